@@ -0,0 +1,443 @@
+#! /usr/bin/env python3
+#-----------------------------------------------------------------------
+#
+# Python rewrite
+# Copyright 2017 Geoff S Derber
+#
+# This file is part of Sorcery.
+#
+# File: benchmarks/grimoire.py
+#
+#    Sorcery is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    Sorcery is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with Sorcery.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Synthetic grimoires
+#
+#    Builds a Source Mage system under a scratch root: several
+#    grimoires with sections, spells, codex.index and provides.index,
+#    plus the installed state, install logs, compressed compile logs,
+#    queues and activity log sorcery keeps.  Point pysorcery at it with
+#    PYSORCERY_ROOT.  The same scale and seed always build the same
+#    tree.
+#
+#        python3 benchmarks/grimoire.py /tmp/smgl --scale medium
+#        PYSORCERY_ROOT=/tmp/smgl pygaze installed
+#
+#-----------------------------------------------------------------------
+"""
+Synthetic grimoires
+
+Builds a Source Mage system under a scratch root: several grimoires
+with sections, spells, codex.index and provides.index, plus the
+installed state, install logs, compressed compile logs, queues and
+activity log sorcery keeps.  Point pysorcery at it with PYSORCERY_ROOT.
+"""
+#-----------------------------------------------------------------------
+#
+# Libraries
+#
+#-----------------------------------------------------------------------
+# System Libraries
+import argparse
+import lzma
+import os
+import random
+import time
+
+#-----------------------------------------------------------------------
+#
+# Global Variables
+#
+#-----------------------------------------------------------------------
+# Number of spells at each named scale
+Scales = {
+    'small': 500,
+    'medium': 5000,
+    'large': 50000,
+}
+
+# Grimoire names, in the order they are listed in the grimoire file
+GRIMOIRES = ('test', 'games', 'binary', 'z-rejected', 'xorg', 'lang')
+
+# Section names, numbered past the end of the list when more are needed
+SECTIONS = ('archive', 'audio-libs', 'chat-im', 'database', 'devel',
+            'disk', 'doc', 'editors', 'fonts', 'ftp', 'gnome2-libs',
+            'graphics', 'http', 'kde5-apps', 'libs', 'mail', 'net',
+            'perl-cpan', 'python-pypi', 'security', 'shell-term-fm',
+            'science', 'utils', 'video', 'web', 'x11', 'xfce')
+
+LICENSES = ('GPL', 'LGPL', 'BSD', 'MIT', 'APACHE', 'ARTISTIC', 'MPL')
+FEATURES = ('SHELL', 'MAIL-TRANSPORT-AGENT', 'WWW-BROWSER', 'SSL',
+            'JAVA', 'X11-SERVER', 'CRON', 'SYSLOGD', 'SQL', 'EDITOR')
+SYLLABLES = ('ba', 'ce', 'di', 'fo', 'gu', 'ha', 'ke', 'li', 'mo', 'nu',
+             'pa', 're', 'si', 'to', 'vu', 'xa', 'ze', 'lo', 'ri', 'sh')
+
+# Average spells per section
+SECTION_SIZE = 50
+
+#-----------------------------------------------------------------------
+#
+# Functions
+#
+# spell_name
+# write
+# make_spell
+# make_grimoires
+# make_state
+# make_system
+# main
+#
+#-----------------------------------------------------------------------
+
+#-----------------------------------------------------------------------
+#
+# Function spell_name
+#
+# A unique, pronounceable spell name for an index.
+#
+# Inputs
+# ------
+#    @param: i
+#
+# Returns
+# -------
+#    @return: name
+#
+# Raises
+# ------
+#    ...
+#
+#-----------------------------------------------------------------------
+def spell_name(i):
+    name = ''
+    while True:
+        i, digit = divmod(i, len(SYLLABLES))
+        name += SYLLABLES[digit]
+        if not i:
+            return name
+        i -= 1
+
+#-----------------------------------------------------------------------
+#
+# Function write
+#
+# Write a file, creating its directory.
+#
+# Inputs
+# ------
+#    @param: path
+#    @param: content
+#
+# Returns
+# -------
+#    @return: None
+#
+# Raises
+# ------
+#    @raises: OSError
+#
+#-----------------------------------------------------------------------
+def write(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as file_:
+        file_.write(content)
+
+#-----------------------------------------------------------------------
+#
+# Function make_spell
+#
+# Write a spell directory: DETAILS, DEPENDS and, for some, PROVIDES.
+#
+# Inputs
+# ------
+#    @param: spell_dir
+#    @param: spell   - dictionary from make_system()
+#
+# Returns
+# -------
+#    @return: None
+#
+# Raises
+# ------
+#    @raises: OSError
+#
+#-----------------------------------------------------------------------
+def make_spell(spell_dir, spell):
+    write(os.path.join(spell_dir, 'DETAILS'),
+          '           SPELL=%(name)s\n'
+          '         VERSION=%(version)s\n'
+          '          SOURCE=$SPELL-$VERSION.tar.xz\n'
+          '   SOURCE_URL[0]=https://example.org/$SPELL/$SOURCE\n'
+          '     SOURCE_HASH=sha512:%(hash)s\n'
+          '        WEB_SITE=https://example.org/%(name)s\n'
+          '      LICENSE[0]=%(license)s\n'
+          '         ENTERED=20170101\n'
+          '           SHORT="%(name)s does something useful"\n'
+          'cat << EOF\n'
+          '%(name)s is a synthetic spell.  It exists so gaze has\n'
+          'something realistic to read.\n'
+          'EOF\n' % spell)
+    write(os.path.join(spell_dir, 'DEPENDS'),
+          ''.join('depends %s\n' % depend for depend in spell['depends']))
+    if spell['provides']:
+        write(os.path.join(spell_dir, 'PROVIDES'),
+              spell['provides'] + '\n')
+
+#-----------------------------------------------------------------------
+#
+# Function make_grimoires
+#
+# Write every grimoire, its sections and spells, codex.index and
+# provides.index, and the grimoire list.
+#
+# Inputs
+# ------
+#    @param: root
+#    @param: grimoires - dictionary of grimoire -> list of spells
+#
+# Returns
+# -------
+#    @return: None
+#
+# Raises
+# ------
+#    @raises: OSError
+#
+#-----------------------------------------------------------------------
+def make_grimoires(root, grimoires):
+    codex_dir = os.path.join(root, 'var/lib/sorcery/codex')
+    grimoire_list = []
+
+    for i, (grimoire, spells) in enumerate(grimoires.items()):
+        grimoire_dir = os.path.join(codex_dir, grimoire)
+        grimoire_list.append('GRIMOIRE_DIR[%d]=%s\n' % (i, grimoire_dir))
+        codex_index = []
+        provides_index = []
+
+        for spell in spells:
+            section_dir = os.path.join(grimoire_dir, spell['section'])
+            if not os.path.isdir(section_dir):
+                write(os.path.join(section_dir, 'MAINTAINER'),
+                      '%s@example.org\n' % spell['section'])
+            make_spell(os.path.join(section_dir, spell['name']), spell)
+            codex_index.append('%s %s\n' % (spell['name'], section_dir))
+            if spell['provides']:
+                provides_index.append('%s %s/%s\n' % (spell['provides'],
+                                                      section_dir,
+                                                      spell['name']))
+
+        write(os.path.join(grimoire_dir, 'VERSION'), '0.62-test\n')
+        write(os.path.join(grimoire_dir, 'codex.index'),
+              ''.join(codex_index))
+        write(os.path.join(grimoire_dir, 'provides.index'),
+              ''.join(provides_index))
+
+    write(os.path.join(root, 'etc/sorcery/local/grimoire'),
+          ''.join(grimoire_list))
+
+#-----------------------------------------------------------------------
+#
+# Function make_state
+#
+# Write the installed system: packages, depends, install and compile
+# logs, queues and the activity log.
+#
+# Inputs
+# ------
+#    @param: root
+#    @param: installed - list of installed spells
+#    @param: rand      - random.Random
+#
+# Returns
+# -------
+#    @return: None
+#
+# Raises
+# ------
+#    @raises: OSError
+#
+#-----------------------------------------------------------------------
+def make_state(root, installed, rand):
+    state_dir = os.path.join(root, 'var/state/sorcery')
+    log_dir = os.path.join(root, 'var/log/sorcery')
+    start = time.mktime((2017, 1, 1, 0, 0, 0, 0, 0, -1))
+
+    packages = []
+    depends = []
+    activity = []
+    for i, spell in enumerate(installed):
+        stamp = start + i * 3600
+        date = time.strftime('%Y%m%d', time.gmtime(stamp))
+        status = 'held' if i % 97 == 0 else 'installed'
+        packages.append('%s:%s:%s:%s\n' % (spell['name'], date, status,
+                                           spell['version']))
+        for depend in spell['depends']:
+            depends.append('%s:%s:on:depends:::\n' % (spell['name'], depend))
+        activity.append('%s\tcast\t%s\t%s\tsuccess\n'
+                        % (time.strftime('%Y%m%d:%H%M', time.gmtime(stamp)),
+                           spell['name'], spell['version']))
+
+        log = '%s-%s' % (spell['name'], spell['version'])
+        files = ['/usr/share/doc/%s/README' % spell['name']]
+        files += ['/usr/bin/%s%d' % (spell['name'], n)
+                  for n in range(rand.randint(1, 5))]
+        files += ['/usr/lib/lib%s.so.%d' % (spell['name'], n)
+                  for n in range(rand.randint(0, 10))]
+        write(os.path.join(log_dir, 'install', log),
+              ''.join(path + '\n' for path in files))
+
+        os.makedirs(os.path.join(log_dir, 'compile'), exist_ok=True)
+        with lzma.open(os.path.join(log_dir, 'compile', log + '.xz'),
+                       'wt') as file_:
+            for n in range(rand.randint(50, 500)):
+                file_.write('gcc -O2 -c %s/src/file%03d.c -o file%03d.o\n'
+                            % (log, n, n))
+
+    write(os.path.join(state_dir, 'packages'), ''.join(packages))
+    write(os.path.join(state_dir, 'depends'), ''.join(depends))
+    write(os.path.join(log_dir, 'activity'), ''.join(activity))
+
+    names = [spell['name'] for spell in installed]
+    write(os.path.join(log_dir, 'queue/install'),
+          ''.join(name + '\n' for name in names[::50]))
+    write(os.path.join(log_dir, 'queue/remove'),
+          ''.join(name + '\n' for name in names[25::100]))
+
+#-----------------------------------------------------------------------
+#
+# Function make_system
+#
+# Build a whole synthetic system under root.
+#
+# Inputs
+# ------
+#    @param: root
+#    @param: spells    - Number of spells across all grimoires
+#    @param: grimoires - Number of grimoires
+#    @param: installed - Fraction of spells installed
+#    @param: seed
+#
+# Returns
+# -------
+#    @return: fixtures - dictionary of useful names and paths
+#
+# Raises
+# ------
+#    @raises: OSError
+#
+#-----------------------------------------------------------------------
+def make_system(root, spells=500, grimoires=3, installed=0.2, seed=0):
+    rand = random.Random(seed)
+    root = os.path.abspath(root)
+    grimoires = max(1, grimoires)
+    names = [GRIMOIRES[i] if i < len(GRIMOIRES) else 'grimoire%d' % i
+             for i in range(grimoires)]
+
+    section_count = max(1, spells // SECTION_SIZE)
+    sections = [SECTIONS[i] if i < len(SECTIONS)
+                else '%s-%d' % (SECTIONS[i % len(SECTIONS)], i)
+                for i in range(section_count)]
+
+    all_spells = []
+    for i in range(spells):
+        name = spell_name(i)
+        depends = sorted({spell_name(rand.randrange(i))
+                          for n in range(min(i, rand.randint(0, 6)))})
+        all_spells.append({
+            'name': name,
+            'version': '%d.%d.%d' % (rand.randint(0, 9),
+                                     rand.randint(0, 30),
+                                     rand.randint(0, 20)),
+            'hash': '%0128x' % rand.getrandbits(512),
+            'license': rand.choice(LICENSES),
+            'section': sections[i % section_count],
+            'depends': depends,
+            'provides': (FEATURES[i // 20 % len(FEATURES)]
+                         if i % 20 == 0 else None),
+        })
+
+    # Spells are spread over the grimoires, and a tenth of them are
+    # overridden by a copy in the first grimoire as well.
+    contents = {name: [] for name in names}
+    for i, spell in enumerate(all_spells):
+        contents[names[i % grimoires]].append(spell)
+        if i % 10 == 5 and i % grimoires:
+            contents[names[0]].append(spell)
+    make_grimoires(root, contents)
+
+    # So pysorcery picks the smgl backend under root on any host
+    write(os.path.join(root, 'etc/os-release'),
+          'NAME="Source Mage"\nID=smgl\n')
+
+    chosen = sorted(rand.sample(range(spells), int(spells * installed)))
+    make_state(root, [all_spells[i] for i in chosen], rand)
+
+    return {'root': root,
+            'spells': spells,
+            'grimoires': names,
+            'installed': len(chosen),
+            'spell': all_spells[chosen[0] if chosen else 0]['name'],
+    }
+
+#-----------------------------------------------------------------------
+#
+# Function main
+#
+# ...
+#
+# Inputs
+# ------
+#    ...
+#
+# Returns
+# -------
+#    @return: status
+#
+# Raises
+# ------
+#    ...
+#
+#-----------------------------------------------------------------------
+def main():
+    parser = argparse.ArgumentParser(description = __doc__.strip())
+    parser.add_argument('root',
+                        help = 'Directory to build the system in')
+    parser.add_argument('-s', '--scale',
+                        choices = sorted(Scales),
+                        default = 'small',
+                        help = 'Number of spells, by name')
+    parser.add_argument('-n', '--spells',
+                        type = int,
+                        help = 'Number of spells; overrides --scale')
+    parser.add_argument('-g', '--grimoires',
+                        type = int,
+                        default = 3,
+                        help = 'Number of grimoires')
+    parser.add_argument('--installed',
+                        type = float,
+                        default = 0.2,
+                        help = 'Fraction of spells installed')
+    parser.add_argument('--seed',
+                        type = int,
+                        default = 0)
+    args = parser.parse_args()
+
+    spells = args.spells if args.spells is not None else Scales[args.scale]
+    fixtures = make_system(args.root, spells, args.grimoires,
+                           args.installed, args.seed)
+    print('Built %(spells)d spells, %(installed)d installed, in %(root)s'
+          % fixtures)
+    return 0
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,170 @@
+#! /usr/bin/env python3
+#-----------------------------------------------------------------------
+#
+# Python rewrite
+# Copyright 2017 Geoff S Derber
+#
+# This file is part of Sorcery.
+#
+# File: benchmarks/import_time.py
+#
+#    Sorcery is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    Sorcery is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with Sorcery.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Import time budget
+#
+#    Imports a module in fresh interpreters with '-X importtime' and
+#    fails when the median cumulative import time is over budget.
+#
+#        python3 benchmarks/import_time.py --budget 100 pysorcery.lib
+#
+#-----------------------------------------------------------------------
+"""
+Import time budget
+
+Imports a module in fresh interpreters with '-X importtime' and fails
+when the median cumulative import time is over budget.
+"""
+#-----------------------------------------------------------------------
+#
+# Libraries
+#
+#-----------------------------------------------------------------------
+# System Libraries
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+#-----------------------------------------------------------------------
+#
+# Global Variables
+#
+#-----------------------------------------------------------------------
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), 'src')
+
+# Budgets, in milliseconds
+Budgets = {
+    'pysorcery.lib': 100,
+    'pysorcery.cli.gaze': 150,
+    'pysorcery.cli.archive': 150,
+}
+
+#-----------------------------------------------------------------------
+#
+# Functions
+#
+# measure
+# main
+#
+#-----------------------------------------------------------------------
+
+#-----------------------------------------------------------------------
+#
+# Function measure
+#
+# Import module once in a new interpreter.
+#
+# Inputs
+# ------
+#    @param: module
+#
+# Returns
+# -------
+#    @return: ms - cumulative import time of module and its parent
+#                  packages, in milliseconds
+#
+# Raises
+# ------
+#    @raises: subprocess.CalledProcessError
+#
+#-----------------------------------------------------------------------
+def measure(module):
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(
+        [SRC_DIR] + [p for p in [env.get('PYTHONPATH')] if p])
+
+    result = subprocess.run([sys.executable, '-X', 'importtime',
+                             '-c', 'import ' + module],
+                            env=env,
+                            stdout=subprocess.DEVNULL,
+                            stderr=subprocess.PIPE,
+                            universal_newlines=True,
+                            check=True)
+
+    # Parent packages are imported first, each as its own top level
+    # entry, so add up every top level pysorcery entry.
+    total = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        self_us, cumulative_us, name = line[12:].split('|')
+        if name.startswith(' pysorcery'):
+            total += int(cumulative_us)
+
+    return total / 1000
+
+#-----------------------------------------------------------------------
+#
+# Function main
+#
+# Inputs
+# ------
+#    @param: None
+#
+# Returns
+# -------
+#    @return: status - 0 when every module is within budget
+#
+# Raises
+# ------
+#    ...
+#
+#-----------------------------------------------------------------------
+def main():
+    parser = argparse.ArgumentParser(description = __doc__.strip())
+    parser.add_argument('modules',
+                        nargs = '*',
+                        default = sorted(Budgets),
+                        help = 'Modules to import (default: all budgeted)')
+    parser.add_argument('-n', '--runs',
+                        type = int,
+                        default = 15,
+                        help = 'Imports per module')
+    parser.add_argument('-b', '--budget',
+                        type = float,
+                        help = 'Budget in ms, overriding the defaults')
+    args = parser.parse_args()
+
+    status = 0
+    for module in args.modules:
+        # The first run also fills the disk cache
+        measure(module)
+        times = [measure(module) for i in range(args.runs)]
+        median = statistics.median(times)
+        budget = args.budget or Budgets.get(module)
+
+        if budget is not None and median > budget:
+            verdict = 'OVER BUDGET'
+            status = 1
+        else:
+            verdict = 'ok'
+        print('%-24s median %7.1f ms  min %7.1f ms  budget %s ms  %s'
+              % (module, median, min(times), budget, verdict))
+
+    return status
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,570 @@
+#! /usr/bin/env python3
+#-----------------------------------------------------------------------
+#
+# Python rewrite
+# Copyright 2017 Geoff S Derber
+#
+# This file is part of Sorcery.
+#
+# File: benchmarks/run.py
+#
+#    Sorcery is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    Sorcery is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with Sorcery.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Command benchmarks
+#
+#    Runs representative pygaze, pyarchive and pycast commands end to
+#    end, each in a fresh interpreter, against fixtures built in a
+#    temporary directory.  For every command it records wall time,
+#    import time (-X importtime), peak RSS and the number of
+#    subprocesses started.  With --grimoire the sorcery state is a
+#    synthetic system from grimoire.py rather than the host's.
+#
+#        python3 benchmarks/run.py run -n 10 -o before.json
+#        python3 benchmarks/run.py run -n 10 -o after.json
+#        python3 benchmarks/run.py compare before.json after.json
+#        python3 benchmarks/run.py run --grimoire large -k gaze
+#
+#-----------------------------------------------------------------------
+"""
+Command benchmarks
+
+Runs representative pygaze, pyarchive and pycast commands end to end,
+each in a fresh interpreter, against fixtures built in a temporary
+directory.  For every command it records wall time, import time
+(-X importtime), peak RSS and the number of subprocesses started.
+"""
+#-----------------------------------------------------------------------
+#
+# Libraries
+#
+#-----------------------------------------------------------------------
+# System Libraries
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+import zipfile
+
+# Benchmark Libraries
+import grimoire
+
+#-----------------------------------------------------------------------
+#
+# Global Variables
+#
+#-----------------------------------------------------------------------
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC_DIR = os.path.join(ROOT_DIR, 'src')
+BIN_DIR = os.path.join(ROOT_DIR, 'bin')
+
+# Benchmarks: (name, program, arguments).  Arguments are formatted with
+# the fixture paths; '{outdir}' is a new empty directory for every run.
+Benchmarks = (
+    ('gaze-help', 'pygaze', ['--help']),
+    ('gaze-what', 'pygaze', ['what', '{spell}']),
+    ('gaze-installed', 'pygaze', ['installed']),
+    ('gaze-from', 'pygaze', ['from', '{installed_file}']),
+    ('gaze-orphans', 'pygaze', ['orphans']),
+    ('gaze-alien', 'pygaze', ['alien']),
+    ('archive-help', 'pyarchive', ['--help']),
+    ('archive-list', 'pyarchive', ['list', '{tar}']),
+    ('archive-list-zip', 'pyarchive', ['list', '{zip}']),
+    ('archive-extract', 'pyarchive', ['extract', '-o', '{outdir}', '{tar}']),
+    ('archive-search', 'pyarchive', ['search', '{tar}', '{pattern}']),
+    ('cast-help', 'pycast', ['--help']),
+)
+
+# Run in the child interpreter: count the subprocesses the command
+# starts and report them with the peak RSS when it exits.  The peak is
+# VmHWM of the child's own memory; ru_maxrss would include what the
+# parent had mapped when it forked.
+BOOTSTRAP = """
+import atexit, json, os, resource, runpy, subprocess, sys
+count = [0]
+execute_child = subprocess.Popen._execute_child
+def counting_execute_child(self, *args, **kwargs):
+    count[0] += 1
+    return execute_child(self, *args, **kwargs)
+subprocess.Popen._execute_child = counting_execute_child
+system = os.system
+def counting_system(command):
+    count[0] += 1
+    return system(command)
+os.system = counting_system
+def max_rss_kb():
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+def report():
+    with open(os.environ['PYSORCERY_BENCH_REPORT'], 'w') as file_:
+        json.dump({'subprocesses': count[0],
+                   'max_rss_kb': max_rss_kb()}, file_)
+atexit.register(report)
+sys.argv = sys.argv[1:]
+runpy.run_path(sys.argv[0], run_name='__main__')
+"""
+
+# Metrics compared against a baseline, and how much worse (percent)
+# they may get before being flagged.  None means any increase.
+Thresholds = {
+    'wall_ms': 10,
+    'import_ms': 10,
+    'max_rss_kb': 10,
+    'subprocesses': None,
+}
+
+#-----------------------------------------------------------------------
+#
+# Functions
+#
+# make_fixtures
+# run_once
+# import_time
+# run_benchmark
+# run_benchmarks
+# compare
+# print_results
+# main
+#
+#-----------------------------------------------------------------------
+
+#-----------------------------------------------------------------------
+#
+# Function make_fixtures
+#
+# Build the archives and other inputs the benchmarks use.
+#
+# Inputs
+# ------
+#    @param: root  - Directory to build the fixtures in
+#    @param: files - Number of files in each archive
+#    @param: spell - Package to query
+#
+# Returns
+# -------
+#    @return: fixtures - dictionary of argument placeholders
+#
+# Raises
+# ------
+#    ...
+#
+#-----------------------------------------------------------------------
+def make_fixtures(root, files=200, spell='bash'):
+    tree = os.path.join(root, 'tree')
+    for i in range(files):
+        directory = os.path.join(tree, 'dir%02d' % (i % 10))
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, 'file%04d.txt' % i), 'w') as file_:
+            for line in range(50):
+                file_.write('file %d line %d lorem ipsum dolor sit amet\n'
+                            % (i, line))
+
+    tar = os.path.join(root, 'fixture.tar.gz')
+    with tarfile.open(tar, 'w:gz') as archive:
+        archive.add(tree, arcname='tree')
+
+    zip_ = os.path.join(root, 'fixture.zip')
+    with zipfile.ZipFile(zip_, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for dirpath, dirnames, filenames in os.walk(tree):
+            for filename in sorted(filenames):
+                path = os.path.join(dirpath, filename)
+                archive.write(path, os.path.relpath(path, root))
+
+    return {'root': root,
+            'tar': tar,
+            'zip': zip_,
+            'pattern': 'line 7 lorem',
+            'spell': spell,
+            'installed_file': shutil.which('sh') or '/bin/sh',
+    }
+
+#-----------------------------------------------------------------------
+#
+# Function run_once
+#
+# Run a command once in a fresh interpreter.
+#
+# Inputs
+# ------
+#    @param: argv - Program and arguments
+#    @param: env
+#
+# Returns
+# -------
+#    @return: sample - dictionary of wall_ms, max_rss_kb, subprocesses
+#                      and returncode
+#
+# Raises
+# ------
+#    ...
+#
+#-----------------------------------------------------------------------
+def run_once(argv, env):
+    fd, report = tempfile.mkstemp(prefix='pysorcery-bench-')
+    os.close(fd)
+    env = dict(env, PYSORCERY_BENCH_REPORT=report)
+
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, '-c', BOOTSTRAP] + argv,
+                               env=env,
+                               stdin=subprocess.DEVNULL,
+                               stdout=subprocess.DEVNULL,
+                               stderr=subprocess.DEVNULL)
+    process.wait()
+    wall = time.perf_counter() - start
+
+    try:
+        with open(report) as file_:
+            found = json.load(file_)
+    except ValueError:
+        found = {}
+    finally:
+        os.unlink(report)
+
+    return {'wall_ms': wall * 1000,
+            'max_rss_kb': found.get('max_rss_kb'),
+            'subprocesses': found.get('subprocesses'),
+            'returncode': process.returncode,
+    }
+
+#-----------------------------------------------------------------------
+#
+# Function import_time
+#
+# Run a command once with '-X importtime'.
+#
+# Inputs
+# ------
+#    @param: argv - Program and arguments
+#    @param: env
+#
+# Returns
+# -------
+#    @return: ms - total time spent importing pysorcery modules
+#
+# Raises
+# ------
+#    ...
+#
+#-----------------------------------------------------------------------
+def import_time(argv, env):
+    result = subprocess.run([sys.executable, '-X', 'importtime'] + argv,
+                            env=env,
+                            stdin=subprocess.DEVNULL,
+                            stdout=subprocess.DEVNULL,
+                            stderr=subprocess.PIPE,
+                            universal_newlines=True)
+
+    # Modules are imported lazily, so add up every pysorcery entry
+    # that was not imported by another pysorcery module.  Entries are
+    # printed after their children, so walk them backwards.
+    total = 0
+    stack = []
+    for line in reversed(result.stderr.splitlines()):
+        if not line.startswith('import time:'):
+            continue
+        self_us, cumulative_us, name = line[12:].split('|')
+        indent = len(name) - len(name.lstrip())
+        while stack and stack[-1][0] >= indent:
+            stack.pop()
+
+        ours = name.strip().startswith('pysorcery')
+        if ours and not any(parent for depth, parent in stack):
+            total += int(cumulative_us)
+        stack.append((indent, ours))
+
+    return total / 1000
+
+#-----------------------------------------------------------------------
+#
+# Function run_benchmark
+#
+# Inputs
+# ------
+#    @param: program   - 'pygaze', 'pyarchive' or 'pycast'
+#    @param: arguments - Argument templates
+#    @param: fixtures  - From make_fixtures()
+#    @param: runs
+#    @param: env
+#
+# Returns
+# -------
+#    @return: result - dictionary of metrics
+#
+# Raises
+# ------
+#    ...
+#
+#-----------------------------------------------------------------------
+def run_benchmark(program, arguments, fixtures, runs, env):
+    def argv():
+        outdir = tempfile.mkdtemp(dir=fixtures['root'])
+        return [os.path.join(BIN_DIR, program)] + \
+            [argument.format(outdir=outdir, **fixtures)
+             for argument in arguments]
+
+    # Warm up, filling the disk cache
+    run_once(argv(), env)
+    samples = [run_once(argv(), env) for i in range(runs)]
+
+    walls = [sample['wall_ms'] for sample in samples]
+    # None when the command exited without running atexit handlers
+    rss = [sample['max_rss_kb'] for sample in samples
+           if sample['max_rss_kb'] is not None]
+    return {'argv': [program] + arguments,
+            'runs': runs,
+            'wall_ms': statistics.median(walls),
+            'wall_ms_min': min(walls),
+            'wall_ms_max': max(walls),
+            'wall_ms_stdev': statistics.stdev(walls) if runs > 1 else 0.0,
+            'import_ms': import_time(argv(), env),
+            'max_rss_kb': max(rss) if rss else None,
+            'subprocesses': samples[-1]['subprocesses'],
+            'returncode': samples[-1]['returncode'],
+    }
+
+#-----------------------------------------------------------------------
+#
+# Function run_benchmarks
+#
+# Inputs
+# ------
+#    @param: args - Parsed command line
+#
+# Returns
+# -------
+#    @return: results - dictionary of metadata and per benchmark results
+#
+# Raises
+# ------
+#    ...
+#
+#-----------------------------------------------------------------------
+def run_benchmarks(args):
+    root = tempfile.mkdtemp(prefix='pysorcery-bench-')
+    try:
+        fixtures = make_fixtures(root, files=args.files, spell=args.spell)
+
+        env = dict(os.environ)
+        env['PYTHONPATH'] = os.pathsep.join(
+            [SRC_DIR] + [p for p in [env.get('PYTHONPATH')] if p])
+        env['PYSORCERY_CACHE_DIR'] = os.path.join(root, 'cache')
+
+        if args.grimoire:
+            system = grimoire.make_system(os.path.join(root, 'system'),
+                                          grimoire.Scales[args.grimoire])
+            env['PYSORCERY_ROOT'] = system['root']
+
+        results = {}
+        for name, program, arguments in Benchmarks:
+            if args.filter and not any(f in name for f in args.filter):
+                continue
+            results[name] = run_benchmark(program, arguments, fixtures,
+                                          args.runs, env)
+            print_results({name: results[name]})
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    try:
+        commit = subprocess.check_output(['git', 'rev-parse', 'HEAD'],
+                                         cwd=ROOT_DIR,
+                                         stderr=subprocess.DEVNULL,
+                                         universal_newlines=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {'meta': {'commit': commit,
+                     'date': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+                     'python': platform.python_version(),
+                     'platform': platform.platform(),
+                     'cpus': os.cpu_count(),
+            },
+            'results': results,
+    }
+
+#-----------------------------------------------------------------------
+#
+# Function compare
+#
+# Flag metrics that got worse than the baseline by more than their
+# threshold, and commands that stopped succeeding.
+#
+# Inputs
+# ------
+#    @param: baseline - results from run_benchmarks()
+#    @param: current  - results from run_benchmarks()
+#    @param: scale    - multiplies every percentage threshold
+#
+# Returns
+# -------
+#    @return: regressions - list of messages
+#
+# Raises
+# ------
+#    ...
+#
+#-----------------------------------------------------------------------
+def compare(baseline, current, scale=1.0):
+    regressions = []
+    for name, new in sorted(current['results'].items()):
+        old = baseline['results'].get(name)
+        if old is None:
+            continue
+
+        if old['returncode'] == 0 and new['returncode'] != 0:
+            regressions.append('%s: now exits with %d'
+                               % (name, new['returncode']))
+
+        for metric, threshold in sorted(Thresholds.items()):
+            before = old.get(metric)
+            after = new.get(metric)
+            if before is None or after is None:
+                continue
+            if threshold is None:
+                worse = after > before
+            else:
+                worse = after > before * (1 + threshold * scale / 100.0)
+            if worse:
+                change = (after - before) * 100.0 / before if before else 0
+                regressions.append('%s: %s %s -> %s (%+.1f%%)'
+                                   % (name, metric, round(before, 1),
+                                      round(after, 1), change))
+
+    return regressions
+
+#-----------------------------------------------------------------------
+#
+# Function print_results
+#
+# Inputs
+# ------
+#    @param: results - dictionary of benchmark name -> result
+#
+# Returns
+# -------
+#    @return: None
+#
+# Raises
+# ------
+#    ...
+#
+#-----------------------------------------------------------------------
+def print_results(results):
+    for name, result in results.items():
+        print('%-18s wall %8.1f ms (+/- %5.1f)  import %6.1f ms  '
+              'rss %7s kB  subprocs %4s  exit %d'
+              % (name,
+                 result['wall_ms'],
+                 result['wall_ms_stdev'],
+                 result['import_ms'],
+                 result['max_rss_kb'],
+                 result['subprocesses'],
+                 result['returncode']))
+    return
+
+#-----------------------------------------------------------------------
+#
+# Function main
+#
+# Inputs
+# ------
+#    @param: None
+#
+# Returns
+# -------
+#    @return: status - 1 when a regression was found
+#
+# Raises
+# ------
+#    ...
+#
+#-----------------------------------------------------------------------
+def main():
+    parser = argparse.ArgumentParser(description = __doc__.strip())
+    subparsers = parser.add_subparsers(dest = 'command')
+    subparsers.required = True
+
+    run = subparsers.add_parser('run',
+                                help = 'Run the benchmarks')
+    run.add_argument('-n', '--runs',
+                     type = int,
+                     default = 10,
+                     help = 'Timed runs per benchmark')
+    run.add_argument('-k', '--filter',
+                     action = 'append',
+                     help = 'Only run benchmarks whose name contains this')
+    run.add_argument('-o', '--output',
+                     help = 'Write the results to this JSON file')
+    run.add_argument('-b', '--baseline',
+                     help = 'Compare against this JSON file')
+    run.add_argument('--files',
+                     type = int,
+                     default = 200,
+                     help = 'Files in each fixture archive')
+    run.add_argument('--spell',
+                     default = 'bash',
+                     help = 'Package to query')
+    run.add_argument('--grimoire',
+                     choices = sorted(grimoire.Scales),
+                     help = 'Run against a synthetic sorcery system of '
+                            'this scale (see grimoire.py)')
+
+    cmp_ = subparsers.add_parser('compare',
+                                 help = 'Compare two result files')
+    cmp_.add_argument('baseline')
+    cmp_.add_argument('current')
+
+    for cmd in (run, cmp_):
+        cmd.add_argument('-t', '--threshold-scale',
+                         type = float,
+                         default = 1.0,
+                         help = 'Multiply the regression thresholds')
+
+    args = parser.parse_args()
+
+    if args.command == 'run':
+        current = run_benchmarks(args)
+        if args.output:
+            with open(args.output, 'w') as file_:
+                json.dump(current, file_, indent=2, sort_keys=True)
+        if not args.baseline:
+            return 0
+        with open(args.baseline) as file_:
+            baseline = json.load(file_)
+    else:
+        with open(args.baseline) as file_:
+            baseline = json.load(file_)
+        with open(args.current) as file_:
+            current = json.load(file_)
+        print_results(current['results'])
+
+    regressions = compare(baseline, current, args.threshold_scale)
+    for regression in regressions:
+        print('REGRESSION ' + regression)
+    return 1 if regressions else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
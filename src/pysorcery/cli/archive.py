@@ -66,6 +66,9 @@ from pysorcery.lib.system import mimetypes
 from pysorcery import *
 from pysorcery import lib
 from pysorcery.lib import util
+from pysorcery.lib.util import output
+from pysorcery.lib.util import plugin
+from pysorcery.lib.util import profiling
 from pysorcery.lib import config
 from pysorcery.lib.util import text
 from pysorcery.lib.files import archive
@@ -118,7 +121,7 @@ colortext = text.ConsoleText()
 #
 # Returns
 # -------
-#    @return: None
+#    @return: res - the exit status the command returned
 #
 # Raises
 # ------
@@ -126,9 +129,8 @@ colortext = text.ConsoleText()
 #
 #-----------------------------------------------------------------------
 def real_main(args):
-    logger.debug('Entered Function')
-
     pluginpath = util.ARCHIVE_PATH
+    argv = sys.argv[1:] if args is None else args
 
     epilog_text = """
 See man pyarchive() for more information.\n
@@ -146,44 +148,45 @@ Report bugs to ...
     parent_parser = parser.add_logging_option()
     subparsers = parser.create_subparsers()
 
-    # Get list of subcommands
-    subcommands = util.get_cmd_types('archive',pluginpath)
-
-    # Create the subcommand arguments
-    for i in subcommands:
-        subcommand = util.get_module_func(scmd='archive',
-                                          program=i,
-                                          cmd='parser')
-        subcommand(subparsers, parent_parser)
+    # Create the subcommand arguments.  Only the selected command's
+    # plugin is imported.
+    plugin.add_subcommands(subparsers,
+                           'archive',
+                           pluginpath,
+                           argv,
+                           parent_parser,
+                           parser=parser)
 
     # This doesn't work...
     if BASHCOMPLETE is True:
         argcomplete.autocomplete(parser)
 
     #
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     # Set configuration
     config_ = config.main_configure(args)
 
     # Print status if debugging
     logger.debug('Configuration set')
-    logger.debug2('Configuration Settings: ' + str(config_))
-    logger.debug3('Arguments: ' + str(args))
+    logger.debug2('Configuration Settings: %s', config_)
+    logger.debug3('Arguments: %s', args)
 
     # 'application' code
-    if DEBUG is False:
-        try:
-            args.func(args)
-        except:
-            parser.print_help()
-            logger.error('No command was given')
-    else:
-        args.func(args)
+    with profiling.span('command'):
+        if DEBUG is False:
+            try:
+                res = args.func(args)
+            except:
+                parser.print_help()
+                logger.error('No command was given')
+                res = 1
+        else:
+            res = args.func(args)
+    output.flush()
 
     #logging.verifydebuglevels()
-    logger.debug('End Function')
-    return
+    return res
 
 
 #-----------------------------------------------------------------------
@@ -199,7 +202,7 @@ Report bugs to ...
 #
 # Returns
 # -------
-#    @param: None (Change this for error exits)
+#    @return: res - exit status for sys.exit()
 #
 # Raises
 # ------
@@ -218,7 +221,7 @@ def main(args=None):
 
     Returns
     -------
-         @return: None
+         @return: res - exit status for sys.exit()
 
     Raises
     ------
@@ -226,19 +229,20 @@ def main(args=None):
 
     """
 
+    res = 1
     if DEBUG is False:
         try:
-            real_main(args)
+            res = real_main(args)
         except KeyboardInterrupt:
-            log_error("aborted")
+            logger.error("aborted")
         except Exception as msg:
             logger.critical('You Fucked Up')
             logger.critical(msg)
     else:
-        real_main(args)
+        res = real_main(args)
 
     logger.debug('End Application')
-    return
+    return res
 
 #-----------------------------------------------------------------------
 #
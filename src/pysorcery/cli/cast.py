@@ -61,8 +61,10 @@ from pysorcery.lib.system import argparse
 from pysorcery.lib.system import logging
 # Other Application Libraries
 from pysorcery import __version__, DEBUG
+from pysorcery import lib
 from pysorcery.lib import util
 from pysorcery.lib import config
+from pysorcery.lib.util import profiling
 from pysorcery.lib.util import text
 
 # Conditional Libraries
@@ -112,10 +114,8 @@ colortext = text.ConsoleText()
 #
 #-------------------------------------------------------------------------------
 def cast(args):
-    logger.debug("Begin Function")
-
     for i in args.spell:
-        logger.debug2('Loop iteration: ' + i)
+        logger.debug2('Loop iteration: %s', i)
         
         spell = lib.Package(i)
         spell.install()
@@ -124,13 +124,12 @@ def cast(args):
         #except:
         #    description = 'Fall back description, something went wrong'
 
-        logger.debug3('Spell: ' + str(spell))
+        logger.debug3('Spell: %s', spell)
             
         message = colortext.colorize(spell.name, 'bold','white','black')
         logger.info(message)
 
     
-    logger.debug("End Function")
     return
 
 
@@ -146,11 +145,13 @@ def cast(args):
 #
 #-------------------------------------------------------------------------------
 def real_main(args):    
-    logger.debug("Entered Function")
-
     # Parse Command Line Arguments
 
-    parser = argparse.ArgumentParser(description='Process parameters')
+    # The common logging options (-q, -v, --profile, ...) come from the
+    # parent parser CommonParser.add_logging_option() creates
+    common = argparse.CommonParser(add_help=False)
+    parser = argparse.CommonParser(description='Process parameters',
+                                   parents=[common.add_logging_option()])
 
     #
     packages = parser.add_argument_group('Package List')
@@ -235,33 +236,16 @@ def real_main(args):
                         help='Override "Voyeur" setting')
 
 
-    #
-    log_opts = parser.add_argument_group('Logging Options')
-    log_opts.add_argument("-q", "--quiet",
-                          action="count",
-                          default=0,
-                          help="Decrease output verbosity")
-    if enable_debugging_mode:
-        log_opts.add_argument("-v", "--verbosity",
-                              action="count",
-                              default=0,
-                              help="Increase output verbosity")
-        log_opts.add_argument("--loglevel",
-                              choices=["debug","info","warning",
-                                       "error","critical","DEBUG",
-                                       "INFO","WARNING","ERROR","CRITICAL"],
-                              help="Set minimum logging level")
-        log_opts.add_argument("--debug",
-                              action="store_true",
-                              help="Maximize logging information")
-    
     #
     parser.add_argument("--version",
                         action="version",
                         help="Print version information and exit",
                         version="%(prog)s " + __version__)
 
-    args = parser.parse_args()
+    parser.set_defaults(debug = False,
+                        loglevel = 'INFO')
+
+    args = parser.parse_args(args)
 
     # Ensure we have root access
     if os.geteuid() != 0:
@@ -272,17 +256,17 @@ def real_main(args):
         os.execvp("sudo", ["sudo"] + sys.argv)
 
     # Get configuration settings
-    config = libconfig.main_configure(args)
+    config_ = config.main_configure(args)
 
     logger.debug("Configuration set")
-    logger.debug2("Configuration Settings: " + str(config))
-    logger.debug3("Arguments: " + str(args))
+    logger.debug2("Configuration Settings: %s", config_)
+    logger.debug3("Arguments: %s", args)
 
     # "application" code
-    cast(args)
+    with profiling.span('command', 'cast'):
+        cast(args)
     
 #    logging.verifydebuglevels()
-    logger.debug("End Function")
     return 0
 
 
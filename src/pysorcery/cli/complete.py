@@ -0,0 +1,417 @@
+#!/usr/bin/env python3
+#-----------------------------------------------------------------------
+#
+# Python rewrite
+# Copyright 2017 Geoff S Derber
+#
+# This file is part of Sorcery.
+#
+# File: pysorcery/cli/complete.py
+#
+#    Sorcery is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published
+#    by the Free Software Foundation, either version 3 of the License,
+#    or (at your option) any later version.
+#
+#    Sorcery is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with Sorcery.  If not, see <http://www.gnu.org/licenses/>.
+#
+#
+# pyGaze completion
+#
+# Shell completion for pygaze command, spell, section and grimoire
+# names.  Candidates come from a sorted name list kept in the cache
+# directory and searched by prefix, so completing does not import the
+# gaze plugins or read the codex.  The list records the files it was
+# built from (grimoire list, every codex.index, the dpkg status file
+# and the plugin directory) and is rebuilt when one of them changes.
+#
+# Only looking names up must be fast, so nothing from pysorcery is
+# imported at module level; bin/pygaze-complete runs this file by path
+# without importing the package.
+#
+#    complete -o default -C pygaze-complete pygaze
+#
+#-----------------------------------------------------------------------
+"""
+pyGaze completion
+
+Shell completion for pygaze command, spell, section and grimoire names.
+Candidates come from a sorted name list kept in the cache directory and
+searched by prefix, so completing does not import the gaze plugins or
+read the codex.  The list is rebuilt when a file it was built from
+changes.
+
+    complete -o default -C pygaze-complete pygaze
+"""
+
+#-----------------------------------------------------------------------
+#
+# Libraries
+#
+#-----------------------------------------------------------------------
+# System Libraries
+import bisect
+import os
+import sys
+
+# 3rd Party Libraries
+
+
+# Application Libraries
+# Imported by build_names() only; see above.
+
+# Conditional Libraries
+
+
+#-----------------------------------------------------------------------
+#
+# Global Variables
+#
+#-----------------------------------------------------------------------
+# Same location as pysorcery.lib.util.cache.CACHE_DIR
+NAMES_FILE = os.path.join(
+    os.environ.get('PYSORCERY_CACHE_DIR',
+                   os.path.join(os.environ.get('XDG_CACHE_HOME',
+                                               os.path.expanduser('~/.cache')),
+                                'pysorcery')),
+    'gaze-names')
+
+# Same as pysorcery.lib.util.SORCERY_ROOT
+SORCERY_ROOT = os.environ.get('PYSORCERY_ROOT', '/')
+
+# Name kinds a command's first argument can complete to, by the dest
+# of that argument in the plugin's parser
+ArgumentKinds = {
+    'spell': 'spell',
+    'section': 'section',
+}
+
+# Options whose value is a grimoire name
+GRIMOIRE_OPTIONS = ('-g', '--grimoire')
+
+# Other options taking a value, by the values they can complete to
+ValueOptions = {
+    '-j': (),
+    '--jobs': (),
+    '--format': ('ndjson', 'text', 'tsv'),
+    '--loglevel': ('critical', 'debug', 'error', 'info', 'warning'),
+    '--profile-output': (),
+}
+
+#-----------------------------------------------------------------------
+#
+# Functions
+#
+# read_stamp
+# read_names
+# build_names
+# load_names
+# candidates
+# complete
+# main
+#
+#-----------------------------------------------------------------------
+
+#-----------------------------------------------------------------------
+#
+# Function read_stamp
+#
+# One header field per source file: its path and mtime, or -1 when it
+# does not exist.
+#
+# Inputs
+# ------
+#    @param: sources - list of filenames
+#
+# Returns
+# -------
+#    @return: stamp - string
+#
+# Raises
+# ------
+#    ...
+#
+#-----------------------------------------------------------------------
+def read_stamp(sources):
+    fields = []
+    for source in sources:
+        try:
+            mtime = os.stat(source).st_mtime_ns
+        except OSError:
+            mtime = -1
+        fields.append('%s=%d' % (source, mtime))
+    return '\t'.join(fields)
+
+#-----------------------------------------------------------------------
+#
+# Function read_names
+#
+# Read the name list if it is still current, and was built for the
+# same PYSORCERY_ROOT.
+#
+# Inputs
+# ------
+#    @param: path
+#
+# Returns
+# -------
+#    @return: lines - sorted 'kind name' lines, or None when the list
+#                     is missing or stale
+#
+# Raises
+# ------
+#    ...
+#
+#-----------------------------------------------------------------------
+def read_names(path=NAMES_FILE):
+    try:
+        with open(path, encoding='utf-8') as file_:
+            content = file_.read()
+    except OSError:
+        return None
+
+    header, sep, body = content.partition('\n')
+    root, sep, stamp = header[1:].partition('\t')
+    if not header.startswith('#') or root != SORCERY_ROOT:
+        return None
+    sources = [field.rpartition('=')[0]
+               for field in stamp.split('\t') if field]
+    if read_stamp(sources) != stamp:
+        return None
+    return body.split('\n')
+
+#-----------------------------------------------------------------------
+#
+# Function build_names
+#
+# Write the name list: gaze commands and what their argument completes
+# to, grimoires, and the spells and sections of every codex.index (or,
+# on Debian, the installed packages).
+#
+# Inputs
+# ------
+#    @param: path
+#
+# Returns
+# -------
+#    @return: lines - sorted 'kind name' lines
+#
+# Raises
+# ------
+#    @raises: OSError
+#
+#-----------------------------------------------------------------------
+def build_names(path=NAMES_FILE):
+    from pysorcery.lib.system import argparse
+    from pysorcery.lib import util
+    from pysorcery.lib.util import plugin
+    from pysorcery.lib.sorcery.apt import py_dpkg
+
+    names = set()
+    sources = [os.path.dirname(util.GAZE_PATH)]
+
+    subparsers = argparse.ArgumentParser().add_subparsers()
+    for program, name, aliases, help_ in plugin.get_manifest('gaze',
+                                                             util.GAZE_PATH):
+        func = util.get_module_func(scmd='gaze', program=program,
+                                    cmd='parser')
+        cmd = func(subparsers)
+        positionals = [action.dest for action in cmd._actions
+                       if not action.option_strings]
+        for command in [name] + aliases:
+            names.add('command ' + command)
+            if positionals and positionals[0] in ArgumentKinds:
+                names.add('arg %s %s' % (command,
+                                         ArgumentKinds[positionals[0]]))
+
+    grimoire_list = util.root_path('/etc/sorcery/local/grimoire')
+    sources.append(grimoire_list)
+    try:
+        with open(grimoire_list) as file_:
+            grimoire_dirs = [line.strip().partition('=')[2]
+                             for line in file_ if '=' in line]
+    except OSError:
+        grimoire_dirs = []
+
+    for grimoire_dir in grimoire_dirs:
+        names.add('grimoire ' + os.path.basename(grimoire_dir))
+        codex_index = os.path.join(grimoire_dir, 'codex.index')
+        sources.append(codex_index)
+        try:
+            with open(codex_index) as file_:
+                for line in file_:
+                    spell, sep, section_dir = line.strip().partition(' ')
+                    if sep:
+                        names.add('spell ' + spell)
+                        names.add('section ' + os.path.basename(section_dir))
+        except OSError:
+            pass
+
+    if not grimoire_dirs:
+        sources.append(py_dpkg.DPKG_STATUS)
+        try:
+            table = py_dpkg.get_installed_table(py_dpkg.DPKG_STATUS)
+            names.update('spell ' + name for name in table['name'])
+        except OSError:
+            pass
+
+    lines = sorted(names)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp = '%s.%d' % (path, os.getpid())
+    with open(temp, 'w', encoding='utf-8') as file_:
+        file_.write('#%s\t%s\n' % (SORCERY_ROOT, read_stamp(sources)))
+        file_.write('\n'.join(lines))
+    os.replace(temp, path)
+    return lines
+
+#-----------------------------------------------------------------------
+#
+# Function load_names
+#
+# Read the name list, building it first when it is missing or stale.
+#
+# Inputs
+# ------
+#    @param: path
+#
+# Returns
+# -------
+#    @return: lines - sorted 'kind name' lines
+#
+# Raises
+# ------
+#    ...
+#
+#-----------------------------------------------------------------------
+def load_names(path=NAMES_FILE):
+    lines = read_names(path)
+    if lines is None:
+        lines = build_names(path)
+    return lines
+
+#-----------------------------------------------------------------------
+#
+# Function candidates
+#
+# Every name of a kind starting with prefix.
+#
+# Inputs
+# ------
+#    @param: lines  - from load_names()
+#    @param: kind   - 'command', 'spell', 'section', 'grimoire', ...
+#    @param: prefix
+#
+# Returns
+# -------
+#    @return: names - list
+#
+# Raises
+# ------
+#    ...
+#
+#-----------------------------------------------------------------------
+def candidates(lines, kind, prefix):
+    key = kind + ' ' + prefix
+    names = []
+    for line in lines[bisect.bisect_left(lines, key):]:
+        if not line.startswith(key):
+            break
+        names.append(line[len(kind) + 1:])
+    return names
+
+#-----------------------------------------------------------------------
+#
+# Function complete
+#
+# Complete the word being typed on a pygaze command line.
+#
+# Inputs
+# ------
+#    @param: words - the words before the one being completed,
+#                    without the program name
+#    @param: word  - the partial word
+#    @param: lines - from load_names()
+#
+# Returns
+# -------
+#    @return: names - list
+#
+# Raises
+# ------
+#    ...
+#
+#-----------------------------------------------------------------------
+def complete(words, word, lines):
+    if word.startswith('-'):
+        return []
+    if words and words[-1] in GRIMOIRE_OPTIONS:
+        return candidates(lines, 'grimoire', word)
+    if words and words[-1] in ValueOptions:
+        return [value for value in ValueOptions[words[-1]]
+                if value.startswith(word)]
+
+    commands = [w for i, w in enumerate(words)
+                if not w.startswith('-')
+                and (i == 0 or words[i - 1] not in ValueOptions)]
+    if not commands:
+        return candidates(lines, 'command', word)
+
+    kinds = candidates(lines, 'arg', commands[0] + ' ')
+    if not kinds:
+        return []
+    return candidates(lines, kinds[0].partition(' ')[2], word)
+
+#-----------------------------------------------------------------------
+#
+# Main
+#
+# Called by bash 'complete -C' as: pygaze-complete COMMAND WORD PREVIOUS
+# with the command line in COMP_LINE and the cursor in COMP_POINT.
+# Prints one candidate per line.
+#
+# Inputs
+# ------
+#    @param: args
+#
+# Returns
+# -------
+#    @return: status
+#
+# Raises
+# ------
+#    ...
+#
+#-----------------------------------------------------------------------
+def main(args = None):
+    args = sys.argv[1:] if args is None else args
+    word = args[1] if len(args) > 1 else ''
+
+    line = os.environ.get('COMP_LINE', ' '.join(args[:1]))
+    point = int(os.environ.get('COMP_POINT', len(line)))
+    words = line[:point].split()[1:]
+    if words and not line[:point].endswith((' ', '\t')):
+        words = words[:-1]
+
+    try:
+        lines = load_names()
+    except Exception:
+        return 1
+
+    names = complete(words, word, lines)
+    if names:
+        sys.stdout.write('\n'.join(names) + '\n')
+    return 0
+
+#———————————————————————————————————————————————————————————————————————
+#
+# ...
+#
+#———————————————————————————————————————————————————————————————————————
+if __name__ == '__main__':
+    sys.exit(main())
@@ -74,6 +74,10 @@ from pysorcery.lib.system import logging
 # Other Application Libraries
 from pysorcery import __version__, DEBUG
 from pysorcery.lib import util
+from pysorcery.lib.util import output
+from pysorcery.lib.util import plugin
+from pysorcery.lib.util import profiling
+from pysorcery.cli import gazed
 from pysorcery.lib import config
 from pysorcery.lib.util import text
 from pysorcery.plugins import gaze
@@ -92,6 +96,10 @@ logger = logging.getLogger(__name__)
 # Allow color text on console
 colortext = text.ConsoleText()
 
+# Parsers already built, by selected plugin.  A one-shot run builds
+# one; pygazed reuses them across commands.
+Parsers = {}
+
 #-----------------------------------------------------------------------
 #
 # Classes
@@ -102,6 +110,7 @@ colortext = text.ConsoleText()
 #
 # Functions
 #
+# make_parser
 # real_main
 # main
 #
@@ -109,30 +118,27 @@ colortext = text.ConsoleText()
 
 #-----------------------------------------------------------------------
 #
-# Function Real_Main
+# Function make_parser
 #
-# 1. Creates the argument parser
-# 2. Establishes configuration
-# 3. Runs the function specified by the arguments
+# Build the argument parser for a command line.  Only the selected
+# command's plugin is imported; parsers are kept in Parsers.
 #
 # Inputs
 # ------
-#    @param: args
+#    @param: argv - Command line arguments, without the program name
 #
 # Returns
 # -------
-#    @return: None
+#    @return: parser
 #
 # Raises
 # ------
-#    @raises: ...
+#    ...
 #
 #-----------------------------------------------------------------------
-def real_main(args):
-    logger.debug('Entered Function')
+def make_parser(argv):
     pluginpath = util.GAZE_PATH
 
-    subcommands = util.get_cmd_types('gaze',pluginpath)
     epilog_text = """
 See man pygaze() for more information.\n
 \n
@@ -145,23 +151,38 @@ Report bugs to ...
         epilog = epilog_text
     )
     parser.add_version_option()
+    parser.add_jobs_option()
+    parser.add_format_option()
     parent_parser = parser.add_logging_option()
     repo_parent_parser = argparse.ArgumentParser(add_help=False)
+    repo_parent_parser.add_argument('-g','--grimoire',
+                                    nargs = '*',
+                                    help = 'Specify which grimoire(s) to look in.')
+
+    # The options are known before the command is looked for, so that
+    # their values are not taken for it
+    selected = plugin.find_command(plugin.get_manifest('gaze', pluginpath),
+                                   argv,
+                                   parser,
+                                   parent_parser,
+                                   repo_parent_parser)
+    if selected in Parsers:
+        return Parsers[selected]
 
     # Create subcommands
     subparsers = parser.add_subparsers(title = 'commands',
                                        metavar = 'Command',
                                        help = 'Description'
     )
-    repo_parent_parser.add_argument('-g','--grimoire',
-                                    nargs = '*',
-                                    help = 'Specify which grimoire(s) to look in.')
 
-    for i in subcommands:
-        subcommand = util.get_module_func(scmd='gaze',
-                                          program=i,
-                                          cmd='parser')
-        subcommand(subparsers, parent_parser, repo_parent_parser)
+    # Only the selected command's plugin is imported
+    plugin.add_subcommands(subparsers,
+                           'gaze',
+                           pluginpath,
+                           argv,
+                           parent_parser,
+                           repo_parent_parser,
+                           parser=parser)
 
     # Parser Arguments
     #parser.add_argument('filename',
@@ -171,12 +192,45 @@ Report bugs to ...
                         verbosity = 0,
                         loglevel = 'INFO')
 
+    Parsers[selected] = parser
+    return parser
+
+#-----------------------------------------------------------------------
+#
+# Function Real_Main
+#
+# 1. Creates the argument parser
+# 2. Establishes configuration
+# 3. Runs the function specified by the arguments
+#
+# Inputs
+# ------
+#    @param: args
+#
+# Returns
+# -------
+#    @return: None
+#
+# Raises
+# ------
+#    @raises: ...
+#
+#-----------------------------------------------------------------------
+def real_main(args):
+    argv = sys.argv[1:] if args is None else args
+
+    parser = make_parser(argv)
+
     # Store all the arguments in a variable
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     # Ensure we have root access if needed
     if (args.sudo is True and
         os.geteuid() != 0):
+        # The daemon must not replace itself; let the client do it.
+        if gazed.Serving:
+            raise gazed.Fallback('needs root')
+
         # os.execvp() replaces the running process, rather than launching a
         # child process, so there's no need to exit afterwards. The extra
         # 'sudo' in the second parameter is required because Python
@@ -189,14 +243,16 @@ Report bugs to ...
     config_ = config.main_configure(args)
 
     logger.debug2('Configuration set')
-    logger.debug3('Configuration Settings: ' + str(config_))
-    logger.debug4('Arguments: ' + str(args))
+    logger.debug3('Configuration Settings: %s', config_)
+    logger.debug4('Arguments: %s', args)
 
     # 'application' code
     # Run the specified subcommand as per args
-    args.func(args)
+    output.set_format(args.format)
+    with profiling.span('command', args.func.__name__):
+        args.func(args)
+        output.flush()
 
-    logger.debug('End Function')
     return
 
 #-----------------------------------------------------------------------
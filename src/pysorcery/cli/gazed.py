@@ -0,0 +1,598 @@
+#!/usr/bin/env python3
+#-----------------------------------------------------------------------
+#
+# Python rewrite
+# Copyright 2017 Geoff S Derber
+#
+# This file is part of Sorcery.
+#
+# File: pysorcery/cli/gazed.py
+#
+#    Sorcery is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published
+#    by the Free Software Foundation, either version 3 of the License,
+#    or (at your option) any later version.
+#
+#    Sorcery is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with Sorcery.  If not, see <http://www.gnu.org/licenses/>.
+#
+#
+# pyGazed
+#
+# A resident gaze.  pygazed imports every gaze plugin once, keeps the
+# package indexes, installed table and dependency graph warm in the
+# in-memory caches, and answers gaze commands over a Unix domain
+# socket.  The state files behind the caches are polled for changes
+# instead of being statted on every query.
+#
+# pygaze forwards its command line to the daemon when one is
+# listening, and runs the command itself when not.  Set
+# PYSORCERY_NO_DAEMON to always run in-process.
+#
+#-----------------------------------------------------------------------
+"""
+pyGazed
+
+A resident gaze.  pygazed imports every gaze plugin once, keeps the
+package indexes, installed table and dependency graph warm in the
+in-memory caches, and answers gaze commands over a Unix domain socket.
+The state files behind the caches are polled for changes instead of
+being statted on every query.
+
+pygaze forwards its command line to the daemon when one is listening,
+and runs the command itself when not.  Set PYSORCERY_NO_DAEMON to
+always run in-process.
+"""
+
+#-----------------------------------------------------------------------
+#
+# Libraries
+#
+#-----------------------------------------------------------------------
+# System Libraries
+import contextlib
+import io
+import json
+import os
+import socket
+import stat
+import struct
+import sys
+
+# 3rd Party Libraries
+
+
+# Application Libraries
+# System Library Overrides
+from pysorcery.lib.system import logging
+# Other Application Libraries
+# The server side (pysorcery.cli.gaze and everything it pulls in) is
+# imported by serve(), so forwarding a command stays cheap.
+
+# Conditional Libraries
+
+
+#-----------------------------------------------------------------------
+#
+# Global Variables
+#
+#-----------------------------------------------------------------------
+# Where the daemon listens.  The socket is per user, in a directory only
+# that user can write to: $XDG_RUNTIME_DIR, or else a 0700 directory of
+# its own in /tmp.  Only the user running the daemon may connect, and
+# clients only talk to a daemon of their own user.
+SOCKET_DIR = (os.environ.get('XDG_RUNTIME_DIR') or
+              '/tmp/pygazed-%d' % os.getuid())
+SOCKET_PATH = os.environ.get(
+    'PYSORCERY_GAZED_SOCKET',
+    os.path.join(SOCKET_DIR, 'pygazed-%d.sock' % os.getuid()))
+
+# How long a client waits to connect before running in-process
+CONNECT_TIMEOUT = 1.0
+
+# Environment that changes what a command sees.  When the client's
+# differs from the daemon's, the client runs the command itself.
+ENVIRONMENT = ('PATH', 'PYSORCERY_ROOT', 'PYSORCERY_CACHE_DIR', 'LANG',
+               'TERM', 'NO_COLOR')
+
+# Enable Logging
+# create logger
+logger = logging.getLogger(__name__)
+
+# Commands run once at startup to fill the caches
+WARM = (['installed'],)
+
+# True while the daemon is running a command
+Serving = False
+
+#-----------------------------------------------------------------------
+#
+# Classes
+#
+# Fallback
+# Buffer
+#
+#-----------------------------------------------------------------------
+
+#-----------------------------------------------------------------------
+#
+# Class Fallback
+#
+# Raised by a command that can not run inside the daemon (for example
+# one that needs to re-execute itself under sudo).  The client then
+# runs it in-process.
+#
+#-----------------------------------------------------------------------
+class Fallback(Exception):
+    pass
+
+#-----------------------------------------------------------------------
+#
+# Class Buffer
+#
+# Collects a command's output, answering isatty() as the client's own
+# stream would so colouring matches a direct run.
+#
+#-----------------------------------------------------------------------
+class Buffer(io.StringIO):
+    def __init__(self, isatty):
+        super(Buffer, self).__init__()
+        self._isatty = isatty
+
+    def isatty(self):
+        return self._isatty
+
+#-----------------------------------------------------------------------
+#
+# Functions
+#
+# forward
+# send
+# peer_uid
+# check_socket_dir
+# capture
+# run_command
+# serve
+# main
+#
+#-----------------------------------------------------------------------
+
+#-----------------------------------------------------------------------
+#
+# Function forward
+#
+# Run a gaze command line in the daemon, copying its output to ours.
+#
+# Inputs
+# ------
+#    @param: argv - gaze arguments, without the program name
+#    @param: path - The daemon socket
+#
+# Returns
+# -------
+#    @return: status - exit status, or None when the command was not
+#                      run and should be run in-process
+#
+# Raises
+# ------
+#    ...
+#
+#-----------------------------------------------------------------------
+def forward(argv, path=SOCKET_PATH):
+    if os.environ.get('PYSORCERY_NO_DAEMON'):
+        return None
+
+    request = {'argv': list(argv),
+               'cwd': os.getcwd(),
+               'env': {name: os.environ.get(name) for name in ENVIRONMENT},
+               'tty': [sys.stdout.isatty(), sys.stderr.isatty()],
+    }
+    reply = send(request, path)
+    if reply is None or reply.get('fallback'):
+        return None
+
+    sys.stdout.write(reply['stdout'])
+    sys.stderr.write(reply['stderr'])
+    sys.stdout.flush()
+    return reply['status']
+
+#-----------------------------------------------------------------------
+#
+# Function send
+#
+# Send one request to the daemon and wait for its reply.
+#
+# Inputs
+# ------
+#    @param: request - dictionary
+#    @param: path    - The daemon socket
+#
+# Returns
+# -------
+#    @return: reply - dictionary, or None when no daemon answered
+#
+# Raises
+# ------
+#    ...
+#
+#-----------------------------------------------------------------------
+def send(request, path=SOCKET_PATH):
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(CONNECT_TIMEOUT)
+            sock.connect(path)
+            if peer_uid(sock) != os.getuid():
+                logger.warning('Not using %s: it belongs to another user',
+                               path)
+                return None
+            sock.settimeout(None)
+            sock.sendall(json.dumps(request).encode('utf-8') + b'\n')
+            with sock.makefile('rb') as file_:
+                reply = file_.readline()
+    except OSError:
+        return None
+
+    if not reply:
+        return None
+    return json.loads(reply.decode('utf-8'))
+
+#-----------------------------------------------------------------------
+#
+# Function peer_uid
+#
+# Inputs
+# ------
+#    @param: sock - connected Unix domain socket
+#
+# Returns
+# -------
+#    @return: uid - of the process at the other end
+#
+# Raises
+# ------
+#    @raises: OSError
+#
+#-----------------------------------------------------------------------
+def peer_uid(sock):
+    creds = sock.getsockopt(socket.SOL_SOCKET,
+                            socket.SO_PEERCRED,
+                            struct.calcsize('3i'))
+    pid, uid, gid = struct.unpack('3i', creds)
+    return uid
+
+#-----------------------------------------------------------------------
+#
+# Function check_socket_dir
+#
+# Create the socket's directory, private to the user, when it is
+# missing.  Refuse a directory that is a symbolic link, belongs to
+# another user or that others can write to, since they could replace
+# the socket.
+#
+# Inputs
+# ------
+#    @param: directory
+#
+# Returns
+# -------
+#    @return: None
+#
+# Raises
+# ------
+#    @raises: OSError - the directory is not safe
+#
+#-----------------------------------------------------------------------
+def check_socket_dir(directory):
+    try:
+        os.mkdir(directory, 0o700)
+    except FileExistsError:
+        pass
+
+    info = os.lstat(directory)
+    if (not stat.S_ISDIR(info.st_mode) or
+        info.st_uid != os.getuid() or
+        info.st_mode & 0o022):
+        raise OSError('%s is not a directory private to this user'
+                      % directory)
+    return
+
+#-----------------------------------------------------------------------
+#
+# Function capture
+#
+# Context manager sending stdout, stderr and every logging stream
+# handler writing to them into buffers for the length of one command.
+#
+# Inputs
+# ------
+#    @param: tty - [stdout, stderr] isatty() of the client
+#
+# Returns
+# -------
+#    @return: (stdout, stderr) - io.StringIO
+#
+# Raises
+# ------
+#    ...
+#
+#-----------------------------------------------------------------------
+@contextlib.contextmanager
+def capture(tty):
+    saved = sys.stdout, sys.stderr
+    buffers = Buffer(tty[0]), Buffer(tty[1])
+
+    loggers = [logging.getLogger()]
+    loggers += [log for log in logging.Logger.manager.loggerDict.values()
+                if isinstance(log, logging.Logger)]
+    handlers = []
+    for log in loggers:
+        for handler in log.handlers:
+            if (isinstance(handler, logging.StreamHandler) and
+                handler.stream in saved + (sys.__stdout__, sys.__stderr__)):
+                out = handler.stream in (saved[0], sys.__stdout__)
+                handlers.append((handler, handler.stream))
+                handler.stream = buffers[0 if out else 1]
+
+    sys.stdout, sys.stderr = buffers
+    try:
+        yield buffers
+    finally:
+        sys.stdout, sys.stderr = saved
+        for handler, stream in handlers:
+            handler.stream = stream
+
+#-----------------------------------------------------------------------
+#
+# Function run_command
+#
+# Run one gaze command line inside the daemon.
+#
+# Inputs
+# ------
+#    @param: request - dictionary from forward()
+#
+# Returns
+# -------
+#    @return: reply - dictionary of status, stdout and stderr, or of
+#                     fallback when the client should run it itself
+#
+# Raises
+# ------
+#    ...
+#
+#-----------------------------------------------------------------------
+def run_command(request):
+    global Serving
+    import traceback
+    from pysorcery.cli import gaze
+    from pysorcery.lib.util import output
+    from pysorcery.lib.util import profiling
+
+    env = {name: os.environ.get(name) for name in ENVIRONMENT}
+    if request.get('env') != env:
+        return {'fallback': 'environment differs'}
+
+    argv = sys.argv
+    cwd = os.getcwd()
+    status = 0
+    with capture(request.get('tty', [False, False])) as (out, err):
+        try:
+            Serving = True
+            sys.argv = ['pygaze'] + request['argv']
+            os.chdir(request['cwd'])
+            gaze.main(request['argv'])
+        except SystemExit as error:
+            if isinstance(error.code, int) or error.code is None:
+                status = error.code or 0
+            else:
+                print(error.code, file=sys.stderr)
+                status = 1
+        except Fallback as msg:
+            return {'fallback': str(msg)}
+        except Exception:
+            traceback.print_exc()
+            status = 1
+        finally:
+            Serving = False
+            # Results still buffered belong to this request
+            output.flush()
+            # A --trace or --profile request must not keep tracing or
+            # profiling the daemon; the report goes to the client
+            logging.trace(False)
+            profiling.finish()
+            sys.argv = argv
+            os.chdir(cwd)
+
+    return {'status': status,
+            'stdout': out.getvalue(),
+            'stderr': err.getvalue(),
+    }
+
+#-----------------------------------------------------------------------
+#
+# Function serve
+#
+# Listen on the socket until stopped.  Requests are answered one at a
+# time, since commands share the process' stdout, cwd and caches.
+#
+# Inputs
+# ------
+#    @param: path     - The daemon socket
+#    @param: interval - Seconds between state file polls
+#    @param: warm     - Run WARM before accepting requests
+#
+# Returns
+# -------
+#    @return: None
+#
+# Raises
+# ------
+#    @raises: OSError - when another daemon is already listening, or
+#                       the socket or its directory is not private
+#
+#-----------------------------------------------------------------------
+def serve(path=SOCKET_PATH, interval=1.0, warm=True):
+    import signal
+    import socketserver
+    import threading
+    import time
+
+    from pysorcery.cli import gaze
+    from pysorcery.lib import util
+    from pysorcery.lib.util import cache
+    from pysorcery.lib.util import plugin
+
+    class RequestHandler(socketserver.StreamRequestHandler):
+        def handle(self):
+            uid = peer_uid(self.request)
+            request = json.loads(self.rfile.readline().decode('utf-8'))
+
+            if uid != os.getuid():
+                reply = {'fallback': 'different user'}
+            elif request.get('command') == 'status':
+                reply = {'pid': os.getpid(),
+                         'caches': cache.cache_info(),
+                }
+            elif request.get('command') == 'stop':
+                reply = {'status': 0}
+                threading.Thread(target=self.server.shutdown).start()
+            else:
+                reply = run_command(request)
+
+            self.wfile.write(json.dumps(reply).encode('utf-8') + b'\n')
+
+    def poll():
+        while True:
+            time.sleep(interval)
+            for filenames in cache.poll_stamps():
+                logger.debug('Changed: %s', ', '.join(map(str, filenames)))
+
+    def terminate(signum, frame):
+        raise SystemExit(0)
+
+    check_socket_dir(os.path.dirname(os.path.abspath(path)))
+    if send({'command': 'status'}, path) is not None:
+        raise OSError('pygazed is already listening on ' + path)
+    try:
+        info = os.lstat(path)
+    except FileNotFoundError:
+        pass
+    else:
+        # Only a stale socket of our own is removed
+        if not stat.S_ISSOCK(info.st_mode) or info.st_uid != os.getuid():
+            raise OSError('%s exists and is not a socket of this user'
+                          % path)
+        os.unlink(path)
+
+    # Import every plugin and build its parser now, not on the first
+    # query that needs it.  Parsers take their prog from sys.argv.
+    argv = sys.argv
+    sys.argv = ['pygaze']
+    try:
+        for program, name, aliases, help_ in plugin.get_manifest(
+                'gaze', util.GAZE_PATH):
+            gaze.make_parser([name])
+        gaze.make_parser([])
+    finally:
+        sys.argv = argv
+
+    cache.watch_stamps()
+    if warm:
+        for argv in WARM:
+            run_command({'argv': argv,
+                         'cwd': '/',
+                         'env': {name: os.environ.get(name)
+                                 for name in ENVIRONMENT},
+            })
+
+    umask = os.umask(0o177)
+    try:
+        server = socketserver.UnixStreamServer(path, RequestHandler)
+    finally:
+        os.umask(umask)
+
+    threading.Thread(target=poll, daemon=True).start()
+    signal.signal(signal.SIGTERM, terminate)
+    logger.info('Listening on %s', path)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        os.unlink(path)
+
+    return
+
+#-----------------------------------------------------------------------
+#
+# Main
+#
+# Inputs
+# ------
+#    @param: args
+#
+# Returns
+# -------
+#    @return: status
+#
+# Raises
+# ------
+#    ...
+#
+#-----------------------------------------------------------------------
+def main(args = None):
+    from pysorcery.lib.system import argparse
+
+    parser = argparse.CommonParser(
+        description = 'Answer gaze commands from a resident process'
+    )
+    parser.add_version_option()
+    parser.add_argument('-s', '--socket',
+                        default = SOCKET_PATH,
+                        help = 'Socket to listen on')
+    parser.add_argument('-i', '--interval',
+                        type = float,
+                        default = 1.0,
+                        help = 'Seconds between checks of the state files')
+    parser.add_argument('--no-warm',
+                        dest = 'warm',
+                        action = 'store_false',
+                        help = 'Do not fill the caches before listening')
+    parser.add_argument('--status',
+                        action = 'store_true',
+                        help = 'Show the running daemon\'s caches')
+    parser.add_argument('--stop',
+                        action = 'store_true',
+                        help = 'Stop the running daemon')
+    args = parser.parse_args(args)
+
+    if args.status or args.stop:
+        reply = send({'command': 'stop' if args.stop else 'status'},
+                     args.socket)
+        if reply is None:
+            print('pygazed is not running', file=sys.stderr)
+            return 1
+        if args.status:
+            print(json.dumps(reply, indent=2, sort_keys=True))
+        return 0
+
+    try:
+        serve(args.socket, args.interval, args.warm)
+    except OSError as msg:
+        print(msg, file=sys.stderr)
+        return 1
+    return 0
+
+#———————————————————————————————————————————————————————————————————————
+#
+# ...
+#
+#———————————————————————————————————————————————————————————————————————
+if __name__ == '__main__':
+    sys.exit(main())
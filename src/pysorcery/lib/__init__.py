@@ -38,7 +38,7 @@ This file provides the top level Sorcery API.
 #
 #-----------------------------------------------------------------------
 # System Libraries
-
+import importlib
 
 # 3rd Party Libraries
 
@@ -49,14 +49,9 @@ from pysorcery.lib.system import distro
 from pysorcery.lib.system import logging
 from pysorcery.lib.system import mimetypes
 # Other Application Libraries
-from pysorcery.lib.sorcery import apt
-from pysorcery.lib.sorcery import smgl
-from pysorcery.lib import files
-from pysorcery.lib.files import archive
-from pysorcery.lib.files import audio
-from pysorcery.lib.files import compressed
-from pysorcery.lib.files import package
-from pysorcery.lib.files import video
+#
+# The backends (apt, smgl, files, ...) are only imported by the
+# factory classes below, the first time they are needed.
 
 # Conditional Libraries
 
@@ -71,7 +66,17 @@ from pysorcery.lib.files import video
 logger = logging.getLogger(__name__)
 
 # Get System Package Manoager
-pkg_mgr = distro.distro_group[distro.distro_id]
+pkg_mgr = distro.get_pkg_mgr()
+
+# Backend modules
+FILES = 'pysorcery.lib.files'
+ARCHIVE = 'pysorcery.lib.files.archive'
+AUDIO = 'pysorcery.lib.files.audio'
+COMPRESSED = 'pysorcery.lib.files.compressed'
+PACKAGE = 'pysorcery.lib.files.package'
+VIDEO = 'pysorcery.lib.files.video'
+APT = 'pysorcery.lib.sorcery.apt'
+SMGL = 'pysorcery.lib.sorcery.smgl'
 
 #-----------------------------------------------------------------------
 #
@@ -122,12 +127,12 @@ pkg_mgr = distro.distro_group[distro.distro_id]
 #-----------------------------------------------------------------------
 class File():
     __file_classes = {
-        'archive': archive.Archive,
-        'audio': audio.AudioFile,
-        'compressed': compressed.CompressedFile,
-        'package': package.PackageFile,
-        'video': video.VideoFile,
-        'default': files.BaseFile
+        'archive': (ARCHIVE, 'Archive'),
+        'audio': (AUDIO, 'AudioFile'),
+        'compressed': (COMPRESSED, 'CompressedFile'),
+        'package': (PACKAGE, 'PackageFile'),
+        'video': (VIDEO, 'VideoFile'),
+        'default': (FILES, 'BaseFile')
     }
 
     #-------------------------------------------------------------------
@@ -156,7 +161,7 @@ class File():
     #-------------------------------------------------------------------
     @staticmethod
     def id_file_class(filename):
-        mimetype, encoding = mimetypes.guess_type(filename)
+        mimetype, encoding = mimetypes.detect_type(filename)
 
         try:
             id_ = mimetypes.fileclasstypes[mimetype]
@@ -191,7 +196,7 @@ class File():
     @staticmethod
     def __new__(cls, filename, *args, **kwargs):
         name = File.id_file_class(filename)
-        share_class = File.__file_classes.get(name.lower(), None)
+        share_class = load_class(File.__file_classes.get(name.lower()))
         if share_class:
             return share_class(filename, *args, **kwargs)
         else:
@@ -220,11 +225,11 @@ class File():
 #-----------------------------------------------------------------------
 class Files():
     __file_classes = {
-        'archive': archive.Archives,
-        'compressed': compressed.CompressedFiles,
-        'audio': audio.AudioFiles,
-        'package': package.PackageFiles,
-        'default': files.BaseFiles
+        'archive': (ARCHIVE, 'Archives'),
+        'compressed': (COMPRESSED, 'CompressedFiles'),
+        'audio': (AUDIO, 'AudioFiles'),
+        'package': (PACKAGE, 'PackageFiles'),
+        'default': (FILES, 'BaseFiles')
     }
 
     #-------------------------------------------------------------------
@@ -253,7 +258,7 @@ class Files():
     #-------------------------------------------------------------------
     @staticmethod
     def id_file_class(filename):
-        mimetype, encoding = mimetypes.guess_type(filename)
+        mimetype, encoding = mimetypes.detect_type(filename)
 
         try:
             id_ = mimetypes.fileclasstypes[mimetype]
@@ -294,7 +299,7 @@ class Files():
             files = []
             name = 'default'
 
-        share_class = Files.__file_classes.get(name.lower(), None)
+        share_class = load_class(Files.__file_classes.get(name.lower()))
         if share_class:
             return share_class(*args, **kwargs)
         else:
@@ -318,8 +323,10 @@ class Files():
 #    @raises: ...
 #
 #-----------------------------------------------------------------------
-class Directory(files.BaseDirectory):
-    pass
+class Directory():
+    @staticmethod
+    def __new__(cls, *args, **kwargs):
+        return load_class((FILES, 'BaseDirectory'))(*args, **kwargs)
 
 #-----------------------------------------------------------------------
 #
@@ -338,8 +345,10 @@ class Directory(files.BaseDirectory):
 #    @raises: ...
 #
 #-----------------------------------------------------------------------
-class Directories(files.BaseDirectories):
-    pass
+class Directories():
+    @staticmethod
+    def __new__(cls, *args, **kwargs):
+        return load_class((FILES, 'BaseDirectories'))(*args, **kwargs)
 
 #-----------------------------------------------------------------------
 #
@@ -360,8 +369,8 @@ class Directories(files.BaseDirectories):
 #-----------------------------------------------------------------------
 class Package():
     __package_classes = {
-        'smgl': smgl.Spell,
-        'apt': apt.Package
+        'smgl': (SMGL, 'Spell'),
+        'apt': (APT, 'Package')
     }
 
     #-------------------------------------------------------------------
@@ -385,7 +394,7 @@ class Package():
     #
     #-------------------------------------------------------------------
     def __new__(cls, name, *args, **kwargs):
-        share_class = Package.__package_classes.get(pkg_mgr.lower(), None)
+        share_class = load_class(Package.__package_classes.get(pkg_mgr.lower()))
         if share_class:
             return share_class(name, *args, **kwargs)
         else:
@@ -410,8 +419,8 @@ class Package():
 #-----------------------------------------------------------------------
 class PackageVersions():
     __package_classes = {
-        'smgl': smgl.SpellVersions,
-        'apt': apt.PackageVersions
+        'smgl': (SMGL, 'SpellVersions'),
+        'apt': (APT, 'PackageVersions')
     }
 
     #-------------------------------------------------------------------
@@ -437,7 +446,7 @@ class PackageVersions():
     @staticmethod
     def __new__(cls, name, *args, **kwargs):
 
-        share_class = PackageVersions.__package_classes.get(pkg_mgr.lower(), None)
+        share_class = load_class(PackageVersions.__package_classes.get(pkg_mgr.lower()))
         if share_class:
             return share_class(name, *args, **kwargs)
         else:
@@ -462,8 +471,8 @@ class PackageVersions():
 #-----------------------------------------------------------------------
 class Packages():
     __package_classes = {
-        'smgl': smgl.Spells,
-        'apt': apt.Packages
+        'smgl': (SMGL, 'Spells'),
+        'apt': (APT, 'Packages')
     }
 
     #-------------------------------------------------------------------
@@ -487,7 +496,7 @@ class Packages():
     #-------------------------------------------------------------------
     @staticmethod
     def __new__(cls, *args, **kwargs):
-        share_class = Packages.__package_classes.get(pkg_mgr.lower(), None)
+        share_class = load_class(Packages.__package_classes.get(pkg_mgr.lower()))
         if share_class:
             return share_class(*args, **kwargs)
         else:
@@ -512,8 +521,8 @@ class Packages():
 #-----------------------------------------------------------------------
 class Section():
     __package_classes = {
-        'smgl': smgl.Section,
-        'apt': apt.Section
+        'smgl': (SMGL, 'Section'),
+        'apt': (APT, 'Section')
     }
 
     #-------------------------------------------------------------------
@@ -538,7 +547,7 @@ class Section():
     #-------------------------------------------------------------------
     @staticmethod
     def __new__(cls, name, *args, **kwargs):
-        share_class = Section.__package_classes.get(pkg_mgr.lower(), None)
+        share_class = load_class(Section.__package_classes.get(pkg_mgr.lower()))
         if share_class:
             return share_class(name, *args, **kwargs)
         else:
@@ -563,8 +572,8 @@ class Section():
 #-----------------------------------------------------------------------
 class Sections():
     __package_classes = {
-        'smgl': smgl.Sections,
-        'apt': apt.Sections
+        'smgl': (SMGL, 'Sections'),
+        'apt': (APT, 'Sections')
     }
 
     #-------------------------------------------------------------------
@@ -587,7 +596,7 @@ class Sections():
     #
     #-------------------------------------------------------------------
     def __new__(cls, *args, **kwargs):
-        share_class = Sections.__package_classes.get(pkg_mgr.lower(), None)
+        share_class = load_class(Sections.__package_classes.get(pkg_mgr.lower()))
         if share_class:
             return share_class(*args, **kwargs)
         else:
@@ -612,8 +621,8 @@ class Sections():
 #-----------------------------------------------------------------------
 class Repository():
     __package_classes = {
-        'smgl': smgl.Grimoire,
-        'apt': apt.Repository
+        'smgl': (SMGL, 'Grimoire'),
+        'apt': (APT, 'Repository')
     }
 
     #-------------------------------------------------------------------
@@ -637,7 +646,7 @@ class Repository():
     #
     #-------------------------------------------------------------------
     def __new__(cls, name, *args, **kwargs):
-        share_class = Repository.__package_classes.get(pkg_mgr.lower(), None)
+        share_class = load_class(Repository.__package_classes.get(pkg_mgr.lower()))
         if share_class:
             return share_class(name, *args, **kwargs)
         else:
@@ -662,8 +671,8 @@ class Repository():
 #-----------------------------------------------------------------------
 class Repositories():
     __package_classes = {
-        'smgl': smgl.Codex,
-        'apt': apt.Repositories
+        'smgl': (SMGL, 'Codex'),
+        'apt': (APT, 'Repositories')
     }
 
     #-------------------------------------------------------------------
@@ -687,7 +696,7 @@ class Repositories():
     #-------------------------------------------------------------------
     @staticmethod
     def __new__(cls, *args, **kwargs):
-        share_class = Repositories.__package_classes.get(pkg_mgr.lower(), None)
+        share_class = load_class(Repositories.__package_classes.get(pkg_mgr.lower()))
         if share_class:
             return share_class(*args, **kwargs)
         else:
@@ -697,6 +706,39 @@ class Repositories():
 #
 # Functions
 #
+# load_class
+#
+#-----------------------------------------------------------------------
+
+#-----------------------------------------------------------------------
+#
+# Function load_class
 #
+# Import a backend module on first use and get one of its classes.
+#
+# Inputs
+# ------
+#    @param: spec - (module name, class name), or None
+#
+# Returns
+# -------
+#    @return: class_ - None if spec is None
+#
+# Raises
+# ------
+#    @raises: ImportError
+#    @raises: AttributeError
 #
 #-----------------------------------------------------------------------
+def load_class(spec):
+    if spec is None:
+        return None
+
+    # Not imported with this module: pysorcery.lib is imported before
+    # the logging it depends on
+    from pysorcery.lib.util import profiling
+
+    module, name = spec
+    with profiling.span('import', module):
+        module = importlib.import_module(module)
+    return getattr(module, name)
@@ -14,6 +14,8 @@ import os
 from pysorcery.lib.system import distro
 from pysorcery.lib.system import logging
 # Other Application Libraries
+from pysorcery.lib import util
+from pysorcery.lib.util import profiling
 
 # Other Optional Libraries
 
@@ -27,13 +29,13 @@ from pysorcery.lib.system import logging
 logger = logging.getLogger(__name__)
 consolehandler = logging.ColorizingStreamHandler()
 
-license_dir = { 'apt': '/usr/share/common-licenses',
-                'smgl': '/etc/sorcery/licenses'
+license_dir = { 'apt': util.root_path('/usr/share/common-licenses'),
+                'smgl': util.root_path('/etc/sorcery/licenses')
 }
 
 activity_log = {
-    'apt'  : '/var/log/apt/history.log',
-    'smgl' : '/var/log/sorcery/activity'
+    'apt'  : util.root_path('/var/log/apt/history.log'),
+    'smgl' : util.root_path('/var/log/sorcery/activity')
 }
 
 log_dirs = {
@@ -43,14 +45,14 @@ log_dirs = {
         'md5': 'tbd',
         },
     'smgl': {
-        'compile': '/var/log/sorcery/compile/',
-        'install': '/var/log/sorcery/install/',
+        'compile': util.root_path('/var/log/sorcery/compile/'),
+        'install': util.root_path('/var/log/sorcery/install/'),
     },
 }
 
 sound_themes = [ 'off', 'ferris', 'star trek' ]
 
-pkg_mgr = distro.distro_group[distro.distro_id]
+pkg_mgr = distro.get_pkg_mgr()
 #-----------------------------------------------------------------------
 #
 # Classes
@@ -100,23 +102,24 @@ class SorceryConfig():
                                 "verbosity": 0
         }
 
-        self.config_files = { 'local_config' : '/etc/sorcery/local/config',
-                              'local_roots_config' : '/etc/sorcery/local/roots',
-                              'local_media_config' : '/etc/sorcery/local/media',
-                              'local_url_config' : '/etc/sorcery/local/url',
-                              'grimoire_list_file' : '/etc/sorcery/local/grimoire'
+        self.config_files = { 'local_config' : util.root_path('/etc/sorcery/local/config'),
+                              'local_roots_config' : util.root_path('/etc/sorcery/local/roots'),
+                              'local_media_config' : util.root_path('/etc/sorcery/local/media'),
+                              'local_url_config' : util.root_path('/etc/sorcery/local/url'),
+                              'grimoire_list_file' : util.root_path('/etc/sorcery/local/grimoire')
         }
     
         self.sound_theme = 'off'
         self.command_theme = []
 
-        self.smgl_library = '/var/lib/sorcery'
+        self.smgl_library = util.root_path('/var/lib/sorcery')
         self.license_dir = license_dir[pkg_mgr]
         self.activity_log = activity_log[pkg_mgr]
         self.codex_dir = self.smgl_library + '/codex'
-        self.source_cache = '/var/spool/sorcery'
-        self.alien = [ '/bin', '/boot', '/etc', '/lib', '/lib64',
-                       '/opt', '/sbin', '/share', '/usr','/var' ]
+        self.source_cache = util.root_path('/var/spool/sorcery')
+        self.alien = [ util.root_path(path) for path in
+                       ('/bin', '/boot', '/etc', '/lib', '/lib64',
+                        '/opt', '/sbin', '/share', '/usr', '/var') ]
 
         self.urls = { 'codex_tarball_url' : 'http://codex.sourcemage.org/',
                       'codex_rsync_url' : 'rsync://sourcemage.org::codex',
@@ -341,8 +344,6 @@ def configure_logging(args, config):
     global logger
     global consolhandler
 
-    logger.debug("Begin Function")
-
     # Ugly hack to make the changes global
     tempname = __name__.split(":")[0].split(".")[0]
     logger = logging.getLogger(tempname)
@@ -375,7 +376,16 @@ def configure_logging(args, config):
         config['logging']['loglevel'] = numeric_level
 
     logger.setLevel(config['logging']['loglevel'])
-    consolehandler.setLevel(config['logging']['loglevel'])
+    # The handlers pysorcery attached to its logger, not the unattached
+    # one defined here
+    for handler in logger.handlers:
+        handler.setLevel(config['logging']['loglevel'])
+
+    if getattr(args, 'trace', False):
+        logging.trace()
+
+    if getattr(args, 'profile', False) or getattr(args, 'profile_output', None):
+        profiling.enable(args.profile_output)
 
     # End ugly hack to change logging level globally
     logger = logging.getLogger(__name__)
@@ -384,7 +394,6 @@ def configure_logging(args, config):
     logger.debug("Arguments Processed")
 #    logger.debug2("Arguments: " + str(args))
 
-    logger.debug("End Function")
     return
 
 #-----------------------------------------------------------------------
@@ -411,23 +420,24 @@ def defConfiguration():
                        "verbosity": 0
     }
 
-    config_files = { 'local_config' : '/etc/sorcery/local/config',
-                     'local_roots_config' : '/etc/sorcery/local/roots',
-                     'local_media_config' : '/etc/sorcery/local/media',
-                     'local_url_config' : '/etc/sorcery/local/url',
-                     'grimoire_list_file' : '/etc/sorcery/local/grimoire'
+    config_files = { 'local_config' : util.root_path('/etc/sorcery/local/config'),
+                     'local_roots_config' : util.root_path('/etc/sorcery/local/roots'),
+                     'local_media_config' : util.root_path('/etc/sorcery/local/media'),
+                     'local_url_config' : util.root_path('/etc/sorcery/local/url'),
+                     'grimoire_list_file' : util.root_path('/etc/sorcery/local/grimoire')
     }
 
     theme = { 'sound': 'off',
               'commands' : []
               }
 
-    smgl_library = '/var/lib/sorcery'
+    smgl_library = util.root_path('/var/lib/sorcery')
     directories = { 'smgl_library' : smgl_library,
                     'codex': smgl_library + '/codex',
-                    'source_cache': '/var/spool/sorcery',
-                    'alien': [ '/bin', '/boot', '/etc', '/lib', '/lib64',
-                               '/opt', '/sbin', '/share', '/usr','/var' ]
+                    'source_cache': util.root_path('/var/spool/sorcery'),
+                    'alien': [ util.root_path(path) for path in
+                               ('/bin', '/boot', '/etc', '/lib', '/lib64',
+                                '/opt', '/sbin', '/share', '/usr', '/var') ]
                     }
 
     urls = { 'codex_tarball_url' : 'http://codex.sourcemage.org',
@@ -659,14 +669,11 @@ CASTFS_DEBUG_LEVEL=${CASTFS_DEBUG_LEVEL:=255}
 #
 #-----------------------------------------------------------------------
 def main_configure(args):
-    logger.debug("Begin Function")
-
     # Default Settings
     config = defConfiguration()
 
     # Congigure Loggings
     configure_logging(args, config)
 
-    logger.debug2("Return variable: Config:\n" + str(config))
-    logger.debug("End Function")
+    logger.debug2("Return variable: Config:\n%s", config)
     return config
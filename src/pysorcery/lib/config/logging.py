@@ -50,7 +50,7 @@ log_dirs = {
 
 sound_themes = [ 'off', 'ferris', 'star trek' ]
 
-pkg_mgr = distro.distro_group[distro.distro_id]
+pkg_mgr = distro.get_pkg_mgr()
 #-----------------------------------------------------------------------
 #
 # Classes
@@ -341,8 +341,6 @@ def configure_logging(args, config):
     global logger
     global consolhandler
 
-    logger.debug("Begin Function")
-
     # Ugly hack to make the changes global
     tempname = __name__.split(":")[0].split(".")[0]
     logger = logging.getLogger(tempname)
@@ -384,7 +382,6 @@ def configure_logging(args, config):
     logger.debug("Arguments Processed")
 #    logger.debug2("Arguments: " + str(args))
 
-    logger.debug("End Function")
     return
 
 #-----------------------------------------------------------------------
@@ -482,14 +479,11 @@ def defConfiguration():
 #
 #-----------------------------------------------------------------------
 def main_configure(args):
-    logger.debug("Begin Function")
-
     # Default Settings
     config = defConfiguration()
 
     # Congigure Loggings
     configure_logging(args, config)
 
-    logger.debug2("Return variable: Config:\n" + str(config))
-    logger.debug("End Function")
+    logger.debug2("Return variable: Config:\n%s", config)
     return config
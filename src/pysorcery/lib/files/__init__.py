@@ -64,6 +64,7 @@ from pysorcery.lib.system import shutil
 # Other Application Libraries
 from pysorcery.lib import util
 from pysorcery.lib.util import config
+from pysorcery.lib.util import profiling
 from pysorcery.lib.util import text
 
 # Conditional Libraries
@@ -77,7 +78,7 @@ from pysorcery.lib.util import text
 # create logger
 logger = logging.getLogger(__name__)
 
-pkg_mgr = distro.distro_group[distro.distro_id]
+pkg_mgr = distro.get_pkg_mgr()
 # Supported package commands
 Commands = ('get_alien',
             'get_from')
@@ -170,12 +171,10 @@ class NotAFileException(OSError):
 #-----------------------------------------------------------------------
 class BaseFile():
     def __init__(self, filename, *args, **kwargs):
-        logger.debug("Begin Function")
         self.filename = filename
-        self.mimetype, self.encoding = mimetypes.guess_type(self.filename)
+        self.mimetype, self.encoding = mimetypes.detect_type(self.filename)
         self.path, self.basename, self.extention = pne(self.filename)
 
-        logger.debug("End Function")
         return
 
     #-------------------------------------------------------------------
@@ -250,15 +249,12 @@ class BaseFile():
     #
     #-------------------------------------------------------------------
     def remove(self):
-        logger.debug("Begin Function")
-
         try:
-            logger.debug2("Removing File: " + self.filename)
+            logger.debug2("Removing File: %s", self.filename)
             raise NotImplementedError('Remove File not implemented')
         except Exception as msg:
             logger.critical('BaseFile.remove fucked up')
 
-        logger.debug("End Function")
         return
 
     #-------------------------------------------------------------------
@@ -384,8 +380,8 @@ class BaseFile():
             try:
                 os.chmod(self.filename, flags | mode)
             except OSError as msg:
-                logger.error("could not set mode flags for `%s': %s"
-                             % (self.filename, msg))
+                logger.error("could not set mode flags for `%s': %s",
+                             self.filename, msg)
         return
 
     #-------------------------------------------------------------------
@@ -409,8 +405,8 @@ class BaseFile():
     #    @raises: EOFError
     #
     #-------------------------------------------------------------------
+    @profiling.spanned('file', 'read')
     def read(self):
-        logger.debug("Begin Function")
         line_list = []
 
         try:
@@ -418,8 +414,8 @@ class BaseFile():
                 line_list.append(line[:-1])
         except FileNotFoundError as msg:
             line_list.append(msg)
+        profiling.count('file lines read', len(line_list))
 
-        logger.debug("End Function")
         return line_list
 
     #-------------------------------------------------------------------
@@ -442,11 +438,8 @@ class BaseFile():
     #
     #-------------------------------------------------------------------
     def write(self):
-        logger.debug("Begin Function")
-
         raise NotImplementedError('BaseFile.write not implemented')
 
-        logger.debug("Begin Function")
         return
 
     #-------------------------------------------------------------------
@@ -471,12 +464,9 @@ class BaseFile():
     #
     #-------------------------------------------------------------------
     def search(self, searchstring):
-        logger.debug("Begin Function")
-
         results = "File Search Results"
 
         raise NotImplementedError('File search not implemented')
-        logger.debug("Begin Function")
         return results
 
     #-------------------------------------------------------------------
@@ -605,9 +595,7 @@ class BaseFile():
     #
     #-------------------------------------------------------------------
     def print_name(self):
-        logger.debug("Begin Function")
         logger.info(self.filename)
-        logger.debug("End Function")
         return
 
 #-----------------------------------------------------------------------
@@ -795,14 +783,11 @@ class BaseDirectory(BaseFile):
 #-----------------------------------------------------------------------
 class BaseFiles():
     def __init__(self, *args, **kwargs):
-        logger.debug("Begin Function")
-
         if 'filelist' in kwargs:
             self.files = kwargs['filelist']
         else:
             self.files = []
 
-        logger.debug("End Function")
         return
 
     #-------------------------------------------------------------------
@@ -902,8 +887,6 @@ class BaseFiles():
     #
     #-------------------------------------------------------------------
     def get_system(self):
-        logger.debug("Begin Function")
-
         # List of directories to check
         sys_dirs = [ '/bin', '/boot', '/etc', '/lib', '/lib64',
                      '/opt', '/sbin', '/share', '/usr','/var' ]
@@ -917,7 +900,6 @@ class BaseFiles():
                         system_file = str(os.path.join(root,i,j))
                         self.files.append(system_file)
 
-        logger.debug("End Function")
         return self.files
 
     #-------------------------------------------------------------------
@@ -58,6 +58,10 @@ from pysorcery.lib.system import shutil
 # Other Application Libraries
 from pysorcery.lib import util
 from pysorcery.lib import files
+from pysorcery.lib.files import recompress
+from pysorcery.lib.files import stream
+from pysorcery.lib.files import tarindex
+from pysorcery.lib.util import tools
 
 # Condiional Libraries
 try:
@@ -285,7 +289,7 @@ class Archive(files.BaseFile):
     #
     # Returns
     # -------
-    #    @return: None
+    #    @return: target - what the archive was extracted to
     #
     # Raises
     # ------
@@ -297,20 +301,15 @@ class Archive(files.BaseFile):
                 outdir=None,
                 program=None,
                 interactive=True):
-        logger.debug('Begin Function')
-
         """Verify given archive exists."""
         self.check_existing_filename(self.filename)
-        logger.info("Extracting %s ..." % self.filename)
+        logger.info("Extracting %s ...", self.filename)
         """Extract given archive."""
-        _extract_archive(self.filename,
-                         verbosity=verbosity,
-                         interactive=interactive,
-                         outdir=outdir,
-                         program=program)
-
-        logger.debug('End Function')
-        return
+        return _extract_archive(self.filename,
+                                verbosity=verbosity,
+                                interactive=interactive,
+                                outdir=outdir,
+                                program=program)
 
     #-------------------------------------------------------------------
     #
@@ -392,25 +391,36 @@ class Archive(files.BaseFile):
     #     @param: self
     #     @param: verbosity
     #     @param: interactive
+    #     @param: candidates  - None, or compressions to try, from
+    #                           recompress.parse_candidates()
+    #     @param: jobs        - candidates to run at once
+    #     @param: max_time    - None, or seconds a candidate may take
+    #     @param: min_gain    - percent a candidate must save
     #
     # Returns
     # -------
-    #     @return: None (change this to True or False?)
+    #     @return: None
     #
     # Raises
     # ------
     #     @raises: ...
     #
     #-------------------------------------------------------------------
-    def recompress_archive(self, verbosity=0, interactive=True):
+    def recompress_archive(self, verbosity=0, interactive=True,
+                           candidates=None, jobs=None, max_time=None,
+                           min_gain=0.0):
         """Recompress an archive to hopefully smaller size."""
         self.check_existing_filename(self.filename)
-        self.check_writable_filename(self.filename)
+        self.check_writable_filename()
         if verbosity >= 0:
-            logger.info('Recompressing {self.filename} ...')
+            logger.info("Recompressing %s ...", self.filename)
         res = _recompress_archive(self.filename,
                                   verbosity=verbosity,
-                                  interactive=interactive)
+                                  interactive=interactive,
+                                  candidates=candidates,
+                                  jobs=jobs,
+                                  max_time=max_time,
+                                  min_gain=min_gain)
         if res and verbosity >= 0:
             logger.info(res)
         return
@@ -423,27 +433,34 @@ class Archive(files.BaseFile):
     #
     # Inputs
     # ------
-    #     @param: self:
+    #     @param: self
+    #     @param: archive_new - the file to write
+    #     @param: verbosity
+    #     @param: interactive
+    #     @param: level       - None, or the compression level 0-9
     #
     # Returns
     # -------
-    #     @return: None (change this to True or False?)
+    #     @return: None
     #
     # Raises
     # ------
+    #     @raises: FileExistsError
     #     @raises: ...
     #
     #-------------------------------------------------------------------
-    def repack_archive (self, archive_new, verbosity=0, interactive=True):
+    def repack_archive (self, archive_new, verbosity=0, interactive=True,
+                        level=None):
         """Repack archive to different file and/or format."""
         self.check_existing_filename(self.filename)
-        self.check_new_filename(archive_new)
+        files.BaseFile(archive_new).check_new_filename()
         if verbosity >= 0:
-            logger.info("Repacking %s to %s ..." % (self.filename, archive_new))
+            logger.info("Repacking %s to %s ...", self.filename, archive_new)
         res = _repack_archive(self.filename,
                               archive_new,
                               verbosity=verbosity,
-                              interactive=interactive)
+                              interactive=interactive,
+                              level=level)
         if verbosity >= 0:
             logger.info("... repacking successful.")
         return res
@@ -471,7 +488,7 @@ class Archive(files.BaseFile):
         """Test given archive."""
         self.check_existing_filename(self.filename)
         if verbosity >= 0:
-            logger.info("Testing %s ..." % self.filename)
+            logger.info("Testing %s ...", self.filename)
         res = _handle_archive(self.filename,
                               'test',
                               verbosity=verbosity,
@@ -489,59 +506,83 @@ class Archive(files.BaseFile):
     #
     # Inputs
     # ------
-    #     @param: self         -
-    #     @param: searchstring -
+    #     @param: self
+    #     @param: pattern       - regular expression
+    #     @param: verbosity
+    #     @param: interactive
+    #     @param: max_count     - None, or the number of matches to
+    #                             stop at
+    #     @param: ignore_case
+    #     @param: fixed_strings - pattern is a string, not an expression
     #
     # Returns
     # -------
-    #     @return: result
+    #     @return: 0 - found
+    #     @return: 1 - not found
     #
     # Raises
     # ------
     #     @raises: ...
     #
     #-------------------------------------------------------------------
-    def search(self, pattern, verbosity=0, interactive=True):
+    def search(self, pattern, verbosity=0, interactive=True, max_count=None,
+               ignore_case=False, fixed_strings=False):
         """Search pattern in archive members."""
         if not pattern:
             raise ArchiveError("empty search pattern")
         self.check_existing_filename(self.filename)
         if verbosity >= 0:
-            logger.info("Searching %r in %s ..."
-                        % (pattern, self.filename))
+            logger.info("Searching %r in %s ...",
+                        pattern, self.filename)
         res = _search_archive(pattern,
                               self.filename,
                               verbosity=verbosity,
-                              interactive=interactive)
+                              interactive=interactive,
+                              max_count=max_count,
+                              ignore_case=ignore_case,
+                              fixed_strings=fixed_strings)
         if res == 1 and verbosity >= 0:
-            logger.info("... %r not found" % pattern)
+            logger.info("... %r not found", pattern)
         return res
 
     #-------------------------------------------------------------------
     #
     # Function read
     #
-    # Read the content of a file within an archive
+    # Read the content of a file within an archive.  Files of tar
+    # archives are read through a tarindex when there is one; see
+    # tarindex.
     #
     # Inputs
     # ------
     #     @param: self
     #     @param: filename
+    #     @param: index    - build the index of a tar archive when it
+    #                        has none
     #
     # Returns
     # -------
-    #     @return: result
+    #     @return: content - bytes
     #
     # Raises
     # ------
-    #     @raises: ...
+    #     @raises: KeyError     - no such file in the archive
+    #     @raises: ArchiveError - archive format that cannot be read
     #
     #-------------------------------------------------------------------
-    def read(self, filename, verbosity=0, interactive=True):
-        """Print the content of a file within an archive"""
-        content = 'Archive Read is not implemented'
-        raise NotImplementedError
-        return content
+    def read(self, filename, verbosity=0, interactive=True, index=False):
+        """Return the content of a file within an archive"""
+        self.check_existing_filename(self.filename)
+        format_, compression = get_archive_format(self.filename)
+        if format_ == 'zip':
+            import zipfile
+            with zipfile.ZipFile(self.filename) as zfile:
+                return zfile.read(filename)
+        if format_ != 'tar' or not stream.supported(format_, compression):
+            raise ArchiveError("cannot read files of %s archive `%s'"
+                               % (format_, self.filename))
+        return tarindex.read_member(self.filename, compression, filename,
+                                    build=index)
 
 #-----------------------------------------------------------------------
 #
@@ -565,39 +606,41 @@ class Archive(files.BaseFile):
 class Archives(files.BaseFiles):
     #-------------------------------------------------------------------
     #
-    # Function search
+    # Function diff
     #
-    # Searches archive files
+    # Show the differences between two archives
     #
     # Inputs
     # ------
-    #     @param: self         - ...
-    #     @param: searchstring - ...
+    #     @param: self
+    #     @param: verbosity
+    #     @param: interactive
+    #     @param: contents    - compare contents, not only names and
+    #                           sizes
     #
     # Returns
     # -------
-    #     @return: result
+    #     @return: 0 - no differences
+    #     @return: 1 - differences
     #
     # Raises
     # ------
     #     @raises: ...
     #
     #-------------------------------------------------------------------
-    def diff(self, verbosity=0, interactive=True):
-        logger.debug('Begin Function')
-
+    def diff(self, verbosity=0, interactive=True, contents=True):
         """Print differences between two archives."""
-        self.check_existing_filename(self.files[0])
-        self.check_existing_filename(self.files[1])
+        for filename in self.files[:2]:
+            files.BaseFile(filename).check_existing_filename()
         if verbosity >= 0:
-            logger.info("Comparing %s with %s ..." % (self.files[0], self.files[1]))
-            res = _diff_archives(self.files,
-                                 verbosity=verbosity,
-                                 interactive=interactive)
+            logger.info("Comparing %s with %s ...", self.files[0], self.files[1])
+        res = _diff_archives(self.files,
+                             verbosity=verbosity,
+                             interactive=interactive,
+                             contents=contents)
         if res == 0 and verbosity >= 0:
             logger.info("... no differences found.")
 
-        logger.debug('End Function')
         return res
 
 #-----------------------------------------------------------------------
@@ -615,6 +658,7 @@ class Archives(files.BaseFiles):
 # Function program_supports_compression
 #
 # Decide if the given program supports the compression natively.
+# tar and bsdtar are asked through the tools registry.
 #
 # Inputs
 # ------
@@ -637,6 +681,10 @@ def program_supports_compression (program, compression):
     @return: True if the program supports the given compression format
       natively, else False.
     """
+    if program in ('tar', 'bsdtar'):
+        found = tools.info(program)
+        if found is not None:
+            return compression in found['codecs']
     if program in ('tar', 'star', 'bsdtar', 'py_tarfile'):
         return compression in ('gzip', 'bzip2') + py_lzma
     return False
@@ -700,7 +748,9 @@ def list_formats ():
                 program = find_archive_program(format_, command)
                 print("   %8s: %s" % (command, program), end=' ')
                 if format_ == 'tar':
-                    encs = [x for x in mimetypes.ArchiveCompressions if util.find_program(x)]
+                    encs = [x for x in mimetypes.ArchiveCompressions
+                            if program_supports_compression(
+                                os.path.basename(program), x)]
                     if encs:
                         print("(supported compressions: %s)" % ", ".join(encs), end=' ')
                 elif format_ == '7z':
@@ -736,7 +786,7 @@ def list_formats ():
 #-----------------------------------------------------------------------
 def get_archive_format (filename):
     """Detect filename archive format and optional compression."""
-    mime, compression = mimetypes.guess_type(filename)
+    mime, compression = mimetypes.detect_type(filename)
     if not (mime or compression):
         raise ArchiveError("unknown archive format for file `%s'" % filename)
     if mime in mimetypes.ArchiveMimetypes:
@@ -772,14 +822,8 @@ def p7zip_supports_rar():
     if os.name == 'nt':
         # Assume RAR support is compiled into the binary.
         return True
-    # the subdirectory and codec name
-    codecname = 'p7zip/Codecs/Rar29.so'
-    # search canonical user library dirs
-    for libdir in ('/usr/lib', '/usr/local/lib', '/usr/lib64', '/usr/local/lib64', '/usr/lib/i386-linux-gnu', '/usr/lib/x86_64-linux-gnu'):
-        fname = os.path.join(libdir, codecname)
-        if os.path.exists(fname):
-            return True
-    return False
+    # the codec is looked for when 7z is probed
+    return 'rar' in tools.codecs('7z')
 
 #-----------------------------------------------------------------------
 #
@@ -820,7 +864,7 @@ def find_archive_program (format_, command, program=None):
             return program
         exe = util.find_program(program)
         if exe:
-            if program == '7z' and format == 'rar' and not p7zip_supports_rar():
+            if program == '7z' and format_ == 'rar' and not p7zip_supports_rar():
                 continue
             return exe
     # no programs found
@@ -1048,7 +1092,7 @@ def _extract_archive(archive, verbosity=0, interactive=True, outdir=None,
         else:
             target, msg = outdir, "`%s'" % outdir
         if verbosity >= 0:
-            logger.info("... %s extracted to %s." % (archive, msg))
+            logger.info("... %s extracted to %s.", archive, msg)
         return target
     finally:
         # try to remove an empty temporary output directory
@@ -1107,43 +1151,57 @@ def _handle_archive(archive, command, verbosity=0, interactive=True,
 
 #-----------------------------------------------------------------------
 #
-# Function _diff_archive
+# Function _diff_archives
 #
-# This is the base File Class
+# Show differences between two archives.  When the stream module can
+# read both, they are compared by their manifests in process and only
+# changed files are diffed; otherwise both are extracted to temporary
+# directories and compared with diff -urN.
 #
 # Inputs
 # ------
-#    @param:
+#    @param: archives
+#    @param: verbosity
+#    @param: interactive
+#    @param: contents    - compare contents, not only names and sizes
 #
 # Returns
 # -------
-#    @return: None
+#    @return: 0 - no differences
+#    @return: 1 - differences
 #
 # Raises
 # ------
-#    @raises: ...
+#    @raises: ArchiveError
 #
 #-----------------------------------------------------------------------
-def _diff_archives (archives, verbosity=0, interactive=True):
+def _diff_archives (archives, verbosity=0, interactive=True, contents=True):
     """Show differences between two archives.
     @return 0 if archives are the same, else 1
     @raises: ArchiveError on errors
     """
-
-    files = files.Files(archives)
-    if files.is_same_file():
+    archive1, archive2 = archives[:2]
+    if files.BaseFiles(filelist=[archive1, archive2]).is_same_file():
         return 0
+
+    sources = [(archive,) + get_archive_format(archive)
+               for archive in (archive1, archive2)]
+    if all(stream.supported(format_, compression)
+           for archive, format_, compression in sources):
+        return stream.diff(sources, contents=contents)
+
     diff = util.find_program("diff")
     if not diff:
         msg = "The diff(1) program is required for showing archive differences, please install it."
         raise ArchiveError(msg)
-    tmpdir1 = files.BaseDirectory.tmpdir()
+    cmd = [diff, "-urN"] if contents else [diff, "-qrN"]
+    tmpdir1 = files.BaseDirectory(".").tmpdir()
     try:
         path1 = _extract_archive(archive1, outdir=tmpdir1, verbosity=-1)
-        tmpdir2 = files.Basedirectory.tmpdir()
+        tmpdir2 = files.BaseDirectory(".").tmpdir()
         try:
             path2 = _extract_archive(archive2, outdir=tmpdir2, verbosity=-1)
-            return util.run_checked([diff, "-urN", path1, path2], verbosity=1, ret_ok=(0, 1))
+            return util.run_checked(cmd + [path1, path2], verbosity=1, ret_ok=(0, 1))
         finally:
             shutil.rmtree(tmpdir2, onerror=rmtree_log_error)
     finally:
@@ -1153,29 +1211,54 @@ def _diff_archives (archives, verbosity=0, interactive=True):
 #
 # Function _recompress_archive
 #
-# This is the base File Class
+# Try to recompress an archive to smaller size.  Tar archives and
+# compressed files the stream module can read are decompressed once and
+# every candidate compression tried on them at once, see
+# pysorcery.lib.files.recompress; other archives are extracted and
+# created again in the same format.
 #
 # Inputs
 # ------
-#    @param:
+#    @param: archive
+#    @param: verbosity
+#    @param: interactive
+#    @param: candidates  - None, or compressions to try
+#    @param: jobs
+#    @param: max_time
+#    @param: min_gain
 #
 # Returns
 # -------
-#    @return: None
+#    @return: message
 #
 # Raises
 # ------
-#    @raises: ...
+#    @raises: ArchiveError
 #
 #-----------------------------------------------------------------------
-def _recompress_archive(archive, verbosity=0, interactive=True):
+def _recompress_archive(archive, verbosity=0, interactive=True,
+                        candidates=None, jobs=None, max_time=None,
+                        min_gain=0.0):
     """Try to recompress an archive to smaller size."""
+    try:
+        recompress.split_name(archive)
+    except ValueError:
+        if candidates:
+            raise ArchiveError("only tar archives and compressed files can be "
+                         "recompressed with other compressions")
+    else:
+        return recompress.recompress(archive,
+                                     candidates=candidates,
+                                     jobs=jobs,
+                                     max_time=max_time,
+                                     min_gain=min_gain)
+
     format, compression = get_archive_format(archive)
     if compression:
         # only recompress the compression itself (eg. for .tar.xz)
         format = compression
-    tmpdir = util.tmpdir()
-    tmpdir2 = util.tmpdir()
+    tmpdir = files.BaseDirectory(".").tmpdir()
+    tmpdir2 = files.BaseDirectory(".").tmpdir()
     base, ext = os.path.splitext(os.path.basename(archive))
     archive2 = files.get_single_outfile(tmpdir2, base, extension=ext)
     try:
@@ -1187,19 +1270,19 @@ def _recompress_archive(archive, verbosity=0, interactive=True):
         os.chdir(path)
         try:
             kwargs = dict(verbosity=verbosity, interactive=interactive, format=format)
-            files = tuple(os.listdir(path))
-            _create_archive(archive2, files, **kwargs)
+            filenames = tuple(os.listdir(path))
+            _create_archive(archive2, filenames, **kwargs)
         finally:
             os.chdir(olddir)
         # check file sizes and replace if new file is smaller
-        filesize = util.get_filesize(archive)
-        filesize2 = util.get_filesize(archive2)
+        filesize = os.path.getsize(archive)
+        filesize2 = os.path.getsize(archive2)
         if filesize2 < filesize:
             # replace file
             os.remove(archive)
             shutil.move(archive2, archive)
             diffsize = filesize - filesize2
-            return "... recompressed file is now %s smaller." % util.strsize(diffsize)
+            return "... recompressed file is now %d bytes smaller." % diffsize
     finally:
         shutil.rmtree(tmpdir, onerror=rmtree_log_error)
         shutil.rmtree(tmpdir2, onerror=rmtree_log_error)
@@ -1252,11 +1335,18 @@ def _create_archive(archive, filenames, verbosity=0, interactive=True,
 #
 # Function _repack_archive
 #
-# ...
+# Repackage an archive to a different format.  When the stream module
+# can read the archive and write the new one, members are copied from
+# one to the other in process; otherwise the archive is extracted to a
+# temporary directory and the new one created from it.
 #
 # Inputs
 # ------
-#    @param:
+#    @param: archive1    - the archive to read
+#    @param: archive2    - the archive to write
+#    @param: verbosity
+#    @param: interactive
+#    @param: level       - None, or the compression level 0-9
 #
 # Returns
 # -------
@@ -1267,24 +1357,37 @@ def _create_archive(archive, filenames, verbosity=0, interactive=True,
 #    @raises: ...
 #
 #-----------------------------------------------------------------------
-def _repack_archive (archive1, archive2, verbosity=0, interactive=True):
+def _repack_archive (archive1, archive2, verbosity=0, interactive=True,
+                     level=None):
     """Repackage an archive to a different format."""
+    source = stream.guess_format(archive1)
+    target = stream.guess_format(archive2)
+    if (source and target
+        and (source[0] in ('tar', 'zip')) == (target[0] in ('tar', 'zip'))):
+        if source == target and level is None:
+            # same format and compression allows to copy the file
+            shutil.copyfile(archive1, archive2)
+            return
+        stream.repack((archive1,) + source, (archive2,) + target,
+                      level=level)
+        return
+
     format1, compression1 = get_archive_format(archive1)
     format2, compression2 = get_archive_format(archive2)
     if format1 == format2 and compression1 == compression2:
         # same format and compression allows to copy the file
-        util.link_or_copy(archive1, archive2, verbosity=verbosity)
+        shutil.copyfile(archive1, archive2)
         return
-    tmpdir = util.tmpdir()
+    tmpdir = files.BaseDirectory(".").tmpdir()
     try:
         kwargs = dict(verbosity=verbosity, outdir=tmpdir)
         same_format = (format1 == format2 and compression1 and compression2)
         if same_format:
             # only decompress since the format is the same
-            kwargs['format'] = compression1
+            kwargs['format_'] = compression1
         path = _extract_archive(archive1, **kwargs)
         archive = os.path.abspath(archive2)
-        files = tuple(os.listdir(path))
+        filenames = tuple(os.listdir(path))
         olddir = os.getcwd()
         os.chdir(path)
         try:
@@ -1292,7 +1395,7 @@ def _repack_archive (archive1, archive2, verbosity=0, interactive=True):
             if same_format:
                 # only compress since the format is the same
                 kwargs['format'] = compression2
-            _create_archive(archive, files, **kwargs)
+            _create_archive(archive, filenames, **kwargs)
         finally:
             os.chdir(olddir)
     finally:
@@ -1302,30 +1405,57 @@ def _repack_archive (archive1, archive2, verbosity=0, interactive=True):
 #
 # Function _search_archive
 #
-# ...
+# Search the members of an archive for a pattern and write the matching
+# lines as member:line:text.  Formats the stream module can read are
+# searched in process, without writing anything to disk; others are
+# extracted to a temporary directory and searched with grep(1).
 #
 # Inputs
 # ------
-#    @param:
+#    @param: pattern
+#    @param: archive
+#    @param: verbosity
+#    @param: interactive
+#    @param: max_count     - None, or the number of matches to stop at
+#    @param: ignore_case
+#    @param: fixed_strings
 #
 # Returns
 # -------
-#    @return: None
+#    @return: 0 - found
+#    @return: 1 - not found
 #
 # Raises
 # ------
-#    @raises: ...
+#    @raises: ArchiveError
 #
 #-----------------------------------------------------------------------
-def _search_archive(pattern, archive, verbosity=0, interactive=True):
+def _search_archive(pattern, archive, verbosity=0, interactive=True,
+                    max_count=None, ignore_case=False, fixed_strings=False):
     """Search for given pattern in an archive."""
+    format_, compression = get_archive_format(archive)
+    if stream.supported(format_, compression):
+        matches = stream.search(archive, pattern, format_, compression,
+                                max_count=max_count,
+                                ignore_case=ignore_case,
+                                fixed_strings=fixed_strings)
+        return stream.write_matches(matches)
+
     grep = util.find_program("grep")
     if not grep:
         msg = "The grep(1) program is required for searching archive contents, please install it."
-        raise ArchiveErrors(msg)
-    tmpdir = util.tmpdir()
+        raise ArchiveError(msg)
+    cmd = [grep, "-r", "-n"]
+    if max_count is not None:
+        # grep counts per member
+        cmd.extend(["-m", str(max_count)])
+    if ignore_case:
+        cmd.append("-i")
+    if fixed_strings:
+        cmd.append("-F")
+    tmpdir = files.BaseDirectory(".").tmpdir()
     try:
         path = _extract_archive(archive, outdir=tmpdir, verbosity=-1)
-        return util.run_checked([grep, "-r", "-e", pattern, "."], ret_ok=(0, 1), verbosity=1, cwd=path)
+        return util.run_checked(cmd + ["-e", pattern, "."], ret_ok=(0, 1), verbosity=1, cwd=path)
     finally:
         shutil.rmtree(tmpdir, onerror=rmtree_log_error)
@@ -16,11 +16,19 @@
 """Archive commands for the tarfile Python module."""
 from pysorcery.lib import util
 from pysorcery.lib.files import archive
-from pysorcery.lib.files.compression import py_lzma
+from pysorcery.lib.files import parallel
 import tarfile
 
 READ_SIZE_BYTES = 1024*1024
 
+# Compressions written on every core, by the parallel codec
+ParallelCodecs = {
+    'gzip': 'gzip',
+    'bzip2': 'bzip2',
+    'lzma': 'xz',
+    'xz': 'xz',
+}
+
 class PyTarFileError(archive.ArchiveError):
     pass
 
@@ -71,8 +79,15 @@ def extract_tar (archive, compression, cmd, verbosity, interactive, outdir):
 
 def create_tar (archive, compression, cmd, verbosity, interactive, filenames):
     """Create a TAR archive with the tarfile Python module."""
-    mode = get_tar_mode(compression)
     try:
+        if compression in ParallelCodecs:
+            # compress in blocks on every core; the tar stream is the same
+            with parallel.open_writer(archive, ParallelCodecs[compression]) as fileobj, \
+                 tarfile.open(fileobj=fileobj, mode='w|') as tfile:
+                for filename in filenames:
+                    tfile.add(filename)
+            return None
+        mode = get_tar_mode(compression)
         with tarfile.open(archive, mode) as tfile:
             for filename in filenames:
                 tfile.add(filename)
@@ -88,7 +103,7 @@ def get_tar_mode (compression):
         return 'w:gz'
     if compression == 'bzip2':
         return 'w:bz2'
-    if compression == 'lzma' and py_lzma:
+    if compression in ('lzma', 'xz'):
         return 'w:xz'
     if compression:
         msg = 'pytarfile does not support %s for tar compression'
@@ -0,0 +1,263 @@
+#! /usr/bin/env python3
+#-----------------------------------------------------------------------
+#
+# Original BASH version
+# Original version Copyright 2001 by Kyle Sallee
+# Additions/corrections Copyright 2002 by the Source Mage Team
+#
+# Python rewrite
+# Copyright 2017 Geoff S Derber
+#
+# File: pysorcery/lib/files/batch.py
+#
+# This file is part of Sorcery.
+#
+#    Sorcery is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published
+#    by the Free Software Foundation, either version 3 of the License,
+#    or (at your option) any later version.
+#
+#    Sorcery is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with Sorcery.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Batch:
+#
+#    Extract many archives at once.  Two limits apply:
+#
+#    - jobs extractions run at a time, each in a worker process, so
+#      archives extracted in Python use every core as well as those
+#      handed to tar, unzip and friends;
+#    - io_jobs threads read archives ahead of the extractions, so
+#      the workers find them in the page cache instead of waiting on
+#      the disk.  They never read more than jobs + io_jobs archives
+#      ahead.
+#
+#    Each archive is extracted as `pyarchive extract' does it alone:
+#    into a temporary directory in the output directory, then moved to
+#    its own name there.  Results come back in the order of the
+#    archives.
+#
+#        for archive, target, error in batch.extract_all(tarballs):
+#            ...
+#
+#-----------------------------------------------------------------------
+"""
+Batch:
+
+Extract many archives at once: jobs extractions in worker processes,
+with io_jobs threads reading archives ahead of them.  Results come back
+in the order of the archives.
+"""
+#-----------------------------------------------------------------------
+#
+# Libraries
+#
+#-----------------------------------------------------------------------
+# System Libraries
+from concurrent import futures
+import os
+
+# 3rd Party Libraries
+
+
+# Application Libraries
+# System Library Overrides
+from pysorcery.lib.system import logging
+# Other Application Libraries
+from pysorcery.lib.util import profiling
+
+# Conditional Libraries
+
+
+#-----------------------------------------------------------------------
+#
+# Global Variables
+#
+#-----------------------------------------------------------------------
+# Enable Logging
+# create logger
+logger = logging.getLogger(__name__)
+
+# Extractions at once
+JOBS = os.cpu_count() or 1
+
+# Archives read ahead at once
+IO_JOBS = 4
+
+# Bytes of an archive read ahead; larger archives are only partly read
+PREFETCH_SIZE = 256 * 1024 * 1024
+
+# Bytes read at a time
+READ_SIZE = 1024 * 1024
+
+#-----------------------------------------------------------------------
+#
+# Classes
+#
+#-----------------------------------------------------------------------
+
+#-----------------------------------------------------------------------
+#
+# Functions
+#
+# prefetch
+# extract_one
+# extract_all
+#
+#-----------------------------------------------------------------------
+
+#-----------------------------------------------------------------------
+#
+# Function prefetch
+#
+# Read the start of an archive into the page cache.  Runs on the I/O
+# threads; errors are left for the extraction to report.
+#
+# Inputs
+# ------
+#    @param: archive
+#
+# Returns
+# -------
+#    @return: None
+#
+# Raises
+# ------
+#    ...
+#
+#-----------------------------------------------------------------------
+def prefetch(archive):
+    try:
+        with profiling.span('batch prefetch'), \
+             open(archive, 'rb', buffering=0) as fileobj:
+            buffer = bytearray(READ_SIZE)
+            left = PREFETCH_SIZE
+            while left > 0 and fileobj.readinto(buffer):
+                left -= READ_SIZE
+    except OSError:
+        pass
+    return
+
+#-----------------------------------------------------------------------
+#
+# Function extract_one
+#
+# Extract an archive in a worker process.
+#
+# Inputs
+# ------
+#    @param: archive   - absolute path
+#    @param: outdir    - absolute path of the directory to extract in
+#    @param: verbosity
+#    @param: program
+#
+# Returns
+# -------
+#    @return: target - what the archive was extracted to
+#
+# Raises
+# ------
+#    @raises: Exception - whatever the extraction raises
+#
+#-----------------------------------------------------------------------
+def extract_one(archive, outdir, verbosity=0, program=None):
+    from pysorcery import lib
+
+    # a worker process extracts one archive at a time, so it can
+    # change directory; the archive then unpacks as it does alone
+    os.chdir(outdir)
+    target = lib.File(archive).extract(verbosity=verbosity,
+                                       interactive=False,
+                                       program=program)
+    return os.path.join(outdir, target) if target else outdir
+
+#-----------------------------------------------------------------------
+#
+# Function extract_all
+#
+# Extract many archives at once; see above.  Archives start in order,
+# whenever an extraction finishes; the io_jobs archives next in line
+# are read ahead meanwhile.  With keep_going False, the first failure
+# stops the batch: archives not started yet are skipped, and those
+# running are finished and reported.  Extractions never ask questions.
+#
+# Inputs
+# ------
+#    @param: archives   - filenames
+#    @param: outdir     - None for the current directory
+#    @param: jobs       - extractions at once, defaults to JOBS
+#    @param: io_jobs    - archives read ahead at once, defaults to
+#                         IO_JOBS; 0 to not read ahead
+#    @param: keep_going - go on after a failure
+#    @param: verbosity
+#    @param: program
+#
+# Returns
+# -------
+#    @return: (archive, target, error) - generator, in the order of
+#                                        archives; one of target and
+#                                        error is None
+#
+# Raises
+# ------
+#    ...
+#
+#-----------------------------------------------------------------------
+def extract_all(archives, outdir=None, jobs=None, io_jobs=None,
+                keep_going=True, verbosity=0, program=None):
+    archives = list(archives)
+    if not archives:
+        return
+
+    outdir = os.path.abspath(outdir or os.curdir)
+    jobs = min(jobs or JOBS, len(archives))
+    io_jobs = IO_JOBS if io_jobs is None else io_jobs
+    logger.debug('Extracting %d archives, %d at a time, reading %d ahead',
+                 len(archives), jobs, io_jobs)
+
+    running = {}
+    done = {}
+    started = 0
+    read = 0
+    stopped = False
+
+    with futures.ProcessPoolExecutor(max_workers=jobs) as pool, \
+         futures.ThreadPoolExecutor(max_workers=max(io_jobs, 1),
+                                    thread_name_prefix='prefetch') as io_pool:
+        for index, archive in enumerate(archives):
+            while index not in done:
+                while not stopped and len(running) < jobs \
+                      and started < len(archives):
+                    running[pool.submit(extract_one,
+                                        os.path.abspath(archives[started]),
+                                        outdir, verbosity, program)] = started
+                    started += 1
+                read = max(read, started)
+                while not stopped and read < min(started + io_jobs,
+                                                 len(archives)):
+                    io_pool.submit(prefetch, archives[read])
+                    read += 1
+
+                if not running:
+                    # stopped before this archive started
+                    return
+                finished, pending = futures.wait(
+                    running, return_when=futures.FIRST_COMPLETED)
+                for future in finished:
+                    done[running.pop(future)] = future
+                    if future.exception() is not None and not keep_going:
+                        stopped = True
+
+            future = done.pop(index)
+            if future.exception() is not None:
+                profiling.count('batch failed')
+                yield archive, None, future.exception()
+            else:
+                profiling.count('batch extracted')
+                yield archive, future.result(), None
+    return
@@ -60,6 +60,9 @@ from pysorcery.lib.system import shutil
 # Other Application Libraries
 from pysorcery.lib import util
 from pysorcery.lib import files
+from pysorcery.lib.files import recompress
+from pysorcery.lib.files import stream
+from pysorcery.lib.util import tools
 
 # Condiional Libraries
 try:
@@ -117,9 +120,9 @@ CompressionPrograms = {
         'list': ('nomarch',),
     },
     'bzip2': {
-        'extract': ('7z', '7za', 'pbzip2', 'lbzip2', 'bzip2', 'py_bz2'),
+        'extract': ('7z', '7za', 'pbzip2', 'lbzip2', 'py_bz2', 'bzip2'),
         'test': ('7z', '7za', 'pbzip2', 'lbzip2', 'bzip2'),
-        'create': ('7z', '7za', 'pbzip2', 'lbzip2', 'bzip2', 'py_bz2'),
+        'create': ('7z', '7za', 'pbzip2', 'lbzip2', 'py_bz2', 'bzip2'),
         'list': ('7z', '7za', 'py_echo'),
         'read': ('py_bz2',),
     },
@@ -292,7 +295,7 @@ class CompressedFile(files.BaseFile):
     #
     # Returns
     # -------
-    #    @return: None
+    #    @return: target - what the archive was extracted to
     #
     # Raises
     # ------
@@ -304,20 +307,15 @@ class CompressedFile(files.BaseFile):
                 outdir=None,
                 program=None,
                 interactive=True):
-        logger.debug('Begin Function')
-
         """Verify given archive exists."""
         self.check_existing_filename(self.filename)
-        logger.info("Extracting %s ..." % self.filename)
+        logger.info("Extracting %s ...", self.filename)
         """Extract given archive."""
-        _extract_archive(self.filename,
-                         verbosity=verbosity,
-                         interactive=interactive,
-                         outdir=outdir,
-                         program=program)
-
-        logger.debug('End Function')
-        return
+        return _extract_archive(self.filename,
+                                verbosity=verbosity,
+                                interactive=interactive,
+                                outdir=outdir,
+                                program=program)
 
     #-------------------------------------------------------------------
     #
@@ -350,14 +348,14 @@ class CompressedFile(files.BaseFile):
         check_names = files.BaseFiles(filelist = filenames)
         check_names.check_filelist()
         if verbosity >= 0:
-            logger.info("Creating %s ..." % self.filename)
+            logger.info("Creating %s ...", self.filename)
             res = _create_archive(self.filename,
                                   filenames,
                                   verbosity=verbosity,
                                   interactive=interactive,
                                   program=program)
             if verbosity >= 0:
-                logger.info("... %s created." % self.filename)
+                logger.info("... %s created.", self.filename)
         return res
 
     #-------------------------------------------------------------------
@@ -389,7 +387,7 @@ class CompressedFile(files.BaseFile):
         # Set default verbosity to 1 since the listing output should be visible.
         self.check_existing_filename(self.filename)
         if verbosity >= 0:
-            logger.info("Listing %s ..." % self.filename)
+            logger.info("Listing %s ...", self.filename)
             return _handle_archive(self.filename,
                                    'list',
                                    verbosity=verbosity,
@@ -404,28 +402,39 @@ class CompressedFile(files.BaseFile):
     #
     # Inputs
     # ------
-    #     @param: self        - ...
-    #     @param: verbosity   - ...
-    #     @param: interactive - ...
+    #     @param: self
+    #     @param: verbosity
+    #     @param: interactive
+    #     @param: candidates  - None, or compressions to try, from
+    #                           recompress.parse_candidates()
+    #     @param: jobs        - candidates to run at once
+    #     @param: max_time    - None, or seconds a candidate may take
+    #     @param: min_gain    - percent a candidate must save
     #
     # Returns
     # -------
-    #     @return: None (change this to True or False?)
+    #     @return: None
     #
     # Raises
     # ------
-    #    @raises: ...
+    #     @raises: ...
     #
     #-------------------------------------------------------------------
-    def recompress_archive(self, verbosity=0, interactive=True):
+    def recompress_archive(self, verbosity=0, interactive=True,
+                           candidates=None, jobs=None, max_time=None,
+                           min_gain=0.0):
         """Recompress an archive to hopefully smaller size."""
         self.check_existing_filename(self.filename)
-        self.check_writable_filename(self.filename)
+        self.check_writable_filename()
         if verbosity >= 0:
-            logger.info("Recompressing %s ..." % (self.filename,))
+            logger.info("Recompressing %s ...", self.filename)
         res = _recompress_archive(self.filename,
                                   verbosity=verbosity,
-                                  interactive=interactive)
+                                  interactive=interactive,
+                                  candidates=candidates,
+                                  jobs=jobs,
+                                  max_time=max_time,
+                                  min_gain=min_gain)
         if res and verbosity >= 0:
             logger.info(res)
         return
@@ -438,30 +447,34 @@ class CompressedFile(files.BaseFile):
     #
     # Inputs
     # ------
-    #     @param: self        - ...
-    #     @param: achive_new  - ...
-    #     @param: verbosity   - ...
-    #     @param: interactive - ...
+    #     @param: self
+    #     @param: archive_new - the file to write
+    #     @param: verbosity
+    #     @param: interactive
+    #     @param: level       - None, or the compression level 0-9
     #
     # Returns
     # -------
-    #     @return: None (change this to True or False?)
+    #     @return: None
     #
     # Raises
     # ------
+    #     @raises: FileExistsError
     #     @raises: ...
     #
     #-------------------------------------------------------------------
-    def repack_archive (self, archive_new, verbosity=0, interactive=True):
+    def repack_archive (self, archive_new, verbosity=0, interactive=True,
+                        level=None):
         """Repack archive to different file and/or format."""
         self.check_existing_filename(self.filename)
-        self.check_new_filename(archive_new)
+        files.BaseFile(archive_new).check_new_filename()
         if verbosity >= 0:
-            logger.info("Repacking %s to %s ..." % (self.filename, archive_new))
+            logger.info("Repacking %s to %s ...", self.filename, archive_new)
         res = _repack_archive(self.filename,
                               archive_new,
                               verbosity=verbosity,
-                              interactive=interactive)
+                              interactive=interactive,
+                              level=level)
         if verbosity >= 0:
             logger.info("... repacking successful.")
         return res
@@ -489,7 +502,7 @@ class CompressedFile(files.BaseFile):
         """Test given archive."""
         self.check_existing_filename(self.filename)
         if verbosity >= 0:
-            logger.info("Testing %s ..." % self.filename)
+            logger.info("Testing %s ...", self.filename)
         res = _handle_archive(self.filename,
                               'test',
                               verbosity=verbosity,
@@ -507,32 +520,43 @@ class CompressedFile(files.BaseFile):
     #
     # Inputs
     # ------
-    #     @param: self         - ...
-    #     @param: searchstring - ...
+    #     @param: self
+    #     @param: pattern       - regular expression
+    #     @param: verbosity
+    #     @param: interactive
+    #     @param: max_count     - None, or the number of matches to
+    #                             stop at
+    #     @param: ignore_case
+    #     @param: fixed_strings - pattern is a string, not an expression
     #
     # Returns
     # -------
-    #     @return: result
+    #     @return: 0 - found
+    #     @return: 1 - not found
     #
     # Raises
     # ------
     #     @raises: ...
     #
     #-------------------------------------------------------------------
-    def search(self, pattern, verbosity=0, interactive=True):
+    def search(self, pattern, verbosity=0, interactive=True, max_count=None,
+               ignore_case=False, fixed_strings=False):
         """Search pattern in archive members."""
         if not pattern:
             raise Exception("empty search pattern")
         self.check_existing_filename(self.filename)
         if verbosity >= 0:
-            logger.info("Searching %r in %s ..."
-                        % (pattern, self.filename))
+            logger.info("Searching %r in %s ...",
+                        pattern, self.filename)
         res = _search_archive(pattern,
                               self.filename,
                               verbosity=verbosity,
-                              interactive=interactive)
+                              interactive=interactive,
+                              max_count=max_count,
+                              ignore_case=ignore_case,
+                              fixed_strings=fixed_strings)
         if res == 1 and verbosity >= 0:
-            logger.info("... %r not found" % pattern)
+            logger.info("... %r not found", pattern)
         return res
 
     #-------------------------------------------------------------------
@@ -560,14 +584,13 @@ class CompressedFile(files.BaseFile):
 
         """Verify given archive exists."""
         self.check_existing_filename(self.filename)
-        logger.info("Reading %s ..." % self.filename)
+        logger.info("Reading %s ...", self.filename)
         """Read given file."""
         content = _read_archive(self.filename,
                          verbosity=verbosity,
                          interactive=interactive,
                          program=program)
 
-        logger.debug('End Function')
         return content
 
 #-----------------------------------------------------------------------
@@ -595,37 +618,39 @@ class CompressedFiles(files.BaseFiles):
     #
     # Function diff
     #
-    # Diff compressed files
+    # Show the differences between two archives
     #
     # Inputs
     # ------
-    #     @param: self         - ...
-    #     @param: searchstring - ...
+    #     @param: self
+    #     @param: verbosity
+    #     @param: interactive
+    #     @param: contents    - compare contents, not only names and
+    #                           sizes
     #
     # Returns
     # -------
-    #     @return: result
+    #     @return: 0 - no differences
+    #     @return: 1 - differences
     #
     # Raises
     # ------
     #     @raises: ...
     #
     #-------------------------------------------------------------------
-    def diff(self, verbosity=0, interactive=True):
-        logger.debug('Begin Function')
-
+    def diff(self, verbosity=0, interactive=True, contents=True):
         """Print differences between two archives."""
-        self.check_existing_filename(self.files[0])
-        self.check_existing_filename(self.files[1])
+        for filename in self.files[:2]:
+            files.BaseFile(filename).check_existing_filename()
         if verbosity >= 0:
-            logger.info("Comparing %s with %s ..." % (self.files[0], self.files[1]))
-            res = _diff_archives(self.files,
-                                 verbosity=verbosity,
-                                 interactive=interactive)
+            logger.info("Comparing %s with %s ...", self.files[0], self.files[1])
+        res = _diff_archives(self.files,
+                             verbosity=verbosity,
+                             interactive=interactive,
+                             contents=contents)
         if res == 0 and verbosity >= 0:
             logger.info("... no differences found.")
 
-        logger.debug('End Function')
         return res
 
 #-----------------------------------------------------------------------
@@ -756,7 +781,7 @@ def list_formats ():
 #-----------------------------------------------------------------------
 def get_archive_format (filename):
     """Detect filename archive format and optional compression."""
-    mime, compression = mimetypes.guess_type(filename)
+    mime, compression = mimetypes.detect_type(filename)
 
     if not (mime or compression):
         raise Exception("unknown compression format for file `%s'" % filename)
@@ -797,14 +822,8 @@ def p7zip_supports_rar():
     if os.name == 'nt':
         # Assume RAR support is compiled into the binary.
         return True
-    # the subdirectory and codec name
-    codecname = 'p7zip/Codecs/Rar29.so'
-    # search canonical user library dirs
-    for libdir in ('/usr/lib', '/usr/local/lib', '/usr/lib64', '/usr/local/lib64', '/usr/lib/i386-linux-gnu', '/usr/lib/x86_64-linux-gnu'):
-        fname = os.path.join(libdir, codecname)
-        if os.path.exists(fname):
-            return True
-    return False
+    # the codec is looked for when 7z is probed
+    return 'rar' in tools.codecs('7z')
 
 #-----------------------------------------------------------------------
 #
@@ -848,7 +867,7 @@ def find_archive_program (format_, command, program=None):
             return program
         exe = util.find_program(program)
         if exe:
-            if program == '7z' and format == 'rar' and not p7zip_supports_rar():
+            if program == '7z' and format_ == 'rar' and not p7zip_supports_rar():
                 continue
             return exe
     # no programs found
@@ -1095,7 +1114,7 @@ def _extract_archive(archive, verbosity=0, interactive=True, outdir=None,
         else:
             target, msg = outdir, "`%s'" % outdir
         if verbosity >= 0:
-            logger.info("... %s extracted to %s." % (archive, msg))
+            logger.info("... %s extracted to %s.", archive, msg)
         return target
     finally:
         # try to remove an empty temporary output directory
@@ -1156,46 +1175,57 @@ def _handle_archive(archive, command, verbosity=0, interactive=True,
 
 #-----------------------------------------------------------------------
 #
-# Function _diff_archive
+# Function _diff_archives
 #
-# Show differences between two archives.
+# Show differences between two archives.  When the stream module can
+# read both, they are compared by their manifests in process and only
+# changed files are diffed; otherwise both are extracted to temporary
+# directories and compared with diff -urN.
 #
 # Inputs
 # ------
-#    @param: archives    - ...
-#    @param: verbosity   - ...
-#    @param: interactive - ...
+#    @param: archives
+#    @param: verbosity
+#    @param: interactive
+#    @param: contents    - compare contents, not only names and sizes
 #
 # Returns
 # -------
-#    @return: 0 - ...
-#    @return: 1 - ...
+#    @return: 0 - no differences
+#    @return: 1 - differences
 #
 # Raises
 # ------
-#    @raises: ...
+#    @raises: Exception
 #
 #-----------------------------------------------------------------------
-def _diff_archives (archives, verbosity=0, interactive=True):
+def _diff_archives (archives, verbosity=0, interactive=True, contents=True):
     """Show differences between two archives.
     @return 0 if archives are the same, else 1
-    @raises: PatoolError on errors
+    @raises: Exception on errors
     """
-
-    files = files.Files(archives)
-    if files.is_same_file():
+    archive1, archive2 = archives[:2]
+    if files.BaseFiles(filelist=[archive1, archive2]).is_same_file():
         return 0
+
+    sources = [(archive,) + get_archive_format(archive)
+               for archive in (archive1, archive2)]
+    if all(stream.supported(format_, compression)
+           for archive, format_, compression in sources):
+        return stream.diff(sources, contents=contents)
+
     diff = util.find_program("diff")
     if not diff:
         msg = "The diff(1) program is required for showing archive differences, please install it."
         raise Exception(msg)
-    tmpdir1 = files.BaseDirectory.tmpdir()
+    cmd = [diff, "-urN"] if contents else [diff, "-qrN"]
+    tmpdir1 = files.BaseDirectory(".").tmpdir()
     try:
         path1 = _extract_archive(archive1, outdir=tmpdir1, verbosity=-1)
-        tmpdir2 = files.Basedirectory.tmpdir()
+        tmpdir2 = files.BaseDirectory(".").tmpdir()
         try:
             path2 = _extract_archive(archive2, outdir=tmpdir2, verbosity=-1)
-            return util.run_checked([diff, "-urN", path1, path2], verbosity=1, ret_ok=(0, 1))
+            return util.run_checked(cmd + [path1, path2], verbosity=1, ret_ok=(0, 1))
         finally:
             shutil.rmtree(tmpdir2, onerror=rmtree_log_error)
     finally:
@@ -1308,34 +1338,54 @@ def create_singlefile_standard (archive, compression, cmd, verbosity, interactiv
 #
 # Function _recompress_archive
 #
-# ...
+# Try to recompress an archive to smaller size.  Tar archives and
+# compressed files the stream module can read are decompressed once and
+# every candidate compression tried on them at once, see
+# pysorcery.lib.files.recompress; other archives are extracted and
+# created again in the same format.
 #
 # Inputs
 # ------
-#    @param: archive     - ...
-#    @param: verbosity   - ...
-#                          Default: 0
-#    @param: interactive - ...
-#                          Default: True
+#    @param: archive
+#    @param: verbosity
+#    @param: interactive
+#    @param: candidates  - None, or compressions to try
+#    @param: jobs
+#    @param: max_time
+#    @param: min_gain
 #
 # Returns
 # -------
-#    @return: ...
-#    @return: ...
+#    @return: message
 #
 # Raises
 # ------
-#    @raises: ...
+#    @raises: Exception
 #
 #-----------------------------------------------------------------------
-def _recompress_archive(archive, verbosity=0, interactive=True):
+def _recompress_archive(archive, verbosity=0, interactive=True,
+                        candidates=None, jobs=None, max_time=None,
+                        min_gain=0.0):
     """Try to recompress an archive to smaller size."""
+    try:
+        recompress.split_name(archive)
+    except ValueError:
+        if candidates:
+            raise Exception("only tar archives and compressed files can be "
+                         "recompressed with other compressions")
+    else:
+        return recompress.recompress(archive,
+                                     candidates=candidates,
+                                     jobs=jobs,
+                                     max_time=max_time,
+                                     min_gain=min_gain)
+
     format, compression = get_archive_format(archive)
     if compression:
         # only recompress the compression itself (eg. for .tar.xz)
         format = compression
-    tmpdir = util.tmpdir()
-    tmpdir2 = util.tmpdir()
+    tmpdir = files.BaseDirectory(".").tmpdir()
+    tmpdir2 = files.BaseDirectory(".").tmpdir()
     base, ext = os.path.splitext(os.path.basename(archive))
     archive2 = files.get_single_outfile(tmpdir2, base, extension=ext)
     try:
@@ -1347,19 +1397,19 @@ def _recompress_archive(archive, verbosity=0, interactive=True):
         os.chdir(path)
         try:
             kwargs = dict(verbosity=verbosity, interactive=interactive, format=format)
-            files = tuple(os.listdir(path))
-            _create_archive(archive2, files, **kwargs)
+            filenames = tuple(os.listdir(path))
+            _create_archive(archive2, filenames, **kwargs)
         finally:
             os.chdir(olddir)
         # check file sizes and replace if new file is smaller
-        filesize = util.get_filesize(archive)
-        filesize2 = util.get_filesize(archive2)
+        filesize = os.path.getsize(archive)
+        filesize2 = os.path.getsize(archive2)
         if filesize2 < filesize:
             # replace file
             os.remove(archive)
             shutil.move(archive2, archive)
             diffsize = filesize - filesize2
-            return "... recompressed file is now %s smaller." % util.strsize(diffsize)
+            return "... recompressed file is now %d bytes smaller." % diffsize
     finally:
         shutil.rmtree(tmpdir, onerror=rmtree_log_error)
         shutil.rmtree(tmpdir2, onerror=rmtree_log_error)
@@ -1412,11 +1462,18 @@ def _create_archive(archive, filenames, verbosity=0, interactive=True,
 #
 # Function _repack_archive
 #
-# ...
+# Repackage an archive to a different format.  When the stream module
+# can read the archive and write the new one, members are copied from
+# one to the other in process; otherwise the archive is extracted to a
+# temporary directory and the new one created from it.
 #
 # Inputs
 # ------
-#    @param: ...
+#    @param: archive1    - the archive to read
+#    @param: archive2    - the archive to write
+#    @param: verbosity
+#    @param: interactive
+#    @param: level       - None, or the compression level 0-9
 #
 # Returns
 # -------
@@ -1427,24 +1484,37 @@ def _create_archive(archive, filenames, verbosity=0, interactive=True,
 #    @raises: ...
 #
 #-----------------------------------------------------------------------
-def _repack_archive (archive1, archive2, verbosity=0, interactive=True):
+def _repack_archive (archive1, archive2, verbosity=0, interactive=True,
+                     level=None):
     """Repackage an archive to a different format."""
+    source = stream.guess_format(archive1)
+    target = stream.guess_format(archive2)
+    if (source and target
+        and (source[0] in ('tar', 'zip')) == (target[0] in ('tar', 'zip'))):
+        if source == target and level is None:
+            # same format and compression allows to copy the file
+            shutil.copyfile(archive1, archive2)
+            return
+        stream.repack((archive1,) + source, (archive2,) + target,
+                      level=level)
+        return
+
     format1, compression1 = get_archive_format(archive1)
     format2, compression2 = get_archive_format(archive2)
     if format1 == format2 and compression1 == compression2:
         # same format and compression allows to copy the file
-        util.link_or_copy(archive1, archive2, verbosity=verbosity)
+        shutil.copyfile(archive1, archive2)
         return
-    tmpdir = util.tmpdir()
+    tmpdir = files.BaseDirectory(".").tmpdir()
     try:
         kwargs = dict(verbosity=verbosity, outdir=tmpdir)
         same_format = (format1 == format2 and compression1 and compression2)
         if same_format:
             # only decompress since the format is the same
-            kwargs['format'] = compression1
+            kwargs['format_'] = compression1
         path = _extract_archive(archive1, **kwargs)
         archive = os.path.abspath(archive2)
-        files = tuple(os.listdir(path))
+        filenames = tuple(os.listdir(path))
         olddir = os.getcwd()
         os.chdir(path)
         try:
@@ -1452,7 +1522,7 @@ def _repack_archive (archive1, archive2, verbosity=0, interactive=True):
             if same_format:
                 # only compress since the format is the same
                 kwargs['format'] = compression2
-            _create_archive(archive, files, **kwargs)
+            _create_archive(archive, filenames, **kwargs)
         finally:
             os.chdir(olddir)
     finally:
@@ -1462,31 +1532,58 @@ def _repack_archive (archive1, archive2, verbosity=0, interactive=True):
 #
 # Function _search_archive
 #
-# This is the base File Class
+# Search the members of an archive for a pattern and write the matching
+# lines as member:line:text.  Formats the stream module can read are
+# searched in process, without writing anything to disk; others are
+# extracted to a temporary directory and searched with grep(1).
 #
 # Inputs
 # ------
-#    @param: ...
+#    @param: pattern
+#    @param: archive
+#    @param: verbosity
+#    @param: interactive
+#    @param: max_count     - None, or the number of matches to stop at
+#    @param: ignore_case
+#    @param: fixed_strings
 #
 # Returns
 # -------
-#    @return: None
+#    @return: 0 - found
+#    @return: 1 - not found
 #
 # Raises
 # ------
-#    @raises: ...
+#    @raises: Exception
 #
 #-----------------------------------------------------------------------
-def _search_archive(pattern, archive, verbosity=0, interactive=True):
+def _search_archive(pattern, archive, verbosity=0, interactive=True,
+                    max_count=None, ignore_case=False, fixed_strings=False):
     """Search for given pattern in an archive."""
+    format_, compression = get_archive_format(archive)
+    if stream.supported(format_, compression):
+        matches = stream.search(archive, pattern, format_, compression,
+                                max_count=max_count,
+                                ignore_case=ignore_case,
+                                fixed_strings=fixed_strings)
+        return stream.write_matches(matches)
+
     grep = util.find_program("grep")
     if not grep:
         msg = "The grep(1) program is required for searching archive contents, please install it."
         raise Exception(msg)
-    tmpdir = util.tmpdir()
+    cmd = [grep, "-r", "-n"]
+    if max_count is not None:
+        # grep counts per member
+        cmd.extend(["-m", str(max_count)])
+    if ignore_case:
+        cmd.append("-i")
+    if fixed_strings:
+        cmd.append("-F")
+    tmpdir = files.BaseDirectory(".").tmpdir()
     try:
         path = _extract_archive(archive, outdir=tmpdir, verbosity=-1)
-        return util.run_checked([grep, "-r", "-e", pattern, "."], ret_ok=(0, 1), verbosity=1, cwd=path)
+        return util.run_checked(cmd + ["-e", pattern, "."], ret_ok=(0, 1), verbosity=1, cwd=path)
     finally:
         shutil.rmtree(tmpdir, onerror=rmtree_log_error)
 
@@ -14,7 +14,9 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """Archive commands for the bz2 Python module."""
-from .. import util
+from pysorcery.lib import files
+from pysorcery.lib.files import archive
+from pysorcery.lib.files import parallel
 try:
     # try external bz2file module with multi-stream support
     import bz2file as bz2
@@ -24,28 +26,27 @@ except ImportError:
 # read in 1MB chunks
 READ_SIZE_BYTES = 1024*1024
 
+class PyBz2Error(archive.ArchiveError):
+    pass
+
 def extract_bzip2 (archive, compression, cmd, verbosity, interactive, outdir):
-    """Extract a BZIP2 archive with the bz2 Python module."""
-    targetname = util.get_single_outfile(outdir, archive)
+    """Extract a BZIP2 archive, its streams decompressed on every core."""
+    targetname = files.get_single_outfile(outdir, archive)
     try:
-        with bz2.BZ2File(archive) as bz2file:
-            with open(targetname, 'wb') as targetfile:
-                data = bz2file.read(READ_SIZE_BYTES)
-                while data:
-                    targetfile.write(data)
-                    data = bz2file.read(READ_SIZE_BYTES)
+        with open(targetname, 'wb') as targetfile:
+            parallel.decompress(archive, 'bzip2', targetfile)
     except Exception as err:
         msg = "error extracting %s to %s: %s" % (archive, targetname, err)
-        raise util.PatoolError(msg)
+        raise PyBz2Error(msg)
     return None
 
 
 def create_bzip2 (archive, compression, cmd, verbosity, interactive, filenames):
-    """Create a BZIP2 archive with the bz2 Python module."""
+    """Create a BZIP2 archive as bzip2 streams compressed on every core."""
     if len(filenames) > 1:
-        raise util.PatoolError('multi-file compression not supported in Python bz2')
+        raise PyBz2Error('multi-file compression not supported in Python bz2')
     try:
-        with bz2.BZ2File(archive, 'wb') as bz2file:
+        with parallel.open_writer(archive, 'bzip2') as bz2file:
             filename = filenames[0]
             with open(filename, 'rb') as srcfile:
                 data = srcfile.read(READ_SIZE_BYTES)
@@ -54,7 +55,7 @@ def create_bzip2 (archive, compression, cmd, verbosity, interactive, filenames):
                     data = srcfile.read(READ_SIZE_BYTES)
     except Exception as err:
         msg = "error creating %s: %s" % (archive, err)
-        raise util.PatoolError(msg)
+        raise PyBz2Error(msg)
     return None
 
 def read_bzip2 (archive, compression, cmd, verbosity, interactive, outdir):
@@ -65,6 +66,6 @@ def read_bzip2 (archive, compression, cmd, verbosity, interactive, outdir):
                 line_list.append(line[:-1])
     except Exception as err:
         msg = "error readinging %s: %s" % (archive, err)
-        raise Exception(msg)
+        raise PyBz2Error(msg)
 
     return line_list
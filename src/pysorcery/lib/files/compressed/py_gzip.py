@@ -20,40 +20,41 @@ from __future__ import absolute_import
 import gzip
 
 from pysorcery.lib import files
+from pysorcery.lib.files import archive
+from pysorcery.lib.files import parallel
 
 READ_SIZE_BYTES = 1024*1024
 
+class PyGzipError(archive.ArchiveError):
+    pass
+
 def extract_gzip (archive, compression, cmd, verbosity, interactive, outdir):
-    """Extract a GZIP archive with the gzip Python module."""
+    """Extract a GZIP archive, its members decompressed on every core."""
     targetname = files.get_single_outfile(outdir, archive)
     try:
-        with gzip.GzipFile(archive) as gzipfile:
-            with open(targetname, 'wb') as targetfile:
-                data = gzipfile.read(READ_SIZE_BYTES)
-                while data:
-                    targetfile.write(data)
-                    data = gzipfile.read(READ_SIZE_BYTES)
+        with open(targetname, 'wb') as targetfile:
+            parallel.decompress(archive, 'gzip', targetfile)
     except Exception as err:
         msg = "error extracting %s to %s: %s" % (archive, targetname, err)
-        raise util.PatoolError(msg)
+        raise PyGzipError(msg)
     return None
 
 
 def create_gzip (archive, compression, cmd, verbosity, interactive, filenames):
-    """Create a GZIP archive with the gzip Python module."""
+    """Create a GZIP archive as gzip members compressed on every core."""
     if len(filenames) > 1:
-        raise Exception('multi-file compression not supported in Python gzip')
+        raise PyGzipError('multi-file compression not supported in Python gzip')
     try:
-        with gzip.GzipFile(archive, 'wb') as gzipfile:
+        with parallel.open_writer(archive, 'gzip') as gzipfile:
             filename = filenames[0]
-            with open(filename, 'wb') as srcfile:
+            with open(filename, 'rb') as srcfile:
                 data = srcfile.read(READ_SIZE_BYTES)
                 while data:
                     gzipfile.write(data)
                     data = srcfile.read(READ_SIZE_BYTES)
     except Exception as err:
         msg = "error creating %s: %s" % (archive, err)
-        raise util.PatoolError(msg)
+        raise PyGzipError(msg)
     return None
 
 def read_gzip (archive, compression, cmd, verbosity, interactive, outdir):
@@ -64,6 +65,6 @@ def read_gzip (archive, compression, cmd, verbosity, interactive, outdir):
                 line_list.append(line[:-1])
     except Exception as err:
         msg = "error readinging %s: %s" % (archive, err)
-        raise Exception(msg)
+        raise PyGzipError(msg)
 
     return line_list
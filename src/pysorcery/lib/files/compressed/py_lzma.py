@@ -14,15 +14,25 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """Archive commands for the lzma Python module."""
-from .. import util
+from pysorcery.lib import files
+from pysorcery.lib.files import archive
+from pysorcery.lib.files import parallel
 import lzma
 
 READ_SIZE_BYTES = 1024*1024
 
+class PyLzmaError(archive.ArchiveError):
+    pass
+
 def _extract(archive, compression, cmd, format, verbosity, outdir):
     """Extract an LZMA or XZ archive with the lzma Python module."""
-    targetname = util.get_single_outfile(outdir, archive)
+    targetname = files.get_single_outfile(outdir, archive)
     try:
+        if format == lzma.FORMAT_XZ:
+            # the blocks of xz -T, pixz and parallel are independent
+            with open(targetname, 'wb') as targetfile:
+                parallel.decompress(archive, 'xz', targetfile)
+            return None
         with lzma.LZMAFile(archive, format=format) as lzmafile:
             with open(targetname, 'wb') as targetfile:
                 data = lzmafile.read(READ_SIZE_BYTES)
@@ -31,7 +41,7 @@ def _extract(archive, compression, cmd, format, verbosity, outdir):
                     data = lzmafile.read(READ_SIZE_BYTES)
     except Exception as err:
         msg = "error extracting %s to %s: %s" % (archive, targetname, err)
-        raise util.PatoolError(msg)
+        raise PyLzmaError(msg)
     return None
 
 def extract_lzma(archive, compression, cmd, verbosity, interactive, outdir):
@@ -46,9 +56,14 @@ def extract_xz(archive, compression, cmd, verbosity, interactive, outdir):
 def _create(archive, compression, cmd, format, verbosity, filenames):
     """Create an LZMA or XZ archive with the lzma Python module."""
     if len(filenames) > 1:
-        raise util.PatoolError('multi-file compression not supported in Python lzma')
+        raise PyLzmaError('multi-file compression not supported in Python lzma')
     try:
-        with lzma.LZMAFile(archive, mode='wb', format=format, preset=9) as lzmafile:
+        if format == lzma.FORMAT_XZ:
+            # xz streams can be concatenated, so compress on every core
+            lzmafile = parallel.open_writer(archive, 'xz', 9)
+        else:
+            lzmafile = lzma.LZMAFile(archive, mode='wb', format=format, preset=9)
+        with lzmafile:
             filename = filenames[0]
             with open(filename, 'rb') as srcfile:
                 data = srcfile.read(READ_SIZE_BYTES)
@@ -57,7 +72,7 @@ def _create(archive, compression, cmd, format, verbosity, filenames):
                     data = srcfile.read(READ_SIZE_BYTES)
     except Exception as err:
         msg = "error creating %s: %s" % (archive, err)
-        raise util.PatoolError(msg)
+        raise PyLzmaError(msg)
     return None
 
 def create_lzma(archive, compression, cmd, verbosity, interactive, filenames):
@@ -76,7 +91,7 @@ def read_xz (archive, compression, cmd, verbosity, interactive, outdir):
                 line_list.append(line[:-1])
     except Exception as err:
         msg = "error readinging %s: %s" % (archive, err)
-        raise Exception(msg)
+        raise PyLzmaError(msg)
 
     return line_list
 
@@ -88,6 +103,6 @@ def read_lzma (archive, compression, cmd, verbosity, interactive, outdir):
                 line_list.append(line[:-1])
     except Exception as err:
         msg = "error readinging %s: %s" % (archive, err)
-        raise Exception(msg)
+        raise PyLzmaError(msg)
 
     return line_list
@@ -14,8 +14,10 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """Archive commands for the xz program."""
+import os
 from . import extract_singlefile_standard, test_singlefile_standard
 from .. import util
+from pysorcery.lib.util import tools
 
 
 extract_xz = extract_singlefile_standard
@@ -36,6 +38,7 @@ def create_xz(archive, compression, cmd, verbosity, interactive, filenames):
     cmdlist = [util.shell_quote(cmd)]
     if verbosity > 1:
         cmdlist.append('-v')
+    cmdlist.extend(tools.thread_args(cmd, os.cpu_count() or 1))
     cmdlist.extend(['-c', '-9', '--'])
     cmdlist.extend([util.shell_quote(x) for x in filenames])
     cmdlist.extend(['>', util.shell_quote(archive)])
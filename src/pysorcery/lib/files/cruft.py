@@ -49,6 +49,8 @@ import subprocess
 # System Library Overrides
 from pysorcery.lib.system import logging
 # Other Application Libraries
+from pysorcery.lib import util
+from pysorcery.lib.util import cache
 
 # Other Optional Libraries
 
@@ -61,6 +63,13 @@ from pysorcery.lib.system import logging
 # Enable Logging
 logger = logging.getLogger(__name__)
 
+# Results are cached between runs until one of these changes.  cruft
+# also walks the file system, so results expire after an hour.
+STATE_FILES = tuple(util.root_path(path) for path in
+                    ('/var/lib/dpkg/status',
+                     '/var/lib/dpkg/info/*.list',
+                     '/etc/cruft/*'))
+
 #-----------------------------------------------------------------------
 #
 # Classes
@@ -96,6 +105,7 @@ logger = logging.getLogger(__name__)
 #    ...
 #
 #-------------------------------------------------------------------
+@cache.cached(ttl=3600, disk=True, depends=STATE_FILES)
 def get_alien():
     var = subprocess.check_output(['cruft'])
 
@@ -55,6 +55,7 @@ from pysorcery.lib.system import shutil
 # Other Application Libraries
 from pysorcery.lib import util
 from pysorcery.lib import files
+from pysorcery.lib.util import tools
 
 # Condiional Libraries
 try:
@@ -157,11 +158,9 @@ class PackageFile(files.BaseFile):
                 outdir=None,
                 program=None,
                 interactive=True):
-        logger.debug('Begin Function')
-
         """Verify given archive exists."""
         self.check_existing_filename(self.filename)
-        logger.info("Extracting %s ..." % self.filename)
+        logger.info("Extracting %s ...", self.filename)
         """Extract given archive."""
         _extract_archive(self.filename,
                          verbosity=verbosity,
@@ -169,7 +168,6 @@ class PackageFile(files.BaseFile):
                          outdir=outdir,
                          program=program)
 
-        logger.debug('End Function')
         return
     
     #-------------------------------------------------------------------
@@ -298,7 +296,7 @@ class PackageFile(files.BaseFile):
         util.check_existing_filename(self.filename)
         util.check_new_filename(archive_new)
         if verbosity >= 0:
-            logger.info("Repacking %s to %s ..." % (self.filename, archive_new))
+            logger.info("Repacking %s to %s ...", self.filename, archive_new)
         res = _repack_archive(self.filename,
                               archive_new,
                               verbosity=verbosity,
@@ -330,7 +328,7 @@ class PackageFile(files.BaseFile):
         """Test given archive."""
         util.check_existing_filename(self.filename)
         if verbosity >= 0:
-            logger.info("Testing %s ..." % self.filename)
+            logger.info("Testing %s ...", self.filename)
         res = _handle_archive(self.filename,
                               'test',
                               verbosity=verbosity,
@@ -366,13 +364,13 @@ class PackageFile(files.BaseFile):
             raise Exception("empty search pattern")
         util.check_existing_filename(self.filename)
         if verbosity >= 0:
-            logger.info("Searching %r in %s ..." % (pattern, self.filename))
+            logger.info("Searching %r in %s ...", pattern, self.filename)
         res = _search_archive(pattern,
                               self.filename,
                               verbosity=verbosity,
                               interactive=interactive)
         if res == 1 and verbosity >= 0:
-            logger.info("... %r not found" % pattern)
+            logger.info("... %r not found", pattern)
         return res
 
     #-------------------------------------------------------------------
@@ -441,20 +439,17 @@ class PackageFiles(files.BaseFiles):
     #
     #-------------------------------------------------------------------
     def diff(self, verbosity=0, interactive=True):
-        logger.debug('Begin Function')
-
         """Print differences between two archives."""
         util.check_existing_filename(self.files[0])
         util.check_existing_filename(self.files[1])
         if verbosity >= 0:
-            logger.info("Comparing %s with %s ..." % (self.files[0], self.files[1]))
+            logger.info("Comparing %s with %s ...", self.files[0], self.files[1])
             res = _diff_archives(self.files,
                                  verbosity=verbosity,
                                  interactive=interactive)
         if res == 0 and verbosity >= 0:
             logger.info("... no differences found.")
         
-        logger.debug('End Function')
         return res
 
 #-----------------------------------------------------------------------
@@ -583,7 +578,7 @@ def list_formats ():
 #-----------------------------------------------------------------------
 def get_archive_format (filename):
     """Detect filename archive format and optional compression."""
-    mime, compression = mimetypes.guess_type(filename)
+    mime, compression = mimetypes.detect_type(filename)
     if not (mime or compression):
         raise Exception("unknown archive format for file `%s'" % filename)
     if mime in mimetypes.PackageMimetypes:
@@ -619,14 +614,8 @@ def p7zip_supports_rar():
     if os.name == 'nt':
         # Assume RAR support is compiled into the binary.
         return True
-    # the subdirectory and codec name
-    codecname = 'p7zip/Codecs/Rar29.so'
-    # search canonical user library dirs
-    for libdir in ('/usr/lib', '/usr/local/lib', '/usr/lib64', '/usr/local/lib64', '/usr/lib/i386-linux-gnu', '/usr/lib/x86_64-linux-gnu'):
-        fname = os.path.join(libdir, codecname)
-        if os.path.exists(fname):
-            return True
-    return False
+    # the codec is looked for when 7z is probed
+    return 'rar' in tools.codecs('7z')
 
 #-----------------------------------------------------------------------
 #
@@ -667,7 +656,7 @@ def find_archive_program (format_, command, program=None):
             return program
         exe = util.find_program(program)
         if exe:
-            if program == '7z' and format == 'rar' and not p7zip_supports_rar():
+            if program == '7z' and format_ == 'rar' and not p7zip_supports_rar():
                 continue
             return exe
     # no programs found
@@ -895,7 +884,7 @@ def _extract_archive(archive, verbosity=0, interactive=True, outdir=None,
         else:
             target, msg = outdir, "`%s'" % outdir
         if verbosity >= 0:
-            logger.info("... %s extracted to %s." % (archive, msg))
+            logger.info("... %s extracted to %s.", archive, msg)
         return target
     finally:
         # try to remove an empty temporary output directory
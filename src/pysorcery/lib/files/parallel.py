@@ -0,0 +1,804 @@
+#! /usr/bin/env python3
+#-----------------------------------------------------------------------
+#
+# Original BASH version
+# Original version Copyright 2001 by Kyle Sallee
+# Additions/corrections Copyright 2002 by the Source Mage Team
+#
+# Python rewrite
+# Copyright 2017 Geoff S Derber
+#
+# File: pysorcery/lib/files/parallel.py
+#
+# This file is part of Sorcery.
+#
+#    Sorcery is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published
+#    by the Free Software Foundation, either version 3 of the License,
+#    or (at your option) any later version.
+#
+#    Sorcery is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with Sorcery.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Parallel:
+#
+#    Compress on every core without pigz, pbzip2 or pixz.  The input is
+#    cut into blocks that are compressed on a thread pool (zlib, bz2
+#    and lzma release the GIL while they work) and written in order,
+#    each block as a complete gzip member, bzip2 stream or xz stream.
+#    Concatenated members and streams are standard; gzip, bzip2, xz and
+#    the Python modules decompress them as one file.
+#
+#        with parallel.open_writer('foo.tar.xz', 'xz', 6) as fileobj:
+#            fileobj.write(data)
+#
+#    Files made of independent pieces are decompressed the same way:
+#    the blocks listed in the index of each xz stream (xz -T, pixz and
+#    the writer above), and the members of a gzip file or streams of a
+#    bzip2 file (pbzip2, lbzip2, the writer above).  gzip members and
+#    bzip2 streams have no index; they are found by their headers, and
+#    a header only counts once the piece before it ended there.
+#
+#        with open('foo.tar', 'wb') as fileobj:
+#            parallel.decompress('foo.tar.xz', 'xz', fileobj)
+#
+#-----------------------------------------------------------------------
+"""
+Parallel:
+
+Compress on every core without pigz, pbzip2 or pixz.  The input is cut
+into blocks that are compressed on a thread pool and written in order
+as a multi-member gzip, multi-stream bzip2 or multi-stream xz file.
+
+Files made of independent pieces (xz blocks, gzip members, bzip2
+streams) are decompressed on the thread pool the same way.
+"""
+#-----------------------------------------------------------------------
+#
+# Libraries
+#
+#-----------------------------------------------------------------------
+# System Libraries
+import collections
+from concurrent import futures
+import importlib
+import mmap
+import os
+import re
+import struct
+import zlib
+
+# 3rd Party Libraries
+
+
+# Application Libraries
+# System Library Overrides
+from pysorcery.lib.system import logging
+# Other Application Libraries
+from pysorcery.lib.util import profiling
+
+# Conditional Libraries
+
+
+#-----------------------------------------------------------------------
+#
+# Global Variables
+#
+#-----------------------------------------------------------------------
+# Enable Logging
+# create logger
+logger = logging.getLogger(__name__)
+
+# Codec -> (uncompressed bytes per block, default level).  A bzip2
+# block holds at most 900k, so every stream is one block at level 9;
+# xz blocks are larger to keep most of its ratio.
+Codecs = {
+    'gzip': (1024 * 1024, 9),
+    'bzip2': (900 * 1000, 9),
+    'xz': (8 * 1024 * 1024, 6),
+}
+
+# Dictionary size of each xz preset; blocks smaller than it get a
+# smaller dictionary, which saves memory on every thread
+XZ_DICT_SIZES = (
+    256 * 1024, 1 << 20, 2 << 20, 4 << 20, 4 << 20,
+    8 << 20, 8 << 20, 16 << 20, 32 << 20, 64 << 20,
+)
+
+# Blocks compressed or waiting to be written, per thread
+QUEUE_DEPTH = 2
+
+# Where a gzip member or a bzip2 stream may start: the gzip magic,
+# deflate, no reserved flags, a known XFL and OS; the bzip2 magic,
+# a level and the magic of the first block
+MemberSignatures = {
+    'gzip': re.compile(rb'\x1f\x8b\x08[\x00-\x1f].{4}[\x00\x02\x04]'
+                       rb'[\x00-\x0d\xff]', re.DOTALL),
+    'bzip2': re.compile(rb'BZh[1-9]1AY&SY'),
+}
+
+# Modules reading each codec one piece after another
+Modules = {
+    'gzip': 'gzip',
+    'bzip2': 'bz2',
+    'xz': 'lzma',
+}
+
+# Largest piece decompressed in memory; bigger ones are streamed
+MAX_PIECE = 32 * 1024 * 1024
+
+# Compressed bytes fed to a decompressor at a time
+CHUNK_SIZE = 1024 * 1024
+
+XZ_MAGIC = b'\xfd7zXZ\x00'
+XZ_FOOTER_MAGIC = b'YZ'
+
+#-----------------------------------------------------------------------
+#
+# Classes
+#
+# BlockWriter
+#
+#-----------------------------------------------------------------------
+
+#-----------------------------------------------------------------------
+#
+# Class BlockWriter
+#
+# A write-only file object compressing what is written to it in
+# parallel.  At most QUEUE_DEPTH blocks per thread are held in memory.
+#
+# Inputs
+# ------
+#    @param: fileobj    - binary file object to write to
+#    @param: codec      - 'gzip', 'bzip2' or 'xz'
+#    @param: level      - None for the default; for xz a preset, which
+#                         may include lzma.PRESET_EXTREME
+#    @param: jobs       - threads, one per CPU by default
+#    @param: block_size - None for the codec's default
+#    @param: close      - also close fileobj when closed
+#
+# Returns
+# -------
+#    @return: None
+#
+# Raises
+# ------
+#    @raises: ValueError - unknown codec
+#
+#-----------------------------------------------------------------------
+class BlockWriter():
+    def __init__(self, fileobj, codec, level=None, jobs=None,
+                 block_size=None, close=False):
+        if codec not in Codecs:
+            raise ValueError("no parallel compressor for `%s'" % codec)
+        self.fileobj = fileobj
+        self.codec = codec
+        self.level = Codecs[codec][1] if level is None else level
+        self.block_size = block_size or Codecs[codec][0]
+        self.jobs = jobs or os.cpu_count() or 1
+        self.close_fileobj = close
+        self.pool = futures.ThreadPoolExecutor(
+            max_workers=self.jobs,
+            thread_name_prefix='compress %s' % codec)
+        self.pending = collections.deque()
+        self.buffer = bytearray()
+        self.blocks = 0
+        self.closed = False
+        return
+
+    #-------------------------------------------------------------------
+    #
+    # Function compress_block
+    #
+    # Compress one block into a complete member or stream.  Runs on the
+    # thread pool.
+    #
+    # Inputs
+    # ------
+    #    @param: self
+    #    @param: block
+    #
+    # Returns
+    # -------
+    #    @return: data
+    #
+    # Raises
+    # ------
+    #    ...
+    #
+    #-------------------------------------------------------------------
+    def compress_block(self, block):
+        if self.codec == 'gzip':
+            import gzip
+            # mtime 0 keeps the output reproducible
+            return gzip.compress(block, self.level, mtime=0)
+
+        if self.codec == 'bzip2':
+            import bz2
+            return bz2.compress(block, max(self.level, 1))
+
+        import lzma
+        preset = self.level & ~lzma.PRESET_EXTREME
+        dict_size = max(4096, min(XZ_DICT_SIZES[preset],
+                                  1 << max(len(block) - 1, 1).bit_length()))
+        filters = [{'id': lzma.FILTER_LZMA2,
+                    'preset': self.level,
+                    'dict_size': dict_size}]
+        return lzma.compress(block, format=lzma.FORMAT_XZ, filters=filters)
+
+    #-------------------------------------------------------------------
+    #
+    # Function submit
+    #
+    # Queue a block, then write finished blocks while too many are
+    # queued.
+    #
+    # Inputs
+    # ------
+    #    @param: self
+    #    @param: block
+    #
+    # Returns
+    # -------
+    #    @return: None
+    #
+    # Raises
+    # ------
+    #    @raises: OSError
+    #
+    #-------------------------------------------------------------------
+    def submit(self, block):
+        self.pending.append(self.pool.submit(self.compress_block, block))
+        self.blocks += 1
+        profiling.count('compress %s blocks' % self.codec)
+        while len(self.pending) > QUEUE_DEPTH * self.jobs:
+            self.fileobj.write(self.pending.popleft().result())
+        return
+
+    #-------------------------------------------------------------------
+    #
+    # Function write
+    #
+    # Inputs
+    # ------
+    #    @param: self
+    #    @param: data
+    #
+    # Returns
+    # -------
+    #    @return: length - of data
+    #
+    # Raises
+    # ------
+    #    @raises: ValueError - when closed
+    #    @raises: OSError
+    #
+    #-------------------------------------------------------------------
+    def write(self, data):
+        if self.closed:
+            raise ValueError('write to closed file')
+        self.buffer += data
+        size = self.block_size
+        while len(self.buffer) >= size:
+            block = bytes(self.buffer[:size])
+            del self.buffer[:size]
+            self.submit(block)
+        return len(data)
+
+    #-------------------------------------------------------------------
+    #
+    # Function writable
+    #
+    # Inputs
+    # ------
+    #    @param: self
+    #
+    # Returns
+    # -------
+    #    @return: True
+    #
+    # Raises
+    # ------
+    #    ...
+    #
+    #-------------------------------------------------------------------
+    def writable(self):
+        return True
+
+    #-------------------------------------------------------------------
+    #
+    # Function close
+    #
+    # Compress what is left and write every block.  An empty input is
+    # still written as one empty member, so the file is valid.
+    #
+    # Inputs
+    # ------
+    #    @param: self
+    #
+    # Returns
+    # -------
+    #    @return: None
+    #
+    # Raises
+    # ------
+    #    @raises: OSError
+    #
+    #-------------------------------------------------------------------
+    def close(self):
+        if self.closed:
+            return
+        try:
+            if self.buffer or not self.blocks:
+                self.submit(bytes(self.buffer))
+                self.buffer = bytearray()
+            while self.pending:
+                self.fileobj.write(self.pending.popleft().result())
+        finally:
+            self.closed = True
+            for future in self.pending:
+                future.cancel()
+            self.pool.shutdown()
+            if self.close_fileobj:
+                self.fileobj.close()
+        return
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
+
+#-----------------------------------------------------------------------
+#
+# Functions
+#
+# open_writer
+# decompress
+# decompress_sequential
+# decompress_member
+# decompress_members
+# read_varint
+# encode_varint
+# xz_blocks
+# decompress_xz_block
+# decompress_xz
+#
+#-----------------------------------------------------------------------
+
+#-----------------------------------------------------------------------
+#
+# Function open_writer
+#
+# Open a file for writing compressed in parallel.
+#
+# Inputs
+# ------
+#    @param: filename
+#    @param: codec    - 'gzip', 'bzip2' or 'xz'
+#    @param: level
+#    @param: jobs
+#
+# Returns
+# -------
+#    @return: writer - BlockWriter
+#
+# Raises
+# ------
+#    @raises: ValueError
+#    @raises: OSError
+#
+#-----------------------------------------------------------------------
+def open_writer(filename, codec, level=None, jobs=None):
+    fileobj = open(filename, 'wb')
+    try:
+        return BlockWriter(fileobj, codec, level, jobs, close=True)
+    except Exception:
+        fileobj.close()
+        raise
+
+#-----------------------------------------------------------------------
+#
+# Function decompress
+#
+# Decompress a file into fileobj.  Independent pieces are decompressed
+# on jobs threads and written in order; anything else, and everything
+# when jobs is 1, is read one piece after another.
+#
+# Inputs
+# ------
+#    @param: filename
+#    @param: codec    - 'gzip', 'bzip2' or 'xz'
+#    @param: fileobj  - binary file object to write to
+#    @param: jobs     - threads, one per CPU by default
+#
+# Returns
+# -------
+#    @return: None
+#
+# Raises
+# ------
+#    @raises: ValueError - unknown codec
+#    @raises: OSError, EOFError, lzma.LZMAError, zlib.error - bad data
+#
+#-----------------------------------------------------------------------
+def decompress(filename, codec, fileobj, jobs=None):
+    if codec not in Modules:
+        raise ValueError("no parallel decompressor for `%s'" % codec)
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1 or os.path.getsize(filename) == 0:
+        return decompress_sequential(filename, codec, fileobj)
+
+    with open(filename, 'rb') as source, \
+         mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ) as view:
+        if codec == 'xz':
+            blocks = xz_blocks(view)
+            if blocks is None or len(blocks) < 2 \
+               or max(block[2] for block in blocks) > MAX_PIECE:
+                return decompress_sequential(filename, codec, fileobj)
+            return decompress_xz(view, blocks, fileobj, jobs)
+        return decompress_members(view, codec, fileobj, jobs)
+
+#-----------------------------------------------------------------------
+#
+# Function decompress_sequential
+#
+# Inputs
+# ------
+#    @param: filename
+#    @param: codec
+#    @param: fileobj
+#
+# Returns
+# -------
+#    @return: None
+#
+# Raises
+# ------
+#    @raises: OSError, EOFError, lzma.LZMAError
+#
+#-----------------------------------------------------------------------
+def decompress_sequential(filename, codec, fileobj):
+    module = importlib.import_module(Modules[codec])
+    with module.open(filename, 'rb') as source:
+        data = source.read(CHUNK_SIZE)
+        while data:
+            fileobj.write(data)
+            data = source.read(CHUNK_SIZE)
+    return
+
+#-----------------------------------------------------------------------
+#
+# Function decompress_member
+#
+# Decompress the gzip member or bzip2 stream starting at offset.  With
+# write, the data is written as it comes; without, it is returned, or
+# None once it grows past MAX_PIECE.
+#
+# Inputs
+# ------
+#    @param: view   - the whole file
+#    @param: offset
+#    @param: codec  - 'gzip' or 'bzip2'
+#    @param: write  - None, or a function taking the data
+#
+# Returns
+# -------
+#    @return: data - bytes; None when written or too large
+#    @return: end  - offset after the member
+#
+# Raises
+# ------
+#    @raises: EOFError - the member is cut short
+#    @raises: OSError, zlib.error - bad data
+#
+#-----------------------------------------------------------------------
+def decompress_member(view, offset, codec, write=None):
+    if codec == 'gzip':
+        decompressor = zlib.decompressobj(zlib.MAX_WBITS | 16)
+    else:
+        import bz2
+        decompressor = bz2.BZ2Decompressor()
+
+    chunks = []
+    size = 0
+    position = offset
+    while not decompressor.eof:
+        if position >= len(view):
+            raise EOFError('compressed file ended before the end-of-stream '
+                           'marker was reached')
+        chunk = view[position:position + CHUNK_SIZE]
+        position += len(chunk)
+        if write is not None:
+            write(decompressor.decompress(chunk))
+            continue
+        # one byte more than allowed tells a piece that is too large
+        data = decompressor.decompress(chunk, MAX_PIECE - size + 1)
+        size += len(data)
+        if size > MAX_PIECE:
+            return None, None
+        chunks.append(data)
+    end = position - len(decompressor.unused_data)
+    return (None if write else b''.join(chunks)), end
+
+#-----------------------------------------------------------------------
+#
+# Function decompress_members
+#
+# Decompress a gzip or bzip2 file member by member.  Members are
+# decompressed ahead on the thread pool from every offset that looks
+# like the start of one; a result is only used when the member before
+# it ended at its offset.  The member being written is otherwise
+# decompressed here, as are members larger than MAX_PIECE.  Zeros
+# after a member are skipped, other trailing data ignored, as gzip
+# does.
+#
+# Inputs
+# ------
+#    @param: view    - the whole file
+#    @param: codec   - 'gzip' or 'bzip2'
+#    @param: fileobj
+#    @param: jobs
+#
+# Returns
+# -------
+#    @return: None
+#
+# Raises
+# ------
+#    @raises: EOFError, OSError, zlib.error
+#
+#-----------------------------------------------------------------------
+def decompress_members(view, codec, fileobj, jobs):
+    signature = MemberSignatures[codec]
+    candidates = (match.start() for match in signature.finditer(view, 1))
+    pending = collections.deque()
+    position = 0
+
+    with futures.ThreadPoolExecutor(
+            max_workers=jobs,
+            thread_name_prefix='decompress %s' % codec) as pool:
+        try:
+            while position < len(view):
+                while len(pending) < QUEUE_DEPTH * jobs:
+                    offset = next(candidates, None)
+                    if offset is None:
+                        break
+                    pending.append((offset, pool.submit(
+                        decompress_member, view, offset, codec)))
+                # pieces starting inside a member were false starts
+                while pending and pending[0][0] < position:
+                    pending.popleft()[1].cancel()
+
+                data = None
+                if pending and pending[0][0] == position:
+                    future = pending.popleft()[1]
+                    if future.exception() is None:
+                        data, end = future.result()
+                if data is None:
+                    # the member is too large, or decompressing failed:
+                    # stream it here, raising its error if any
+                    profiling.count('decompress %s streamed' % codec)
+                    data, end = decompress_member(view, position, codec,
+                                                  fileobj.write)
+                else:
+                    profiling.count('decompress %s members' % codec)
+                    fileobj.write(data)
+
+                position = end
+                while position < len(view) and view[position] == 0:
+                    position += 1
+                if position < len(view) \
+                   and not signature.match(view, position):
+                    logger.warning('trailing garbage after %s data ignored',
+                                   codec)
+                    break
+        finally:
+            for offset, future in pending:
+                future.cancel()
+    return
+
+#-----------------------------------------------------------------------
+#
+# Function read_varint
+#
+# Read an xz variable-length integer: 7 bits a byte, low bits first.
+#
+# Inputs
+# ------
+#    @param: data
+#    @param: position
+#
+# Returns
+# -------
+#    @return: value
+#    @return: position - after the integer
+#
+# Raises
+# ------
+#    @raises: IndexError - data ends inside the integer
+#
+#-----------------------------------------------------------------------
+def read_varint(data, position):
+    value = 0
+    shift = 0
+    while True:
+        byte = data[position]
+        position += 1
+        value |= (byte & 0x7f) << shift
+        if not byte & 0x80:
+            return value, position
+        shift += 7
+
+#-----------------------------------------------------------------------
+#
+# Function encode_varint
+#
+# Inputs
+# ------
+#    @param: value
+#
+# Returns
+# -------
+#    @return: data
+#
+# Raises
+# ------
+#    ...
+#
+#-----------------------------------------------------------------------
+def encode_varint(value):
+    data = bytearray()
+    while value >= 0x80:
+        data.append(value & 0x7f | 0x80)
+        value >>= 7
+    data.append(value)
+    return bytes(data)
+
+#-----------------------------------------------------------------------
+#
+# Function xz_blocks
+#
+# List the blocks of an xz file from the index of each stream, reading
+# the streams back to front as xz does.
+#
+# Inputs
+# ------
+#    @param: view - the whole file
+#
+# Returns
+# -------
+#    @return: blocks - list of (offset, unpadded size, uncompressed
+#                      size, stream header) in file order; None when
+#                      the file is not a well formed xz file
+#
+# Raises
+# ------
+#    ...
+#
+#-----------------------------------------------------------------------
+def xz_blocks(view):
+    blocks = []
+    position = len(view)
+    try:
+        while position > 0:
+            # stream padding
+            while position >= 4 and view[position - 4:position] == bytes(4):
+                position -= 4
+            footer = view[position - 12:position]
+            if position < 24 or footer[10:] != XZ_FOOTER_MAGIC \
+               or zlib.crc32(footer[4:10]) != struct.unpack('<I', footer[:4])[0]:
+                return None
+            index_size = (struct.unpack('<I', footer[4:8])[0] + 1) * 4
+            index_start = position - 12 - index_size
+            index = view[index_start:position - 12]
+            if index_start < 12 or index[0] != 0 \
+               or zlib.crc32(index[:-4]) != struct.unpack('<I', index[-4:])[0]:
+                return None
+
+            count, offset = read_varint(index, 1)
+            records = []
+            for i in range(count):
+                unpadded, offset = read_varint(index, offset)
+                uncompressed, offset = read_varint(index, offset)
+                records.append((unpadded, uncompressed))
+
+            stream_start = index_start - 12 \
+                - sum((unpadded + 3) & ~3 for unpadded, size in records)
+            header = view[stream_start:stream_start + 12]
+            if stream_start < 0 or header[:6] != XZ_MAGIC \
+               or header[6:8] != footer[8:10]:
+                return None
+
+            offset = stream_start + 12
+            stream = []
+            for unpadded, uncompressed in records:
+                stream.append((offset, unpadded, uncompressed, header))
+                offset += (unpadded + 3) & ~3
+            blocks[:0] = stream
+            position = stream_start
+    except (IndexError, struct.error):
+        return None
+    return blocks
+
+#-----------------------------------------------------------------------
+#
+# Function decompress_xz_block
+#
+# Decompress one xz block by wrapping it in a stream of its own: the
+# header of its stream, the block, and an index and footer for it.
+#
+# Inputs
+# ------
+#    @param: view  - the whole file
+#    @param: block - from xz_blocks()
+#
+# Returns
+# -------
+#    @return: data
+#
+# Raises
+# ------
+#    @raises: lzma.LZMAError
+#
+#-----------------------------------------------------------------------
+def decompress_xz_block(view, block):
+    import lzma
+    offset, unpadded, uncompressed, header = block
+    index = b'\x00' + encode_varint(1) + encode_varint(unpadded) \
+        + encode_varint(uncompressed)
+    index += bytes(-len(index) % 4)
+    index += struct.pack('<I', zlib.crc32(index))
+    footer = struct.pack('<I', len(index) // 4 - 1) + header[6:8]
+    footer = struct.pack('<I', zlib.crc32(footer)) + footer + XZ_FOOTER_MAGIC
+
+    data = lzma.decompress(header + view[offset:offset + ((unpadded + 3) & ~3)]
+                           + index + footer, format=lzma.FORMAT_XZ)
+    if len(data) != uncompressed:
+        raise lzma.LZMAError('xz block at %d has %d bytes, index says %d'
+                             % (offset, len(data), uncompressed))
+    return data
+
+#-----------------------------------------------------------------------
+#
+# Function decompress_xz
+#
+# Inputs
+# ------
+#    @param: view    - the whole file
+#    @param: blocks  - from xz_blocks()
+#    @param: fileobj
+#    @param: jobs
+#
+# Returns
+# -------
+#    @return: None
+#
+# Raises
+# ------
+#    @raises: lzma.LZMAError
+#
+#-----------------------------------------------------------------------
+def decompress_xz(view, blocks, fileobj, jobs):
+    pending = collections.deque()
+    with futures.ThreadPoolExecutor(
+            max_workers=jobs, thread_name_prefix='decompress xz') as pool:
+        try:
+            for block in blocks:
+                pending.append(pool.submit(decompress_xz_block, view, block))
+                profiling.count('decompress xz blocks')
+                while len(pending) > QUEUE_DEPTH * jobs:
+                    fileobj.write(pending.popleft().result())
+            while pending:
+                fileobj.write(pending.popleft().result())
+        finally:
+            for future in pending:
+                future.cancel()
+    return
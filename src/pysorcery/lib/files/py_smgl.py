@@ -52,6 +52,7 @@ import os
 from pysorcery.lib.system import logging
 # Other Application Libraries
 from pysorcery.lib import files
+from pysorcery.lib import util
 # Other Optional Libraries
 
 
@@ -107,9 +108,7 @@ logger = logging.getLogger(__name__)
 #
 #-------------------------------------------------------------------
 def get_installed():
-    logger.debug("Begin Function")
-
-    install_log_dir = '/var/log/sorcery/install'
+    install_log_dir = util.root_path('/var/log/sorcery/install')
     installed_files = []
     for root, dirs, files_  in os.walk(install_log_dir):
         for i in files_:
@@ -117,7 +116,6 @@ def get_installed():
             f = files.BaseFile(install_log)
             installed_files = installed_files + f.read()
 
-    logger.debug("End Function")
     return installed_files
 
 #-------------------------------------------------------------------
@@ -140,8 +138,6 @@ def get_installed():
 #
 #-------------------------------------------------------------------
 def get_alien():
-    logger.debug("Begin Function")
-
     # 1. Gather list of installed files
     logger.info("Discovering installed files...")
     installed_files = get_installed()
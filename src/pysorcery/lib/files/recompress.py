@@ -0,0 +1,415 @@
+#! /usr/bin/env python3
+#-----------------------------------------------------------------------
+#
+# Original BASH version
+# Original version Copyright 2001 by Kyle Sallee
+# Additions/corrections Copyright 2002 by the Source Mage Team
+#
+# Python rewrite
+# Copyright 2017 Geoff S Derber
+#
+# File: pysorcery/lib/files/recompress.py
+#
+# This file is part of Sorcery.
+#
+#    Sorcery is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published
+#    by the Free Software Foundation, either version 3 of the License,
+#    or (at your option) any later version.
+#
+#    Sorcery is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with Sorcery.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Recompress:
+#
+#    Try several compressions on a tar archive or compressed file and
+#    keep the smallest result.  The file is decompressed once, into a
+#    spool file every candidate reads; the candidates run at the same
+#    time, each in its own process.
+#
+#        recompress.recompress('foo.tar.gz',
+#                              recompress.parse_candidates('gzip:9,xz:9e'))
+#
+#    A candidate is a codec with an optional level and, for xz and
+#    lzma, 'e' for the extreme preset: gzip:9, xz:9e, zstd:19, lzip.
+#    gzip, bzip2, xz and lzma are compressed in process; zstd and lzip
+#    need their programs.
+#
+#-----------------------------------------------------------------------
+"""
+Recompress:
+
+Try several compressions on a tar archive or compressed file and keep
+the smallest result.  The file is decompressed once; the candidates run
+at the same time, each in its own process.
+"""
+#-----------------------------------------------------------------------
+#
+# Libraries
+#
+#-----------------------------------------------------------------------
+# System Libraries
+from concurrent import futures
+import os
+import subprocess
+import tempfile
+import time
+
+# 3rd Party Libraries
+
+
+# Application Libraries
+# System Library Overrides
+from pysorcery.lib.system import logging
+from pysorcery.lib.system import shutil
+# Other Application Libraries
+from pysorcery.lib import util
+from pysorcery.lib.files import stream
+from pysorcery.lib.util import output
+from pysorcery.lib.util import profiling
+from pysorcery.lib.util import tools
+
+# Conditional Libraries
+
+
+#-----------------------------------------------------------------------
+#
+# Global Variables
+#
+#-----------------------------------------------------------------------
+# Enable Logging
+# create logger
+logger = logging.getLogger(__name__)
+
+# Codec -> (file extension, default level, highest level)
+Codecs = {
+    'gzip': ('.gz', 6, 9),
+    'bzip2': ('.bz2', 9, 9),
+    'xz': ('.xz', 6, 9),
+    'lzma': ('.lzma', 6, 9),
+    'zstd': ('.zst', 3, 22),
+    'lzip': ('.lz', 6, 9),
+}
+
+# Codecs compressed by a program, by the programs to look for
+Programs = {
+    'zstd': ('zstd',),
+    'lzip': ('plzip', 'lzip', 'clzip', 'pdlzip'),
+}
+
+# Codecs taking 'e', the extreme preset
+EXTREME = ('xz', 'lzma')
+
+# Bytes copied at a time
+COPY_SIZE = 1024 * 1024
+
+#-----------------------------------------------------------------------
+#
+# Classes
+#
+#-----------------------------------------------------------------------
+
+#-----------------------------------------------------------------------
+#
+# Functions
+#
+# parse_candidates
+# candidate_name
+# compress
+# split_name
+# recompress
+#
+#-----------------------------------------------------------------------
+
+#-----------------------------------------------------------------------
+#
+# Function parse_candidates
+#
+# Parse a list of candidates like 'gzip:9,xz:6,xz:9e,zstd:19,lzip'.
+#
+# Inputs
+# ------
+#    @param: text
+#
+# Returns
+# -------
+#    @return: candidates - list of (codec, level, extreme); level is
+#                          None for the codec's default
+#
+# Raises
+# ------
+#    @raises: ValueError
+#
+#-----------------------------------------------------------------------
+def parse_candidates(text):
+    candidates = []
+    for item in text.split(','):
+        codec, sep, level = item.strip().partition(':')
+        if codec not in Codecs:
+            raise ValueError("unknown codec `%s'; known are %s"
+                             % (codec, ', '.join(sorted(Codecs))))
+        extreme = level.endswith('e')
+        if extreme:
+            if codec not in EXTREME:
+                raise ValueError("`%s' has no extreme preset" % codec)
+            level = level[:-1]
+        if level:
+            if not level.isdigit() or int(level) > Codecs[codec][2]:
+                raise ValueError("invalid level `%s' for %s"
+                                 % (level, codec))
+            level = int(level)
+        else:
+            level = None
+        candidates.append((codec, level, extreme))
+    return candidates
+
+#-----------------------------------------------------------------------
+#
+# Function candidate_name
+#
+# Inputs
+# ------
+#    @param: candidate - (codec, level, extreme)
+#
+# Returns
+# -------
+#    @return: name - as given to parse_candidates()
+#
+# Raises
+# ------
+#    ...
+#
+#-----------------------------------------------------------------------
+def candidate_name(candidate):
+    codec, level, extreme = candidate
+    if level is None:
+        return codec
+    return '%s:%d%s' % (codec, level, 'e' if extreme else '')
+
+#-----------------------------------------------------------------------
+#
+# Function compress
+#
+# Compress the spool file with one candidate.  Runs in a worker
+# process.
+#
+# Inputs
+# ------
+#    @param: spool     - the uncompressed data
+#    @param: candidate - (codec, level, extreme)
+#    @param: target
+#    @param: jobs      - threads, for programs with thread support
+#                        too
+#
+# Returns
+# -------
+#    @return: size    - of target
+#    @return: seconds
+#
+# Raises
+# ------
+#    @raises: OSError
+#    @raises: subprocess.CalledProcessError
+#
+#-----------------------------------------------------------------------
+def compress(spool, candidate, target, jobs=1):
+    codec, level, extreme = candidate
+    started = time.perf_counter()
+
+    if codec in Programs:
+        for program in Programs[codec]:
+            exe = util.find_program(program)
+            if exe:
+                break
+        else:
+            raise OSError('no %s program found; install one of %s'
+                          % (codec, ', '.join(Programs[codec])))
+        cmd = [exe, '-c']
+        if jobs > 1:
+            cmd.extend(tools.thread_args(program, jobs))
+        if level is not None:
+            if level > 19:
+                # zstd only goes beyond 19 when asked to
+                cmd.append('--ultra')
+            cmd.append('-%d' % level)
+        with open(spool, 'rb') as source, open(target, 'wb') as fileobj:
+            subprocess.run(cmd, stdin=source, stdout=fileobj, check=True)
+
+    else:
+        if extreme:
+            import lzma
+            level = (Codecs[codec][1] if level is None else level) \
+                | lzma.PRESET_EXTREME
+        if extreme and codec == 'lzma':
+            compressed = lzma.open(target, 'wb', format=lzma.FORMAT_ALONE,
+                                   preset=level)
+        else:
+            compressed = stream.open_compressed(target, codec, 'wb', level,
+                                                jobs)
+        with open(spool, 'rb') as source, compressed:
+            shutil.copyfileobj(source, compressed, COPY_SIZE)
+
+    return os.path.getsize(target), time.perf_counter() - started
+
+#-----------------------------------------------------------------------
+#
+# Function split_name
+#
+# Split a tar archive or compressed file name into the name without
+# the compression and the compression.  'foo.tgz' is 'foo.tar'.
+#
+# Inputs
+# ------
+#    @param: filename
+#
+# Returns
+# -------
+#    @return: base  - the name of the uncompressed file
+#    @return: codec - None for a plain tar archive
+#
+# Raises
+# ------
+#    @raises: ValueError - neither a tar archive nor a compressed file
+#
+#-----------------------------------------------------------------------
+def split_name(filename):
+    format_ = stream.guess_format(filename)
+    if format_ is None or format_[0] == 'zip':
+        raise ValueError("`%s' is neither a tar archive nor a compressed "
+                         "file read in process" % filename)
+
+    format_, compression = format_
+    if format_ != 'tar':
+        return os.path.splitext(filename)[0], format_
+    if compression is None:
+        return filename, None
+    base = os.path.splitext(filename)[0]
+    if not base.endswith('.tar'):
+        base += '.tar'
+    return base, compression
+
+#-----------------------------------------------------------------------
+#
+# Function recompress
+#
+# Compress a file with every candidate, report size and time of each,
+# and keep the smallest result.  A candidate is only kept when it
+# finished within max_time and is at least min_gain percent smaller
+# than the file.  When it uses another compression, it replaces the
+# file under the name of its compression, for example foo.tar.xz for
+# foo.tar.gz.
+#
+# Inputs
+# ------
+#    @param: filename
+#    @param: candidates - from parse_candidates(); None to try the
+#                         file's own compression at its highest level
+#    @param: jobs       - candidates to run at once; one per CPU.  CPUs
+#                         left over are shared out as compressing
+#                         threads
+#    @param: max_time   - None, or seconds
+#    @param: min_gain   - percent
+#
+# Returns
+# -------
+#    @return: message - what was kept
+#
+# Raises
+# ------
+#    @raises: ValueError
+#    @raises: OSError
+#
+#-----------------------------------------------------------------------
+def recompress(filename, candidates=None, jobs=None, max_time=None,
+               min_gain=0.0):
+    base, codec = split_name(filename)
+    if not candidates:
+        if codec is None:
+            raise ValueError('%s is not compressed; say which '
+                             'compressions to try' % filename)
+        candidates = [(codec, Codecs[codec][2], codec in EXTREME)]
+
+    directory = os.path.dirname(os.path.abspath(filename))
+    original = os.path.getsize(filename)
+    cpus = os.cpu_count() or 1
+    jobs = min(jobs or cpus, len(candidates))
+    threads = max(cpus // jobs, 1)
+    targets = {}
+    results = {}
+
+    fd, spool = tempfile.mkstemp(prefix='pysorcery-', suffix='.spool')
+    try:
+        with profiling.span('recompress decompress'), \
+             os.fdopen(fd, 'wb') as fileobj, \
+             stream.open_compressed(filename, codec) as source:
+            shutil.copyfileobj(source, fileobj, COPY_SIZE)
+
+        with profiling.span('recompress candidates'), \
+             futures.ProcessPoolExecutor(max_workers=jobs) as pool:
+            pending = {}
+            for candidate in candidates:
+                name = candidate_name(candidate)
+                targets[name] = os.path.join(
+                    directory, '.%s.%s.%d.tmp' % (os.path.basename(base),
+                                                  name.replace(':', '-'),
+                                                  os.getpid()))
+                pending[pool.submit(compress, spool, candidate,
+                                    targets[name], threads)] = candidate
+            for future in futures.as_completed(pending):
+                candidate = pending[future]
+                name = candidate_name(candidate)
+                try:
+                    results[name] = (candidate,) + future.result()
+                except (OSError, subprocess.CalledProcessError) as msg:
+                    logger.error('%s failed: %s', name, msg)
+
+        writer = output.get_writer()
+        writer.line('%-12s %12d bytes' % ('original', original))
+        for name, (candidate, size, seconds) in sorted(
+                results.items(), key=lambda item: item[1][1]):
+            writer.line('%-12s %12d bytes %6.1f%% %8.2f s'
+                        % (name, size, 100.0 * size / max(original, 1),
+                           seconds))
+        writer.flush()
+
+        eligible = [(size, seconds, name)
+                    for name, (candidate, size, seconds) in results.items()
+                    if max_time is None or seconds <= max_time]
+        if not eligible:
+            return '... no candidate finished in time, leaving %s as is.' \
+                % filename
+        size, seconds, name = min(eligible)
+        if size >= original:
+            return '... recompressed file is not smaller, leaving %s as ' \
+                'is.' % filename
+        if size > original * (1 - min_gain / 100.0):
+            return '... %s saves less than %g%%, leaving %s as is.' \
+                % (name, min_gain, filename)
+
+        winner = results[name][0][0]
+        if winner == codec:
+            # same compression, keep the name (foo.tgz stays foo.tgz)
+            newname = filename
+        else:
+            newname = base + Codecs[winner][0]
+        if newname != filename and os.path.exists(newname):
+            raise FileExistsError("`%s' already exists, leaving %s as is"
+                                  % (newname, filename))
+        shutil.copystat(filename, targets[name])
+        os.replace(targets[name], newname)
+        if newname != filename:
+            os.remove(filename)
+        return '... kept %s as %s, %d bytes smaller.' % (name, newname,
+                                                          original - size)
+    finally:
+        for target in targets.values():
+            try:
+                os.remove(target)
+            except OSError:
+                pass
+        os.remove(spool)
@@ -0,0 +1,1250 @@
+#! /usr/bin/env python3
+#-----------------------------------------------------------------------
+#
+# Original BASH version
+# Original version Copyright 2001 by Kyle Sallee
+# Additions/corrections Copyright 2002 by the Source Mage Team
+#
+# Python rewrite
+# Copyright 2017 Geoff S Derber
+#
+# File: pysorcery/lib/files/stream.py
+#
+# This file is part of Sorcery.
+#
+#    Sorcery is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published
+#    by the Free Software Foundation, either version 3 of the License,
+#    or (at your option) any later version.
+#
+#    Sorcery is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with Sorcery.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Stream:
+#
+#    Read archive members in process, one after the other, without
+#    extracting anything to disk.  Tar archives are read as a stream
+#    (plain, gzip, bzip2, xz or lzma compressed), zip archives member
+#    by member and single compressed files as their one member.
+#
+#        for name, fileobj in stream.iter_members(filename, 'tar', 'xz'):
+#            ...
+#
+#    search() matches a regular expression against the members a chunk
+#    at a time, so memory use does not depend on the size of a member.
+#
+#-----------------------------------------------------------------------
+"""
+Stream:
+
+Read archive members in process, one after the other, without
+extracting anything to disk, and search them for a regular expression a
+chunk at a time.
+"""
+#-----------------------------------------------------------------------
+#
+# Libraries
+#
+#-----------------------------------------------------------------------
+# System Libraries
+import difflib
+import hashlib
+import importlib
+import itertools
+import os
+import re
+import queue
+import stat
+import threading
+import time
+
+# 3rd Party Libraries
+
+
+# Application Libraries
+# System Library Overrides
+from pysorcery.lib.system import logging
+# Other Application Libraries
+from pysorcery.lib.files import parallel
+from pysorcery.lib.util import output
+from pysorcery.lib.util import profiling
+
+# Conditional Libraries
+
+
+#-----------------------------------------------------------------------
+#
+# Global Variables
+#
+#-----------------------------------------------------------------------
+# Enable Logging
+# create logger
+logger = logging.getLogger(__name__)
+
+# Compressions read and written in process, by the module opening them
+Decompressors = {
+    'gzip': 'gzip',
+    'bzip2': 'bz2',
+    'xz': 'lzma',
+    'lzma': 'lzma',
+}
+
+# Bytes read from a member at a time
+CHUNK_SIZE = 64 * 1024
+
+# Lines longer than this are searched in pieces of this size, so a
+# member without newlines does not have to fit in memory
+MAX_LINE = 1024 * 1024
+
+# Content hash of a manifest; blake2b is the fastest in hashlib
+HASH = 'blake2b'
+
+# Members larger than this are compared by hash only, not diffed
+DIFF_SIZE = 4 * 1024 * 1024
+
+# Chunks the repack reader may be ahead of the writer
+QUEUE_SIZE = 16
+
+# Sent by the repack reader after the last member
+END = None
+
+#-----------------------------------------------------------------------
+#
+# Classes
+#
+# StreamError
+# Member
+# QueueReader
+#
+#-----------------------------------------------------------------------
+
+#-----------------------------------------------------------------------
+#
+# Class StreamError
+#
+# An archive could not be read.
+#
+# Inputs
+# ------
+#    @param: ...
+#
+# Returns
+# -------
+#    @return: None
+#
+# Raises
+# ------
+#    ...
+#
+#-----------------------------------------------------------------------
+class StreamError(OSError):
+    pass
+
+#-----------------------------------------------------------------------
+#
+# Class Member
+#
+# One archive entry.
+#
+# Inputs
+# ------
+#    @param: name
+#    @param: type_    - 'file', 'dir', 'link', 'hardlink' or 'other'
+#    @param: size     - None when not known before reading
+#    @param: mode     - permission bits
+#    @param: linkname - target of a link
+#    @param: mtime
+#    @param: info     - the TarInfo or ZipInfo read
+#
+# Returns
+# -------
+#    @return: None
+#
+# Raises
+# ------
+#    ...
+#
+#-----------------------------------------------------------------------
+class Member():
+    __slots__ = ('name', 'type', 'size', 'mode', 'linkname', 'mtime',
+                 'info', 'digest')
+
+    def __init__(self, name, type_='file', size=0, mode=0, linkname='',
+                 mtime=0, info=None):
+        self.name = name
+        self.type = type_
+        self.size = size
+        self.mode = stat.S_IMODE(mode)
+        self.linkname = linkname
+        self.mtime = mtime
+        self.info = info
+        # Content hash, set by hash_member()
+        self.digest = None
+        return
+
+#-----------------------------------------------------------------------
+#
+# Class QueueReader
+#
+# The content of one member as sent by read_into(), read like a file.
+#
+# Inputs
+# ------
+#    @param: pipe - queue.Queue
+#
+# Returns
+# -------
+#    @return: None
+#
+# Raises
+# ------
+#    ...
+#
+#-----------------------------------------------------------------------
+class QueueReader():
+    def __init__(self, pipe):
+        self.pipe = pipe
+        self.buffer = b''
+        self.offset = 0
+        self.done = False
+        return
+
+    #-------------------------------------------------------------------
+    #
+    # Function next_chunk
+    #
+    # Inputs
+    # ------
+    #    @param: self
+    #
+    # Returns
+    # -------
+    #    @return: chunk - b'' after the last one
+    #
+    # Raises
+    # ------
+    #    @raises: StreamError - sent by the reader
+    #
+    #-------------------------------------------------------------------
+    def next_chunk(self):
+        if self.done:
+            return b''
+        chunk = self.pipe.get()
+        if isinstance(chunk, Exception):
+            raise chunk
+        if not chunk:
+            self.done = True
+        return chunk
+
+    #-------------------------------------------------------------------
+    #
+    # Function read
+    #
+    # Inputs
+    # ------
+    #    @param: self
+    #    @param: size - -1 for everything
+    #
+    # Returns
+    # -------
+    #    @return: data
+    #
+    # Raises
+    # ------
+    #    @raises: StreamError
+    #
+    #-------------------------------------------------------------------
+    def read(self, size=-1):
+        # Serve from the current chunk without copying it around
+        if 0 <= size <= len(self.buffer) - self.offset:
+            data = self.buffer[self.offset:self.offset + size]
+            self.offset += size
+            return data
+
+        parts = [self.buffer[self.offset:]]
+        length = len(parts[0])
+        self.buffer, self.offset = b'', 0
+        while size < 0 or length < size:
+            chunk = self.next_chunk()
+            if not chunk:
+                break
+            parts.append(chunk)
+            length += len(chunk)
+        data = b''.join(parts)
+        if 0 <= size < length:
+            data, self.buffer = data[:size], data[size:]
+        return data
+
+    #-------------------------------------------------------------------
+    #
+    # Function drain
+    #
+    # Skip what was not read of the member.
+    #
+    # Inputs
+    # ------
+    #    @param: self
+    #
+    # Returns
+    # -------
+    #    @return: None
+    #
+    # Raises
+    # ------
+    #    @raises: StreamError
+    #
+    #-------------------------------------------------------------------
+    def drain(self):
+        self.buffer, self.offset = b'', 0
+        while self.next_chunk():
+            pass
+        return
+
+#-----------------------------------------------------------------------
+#
+# Functions
+#
+# guess_format
+# supported
+# open_compressed
+# iter_members
+# search_stream
+# search
+# write_matches
+# hash_member
+# manifest
+# read_members
+# compare_members
+# diff
+# read_into
+# tar_info
+# zip_info
+# repack
+# iter_queue
+#
+#-----------------------------------------------------------------------
+
+#-----------------------------------------------------------------------
+#
+# Function guess_format
+#
+# The format and compression of a file, as far as streaming is
+# concerned: ('tar', compression), ('zip', None), or a single
+# compressed file as (compression, None).
+#
+# Inputs
+# ------
+#    @param: filename
+#
+# Returns
+# -------
+#    @return: (format_, compression)
+#    @return: None - when the file cannot be streamed
+#
+# Raises
+# ------
+#    ...
+#
+#-----------------------------------------------------------------------
+def guess_format(filename):
+    from pysorcery.lib.system import mimetypes
+
+    mime, encoding = mimetypes.detect_type(filename)
+    if mime == 'application/x-tar':
+        format_ = ('tar', encoding)
+    elif mime == 'application/zip' and encoding is None:
+        format_ = ('zip', None)
+    elif encoding is not None:
+        format_ = (encoding, None)
+    else:
+        return None
+    if not supported(*format_):
+        return None
+    return format_
+
+#-----------------------------------------------------------------------
+#
+# Function supported
+#
+# Whether an archive of this format and compression can be streamed.
+#
+# Inputs
+# ------
+#    @param: format_     - 'tar', 'zip' or a compression, as returned by
+#                          get_archive_format()
+#    @param: compression
+#
+# Returns
+# -------
+#    @return: True
+#    @return: False
+#
+# Raises
+# ------
+#    ...
+#
+#-----------------------------------------------------------------------
+def supported(format_, compression=None):
+    if compression is not None and compression not in Decompressors:
+        return False
+    return format_ in ('tar', 'zip') or format_ in Decompressors
+
+#-----------------------------------------------------------------------
+#
+# Function open_compressed
+#
+# Open a compressed file for reading its uncompressed bytes, or for
+# writing bytes to compress.  gzip, bzip2 and xz are written in blocks
+# compressed on jobs threads; see parallel.
+#
+# Inputs
+# ------
+#    @param: filename
+#    @param: compression - None, or a key of Decompressors
+#    @param: mode        - 'rb' or 'wb'
+#    @param: level       - None for the default compression level,
+#                          or 0-9
+#    @param: jobs        - threads compressing; one per CPU by default
+#
+# Returns
+# -------
+#    @return: fileobj - binary file object
+#
+# Raises
+# ------
+#    @raises: StreamError - when the compression is not supported
+#    @raises: OSError
+#
+#-----------------------------------------------------------------------
+def open_compressed(filename, compression=None, mode='rb', level=None,
+                    jobs=None):
+    if compression is None:
+        return open(filename, mode)
+    if compression not in Decompressors:
+        raise StreamError("compression `%s' cannot be read in process"
+                          % compression)
+    try:
+        module = importlib.import_module(Decompressors[compression])
+    except ImportError as msg:
+        raise StreamError("compression `%s' cannot be read in process: %s"
+                          % (compression, msg))
+
+    if mode == 'rb':
+        return module.open(filename, mode)
+    if compression in parallel.Codecs and jobs != 1:
+        return parallel.open_writer(filename, compression, level, jobs)
+    if compression == 'lzma':
+        return module.open(filename, mode, format=module.FORMAT_ALONE,
+                           preset=level)
+    if compression == 'xz':
+        return module.open(filename, mode, preset=level)
+    if level is None:
+        return module.open(filename, mode)
+    if compression == 'bzip2':
+        # bzip2 has no level 0
+        level = max(level, 1)
+    return module.open(filename, mode, compresslevel=level)
+
+#-----------------------------------------------------------------------
+#
+# Function iter_members
+#
+# Every regular file in an archive, in archive order; with everything,
+# directories, links and other entries as well.  Each file object is
+# only valid until the next member is asked for.
+#
+# Inputs
+# ------
+#    @param: filename
+#    @param: format_
+#    @param: compression
+#    @param: everything
+#
+# Returns
+# -------
+#    @return: generator of (member, fileobj) - fileobj is None for
+#                                              anything but a file
+#
+# Raises
+# ------
+#    @raises: StreamError
+#
+#-----------------------------------------------------------------------
+def iter_members(filename, format_, compression=None, everything=False):
+    if not supported(format_, compression):
+        raise StreamError("cannot stream %s archive `%s'"
+                          % (format_, filename))
+
+    try:
+        if format_ == 'tar':
+            import tarfile
+            with open_compressed(filename, compression) as fileobj, \
+                 tarfile.open(fileobj=fileobj, mode='r|') as tar:
+                for info in tar:
+                    if info.isfile():
+                        type_ = 'file'
+                    elif not everything:
+                        continue
+                    elif info.isdir():
+                        type_ = 'dir'
+                    elif info.issym():
+                        type_ = 'link'
+                    elif info.islnk():
+                        type_ = 'hardlink'
+                    else:
+                        type_ = 'other'
+                    member = Member(info.name.rstrip('/'), type_,
+                                    info.size, info.mode, info.linkname,
+                                    info.mtime, info)
+                    profiling.count('stream members')
+                    if type_ == 'file':
+                        yield member, tar.extractfile(info)
+                    else:
+                        yield member, None
+
+        elif format_ == 'zip':
+            import zipfile
+            with zipfile.ZipFile(filename) as zfile:
+                for info in zfile.infolist():
+                    mode = info.external_attr >> 16
+                    if info.is_dir():
+                        type_ = 'dir'
+                    elif stat.S_ISLNK(mode):
+                        type_ = 'link'
+                    else:
+                        type_ = 'file'
+                    if type_ != 'file' and not everything:
+                        continue
+                    try:
+                        fileobj = zfile.open(info)
+                    except RuntimeError as msg:
+                        # Encrypted members need a password
+                        logger.warning('Skipping %s: %s', info.filename, msg)
+                        continue
+                    profiling.count('stream members')
+                    with fileobj:
+                        mtime = time.mktime(info.date_time + (0, 0, -1))
+                        member = Member(info.filename.rstrip('/'), type_,
+                                        info.file_size, mode, '', mtime,
+                                        info)
+                        if type_ == 'file':
+                            yield member, fileobj
+                        else:
+                            if type_ == 'link':
+                                # The target is stored as the content
+                                member.linkname = fileobj.read().decode(
+                                    'utf-8', 'surrogateescape')
+                            yield member, None
+
+        else:
+            name = os.path.splitext(os.path.basename(filename))[0]
+            with open_compressed(filename, format_) as fileobj:
+                profiling.count('stream members')
+                # The uncompressed size is only known once it was read
+                yield Member(name, 'file', None, 0o644,
+                             mtime=os.stat(filename).st_mtime), fileobj
+
+    except StreamError:
+        raise
+    except Exception as msg:
+        # OSError, EOFError, tarfile.TarError, zipfile.BadZipFile, ...
+        raise StreamError('error reading %s: %s' % (filename, msg))
+
+#-----------------------------------------------------------------------
+#
+# Function search_stream
+#
+# Search one member.  Whole chunks are searched at once and only the
+# lines around a match are split out, as grep does.  A member with a
+# NUL byte in its first chunk is binary: a match is reported once, as
+# line None, and the rest of the member is skipped.
+#
+# Inputs
+# ------
+#    @param: fileobj - binary file object
+#    @param: regex   - compiled bytes pattern, with re.MULTILINE
+#
+# Returns
+# -------
+#    @return: generator of (lineno, line) - line as bytes, without the
+#                                           newline
+#
+# Raises
+# ------
+#    ...
+#
+#-----------------------------------------------------------------------
+def search_stream(fileobj, regex):
+    lineno = 1
+    tail = b''
+    binary = None
+
+    while True:
+        chunk = fileobj.read(CHUNK_SIZE)
+        if binary is None:
+            binary = b'\0' in chunk
+
+        if chunk:
+            data = tail + chunk
+            end = data.rfind(b'\n') + 1
+            if end == 0:
+                if len(data) < MAX_LINE:
+                    tail = data
+                    continue
+                end = len(data)
+            data, tail = data[:end], data[end:]
+        elif tail:
+            data, tail = tail, b''
+        else:
+            return
+
+        if binary:
+            if regex.search(data):
+                yield None, None
+                return
+            continue
+
+        pos = counted = 0
+        while pos < len(data):
+            match = regex.search(data, pos)
+            if match is None:
+                break
+            start = data.rfind(b'\n', 0, match.start()) + 1
+            stop = data.find(b'\n', match.start())
+            if stop < 0:
+                stop = len(data)
+            lineno += data.count(b'\n', counted, start)
+            counted = start
+            yield lineno, data[start:stop].rstrip(b'\r')
+            pos = stop + 1
+        lineno += data.count(b'\n', counted)
+
+#-----------------------------------------------------------------------
+#
+# Function search
+#
+# Search every member of an archive for a pattern.  Stops reading as
+# soon as max_count matches were found.
+#
+# Inputs
+# ------
+#    @param: filename
+#    @param: pattern       - regular expression, or a fixed string
+#    @param: format_
+#    @param: compression
+#    @param: max_count     - None, or the number of matches to stop at
+#    @param: ignore_case
+#    @param: fixed_strings - pattern is a string, not an expression
+#
+# Returns
+# -------
+#    @return: generator of (member, lineno, line) - line is a string;
+#                                                   lineno and line are
+#                                                   None for a binary
+#                                                   member
+#
+# Raises
+# ------
+#    @raises: StreamError
+#    @raises: re.error
+#
+#-----------------------------------------------------------------------
+def search(filename, pattern, format_, compression=None, max_count=None,
+           ignore_case=False, fixed_strings=False):
+    pattern = pattern.encode('utf-8', 'surrogateescape')
+    if fixed_strings:
+        pattern = re.escape(pattern)
+    flags = re.MULTILINE | (re.IGNORECASE if ignore_case else 0)
+    regex = re.compile(pattern, flags)
+
+    if max_count is not None and max_count <= 0:
+        return
+    found = 0
+    for member, fileobj in iter_members(filename, format_, compression):
+        name = member.name
+        try:
+            for lineno, line in search_stream(fileobj, regex):
+                if line is not None:
+                    line = line.decode('utf-8', 'replace')
+                yield name, lineno, line
+                found += 1
+                if found == max_count:
+                    return
+        except StreamError:
+            raise
+        except Exception as msg:
+            raise StreamError('error reading %s in %s: %s'
+                              % (name, filename, msg))
+
+#-----------------------------------------------------------------------
+#
+# Function write_matches
+#
+# Write matches from search() as grep -n would.
+#
+# Inputs
+# ------
+#    @param: matches
+#
+# Returns
+# -------
+#    @return: 0 - something matched
+#    @return: 1 - nothing matched
+#
+# Raises
+# ------
+#    @raises: StreamError
+#
+#-----------------------------------------------------------------------
+def write_matches(matches):
+    writer = output.get_writer()
+    status = 1
+    for name, lineno, line in matches:
+        if line is None:
+            writer.line('Binary file %s matches' % name)
+        else:
+            writer.line('%s:%d:%s' % (name, lineno, line))
+        status = 0
+    return status
+
+#-----------------------------------------------------------------------
+#
+# Function hash_member
+#
+# Hash a file while reading it, and set its size and digest.  With
+# keep, its content is returned as well for files up to DIFF_SIZE.
+#
+# Inputs
+# ------
+#    @param: member
+#    @param: fileobj
+#    @param: filename - of the archive, for errors
+#    @param: contents - hash the content; otherwise the file is only
+#                       read when its size is not known
+#    @param: keep     - return the content
+#
+# Returns
+# -------
+#    @return: content - bytes
+#    @return: None - not kept, or larger than DIFF_SIZE
+#
+# Raises
+# ------
+#    @raises: StreamError
+#
+#-----------------------------------------------------------------------
+def hash_member(member, fileobj, filename, contents=True, keep=False):
+    if fileobj is None or not (contents or member.size is None):
+        return None
+
+    digest = hashlib.new(HASH)
+    size = 0
+    chunks = [] if keep else None
+    try:
+        while True:
+            chunk = fileobj.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            digest.update(chunk)
+            size += len(chunk)
+            if chunks is not None:
+                if size <= DIFF_SIZE:
+                    chunks.append(chunk)
+                else:
+                    chunks = None
+    except Exception as msg:
+        raise StreamError('error reading %s in %s: %s'
+                          % (member.name, filename, msg))
+    member.size = size
+    if contents:
+        member.digest = digest.hexdigest()
+    return b''.join(chunks) if chunks is not None else None
+
+#-----------------------------------------------------------------------
+#
+# Function manifest
+#
+# Every entry of an archive with its type, size and mode, and with
+# contents, a hash of every file computed while it is read.
+#
+# Inputs
+# ------
+#    @param: filename
+#    @param: format_
+#    @param: compression
+#    @param: contents    - hash file contents
+#
+# Returns
+# -------
+#    @return: members - dict, name -> Member
+#
+# Raises
+# ------
+#    @raises: StreamError
+#
+#-----------------------------------------------------------------------
+def manifest(filename, format_, compression=None, contents=True):
+    members = {}
+    for member, fileobj in iter_members(filename, format_, compression,
+                                        everything=True):
+        members[member.name] = member
+        hash_member(member, fileobj, filename, contents)
+    return members
+
+#-----------------------------------------------------------------------
+#
+# Function read_members
+#
+# The content of some files of an archive, up to DIFF_SIZE each.  Stops
+# reading the archive once all of them were found.
+#
+# Inputs
+# ------
+#    @param: filename
+#    @param: format_
+#    @param: compression
+#    @param: names
+#
+# Returns
+# -------
+#    @return: contents - dict, name -> bytes
+#
+# Raises
+# ------
+#    @raises: StreamError
+#
+#-----------------------------------------------------------------------
+def read_members(filename, format_, compression, names):
+    names = set(names)
+    contents = {}
+    if not names:
+        return contents
+    for member, fileobj in iter_members(filename, format_, compression):
+        if member.name not in names:
+            continue
+        names.discard(member.name)
+        try:
+            content = fileobj.read(DIFF_SIZE + 1)
+        except Exception as msg:
+            raise StreamError('error reading %s in %s: %s'
+                              % (member.name, filename, msg))
+        if len(content) <= DIFF_SIZE:
+            contents[member.name] = content
+        if not names:
+            break
+    return contents
+
+#-----------------------------------------------------------------------
+#
+# Function compare_members
+#
+# Read both archives side by side and hash every entry.  A file found
+# at the same place in both is read from each in turn, its content
+# kept only until the hashes show whether it changed; only the pairs
+# that differ are kept for the diff, so memory use does not grow with
+# the files the archives share.
+#
+# Inputs
+# ------
+#    @param: sources  - two (filename, format_, compression) tuples
+#    @param: contents - hash file contents
+#
+# Returns
+# -------
+#    @return: old   - dict, name -> Member
+#    @return: new   - dict, name -> Member
+#    @return: pairs - dict, name -> (before, after) of changed files up
+#                     to DIFF_SIZE read side by side
+#
+# Raises
+# ------
+#    @raises: StreamError
+#
+#-----------------------------------------------------------------------
+def compare_members(sources, contents=True):
+    old = {}
+    new = {}
+    pairs = {}
+    for before, after in itertools.zip_longest(
+            iter_members(*sources[0], everything=True),
+            iter_members(*sources[1], everything=True)):
+        if (contents and before is not None and after is not None
+                and before[0].name == after[0].name
+                and before[1] is not None and after[1] is not None):
+            (member, fileobj), (other, otherobj) = before, after
+            old[member.name] = member
+            new[other.name] = other
+            first = hash_member(member, fileobj, sources[0][0], keep=True)
+            second = hash_member(other, otherobj, sources[1][0], keep=True)
+            if member.digest != other.digest and first is not None \
+               and second is not None:
+                pairs[member.name] = (first, second)
+            continue
+
+        if before is not None:
+            old[before[0].name] = before[0]
+            hash_member(*before, sources[0][0], contents)
+        if after is not None:
+            new[after[0].name] = after[0]
+            hash_member(*after, sources[1][0], contents)
+    return old, new, pairs
+
+#-----------------------------------------------------------------------
+#
+# Function diff
+#
+# Compare two archives by their manifests and write a summary, one
+# line per added (A), deleted (D) or modified (M) entry, followed by a
+# unified diff of every changed text file.
+#
+# Both archives are read once, side by side; see compare_members().
+# Changed files that sit at different places in the two archives are
+# read again, from each, for their diff.
+#
+# Inputs
+# ------
+#    @param: sources  - two (filename, format_, compression) tuples
+#    @param: contents - compare contents; otherwise only names, types,
+#                       sizes and modes
+#
+# Returns
+# -------
+#    @return: 0 - no differences
+#    @return: 1 - differences
+#
+# Raises
+# ------
+#    @raises: StreamError
+#
+#-----------------------------------------------------------------------
+def diff(sources, contents=True):
+    old, new, pairs = compare_members(sources, contents)
+
+    writer = output.get_writer()
+    changed = []
+    status = 0
+    for name in sorted(old.keys() | new.keys()):
+        before = old.get(name)
+        after = new.get(name)
+        if before is None:
+            writer.line('A %s' % name)
+        elif after is None:
+            writer.line('D %s' % name)
+        elif before.type != after.type:
+            writer.line('M %s (%s -> %s)' % (name, before.type, after.type))
+        elif (before.size != after.size or before.digest != after.digest
+              or before.linkname != after.linkname):
+            if before.linkname != after.linkname:
+                writer.line('M %s (-> %s, was -> %s)'
+                            % (name, after.linkname, before.linkname))
+            else:
+                writer.line('M %s (%d -> %d bytes)'
+                            % (name, before.size, after.size))
+            if contents and after.type == 'file':
+                changed.append(name)
+        elif before.mode != after.mode:
+            writer.line('M %s (mode %04o -> %04o)'
+                        % (name, before.mode, after.mode))
+        else:
+            continue
+        status = 1
+
+    if not changed:
+        return status
+
+    missing = [name for name in changed
+               if name not in pairs
+               and old[name].size <= DIFF_SIZE
+               and new[name].size <= DIFF_SIZE]
+    previous = read_members(*sources[0], names=missing)
+    current = read_members(*sources[1], names=missing)
+    for name in changed:
+        before, after = pairs.pop(name, (previous.get(name),
+                                         current.get(name)))
+        if before is None or after is None:
+            writer.line('Files a/%s and b/%s differ' % (name, name))
+            continue
+        if b'\0' in before or b'\0' in after:
+            writer.line('Binary files a/%s and b/%s differ' % (name, name))
+            continue
+        lines = difflib.unified_diff(
+            before.decode('utf-8', 'replace').splitlines(True),
+            after.decode('utf-8', 'replace').splitlines(True),
+            'a/' + name, 'b/' + name)
+        for line in lines:
+            if not line.endswith('\n'):
+                line += '\n\\ No newline at end of file\n'
+            writer.write(line)
+    return status
+
+#-----------------------------------------------------------------------
+#
+# Function read_into
+#
+# Read an archive into a queue: (member, has_content) for every entry,
+# followed, for a file, by its content in chunks and b''; END after
+# the last one, or the exception that stopped reading.  Runs in its own
+# thread and gives up when stop is set.
+#
+# Inputs
+# ------
+#    @param: source - (filename, format_, compression)
+#    @param: pipe   - queue.Queue
+#    @param: stop   - threading.Event
+#
+# Returns
+# -------
+#    @return: None
+#
+# Raises
+# ------
+#    ...
+#
+#-----------------------------------------------------------------------
+def read_into(source, pipe, stop):
+    def put(item):
+        while not stop.is_set():
+            try:
+                pipe.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    try:
+        for member, fileobj in iter_members(*source, everything=True):
+            if not put((member, fileobj is not None)):
+                return
+            if fileobj is None:
+                continue
+            while True:
+                chunk = fileobj.read(CHUNK_SIZE)
+                if not put(chunk):
+                    return
+                if not chunk:
+                    break
+        put(END)
+    except Exception as msg:
+        if not isinstance(msg, StreamError):
+            msg = StreamError('error reading %s: %s' % (source[0], msg))
+        put(msg)
+    return
+
+#-----------------------------------------------------------------------
+#
+# Function tar_info
+#
+# A TarInfo for a member; the one read when it came from a tar archive,
+# so nothing is lost between tar archives.
+#
+# Inputs
+# ------
+#    @param: member
+#
+# Returns
+# -------
+#    @return: info - tarfile.TarInfo
+#
+# Raises
+# ------
+#    ...
+#
+#-----------------------------------------------------------------------
+def tar_info(member):
+    import tarfile
+
+    if isinstance(member.info, tarfile.TarInfo):
+        return member.info
+
+    types = {
+        'file': tarfile.REGTYPE,
+        'dir': tarfile.DIRTYPE,
+        'link': tarfile.SYMTYPE,
+        'hardlink': tarfile.LNKTYPE,
+    }
+    info = tarfile.TarInfo(member.name)
+    info.type = types.get(member.type, tarfile.REGTYPE)
+    info.size = member.size if member.type == 'file' else 0
+    info.mode = member.mode
+    info.mtime = member.mtime
+    info.linkname = member.linkname
+    return info
+
+#-----------------------------------------------------------------------
+#
+# Function zip_info
+#
+# A ZipInfo for a member, keeping its mode and time.
+#
+# Inputs
+# ------
+#    @param: member
+#
+# Returns
+# -------
+#    @return: info - zipfile.ZipInfo
+#
+# Raises
+# ------
+#    ...
+#
+#-----------------------------------------------------------------------
+def zip_info(member):
+    import zipfile
+
+    types = {
+        'file': stat.S_IFREG,
+        'dir': stat.S_IFDIR,
+        'link': stat.S_IFLNK,
+    }
+    name = member.name + '/' if member.type == 'dir' else member.name
+    # Zip cannot store times before 1980
+    date_time = time.localtime(max(member.mtime, 315532800))[:6]
+    info = zipfile.ZipInfo(name, date_time)
+    info.external_attr = (types[member.type] | member.mode) << 16
+    if member.type == 'dir':
+        info.external_attr |= 0x10
+    else:
+        info.compress_type = zipfile.ZIP_DEFLATED
+    return info
+
+#-----------------------------------------------------------------------
+#
+# Function repack
+#
+# Copy every entry of one archive into a new one of another format,
+# member by member, keeping names, modes, times and links.  A reader
+# thread decompresses the source while this thread compresses the
+# target; they pass chunks through a small queue, so memory use is
+# bounded and nothing is extracted.  The target is written under a
+# temporary name next to it and renamed when complete.
+#
+# Inputs
+# ------
+#    @param: source - (filename, format_, compression)
+#    @param: target - (filename, format_, compression)
+#    @param: level  - None, or the compression level 0-9
+#
+# Returns
+# -------
+#    @return: None
+#
+# Raises
+# ------
+#    @raises: StreamError
+#
+#-----------------------------------------------------------------------
+def repack(source, target, level=None):
+    for name, format_, compression in (source, target):
+        if not supported(format_, compression):
+            raise StreamError("cannot stream %s archive `%s'"
+                              % (format_, name))
+    filename, format_, compression = target
+    if (format_ in ('tar', 'zip')) != (source[1] in ('tar', 'zip')):
+        raise StreamError('cannot repack %s to %s: only archives can be '
+                          'repacked to archives and compressed files to '
+                          'compressed files' % (source[0], filename))
+
+    pipe = queue.Queue(QUEUE_SIZE)
+    stop = threading.Event()
+    reader = threading.Thread(target=read_into,
+                              args=(source, pipe, stop),
+                              name='repack reader',
+                              daemon=True)
+    temp = os.path.join(os.path.dirname(os.path.abspath(filename)),
+                        '.%s.%d.tmp' % (os.path.basename(filename),
+                                        os.getpid()))
+    reader.start()
+    try:
+        if format_ == 'tar':
+            import tarfile
+            with open_compressed(temp, compression, 'wb', level) as fileobj, \
+                 tarfile.open(fileobj=fileobj, mode='w|',
+                              format=tarfile.PAX_FORMAT) as tar:
+                for member, content in iter_queue(pipe):
+                    tar.addfile(tar_info(member), content)
+                    if content is not None:
+                        content.drain()
+
+        elif format_ == 'zip':
+            import zipfile
+            with zipfile.ZipFile(temp, 'w', zipfile.ZIP_DEFLATED) as zfile:
+                for member, content in iter_queue(pipe):
+                    if member.type not in ('file', 'dir', 'link'):
+                        logger.warning('Skipping %s: zip cannot store a %s',
+                                       member.name, member.type)
+                    elif member.type == 'link':
+                        zfile.writestr(zip_info(member), member.linkname)
+                    elif content is None:
+                        zfile.writestr(zip_info(member), b'')
+                    else:
+                        large = (member.size or 0) > zipfile.ZIP64_LIMIT
+                        with zfile.open(zip_info(member), 'w',
+                                        force_zip64=large) as fileobj:
+                            while True:
+                                chunk = content.next_chunk()
+                                if not chunk:
+                                    break
+                                fileobj.write(chunk)
+                    if content is not None:
+                        content.drain()
+
+        else:
+            with open_compressed(temp, format_, 'wb', level) as fileobj:
+                for member, content in iter_queue(pipe):
+                    while True:
+                        chunk = content.next_chunk()
+                        if not chunk:
+                            break
+                        fileobj.write(chunk)
+
+        os.replace(temp, filename)
+    except BaseException as msg:
+        stop.set()
+        try:
+            os.remove(temp)
+        except OSError:
+            pass
+        if isinstance(msg, Exception) and not isinstance(msg, StreamError):
+            raise StreamError('error writing %s: %s' % (filename, msg))
+        raise
+    finally:
+        stop.set()
+        reader.join()
+    return
+
+#-----------------------------------------------------------------------
+#
+# Function iter_queue
+#
+# The members sent by read_into().
+#
+# Inputs
+# ------
+#    @param: pipe
+#
+# Returns
+# -------
+#    @return: generator of (member, content) - content is a QueueReader,
+#                                              or None for anything but
+#                                              a file
+#
+# Raises
+# ------
+#    @raises: StreamError - sent by the reader
+#
+#-----------------------------------------------------------------------
+def iter_queue(pipe):
+    while True:
+        item = pipe.get()
+        if item is END:
+            return
+        if isinstance(item, Exception):
+            raise item
+        member, has_content = item
+        yield member, QueueReader(pipe) if has_content else None
@@ -0,0 +1,684 @@
+#! /usr/bin/env python3
+#-----------------------------------------------------------------------
+#
+# Original BASH version
+# Original version Copyright 2001 by Kyle Sallee
+# Additions/corrections Copyright 2002 by the Source Mage Team
+#
+# Python rewrite
+# Copyright 2017 Geoff S Derber
+#
+# File: pysorcery/lib/files/tarindex.py
+#
+# This file is part of Sorcery.
+#
+#    Sorcery is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published
+#    by the Free Software Foundation, either version 3 of the License,
+#    or (at your option) any later version.
+#
+#    Sorcery is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with Sorcery.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Tar Index:
+#
+#    Read one file out of a compressed tar archive without
+#    decompressing everything before it.  A sidecar index,
+#    foo.tar.xz.idx next to foo.tar.xz, records where each file's data
+#    starts in the uncompressed tar, and checkpoints: places in the
+#    compressed file decompression can start from, with the
+#    uncompressed offset they start at.
+#
+#    - xz: every block (xz -T, pixz, parallel.BlockWriter);
+#    - bzip2: every block, found by its bit aligned magic and
+#      decompressed as a stream of its own;
+#    - gzip: every member (parallel.BlockWriter, cat a.gz b.gz).
+#
+#    A file is read by decompressing from the last checkpoint before
+#    it until its end.  Python's zlib can not stop or restart inflating
+#    inside a member, so a gzip file of one member, like an xz file of
+#    one block, has one checkpoint: the start.
+#
+#    The index is JSON, stamped with the archive's size and mtime, and
+#    built by a full read of the archive, on demand.  When the archive's
+#    directory is not writable it is kept in the cache directory.
+#
+#        tarindex.build_index('foo.tar.xz', 'xz')
+#        data = tarindex.read_member('foo.tar.xz', 'xz', 'foo/README')
+#
+#-----------------------------------------------------------------------
+"""
+Tar Index:
+
+Read one file out of a compressed tar archive without decompressing
+everything before it, using a sidecar index of where each file starts
+and where decompression can start: xz blocks, bzip2 blocks and gzip
+members.
+"""
+#-----------------------------------------------------------------------
+#
+# Libraries
+#
+#-----------------------------------------------------------------------
+# System Libraries
+import bisect
+import hashlib
+import json
+import mmap
+import os
+import tarfile
+import tempfile
+import zlib
+
+# 3rd Party Libraries
+
+
+# Application Libraries
+# System Library Overrides
+from pysorcery.lib.system import logging
+# Other Application Libraries
+from pysorcery.lib.files import parallel
+from pysorcery.lib.files import stream
+from pysorcery.lib.util import cache
+from pysorcery.lib.util import profiling
+
+# Conditional Libraries
+
+
+#-----------------------------------------------------------------------
+#
+# Global Variables
+#
+#-----------------------------------------------------------------------
+# Enable Logging
+# create logger
+logger = logging.getLogger(__name__)
+
+INDEX_VERSION = 1
+
+# Sidecar index of foo.tar.gz: foo.tar.gz.idx
+INDEX_SUFFIX = '.idx'
+
+# Where indexes of archives in read-only directories are kept
+INDEX_DIR = os.path.join(cache.CACHE_DIR, 'tar-index')
+
+# Compressed bytes decompressed at a time
+CHUNK_SIZE = 1024 * 1024
+
+# Magic numbers starting a bzip2 block and ending a bzip2 stream; both
+# are bit aligned
+BZ2_BLOCK_MAGIC = 0x314159265359
+BZ2_EOS_MAGIC = 0x177245385090
+
+#-----------------------------------------------------------------------
+#
+# Classes
+#
+# PieceReader
+#
+#-----------------------------------------------------------------------
+
+#-----------------------------------------------------------------------
+#
+# Class PieceReader
+#
+# A read-only file object over iter_pieces(), recording each
+# checkpoint with the uncompressed offset it starts at.
+#
+# Inputs
+# ------
+#    @param: pieces - from iter_pieces()
+#
+# Returns
+# -------
+#    @return: None
+#
+# Raises
+# ------
+#    ...
+#
+#-----------------------------------------------------------------------
+class PieceReader():
+    def __init__(self, pieces):
+        self.pieces = pieces
+        self.buffer = b''
+        self.offset = 0
+        self.position = 0
+        self.checkpoints = []
+        return
+
+    #-------------------------------------------------------------------
+    #
+    # Function read
+    #
+    # Inputs
+    # ------
+    #    @param: self
+    #    @param: size
+    #
+    # Returns
+    # -------
+    #    @return: data - at most size bytes; b'' at the end
+    #
+    # Raises
+    # ------
+    #    @raises: OSError, EOFError - bad data
+    #
+    #-------------------------------------------------------------------
+    def read(self, size=-1):
+        chunks = []
+        while size != 0:
+            if self.offset >= len(self.buffer):
+                piece = next(self.pieces, None)
+                if piece is None:
+                    break
+                checkpoint, self.buffer = piece
+                self.offset = 0
+                if checkpoint is not None:
+                    self.checkpoints.append([self.position] + checkpoint)
+                continue
+            left = len(self.buffer) - self.offset
+            length = left if size < 0 else min(size, left)
+            chunks.append(self.buffer[self.offset:self.offset + length])
+            self.offset += length
+            self.position += length
+            if size > 0:
+                size -= length
+        return b''.join(chunks)
+
+#-----------------------------------------------------------------------
+#
+# Functions
+#
+# index_paths
+# load_index
+# save_index
+# find_bits
+# read_bits
+# bz2_blocks
+# decompress_bz2_block
+# iter_pieces
+# build_index
+# read_member
+#
+#-----------------------------------------------------------------------
+
+#-----------------------------------------------------------------------
+#
+# Function index_paths
+#
+# Inputs
+# ------
+#    @param: filename - the archive
+#
+# Returns
+# -------
+#    @return: paths - the sidecar index, and the one in INDEX_DIR
+#
+# Raises
+# ------
+#    ...
+#
+#-----------------------------------------------------------------------
+def index_paths(filename):
+    filename = os.path.abspath(filename)
+    digest = hashlib.sha1(filename.encode('utf-8', 'surrogateescape'))
+    return (filename + INDEX_SUFFIX,
+            os.path.join(INDEX_DIR, digest.hexdigest() + INDEX_SUFFIX))
+
+#-----------------------------------------------------------------------
+#
+# Function load_index
+#
+# Inputs
+# ------
+#    @param: filename - the archive
+#
+# Returns
+# -------
+#    @return: index - dict; None when there is none, or it is stale
+#
+# Raises
+# ------
+#    ...
+#
+#-----------------------------------------------------------------------
+def load_index(filename):
+    try:
+        st = os.stat(filename)
+    except OSError:
+        return None
+
+    for path in index_paths(filename):
+        try:
+            with open(path, encoding='utf-8') as file_:
+                index = json.load(file_)
+        except (OSError, ValueError):
+            continue
+        if isinstance(index, dict) \
+           and index.get('version') == INDEX_VERSION \
+           and index.get('stamp') == [st.st_size, st.st_mtime_ns]:
+            profiling.count('tar index hits')
+            return index
+    return None
+
+#-----------------------------------------------------------------------
+#
+# Function save_index
+#
+# Write the sidecar index, or the one in INDEX_DIR when the archive's
+# directory is not writable.  Written to a temporary file and renamed
+# into place, so readers never see a partial index.
+#
+# Inputs
+# ------
+#    @param: filename - the archive
+#    @param: index
+#
+# Returns
+# -------
+#    @return: path - where it was written; None when it could not be
+#
+# Raises
+# ------
+#    ...
+#
+#-----------------------------------------------------------------------
+def save_index(filename, index):
+    for path in index_paths(filename):
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, temp = tempfile.mkstemp(dir=os.path.dirname(path),
+                                        prefix='.tar-index-')
+            with os.fdopen(fd, 'w', encoding='utf-8') as file_:
+                json.dump(index, file_, separators=(',', ':'))
+            os.replace(temp, path)
+            return path
+        except OSError as msg:
+            logger.debug('Cannot write index %s: %s', path, msg)
+    return None
+
+#-----------------------------------------------------------------------
+#
+# Function find_bits
+#
+# Find a 48 bit magic number at any bit offset.  For each of the 8
+# offsets within a byte, the 5 bytes the magic number fully covers are
+# searched for, then the whole number checked.
+#
+# Inputs
+# ------
+#    @param: view  - the whole file
+#    @param: magic
+#
+# Returns
+# -------
+#    @return: offsets - list of bit offsets
+#
+# Raises
+# ------
+#    ...
+#
+#-----------------------------------------------------------------------
+def find_bits(view, magic):
+    offsets = []
+    for shift in range(8):
+        pattern = (magic << (8 - shift)).to_bytes(7, 'big')[1:6]
+        found = view.find(pattern)
+        while found >= 0:
+            start = found - 1
+            window = view[max(start, 0):start + 7]
+            if start >= 0 and len(window) == 7 \
+               and (int.from_bytes(window, 'big') >> (8 - shift)) \
+               & ((1 << 48) - 1) == magic:
+                offsets.append(start * 8 + shift)
+            elif start < 0 and shift == 0 \
+                 and int.from_bytes(view[:6], 'big') == magic:
+                offsets.append(0)
+            found = view.find(pattern, found + 1)
+    offsets.sort()
+    return offsets
+
+#-----------------------------------------------------------------------
+#
+# Function read_bits
+#
+# Inputs
+# ------
+#    @param: view
+#    @param: start - bit offset
+#    @param: end   - bit offset
+#
+# Returns
+# -------
+#    @return: value - the bits as an integer
+#
+# Raises
+# ------
+#    ...
+#
+#-----------------------------------------------------------------------
+def read_bits(view, start, end):
+    first = start // 8
+    last = (end + 7) // 8
+    value = int.from_bytes(view[first:last], 'big')
+    value >>= last * 8 - end
+    return value & ((1 << (end - start)) - 1)
+
+#-----------------------------------------------------------------------
+#
+# Function bz2_blocks
+#
+# List the blocks of a bzip2 file, stream after stream.
+#
+# Inputs
+# ------
+#    @param: view - the whole file
+#
+# Returns
+# -------
+#    @return: blocks - list of [start bit, end bit, level]; None when
+#                      the file is not a well formed bzip2 file
+#
+# Raises
+# ------
+#    ...
+#
+#-----------------------------------------------------------------------
+def bz2_blocks(view):
+    magics = sorted([(offset, 'block')
+                     for offset in find_bits(view, BZ2_BLOCK_MAGIC)]
+                    + [(offset, 'end')
+                       for offset in find_bits(view, BZ2_EOS_MAGIC)])
+    blocks = []
+    stream_start = 0
+    start = None
+    level = None
+    for offset, kind in magics:
+        if level is None:
+            # a stream header must come first
+            header = view[stream_start:stream_start + 4]
+            if header[:3] != b'BZh' or header[3:] not in b'123456789' \
+               or offset != (stream_start + 4) * 8:
+                return None
+            level = header[3:].decode('ascii')
+        if start is not None:
+            blocks.append([start, offset, level])
+        start = offset if kind == 'block' else None
+        if kind == 'end':
+            # the stream CRC follows, then padding to a byte
+            stream_start = (offset + 48 + 32 + 7) // 8
+            level = None
+            while stream_start < len(view) and view[stream_start] == 0:
+                stream_start += 1
+            if stream_start >= len(view):
+                break
+    if start is not None or level is not None or not blocks:
+        return None
+    return blocks
+
+#-----------------------------------------------------------------------
+#
+# Function decompress_bz2_block
+#
+# Decompress one bzip2 block by wrapping it in a stream of its own: a
+# header, the block shifted to a byte boundary, and an end of stream
+# whose CRC, for one block, is the block's.
+#
+# Inputs
+# ------
+#    @param: view  - the whole file
+#    @param: block - from bz2_blocks()
+#
+# Returns
+# -------
+#    @return: data
+#
+# Raises
+# ------
+#    @raises: OSError - bad data
+#
+#-----------------------------------------------------------------------
+def decompress_bz2_block(view, block):
+    import bz2
+    start, end, level = block
+    bits = end - start
+    value = read_bits(view, start, end)
+    crc = (value >> (bits - 80)) & 0xffffffff
+    value = (((value << 48) | BZ2_EOS_MAGIC) << 32) | crc
+    bits += 80
+    padding = -bits % 8
+    data = (b'BZh' + level.encode('ascii')
+            + (value << padding).to_bytes((bits + padding) // 8, 'big'))
+    return bz2.decompress(data)
+
+#-----------------------------------------------------------------------
+#
+# Function iter_pieces
+#
+# Decompress a file piece by piece, from the start or from a list of
+# checkpoints.  A checkpoint is a list:
+#
+# - []: the start of a file read as one piece
+# - [offset]: a gzip member
+# - [offset, unpadded size, uncompressed size, stream header]: an xz
+#   block
+# - [start bit, end bit, level]: a bzip2 block
+#
+# Inputs
+# ------
+#    @param: view        - the whole file
+#    @param: filename
+#    @param: compression
+#    @param: checkpoints - None to start at the start, listing the
+#                          checkpoints found
+#    @param: independent - False to read the file as one piece
+#
+# Returns
+# -------
+#    @return: generator of (checkpoint, data) - checkpoint is None but
+#                                               where a piece starts
+#
+# Raises
+# ------
+#    @raises: StreamError, OSError, EOFError, lzma.LZMAError
+#
+#-----------------------------------------------------------------------
+def iter_pieces(view, filename, compression, checkpoints=None,
+                independent=True):
+    if checkpoints is None and independent:
+        if compression == 'xz':
+            blocks = parallel.xz_blocks(view)
+            if blocks and len(blocks) > 1 \
+               and max(block[2] for block in blocks) <= parallel.MAX_PIECE:
+                checkpoints = [[offset, unpadded, uncompressed, header.hex()]
+                               for offset, unpadded, uncompressed, header
+                               in blocks]
+        elif compression == 'bzip2':
+            checkpoints = bz2_blocks(view)
+
+    if compression == 'gzip' and independent \
+       and (checkpoints is None or checkpoints[0]):
+        position = checkpoints[0][0] if checkpoints else 0
+        while position < len(view):
+            yield [position], b''
+            decompressor = zlib.decompressobj(zlib.MAX_WBITS | 16)
+            while not decompressor.eof:
+                if position >= len(view):
+                    raise EOFError('compressed file ended before the '
+                                   'end-of-stream marker was reached')
+                chunk = view[position:position + CHUNK_SIZE]
+                position += len(chunk)
+                yield None, decompressor.decompress(chunk)
+            position -= len(decompressor.unused_data)
+            while position < len(view) and view[position] == 0:
+                position += 1
+            if not parallel.MemberSignatures['gzip'].match(view, position):
+                break
+
+    elif compression == 'xz' and checkpoints and checkpoints[0]:
+        for checkpoint in checkpoints:
+            offset, unpadded, uncompressed, header = checkpoint
+            yield checkpoint, parallel.decompress_xz_block(
+                view, (offset, unpadded, uncompressed, bytes.fromhex(header)))
+
+    elif compression == 'bzip2' and checkpoints and checkpoints[0]:
+        for checkpoint in checkpoints:
+            yield checkpoint, decompress_bz2_block(view, checkpoint)
+
+    else:
+        yield [], b''
+        with stream.open_compressed(filename, compression) as fileobj:
+            data = fileobj.read(CHUNK_SIZE)
+            while data:
+                yield None, data
+                data = fileobj.read(CHUNK_SIZE)
+    return
+
+#-----------------------------------------------------------------------
+#
+# Function build_index
+#
+# Read the whole archive once, recording where each file's data starts
+# and the checkpoints decompression went through, and save the index.
+# When the pieces turn out not to decompress on their own (a bzip2
+# magic number inside compressed data), the file is read as one piece.
+#
+# Inputs
+# ------
+#    @param: filename
+#    @param: compression - None, or a key of stream.Decompressors
+#
+# Returns
+# -------
+#    @return: index - dict
+#
+# Raises
+# ------
+#    @raises: StreamError
+#
+#-----------------------------------------------------------------------
+def build_index(filename, compression):
+    if not stream.supported('tar', compression):
+        raise stream.StreamError("cannot index `%s' compressed archive `%s'"
+                                 % (compression, filename))
+
+    st = os.stat(filename)
+    if st.st_size == 0:
+        raise stream.StreamError("`%s' is empty" % filename)
+    members = {}
+    checkpoints = []
+    with profiling.span('tar index build'), \
+         open(filename, 'rb') as source:
+        if compression is None:
+            reader = source
+        else:
+            view = mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ)
+        for independent in (True, False):
+            if compression is not None:
+                reader = PieceReader(iter_pieces(view, filename, compression,
+                                                 independent=independent))
+            try:
+                with tarfile.open(fileobj=reader, mode='r|') as tar:
+                    for info in tar:
+                        if info.isreg():
+                            members[info.name] = [info.offset_data, info.size]
+                break
+            except (OSError, EOFError, tarfile.TarError) as msg:
+                if compression is None or not independent:
+                    raise stream.StreamError("error indexing `%s': %s"
+                                             % (filename, msg))
+                logger.debug('Reading %s as one piece: %s', filename, msg)
+                members = {}
+        if compression is not None:
+            checkpoints = reader.checkpoints
+            view.close()
+
+    index = {
+        'version': INDEX_VERSION,
+        'stamp': [st.st_size, st.st_mtime_ns],
+        'compression': compression,
+        'checkpoints': checkpoints,
+        'members': members,
+    }
+    path = save_index(filename, index)
+    logger.debug('Indexed %d files at %d checkpoints of %s in %s',
+                 len(members), len(checkpoints), filename, path)
+    return index
+
+#-----------------------------------------------------------------------
+#
+# Function read_member
+#
+# The content of one file of a tar archive.  With an index, only the
+# pieces holding it are decompressed; without, the archive is read
+# until the file, unless build asks for the index to be built first.
+#
+# Inputs
+# ------
+#    @param: filename
+#    @param: compression - None, or a key of stream.Decompressors
+#    @param: name        - the file in the archive
+#    @param: build       - build the index when there is none
+#
+# Returns
+# -------
+#    @return: data - bytes
+#
+# Raises
+# ------
+#    @raises: KeyError    - no such file in the archive
+#    @raises: StreamError
+#
+#-----------------------------------------------------------------------
+def read_member(filename, compression, name, build=False):
+    index = load_index(filename)
+    if index is None and build:
+        index = build_index(filename, compression)
+
+    if index is None:
+        for member, fileobj in stream.iter_members(filename, 'tar',
+                                                   compression):
+            if member.name == name:
+                return fileobj.read()
+        raise KeyError("no file `%s' in %s" % (name, filename))
+
+    if name not in index['members']:
+        raise KeyError("no file `%s' in %s" % (name, filename))
+    offset, size = index['members'][name]
+    end = offset + size
+    if size == 0:
+        return b''
+
+    with open(filename, 'rb') as source:
+        if compression is None:
+            source.seek(offset)
+            return source.read(size)
+
+        checkpoints = index['checkpoints']
+        first = bisect.bisect_right([checkpoint[0]
+                                     for checkpoint in checkpoints],
+                                    offset) - 1
+        position = checkpoints[first][0]
+        data = []
+        with mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ) as view:
+            profiling.count('tar index reads')
+            for checkpoint, chunk in iter_pieces(
+                    view, filename, compression,
+                    [checkpoint[1:] for checkpoint in checkpoints[first:]]):
+                if position + len(chunk) > offset:
+                    data.append(chunk[max(offset - position, 0):
+                                      end - position])
+                position += len(chunk)
+                if position >= end:
+                    break
+    data = b''.join(data)
+    if len(data) != size:
+        raise stream.StreamError("`%s' in %s is cut short"
+                                 % (name, filename))
+    return data
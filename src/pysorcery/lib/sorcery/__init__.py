@@ -41,7 +41,10 @@ Library for sorcery works with the package manager's packages.
 #
 #-----------------------------------------------------------------------
 # System Libraries
-
+from concurrent import futures
+import os
+import subprocess
+import threading
 
 # 3rd Party Libraries
 
@@ -52,6 +55,7 @@ from pysorcery.lib.system import logging
 # Other Application Libraries
 from pysorcery.lib import util
 from pysorcery.lib.util import config
+from pysorcery.lib.util import profiling
 
 # Conditional Libraries
 
@@ -149,7 +153,7 @@ Programs = {
         'packages': {
             'get_installed': ('apt',),
             'get_queue': ('py_apt',),
-            'get_orphans': ('deborphan',),
+            'get_orphans': ('py_dpkg', 'deborphan'),
         },
         'section': {
             'get_maintainer': ('py_apt',),
@@ -166,6 +170,16 @@ Programs = {
     }
 }
 
+# Resolved backend functions, keyed on (pkg_mgr, class_, command).
+# Each entry is (func, path_dependent); entries found by searching PATH
+# are dropped when PATH changes.
+Dispatch = {}
+dispatch_path = None
+dispatch_lock = threading.Lock()
+
+# Default number of backend calls map_packages() runs at once
+JOBS = os.cpu_count() or 1
+
 #-----------------------------------------------------------------------
 #
 # Classes
@@ -173,11 +187,83 @@ Programs = {
 # Warning: Do not call this classes directly.  The program will
 # crash.
 #
+# PackageError
 # BasePackage
 # BasePackages
 #
 #-----------------------------------------------------------------------
 
+#-----------------------------------------------------------------------
+#
+# Class PackageError
+#
+# A backend failed for one package.  The external tool's exit status
+# and output are kept so callers can report them per package.
+#
+# Inputs
+# ------
+#    @param: name       - The package the backend was called for
+#    @param: message
+#    @param: returncode - Exit status of the external tool, if any
+#    @param: output     - Output of the external tool, if any
+#
+# Returns
+# -------
+#    @return: None
+#
+# Raises
+# ------
+#    ...
+#
+#-----------------------------------------------------------------------
+class PackageError(Exception):
+    def __init__(self, name, message, returncode=None, output=None):
+        super(PackageError, self).__init__(name, message)
+        self.name = name
+        self.message = message
+        self.returncode = returncode
+        self.output = output
+        return
+
+    def __str__(self):
+        return '%s: %s' % (self.name, self.message)
+
+    #-------------------------------------------------------------------
+    #
+    # Function from_called_process
+    #
+    # Build a PackageError from a failed subprocess call.
+    #
+    # Inputs
+    # ------
+    #    @param: cls
+    #    @param: name
+    #    @param: error - subprocess.CalledProcessError
+    #
+    # Returns
+    # -------
+    #    @return: PackageError
+    #
+    # Raises
+    # ------
+    #    ...
+    #
+    #-------------------------------------------------------------------
+    @classmethod
+    def from_called_process(cls, name, error):
+        output = ''
+        for stream in (error.output, error.stderr):
+            if isinstance(stream, bytes):
+                stream = stream.decode(errors='replace')
+            if stream:
+                output += stream
+        output = output.strip()
+
+        message = output.splitlines()[-1] if output else \
+                  '%s exited with status %s' % (error.cmd[0],
+                                                error.returncode)
+        return cls(name, message, error.returncode, output)
+
 #-----------------------------------------------------------------------
 #
 # Class BasePackage
@@ -233,11 +319,9 @@ class BasePackage:
     #
     #-------------------------------------------------------------------
     def get_info(self, info):
-        program = find_program(self.pkg_mgr, self.program, info)
-        func = util.get_module_func(scmd=self.scmd,
-                                    program=program,
-                                    cmd=info)
-        info = func(self.name, repository=self.repository)
+        func = get_backend(self.pkg_mgr, self.scmd, self.program, info)
+        with profiling.span('backend', info):
+            info = func(self.name, repository=self.repository)
         return info
 
     #-------------------------------------------------------------------
@@ -514,14 +598,12 @@ class BasePackage:
         else:
             extension = None
 
-        program = find_program(self.pkg_mgr, self.program, 'get_log')
-        func = util.get_module_func(scmd=self.scmd,
-                                    program=program,
-                                    cmd='get_log')
-        content = func(self.name,
-                       log=log,
-                       version=self.version,
-                       extension=extension)
+        func = get_backend(self.pkg_mgr, self.scmd, self.program, 'get_log')
+        with profiling.span('backend', 'get_log'):
+            content = func(self.name,
+                           log=log,
+                           version=self.version,
+                           extension=extension)
         return content
 
     #-------------------------------------------------------------------
@@ -637,10 +719,7 @@ class BasePackage:
     #
     #-------------------------------------------------------------------
     def install(self,args):
-        program = find_package_program(self.pkg_mgr, self.program, 'install')
-        func = util.get_module_func(scmd=self.scmd,
-                                    program=self.program,
-                                    cmd='install')
+        func = get_backend(self.pkg_mgr, self.scmd, self.program, 'install')
         func(args)
         return
 
@@ -712,11 +791,9 @@ class BasePackages:
     #
     #-------------------------------------------------------------------
     def get_info(self, info, which_info=None):
-        program = find_program(self.pkg_mgr, self.program, info)
-        func = util.get_module_func(scmd=self.scmd,
-                                    program=program,
-                                    cmd=info)
-        info = func(which_info)
+        func = get_backend(self.pkg_mgr, self.scmd, self.program, info)
+        with profiling.span('backend', info):
+            info = func(which_info)
         return info
 
     #-------------------------------------------------------------------
@@ -789,11 +866,9 @@ class BasePackages:
     #
     #-------------------------------------------------------------------
     def get_orphans(self):
-        program = find_program(self.pkg_mgr, self.program, 'get_orphans')
-        func = util.get_module_func(scmd=self.scmd,
-                                    program=program,
-                                    cmd='get_orphans')
-        self.packages = func()
+        func = get_backend(self.pkg_mgr, self.scmd, self.program, 'get_orphans')
+        with profiling.span('backend', 'get_orphans'):
+            self.packages = func()
         return self.packages
 
 #-----------------------------------------------------------------------
@@ -944,11 +1019,9 @@ class BaseRepository():
     #
     #-------------------------------------------------------------------
     def get_info(self, info):
-        program = find_program(self.program, info)
-        func = util.get_module_func(scmd=self.scmd,
-                                    program=program,
-                                    cmd=info)
-        info = func(self.name, self.repositories)
+        func = get_backend(self.pkg_mgr, self.scmd, self.program, info)
+        with profiling.span('backend', info):
+            info = func(self.name, self.repositories)
         return info
 
     #-------------------------------------------------------------------
@@ -1008,8 +1081,105 @@ class BaseRepositories():
 #
 # Functions
 #
+# get_package_info
+# map_packages
+# get_repository
+# get_repositories
+# get_backend
+# get_programs
+# find_program
+#
+#-----------------------------------------------------------------------
+
+#-----------------------------------------------------------------------
+#
+# Function get_package_info
+#
+# Call one of a package's get_* methods, turning a failed external
+# tool into a PackageError for that package.
+#
+# Inputs
+# ------
+#    @param: package - A BasePackage
+#    @param: info    - Method name, for example 'get_size'
+#
+# Returns
+# -------
+#    @return: result
+#
+# Raises
+# ------
+#    @raises: PackageError
+#
+#-----------------------------------------------------------------------
+def get_package_info(package, info):
+    try:
+        return getattr(package, info)()
+    except subprocess.CalledProcessError as error:
+        raise PackageError.from_called_process(package.name, error)
+    except OSError as error:
+        raise PackageError(package.name, str(error))
+
+#-----------------------------------------------------------------------
+#
+# Function map_packages
+#
+# Run the same query for many packages on a bounded pool of worker
+# threads.  Backends spend their time waiting on external tools
+# (gaze, apt-cache, dpkg), so threads are enough to overlap them.
+#
+# Results are yielded in the order of packages, as soon as each one
+# and every package before it has finished.  A failing package does
+# not stop the others; its error is yielded in place of a result.
+#
+#    for spell, size, error in sorcery.map_packages(spells, 'get_size'):
+#        ...
+#
+# Inputs
+# ------
+#    @param: packages - List of BasePackage
+#    @param: info     - Method name, for example 'get_size'
+#    @param: jobs     - Maximum concurrent calls, defaults to JOBS
+#
+# Returns
+# -------
+#    @return: (package, result, error) - generator; one of result and
+#                                        error is None
+#
+# Raises
+# ------
+#    ...
 #
 #-----------------------------------------------------------------------
+def map_packages(packages, info, jobs=None):
+    packages = list(packages)
+    if not packages:
+        return
+
+    jobs = min(jobs or JOBS, len(packages))
+    logger.debug2('Running %s for %d packages, %d at a time',
+                  info, len(packages), jobs)
+
+    if jobs == 1:
+        for package in packages:
+            try:
+                yield package, get_package_info(package, info), None
+            except PackageError as error:
+                yield package, None, error
+        return
+
+    with futures.ThreadPoolExecutor(max_workers=jobs) as pool:
+        pending = [pool.submit(get_package_info, package, info)
+                   for package in packages]
+        try:
+            for package, future in zip(packages, pending):
+                try:
+                    yield package, future.result(), None
+                except PackageError as error:
+                    yield package, None, error
+        finally:
+            for future in pending:
+                future.cancel()
 
 #-----------------------------------------------------------------------
 #
@@ -1031,11 +1201,7 @@ class BaseRepositories():
 #
 #-----------------------------------------------------------------------
 def get_repository(pkg_mgr, scmd, cmd, name=None, repo_dir=None):
-    program = find_program(pkg_mgr, 'repository', cmd)    
-    func = util.get_module_func(scmd=scmd,
-                                program=program,
-                                cmd=cmd
-    )
+    func = get_backend(pkg_mgr, scmd, 'repository', cmd)
     name, directory = func(name, repo_dir)
     return name, directory
 
@@ -1063,38 +1229,99 @@ def get_repository(pkg_mgr, scmd, cmd, name=None, repo_dir=None):
 #
 #-----------------------------------------------------------------------
 def get_repositories(pkg_mgr, scmd, program, cmd, *args, **kwargs):
-    program = find_program(pkg_mgr, program, cmd)
-    func = util.get_module_func(scmd=scmd,
-                                program=program,
-                                cmd=cmd)
+    func = get_backend(pkg_mgr, scmd, program, cmd)
     codex, directories = func()
     return codex, directories
 
 #-----------------------------------------------------------------------
 #
-# Function find_program
+# Function get_backend
 #
-# ...
+# Get the backend function for a package manager, class and command.
+#
+# The first call for each (pkg_mgr, class_, command) resolves the
+# program and imports its module, later calls are a dictionary lookup.
+# Entries for external programs depend on PATH, so they are resolved
+# again when PATH changes.  So are Python modules chosen because an
+# external program ahead of them was not found.
 #
 # Inputs
 # ------
 #    @param: pkg_mgr
+#    @param: scmd
 #    @param: class_
 #    @param: command
-#    @param: program
 #
 # Returns
 # -------
-#    @return: program
-#    @return: exe
+#    @return: func
 #
 # Raises
 # ------
-#    ...
+#    @raises: Exception      - the command is not supported
+#    @raises: ImportError
+#    @raises: AttributeError
 #
 #-----------------------------------------------------------------------
-def find_program(pkg_mgr, class_, command, program=None):
-    """Find suitable archive program for given format and mode."""
+def get_backend(pkg_mgr, scmd, class_, command):
+    global dispatch_path
+
+    path = util.system_search_path()
+    if path != dispatch_path:
+        with dispatch_lock:
+            for key in [key for key, value in Dispatch.items() if value[1]]:
+                del Dispatch[key]
+            dispatch_path = path
+
+    key = (pkg_mgr, class_, command)
+    try:
+        return Dispatch[key][0]
+    except KeyError:
+        pass
+
+    program = find_program(pkg_mgr, class_, command)
+    if program is None:
+        raise Exception("No program found for %s %s `%s'"
+                        % (pkg_mgr, class_, command))
+
+    if program.startswith('py_'):
+        programs = get_programs(pkg_mgr, class_, command)
+        skipped = programs[:programs.index(program)]
+        path_dependent = any(not name.startswith('py_') for name in skipped)
+    else:
+        path_dependent = True
+
+    func = util.get_module_func(scmd=scmd,
+                                program=program,
+                                cmd=command)
+    with dispatch_lock:
+        Dispatch[key] = (func, path_dependent)
+    return func
+
+#-----------------------------------------------------------------------
+#
+# Function get_programs
+#
+# List the programs that may run a command, in the order they are
+# tried.
+#
+# Inputs
+# ------
+#    @param: pkg_mgr
+#    @param: class_
+#    @param: command
+#    @param: program - tried first
+#
+# Returns
+# -------
+#    @return: programs
+#
+# Raises
+# ------
+#    @raises: Exception - the command is not supported
+#
+#-----------------------------------------------------------------------
+def get_programs(pkg_mgr, class_, command, program=None):
     commands = Programs[pkg_mgr][class_]
     programs = []
     if program is not None:
@@ -1107,10 +1334,41 @@ def find_program(pkg_mgr, class_, command, program=None):
     if not programs:
         raise Exception("%s program class `%s' is not supported"
                         % (command, class_))
+    return programs
+
+#-----------------------------------------------------------------------
+#
+# Function find_program
+#
+# Find the first of get_programs() that is a Python module or is
+# installed.
+#
+# Inputs
+# ------
+#    @param: pkg_mgr
+#    @param: class_
+#    @param: command
+#    @param: program
+#
+# Returns
+# -------
+#    @return: program - a Python module
+#    @return: exe
+#    @return: None    - no program is installed
+#
+# Raises
+# ------
+#    @raises: Exception - the command is not supported
+#
+#-----------------------------------------------------------------------
+def find_program(pkg_mgr, class_, command, program=None):
+    """Find suitable archive program for given format and mode."""
     # return the first existing program
-    for program in programs:
+    for program in get_programs(pkg_mgr, class_, command, program):
         if program.startswith('py_'):
             # it's a Python module and therefore always supported
             return program
         exe = util.find_program(program)
-        return exe
+        if exe is not None:
+            return exe
+    return None
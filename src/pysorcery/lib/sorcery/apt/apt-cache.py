@@ -52,6 +52,8 @@ import os
 # System Library Overrides
 from pysorcery.lib.system import logging
 # Other Application Libraries
+from pysorcery.lib import util
+from pysorcery.lib.util import cache
 from pysorcery.lib import sorcery
 
 # Other Optional Libraries
@@ -65,6 +67,14 @@ from pysorcery.lib import sorcery
 # Enable Logging
 logger = logging.getLogger(__name__)
 
+# Results are cached between runs until one of these changes
+STATE_FILES = tuple(util.root_path(path) for path in
+                    ('/var/lib/dpkg/status',
+                     '/var/lib/apt/extended_states',
+                     '/var/lib/apt/lists/*',
+                     '/etc/apt/preferences',
+                     '/etc/apt/preferences.d/*'))
+
 #-----------------------------------------------------------------------
 #
 # Classes
@@ -112,6 +122,7 @@ logger = logging.getLogger(__name__)
 #    ...
 #
 #-----------------------------------------------------------------------
+@cache.cached(disk=True, depends=STATE_FILES)
 def get_repositories(*args, **kwargs):
     var = subprocess.check_output(['apt-cache', 'policy'])
     repositories = []
@@ -152,6 +163,7 @@ def get_repositories(*args, **kwargs):
 #    ...
 #
 #-----------------------------------------------------------------------
+@cache.cached(disk=True, depends=STATE_FILES)
 def get_depends(name, *args, **kwargs):
     var = subprocess.check_output(['apt-cache', 'depends', name])
     depends = []
@@ -176,6 +188,7 @@ def get_depends(name, *args, **kwargs):
 #    ...
 #
 #-----------------------------------------------------------------------
+@cache.cached(disk=True, depends=STATE_FILES)
 def get_dependencies(name, *args, **kwargs):
     var = subprocess.check_output(['apt-cache', 'rdepends', name])
     depends = []
@@ -51,6 +51,8 @@ import os
 # System Library Overrides
 from pysorcery.lib.system import logging
 # Other Application Libraries
+from pysorcery.lib import util
+from pysorcery.lib.util import cache
 
 # Other Optional Libraries
 
@@ -63,6 +65,14 @@ from pysorcery.lib.system import logging
 # Enable Logging
 logger = logging.getLogger(__name__)
 
+# Results are cached between runs until one of these changes
+STATE_FILES = tuple(util.root_path(path) for path in
+                    ('/var/lib/dpkg/status',
+                     '/var/lib/apt/extended_states',
+                     '/var/lib/apt/lists/*',
+                     '/etc/apt/preferences',
+                     '/etc/apt/preferences.d/*'))
+
 #-----------------------------------------------------------------------
 #
 # Classes
@@ -114,6 +124,7 @@ logger = logging.getLogger(__name__)
 #    ...
 #
 #-----------------------------------------------------------------------
+@cache.cached(disk=True, depends=STATE_FILES)
 def read_file(name, **kwargs):
     if kwargs['filename'].upper() == 'DETAILS':
         var = subprocess.check_output(['apt', 'show', name])
@@ -147,6 +158,7 @@ def read_file(name, **kwargs):
 #    ...
 #
 #-------------------------------------------------------------------
+@cache.cached(disk=True, depends=STATE_FILES)
 def get_installed(status):
     var = subprocess.check_output(['apt', 'list','--installed'])
     
@@ -182,7 +194,7 @@ def get_installed(status):
 #
 #-------------------------------------------------------------------
 def install(name, **kwargs):
-    var = subprocess.check_output(['apt', 'list', name)
+    var = subprocess.check_output(['apt', 'list', name])
 
     return None
 
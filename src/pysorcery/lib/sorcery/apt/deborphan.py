@@ -51,6 +51,8 @@ import os
 # System Library Overrides
 from pysorcery.lib.system import logging
 # Other Application Libraries
+from pysorcery.lib import util
+from pysorcery.lib.util import cache
 
 # Other Optional Libraries
 
@@ -63,6 +65,11 @@ from pysorcery.lib.system import logging
 # Enable Logging
 logger = logging.getLogger(__name__)
 
+# Results are cached between runs until one of these changes
+STATE_FILES = tuple(util.root_path(path) for path in
+                    ('/var/lib/dpkg/status',
+                     '/var/lib/deborphan/keep'))
+
 #-----------------------------------------------------------------------
 #
 # Classes
@@ -113,6 +120,7 @@ logger = logging.getLogger(__name__)
 #    ...
 #
 #-------------------------------------------------------------------
+@cache.cached(disk=True, depends=STATE_FILES)
 def get_orphans():
     var = subprocess.check_output(['deborphan',
                                    '--no-show-section',
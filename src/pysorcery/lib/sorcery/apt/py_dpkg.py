@@ -0,0 +1,443 @@
+#! /usr/bin/env python3
+#-----------------------------------------------------------------------
+#
+# Original BASH version
+# Original version Copyright 2001 by Kyle Sallee
+# Additions/corrections Copyright 2002 by the Source Mage Team
+#
+# Python rewrite
+# Copyright 2017 Geoff S Derber
+#
+# This file is part of Sorcery.
+#
+# File: pysorcery/lib/sorcery/apt/py_dpkg.py
+#
+#    Sorcery is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    Sorcery is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with Sorcery.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Apt: py_dpkg
+#
+#    These functions read the dpkg and apt state files directly, so no
+#    external programs are needed.
+#
+#-----------------------------------------------------------------------
+"""
+Apt: py_dpkg
+
+These functions read the dpkg and apt state files directly, so no
+external programs are needed.
+"""
+#-----------------------------------------------------------------------
+#
+# Libraries
+#
+#-----------------------------------------------------------------------
+
+# System Libraries
+import re
+
+# 3rd Party Libraries
+
+
+# Application Libraries
+# System Library Overrides
+from pysorcery.lib.system import logging
+# Other Application Libraries
+from pysorcery.lib import util
+from pysorcery.lib.util import profiling
+
+# Other Optional Libraries
+
+
+#-----------------------------------------------------------------------
+#
+# Global Variables
+#
+#-----------------------------------------------------------------------
+# Enable Logging
+logger = logging.getLogger(__name__)
+
+# State files
+DPKG_STATUS = util.root_path('/var/lib/dpkg/status')
+APT_EXTENDED_STATES = util.root_path('/var/lib/apt/extended_states')
+
+# Relationship fields that keep a package from being an orphan.  The
+# 'nice' fields mirror deborphan's default nice-mode and apt's
+# RecommendsImportant/SuggestsImportant defaults.
+DEPENDS_FIELDS = ('pre-depends', 'depends')
+NICE_FIELDS = ('recommends', 'suggests')
+
+# Priorities that are never reported
+PROTECTED_PRIORITIES = ('required', 'important')
+
+# deborphan style guesses.  Each guess is a (column, regex) pair that
+# is applied to a whole column of the installed table in one pass.
+Guesses = {
+    'section': ('section', re.compile(r'(^|/)(old)?libs$')),
+    'common': ('name', re.compile(r'-common$')),
+    'data': ('name', re.compile(r'-data$')),
+    'debug': ('name', re.compile(r'-(dbg|dbgsym)$')),
+    'dev': ('name', re.compile(r'-dev$')),
+    'doc': ('name', re.compile(r'-doc$')),
+    'dummy': ('description', re.compile(r'(dummy|transitional)',
+                                        re.IGNORECASE)),
+    'kernel': ('name', re.compile(r'^linux-(image|headers|modules)-')),
+    'mono': ('name', re.compile(r'^libmono')),
+    'perl': ('name', re.compile(r'^lib.*-perl$')),
+    'pike': ('name', re.compile(r'^pike')),
+    'python': ('name', re.compile(r'^python')),
+    'ruby': ('name', re.compile(r'^(ruby|lib.*-ruby)')),
+}
+
+#-----------------------------------------------------------------------
+#
+# Classes
+#
+#
+#-----------------------------------------------------------------------
+
+#-----------------------------------------------------------------------
+#
+# Functions
+#
+# parse_relation
+# read_control_file
+# get_installed_table
+# get_auto_installed
+# resolve
+# get_unreachable
+# get_orphans
+#
+#-----------------------------------------------------------------------
+
+#-----------------------------------------------------------------------
+#
+# Function parse_relation
+#
+# Split a dpkg relationship field into a list of alternative groups,
+# dropping version constraints and architecture qualifiers.
+#
+# 'a (>= 1) | b, c:any' -> [['a', 'b'], ['c']]
+#
+# Inputs
+# ------
+#    @param: value - The raw field value
+#
+# Returns
+# -------
+#    @return: groups
+#
+# Raises
+# ------
+#    ...
+#
+#-----------------------------------------------------------------------
+def parse_relation(value):
+    groups = []
+    for group in value.split(','):
+        alternatives = []
+        for alternative in group.split('|'):
+            name = alternative.split('(')[0].split('[')[0].strip()
+            name = name.split(':')[0]
+            if name:
+                alternatives.append(name)
+        if alternatives:
+            groups.append(alternatives)
+    return groups
+
+#-----------------------------------------------------------------------
+#
+# Function read_control_file
+#
+# Read a deb822 style file (dpkg status, apt extended_states) and yield
+# one dictionary per stanza.  Field names are lower cased and
+# continuation lines are joined onto their field.
+#
+# Inputs
+# ------
+#    @param: filename
+#
+# Returns
+# -------
+#    @return: stanza - generator of dictionaries
+#
+# Raises
+# ------
+#    @raises: OSError
+#
+#-----------------------------------------------------------------------
+def read_control_file(filename):
+    stanza = {}
+    field = None
+    with open(filename, 'r', encoding='utf-8', errors='replace') as file_:
+        for line in file_:
+            if line[0] in ' \t':
+                if field is not None:
+                    stanza[field] += '\n' + line.strip()
+                continue
+
+            line = line.rstrip('\n')
+            if not line:
+                if stanza:
+                    yield stanza
+                stanza = {}
+                field = None
+                continue
+
+            key, sep, value = line.partition(':')
+            if sep:
+                field = key.lower()
+                stanza[field] = value.strip()
+
+    if stanza:
+        yield stanza
+
+#-----------------------------------------------------------------------
+#
+# Function get_installed_table
+#
+# Build a column oriented table of every installed package from the
+# dpkg status file.  Packages with more than one architecture
+# installed are merged under a single name.
+#
+# Inputs
+# ------
+#    @param: status_file
+#
+# Returns
+# -------
+#    @return: table - dictionary of columns, all indexed alike
+#
+# Raises
+# ------
+#    @raises: OSError
+#
+#-----------------------------------------------------------------------
+@profiling.spanned('index', 'dpkg status')
+def get_installed_table(status_file=DPKG_STATUS):
+    table = {'name': [],
+             'section': [],
+             'priority': [],
+             'essential': [],
+             'description': [],
+             'provides': [],
+             'depends': [],
+             'nice': []
+    }
+    index = {}
+
+    for stanza in read_control_file(status_file):
+        if not stanza.get('status', '').endswith(' installed'):
+            continue
+
+        name = stanza['package']
+        depends = []
+        for field in DEPENDS_FIELDS:
+            depends.extend(parse_relation(stanza.get(field, '')))
+        nice = []
+        for field in NICE_FIELDS:
+            nice.extend(parse_relation(stanza.get(field, '')))
+        provides = [group[0] for group
+                    in parse_relation(stanza.get('provides', ''))]
+
+        if name in index:
+            i = index[name]
+            table['depends'][i].extend(depends)
+            table['nice'][i].extend(nice)
+            table['provides'][i].extend(provides)
+            continue
+
+        index[name] = len(table['name'])
+        table['name'].append(name)
+        table['section'].append(stanza.get('section', ''))
+        table['priority'].append(stanza.get('priority', ''))
+        table['essential'].append(stanza.get('essential', 'no') == 'yes')
+        table['description'].append(
+            stanza.get('description', '').split('\n')[0])
+        table['provides'].append(provides)
+        table['depends'].append(depends)
+        table['nice'].append(nice)
+
+    return table
+
+#-----------------------------------------------------------------------
+#
+# Function get_auto_installed
+#
+# Get the packages apt has marked as automatically installed.
+#
+# Inputs
+# ------
+#    @param: states_file
+#
+# Returns
+# -------
+#    @return: auto - set of package names
+#
+# Raises
+# ------
+#    ...
+#
+#-----------------------------------------------------------------------
+def get_auto_installed(states_file=APT_EXTENDED_STATES):
+    try:
+        return {stanza['package']
+                for stanza in read_control_file(states_file)
+                if stanza.get('auto-installed') == '1'}
+    except OSError as msg:
+        logger.debug(msg)
+        return set()
+
+#-----------------------------------------------------------------------
+#
+# Function resolve
+#
+# Map each installed package to the installed packages its
+# relationship groups can be satisfied by, following Provides.
+#
+# Inputs
+# ------
+#    @param: table
+#    @param: columns - which relationship columns to follow
+#
+# Returns
+# -------
+#    @return: graph - dictionary of package name -> set of names
+#
+# Raises
+# ------
+#    ...
+#
+#-----------------------------------------------------------------------
+def resolve(table, columns):
+    providers = {name: {name} for name in table['name']}
+    for name, provides in zip(table['name'], table['provides']):
+        for virtual in provides:
+            providers.setdefault(virtual, set()).add(name)
+
+    graph = {}
+    for i, name in enumerate(table['name']):
+        targets = set()
+        for column in columns:
+            for group in table[column][i]:
+                for alternative in group:
+                    targets.update(providers.get(alternative, ()))
+        targets.discard(name)
+        graph[name] = targets
+
+    return graph
+
+#-----------------------------------------------------------------------
+#
+# Function get_unreachable
+#
+# Get the automatically installed packages that can not be reached
+# from any manually installed or kept package.  This is what 'apt
+# autoremove' would remove; apt's NeverAutoRemove keeps the Essential
+# and required/important packages, and with them what they depend on.
+#
+# Inputs
+# ------
+#    @param: graph - forward dependency graph from resolve()
+#    @param: auto  - set of automatically installed packages
+#    @param: keep  - packages kept even when automatically installed
+#
+# Returns
+# -------
+#    @return: unreachable - set of package names
+#
+# Raises
+# ------
+#    ...
+#
+#-----------------------------------------------------------------------
+def get_unreachable(graph, auto, keep=()):
+    stack = [name for name in graph if name not in auto or name in keep]
+    reachable = set(stack)
+    while stack:
+        for target in graph[stack.pop()]:
+            if target not in reachable:
+                reachable.add(target)
+                stack.append(target)
+
+    return (auto & set(graph)) - reachable
+
+#-----------------------------------------------------------------------
+#
+# Function get_orphans
+#
+# Get installed packages that nothing else installed depends on.
+#
+# Without deborphan, this reports the union of
+#   1. packages with no installed reverse dependencies that match the
+#      requested guesses (deborphan --guess-*), and
+#   2. automatically installed packages no longer reachable from a
+#      manually installed package (apt autoremove).
+#
+# Essential packages and those of required/important priority are
+# never reported, nor is anything they depend on.
+#
+# Inputs
+# ------
+#    @param: guess       - 'all' or an iterable of Guesses keys.
+#                          Defaults to 'all' (--guess-all).
+#    @param: nice        - Recommends/Suggests keep packages installed
+#    @param: status_file
+#    @param: states_file
+#
+# Returns
+# -------
+#    @return: orphans - sorted list of package names
+#
+# Raises
+# ------
+#    @raises: OSError - when the dpkg status file can not be read
+#
+#-----------------------------------------------------------------------
+def get_orphans(guess='all', nice=True,
+                status_file=DPKG_STATUS,
+                states_file=APT_EXTENDED_STATES):
+    table = get_installed_table(status_file)
+
+    columns = ('depends', 'nice') if nice else ('depends',)
+    graph = resolve(table, columns)
+
+    depended_on = set()
+    for targets in graph.values():
+        depended_on.update(targets)
+
+    protected = {name for name, essential, priority
+                 in zip(table['name'],
+                        table['essential'],
+                        table['priority'])
+                 if essential or priority in PROTECTED_PRIORITIES}
+
+    if guess == 'all':
+        guess = Guesses.keys()
+    else:
+        guess = ('section',) + tuple(guess)
+
+    guessed = set()
+    for key in guess:
+        column, regex = Guesses[key]
+        guessed.update(name for name, value
+                       in zip(table['name'], table[column])
+                       if regex.search(value))
+
+    leaves = set(table['name']) - depended_on
+    auto = get_auto_installed(states_file)
+    orphans = (leaves & guessed) | get_unreachable(graph, auto, protected)
+    orphans -= protected
+
+    logger.debug2(orphans)
+    return sorted(orphans)
@@ -50,6 +50,9 @@ import os
 # System Library Overrides
 from pysorcery.lib import logging
 # Other Application Libraries
+from pysorcery.lib import sorcery
+from pysorcery.lib import util
+from pysorcery.lib.util import cache
 
 #-----------------------------------------------------------------------
 #
@@ -59,6 +62,13 @@ from pysorcery.lib import logging
 # Enable Logging
 logger = logging.getLogger(__name__)
 
+# Results are cached between runs until one of these changes
+STATE_FILES = tuple(util.root_path(path) for path in
+                    ('/etc/sorcery/local/grimoire',
+                     '/var/lib/sorcery/codex/*/codex.index',
+                     '/var/lib/sorcery/codex/*/provides.index',
+                     '/var/state/sorcery/*'))
+
 #-----------------------------------------------------------------------
 #
 # Classes
@@ -107,6 +117,7 @@ logger = logging.getLogger(__name__)
 #    ...
 #
 #-----------------------------------------------------------------------
+@cache.cached(disk=True, depends=STATE_FILES)
 def get_description(name, **kwargs):
     var = subprocess.check_output(['gaze','-q', 'what', name])
 
@@ -137,6 +148,7 @@ def get_description(name, **kwargs):
 #    ...
 #
 #-----------------------------------------------------------------------
+@cache.cached(disk=True, depends=STATE_FILES)
 def get_size(name, **kwargs):
     var = subprocess.check_output(['gaze','-q', 'size', name])
 
@@ -168,9 +180,8 @@ def get_size(name, **kwargs):
 #    ...
 #
 #-------------------------------------------------------------------
+@cache.cached(disk=True, depends=STATE_FILES)
 def get_orphans():
-    logger.debug('Begin Function')
-    
     var = subprocess.check_output(['gaze','orphans'])
 
     orphan_list = []
@@ -180,7 +191,6 @@ def get_orphans():
         orphan_list.append(item)
 
     logger.debug2(orphan_list)
-    logger.debug('End Function')
     return orphan_list
 
 #---------------------------------------------------------------
@@ -202,9 +212,8 @@ def get_orphans():
 #    ...
 #
 #-------------------------------------------------------------------
+@cache.cached(disk=True, depends=STATE_FILES)
 def get_sources(spell, **kwargs):
-    logger.debug('Begin Function')
-    
     var = subprocess.check_output(['gaze','sources', spell])
 
     sources = []
@@ -214,7 +223,6 @@ def get_sources(spell, **kwargs):
         sources.append(item)
 
     logger.debug2(sources)
-    logger.debug('End Function')
     return sources
 
 #---------------------------------------------------------------
@@ -236,9 +244,8 @@ def get_sources(spell, **kwargs):
 #    ...
 #
 #-------------------------------------------------------------------
+@cache.cached(disk=True, depends=STATE_FILES)
 def get_source_uris(spell, **kwargs):
-    logger.debug('Begin Function')
-    
     var = subprocess.check_output(['gaze','source_urls', spell])
 
     source_uris = []
@@ -248,7 +255,6 @@ def get_source_uris(spell, **kwargs):
         source_uris.append(item)
 
     logger.debug2(source_uris)
-    logger.debug('End Function')
     return source_uris
 
 #-----------------------------------------------------------------------
@@ -270,31 +276,25 @@ def get_source_uris(spell, **kwargs):
 #    ...
 #
 #-----------------------------------------------------------------------
+@cache.cached(disk=True, depends=STATE_FILES)
 def get_depends(name, **kwargs):
+    logger.debug2(name)
     try:
-        print(name)
         var = subprocess.check_output(['gaze',
                                        'depends',
-                                       name])
-
-        depends = []
-        for line in var.splitlines():
-            tmpline = str(line).split("'")[1]
-            name = tmpline.split(':')[0]
-            depends.append(name)
+                                       name],
+                                      stderr=subprocess.PIPE)
+    except subprocess.CalledProcessError as error:
+        raise sorcery.PackageError.from_called_process(name, error)
 
-        return depends
+    depends = []
+    for line in var.splitlines():
+        tmpline = str(line).split("'")[1]
+        depends.append(tmpline.split(':')[0])
 
-    except subprocess.CalledProcessError as e:
-        logger.error(e.output)
-        tmpline = str(e.output).split("'")[1]
-        name = tmpline.split(':')[0]
-        depends = [name]
-        return depends
-    finally:
-        pass
+    return depends
 
-    #-----------------------------------------------------------------------
+#-----------------------------------------------------------------------
 #
 # Function get_description
 #
@@ -313,27 +313,21 @@ def get_depends(name, **kwargs):
 #    ...
 #
 #-----------------------------------------------------------------------
+@cache.cached(disk=True, depends=STATE_FILES)
 def get_dependencies(name, **kwargs):
+    logger.debug2(name)
     try:
-        print(name)
         var = subprocess.check_output(['gaze',
                                        'dependencies',
-                                       name])
-
-        depends = []
-        for line in var.splitlines():
-            tmpline = str(line).split("'")[1]
-            name = tmpline.split(':')[0]
-            depends.append(name)
-
-        return depends
-
-    except subprocess.CalledProcessError as e:
-        logger.error(e.output)
-        tmpline = str(e.output).split("'")[1]
-        name = tmpline.split(':')[0]
-        depends = [name]
-        return depends
-    finally:
-        pass
+                                       name],
+                                      stderr=subprocess.PIPE)
+    except subprocess.CalledProcessError as error:
+        raise sorcery.PackageError.from_called_process(name, error)
+
+    depends = []
+    for line in var.splitlines():
+        tmpline = str(line).split("'")[1]
+        depends.append(tmpline.split(':')[0])
+
+    return depends
 
@@ -55,6 +55,12 @@ from pysorcery.lib.system import logging
 # Other Application Libraries
 from pysorcery.lib import sorcery
 from pysorcery.lib import util
+# The backend commands dispatched to py_smgl
+from pysorcery.lib.sorcery.smgl.py_smgl.api_01 import (
+    get_repository, get_codex, get_description, get_version, get_url,
+    get_short, get_section, read_file, get_log, is_package, is_spell,
+    get_license, get_pkg_maintainer, get_section_maintainer,
+    get_section_packages, get_section_spells, get_queue, get_installed)
 
 # Conditional Libraries
 
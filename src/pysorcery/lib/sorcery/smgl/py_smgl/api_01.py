@@ -51,7 +51,10 @@ from pysorcery.lib import logging
 # Other Application Libraries
 from pysorcery.lib.sorcery import smgl
 from pysorcery.lib import files
+from pysorcery.lib import util
+from pysorcery.lib.util import cache
 from pysorcery.lib.util import config
+from pysorcery.lib.util import profiling
 from pysorcery.lib.files import compressed
 
 #-----------------------------------------------------------------------
@@ -230,8 +233,6 @@ class DetailsFile(files.BaseFile):
     #
     #-------------------------------------------------------------------
     def parse(self):
-        logger.debug('Begin Function')
-        
         details_dict = {}
 
         description_check = False
@@ -242,7 +243,7 @@ class DetailsFile(files.BaseFile):
 
 
             if (line.startswith('#')):
-                logger.debug('Ignoring Line' + line)
+                logger.debug('Ignoring Line%s', line)
             elif ('cat' in line and
                   'EOF' in line):
                 description_check = True
@@ -264,7 +265,7 @@ class DetailsFile(files.BaseFile):
 
                 key, value = line.split('=')
                 if 'VERSION' in key:
-                    logger.debug('Line: ' + line)
+                    logger.debug('Line: %s', line)
                     details_dict['version'] = value
                 elif 'WEB_SITE' in key:
                     details_dict['website'] = value
@@ -275,11 +276,10 @@ class DetailsFile(files.BaseFile):
                 elif 'LICENSE' in key:
                     details_dict['license'] = value
             else:
-                logger.debug('Line: ' + line)
+                logger.debug('Line: %s', line)
 
         details_dict['description'] = description
 
-        logger.debug('End Function')
         return details_dict
 
 #-----------------------------------------------------------------------
@@ -1065,7 +1065,8 @@ def get_codex():
 #
 #-------------------------------------------------------------------------------
 def get_repository_dirs():
-    grimoire_file = files.BaseFile('/etc/sorcery/local/grimoire')
+    grimoire_file = files.BaseFile(
+        util.root_path('/etc/sorcery/local/grimoire'))
     content = grimoire_file.read()
 
     grimoires = []
@@ -1365,8 +1366,7 @@ def is_package(name, **kwargs):
     else:
         repository = kwargs['repository']
 
-    spell_list_file = files.BaseFile(grimoire_dir + '/codex.index')
-    spell_list = spell_list_file.read()
+    spell_list = read_codex_index(grimoire_dir)
     check = False
     for item in spell_list:
         spell, section_dir = item.split(' ')
@@ -1549,7 +1549,7 @@ def get_section_packages(name, **kwargs):
         packages = os.scandir(section_dir)
         return packages
     except FileNotFoundError:
-        logger.error('Section %s does not exist' % name)
+        logger.error('Section %s does not exist', name)
     finally:
         return
 
@@ -1575,6 +1575,60 @@ def get_section_packages(name, **kwargs):
 def get_section_spells(name, **kwargs):
     return get_section_packages(name)
 
+#-----------------------------------------------------------------------
+#
+# Function read_codex_index
+#
+# Read a grimoire's codex.index.  The result is cached until the index
+# file changes.
+#
+# Inputs
+# ------
+#    @param: grimoire_dir
+#
+# Returns
+# -------
+#    @return: spell_list - lines of 'spell section_dir'
+#
+# Raises
+# ------
+#    ...
+#
+#-----------------------------------------------------------------------
+@cache.cached(maxsize=32,
+              depends=lambda grimoire_dir: [grimoire_dir + '/codex.index'])
+@profiling.spanned('index', 'codex.index')
+def read_codex_index(grimoire_dir):
+    spell_list_file = files.BaseFile(grimoire_dir + '/codex.index')
+    return spell_list_file.read()
+
+#-----------------------------------------------------------------------
+#
+# Function read_provides_index
+#
+# Read a grimoire's provides.index.  The result is cached until the
+# index file changes.
+#
+# Inputs
+# ------
+#    @param: grimoire_dir
+#
+# Returns
+# -------
+#    @return: lines
+#
+# Raises
+# ------
+#    ...
+#
+#-----------------------------------------------------------------------
+@cache.cached(maxsize=32,
+              depends=lambda grimoire_dir: [grimoire_dir + '/provides.index'])
+@profiling.spanned('index', 'provides.index')
+def read_provides_index(grimoire_dir):
+    with open(grimoire_dir + '/provides.index') as file_:
+        return file_.readlines()
+
 #-----------------------------------------------------------------------
 #
 # Function get_first_repo
@@ -1599,8 +1653,7 @@ def get_first_repo(name):
 
     check = False
     for directory in codex.directories:
-        spell_list_file = files.BaseFile(directory + '/codex.index')
-        spell_list = spell_list_file.read()
+        spell_list = read_codex_index(directory)
         
         for item in spell_list:
             spell, section_dir = item.split(' ')
@@ -1637,8 +1690,7 @@ def get_first_repo(name):
 #
 #-----------------------------------------------------------------------
 def get_section_dir(grimoire, name):
-    spell_list_file = files.BaseFile(grimoire + '/codex.index')
-    spell_list = spell_list_file.read()
+    spell_list = read_codex_index(grimoire)
 
     for item in spell_list:
         spell, section_dir = item.split(' ')
@@ -1690,12 +1742,11 @@ def get_spell_dir(section_dir, name):
 #
 #-------------------------------------------------------------------
 def get_queue(which_queue):
-    logger.debug("Begin Function")
-    queue_file = files.BaseFile('/var/log/sorcery/queue/' + which_queue)
+    queue_file = files.BaseFile(util.root_path('/var/log/sorcery/queue/')
+                                + which_queue)
     
     queue = queue_file.read()
     
-    logger.debug("End Function")
     return queue
     
 #---------------------------------------------------------------
@@ -1717,12 +1768,11 @@ def get_queue(which_queue):
 #    ...
 #
 #-------------------------------------------------------------------
+@profiling.spanned('index', 'packages')
 def get_installed(status):
-    logger.debug("Begin Function")
-    
     spell_list = []
     
-    for line in open('/var/state/sorcery/packages'):
+    for line in open(util.root_path('/var/state/sorcery/packages')):
         spell = line.split(':')
         
         name = spell[0]
@@ -1741,7 +1791,6 @@ def get_installed(status):
         else:
             pass
             
-    logger.debug('End Function')
     return spell_list
 
 #-----------------------------------------------------------------------
@@ -1764,8 +1813,6 @@ def get_installed(status):
 #
 #-----------------------------------------------------------------------
 def get_sections(grimoire=None, grim_dir=None, **kwargs):
-    logger.debug('Begin Function')
-    
     dir_list = os.scandir(grim_dir)
     sections = []
     for item in dir_list:
@@ -1773,7 +1820,6 @@ def get_sections(grimoire=None, grim_dir=None, **kwargs):
             if 'git' not in item.name:
                 section_list.append(item.name)
 
-    logger.debug('End Function')
     return sections
 
 #---------------------------------------------------------------
@@ -1796,17 +1842,14 @@ def get_sections(grimoire=None, grim_dir=None, **kwargs):
 #
 #-------------------------------------------------------------------
 def get_providers(feature):
-    logger.debug('Begin Function')
-    
     grimoires = Codex()
     
     providers = []
-    for grimoire in grimoires.get_repositories():
-        for line in open(grimoire + '/provides.index'):
+    for grimoire in grimoires.directories:
+        for line in read_provides_index(grimoire):
             if feature.upper() == line.split(' ')[0]:
                 providers.append(line.split('/')[-1][:-1])
                 
-    logger.debug('End Function')
     return providers
 
 
@@ -52,6 +52,7 @@ from pysorcery.lib import logging
 # Other Application Libraries
 from pysorcery.lib.sorcery import smgl
 from pysorcery.lib import files
+from pysorcery.lib import util
 from pysorcery.lib.util import config
 from pysorcery.lib.files import compressed
 
@@ -190,8 +191,6 @@ class DetailsFile(files.BaseFile):
     #
     #-------------------------------------------------------------------
     def parse(self):
-        logger.debug('Begin Function')
-        
         details_dict = {}
 
         description_check = False
@@ -202,7 +201,7 @@ class DetailsFile(files.BaseFile):
 
 
             if (line.startswith('#')):
-                logger.debug('Ignoring Line' + line)
+                logger.debug('Ignoring Line%s', line)
             elif ('cat' in line and
                   'EOF' in line):
                 description_check = True
@@ -224,7 +223,7 @@ class DetailsFile(files.BaseFile):
 
                 key, value = line.split('=')
                 if 'VERSION' in key:
-                    logger.debug('Line: ' + line)
+                    logger.debug('Line: %s', line)
                     details_dict['version'] = value
                 elif 'WEB_SITE' in key:
                     details_dict['website'] = value
@@ -235,11 +234,10 @@ class DetailsFile(files.BaseFile):
                 elif 'LICENSE' in key:
                     details_dict['license'] = value
             else:
-                logger.debug('Line: ' + line)
+                logger.debug('Line: %s', line)
 
         details_dict['description'] = description
 
-        logger.debug('End Function')
         return details_dict
 
 #-----------------------------------------------------------------------
@@ -1025,7 +1023,8 @@ def get_codex():
 #
 #-------------------------------------------------------------------------------
 def get_repository_dirs():
-    grimoire_file = files.BaseFile('/etc/sorcery/local/grimoire')
+    grimoire_file = files.BaseFile(
+        util.root_path('/etc/sorcery/local/grimoire'))
     content = grimoire_file.read()
 
     grimoires = []
@@ -1509,7 +1508,7 @@ def get_section_packages(name, **kwargs):
         packages = os.scandir(section_dir)
         return packages
     except FileNotFoundError:
-        logger.error('Section %s does not exist' % name)
+        logger.error('Section %s does not exist', name)
     finally:
         return
 
@@ -1650,12 +1649,11 @@ def get_spell_dir(section_dir, name):
 #
 #-------------------------------------------------------------------
 def get_queue(which_queue):
-    logger.debug("Begin Function")
-    queue_file = files.BaseFile('/var/log/sorcery/queue/' + which_queue)
+    queue_file = files.BaseFile(util.root_path('/var/log/sorcery/queue/')
+                                + which_queue)
     
     queue = queue_file.read()
     
-    logger.debug("End Function")
     return queue
     
 #---------------------------------------------------------------
@@ -1678,11 +1676,9 @@ def get_queue(which_queue):
 #
 #-------------------------------------------------------------------
 def get_installed(status):
-    logger.debug("Begin Function")
-    
     spell_list = []
     
-    for line in open('/var/state/sorcery/packages'):
+    for line in open(util.root_path('/var/state/sorcery/packages')):
         spell = line.split(':')
         
         name = spell[0]
@@ -1701,7 +1697,6 @@ def get_installed(status):
         else:
             pass
             
-    logger.debug('End Function')
     return spell_list
 
 #-----------------------------------------------------------------------
@@ -1724,8 +1719,6 @@ def get_installed(status):
 #
 #-----------------------------------------------------------------------
 def get_sections(grimoire=None, grim_dir=None, **kwargs):
-    logger.debug('Begin Function')
-    
     dir_list = os.scandir(grim_dir)
     sections = []
     for item in dir_list:
@@ -1733,7 +1726,6 @@ def get_sections(grimoire=None, grim_dir=None, **kwargs):
             if 'git' not in item.name:
                 section_list.append(item.name)
 
-    logger.debug('End Function')
     return sections
 
 #---------------------------------------------------------------
@@ -1756,8 +1748,6 @@ def get_sections(grimoire=None, grim_dir=None, **kwargs):
 #
 #-------------------------------------------------------------------
 def get_providers(feature):
-    logger.debug('Begin Function')
-    
     grimoires = Codex()
     
     providers = []
@@ -1766,7 +1756,6 @@ def get_providers(feature):
             if feature.upper() == line.split(' ')[0]:
                 providers.append(line.split('/')[-1][:-1])
                 
-    logger.debug('End Function')
     return providers
 
 
@@ -52,8 +52,12 @@ from pysorcery.lib import logging
 from pysorcery.lib.sorcery import smgl
 from pysorcery.lib.sorcery.smgl import bashspell
 from pysorcery.lib import files
+from pysorcery.lib import util
+from pysorcery.lib.util import profiling
 from pysorcery.lib.util import config
 from pysorcery.lib.files import compressed
+from pysorcery.lib.sorcery.smgl.py_smgl.api_01 import (read_codex_index,
+                                                      read_provides_index)
 
 #-----------------------------------------------------------------------
 #
@@ -332,7 +336,8 @@ def get_codex():
 #
 #-------------------------------------------------------------------------------
 def get_repository_dirs():
-    grimoire_file = files.BaseFile('/etc/sorcery/local/grimoire')
+    grimoire_file = files.BaseFile(
+        util.root_path('/etc/sorcery/local/grimoire'))
     content = grimoire_file.read()
 
     grimoires = []
@@ -632,8 +637,7 @@ def is_package(name, **kwargs):
     else:
         repository = kwargs['repository']
 
-    spell_list_file = files.BaseFile(grimoire_dir + '/codex.index')
-    spell_list = spell_list_file.read()
+    spell_list = read_codex_index(grimoire_dir)
     check = False
     for item in spell_list:
         spell, section_dir = item.split(' ')
@@ -816,7 +820,7 @@ def get_section_packages(name, **kwargs):
         packages = os.scandir(section_dir)
         return packages
     except FileNotFoundError:
-        logger.error('Section %s does not exist' % name)
+        logger.error('Section %s does not exist', name)
     finally:
         return
 
@@ -866,8 +870,7 @@ def get_first_repo(name):
 
     check = False
     for directory in codex.directories:
-        spell_list_file = files.BaseFile(directory + '/codex.index')
-        spell_list = spell_list_file.read()
+        spell_list = read_codex_index(directory)
         
         for item in spell_list:
             spell, section_dir = item.split(' ')
@@ -904,8 +907,7 @@ def get_first_repo(name):
 #
 #-----------------------------------------------------------------------
 def get_section_dir(grimoire, name):
-    spell_list_file = files.BaseFile(grimoire + '/codex.index')
-    spell_list = spell_list_file.read()
+    spell_list = read_codex_index(grimoire)
 
     for item in spell_list:
         spell, section_dir = item.split(' ')
@@ -957,12 +959,11 @@ def get_spell_dir(section_dir, name):
 #
 #-------------------------------------------------------------------
 def get_queue(which_queue):
-    logger.debug("Begin Function")
-    queue_file = files.BaseFile('/var/log/sorcery/queue/' + which_queue)
+    queue_file = files.BaseFile(util.root_path('/var/log/sorcery/queue/')
+                                + which_queue)
     
     queue = queue_file.read()
     
-    logger.debug("End Function")
     return queue
     
 #---------------------------------------------------------------
@@ -984,12 +985,11 @@ def get_queue(which_queue):
 #    ...
 #
 #-------------------------------------------------------------------
+@profiling.spanned('index', 'packages')
 def get_installed(status):
-    logger.debug("Begin Function")
-    
     spell_list = []
     
-    for line in open('/var/state/sorcery/packages'):
+    for line in open(util.root_path('/var/state/sorcery/packages')):
         spell = line.split(':')
         
         name = spell[0]
@@ -1008,7 +1008,6 @@ def get_installed(status):
         else:
             pass
             
-    logger.debug('End Function')
     return spell_list
 
 #-----------------------------------------------------------------------
@@ -1031,8 +1030,6 @@ def get_installed(status):
 #
 #-----------------------------------------------------------------------
 def get_sections(grimoire=None, grim_dir=None, **kwargs):
-    logger.debug('Begin Function')
-    
     dir_list = os.scandir(grim_dir)
     sections = []
     for item in dir_list:
@@ -1040,7 +1037,6 @@ def get_sections(grimoire=None, grim_dir=None, **kwargs):
             if 'git' not in item.name:
                 section_list.append(item.name)
 
-    logger.debug('End Function')
     return sections
 
 #---------------------------------------------------------------
@@ -1063,17 +1059,14 @@ def get_sections(grimoire=None, grim_dir=None, **kwargs):
 #
 #-------------------------------------------------------------------
 def get_providers(feature):
-    logger.debug('Begin Function')
-    
     grimoires = Codex()
     
     providers = []
     for grimoire in grimoires.get_repositories():
-        for line in open(grimoire + '/provides.index'):
+        for line in read_provides_index(grimoire):
             if feature.upper() == line.split(' ')[0]:
                 providers.append(line.split('/')[-1][:-1])
                 
-    logger.debug('End Function')
     return providers
 
 
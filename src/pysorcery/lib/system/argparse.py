@@ -150,6 +150,64 @@ class CommonParser(ArgumentParser):
         )
         return
 
+    #-------------------------------------------------------------------
+    #
+    # Function add_jobs_option
+    #
+    # Adds the argument '--jobs', the number of backend queries to run
+    # at once.
+    #
+    # Inputs
+    # ------
+    #    @param: self
+    #
+    # Returns
+    # -------
+    #    @return: None
+    #
+    # Raises
+    # ------
+    #    ...
+    #
+    #-------------------------------------------------------------------
+    def add_jobs_option(self):
+        self.add_argument('-j',
+                          '--jobs',
+                          type = int,
+                          default = None,
+                          metavar = 'N',
+                          help = 'Run at most N package queries at once (default: one per CPU)'
+        )
+        return
+
+    #-------------------------------------------------------------------
+    #
+    # Function add_format_option
+    #
+    # Adds the argument '--format', how results are written: for people
+    # or as NDJSON/TSV records for other programs.
+    #
+    # Inputs
+    # ------
+    #    @param: self
+    #
+    # Returns
+    # -------
+    #    @return: None
+    #
+    # Raises
+    # ------
+    #    ...
+    #
+    #-------------------------------------------------------------------
+    def add_format_option(self):
+        self.add_argument('--format',
+                          choices = ('text', 'ndjson', 'tsv'),
+                          default = 'text',
+                          help = 'Write results as text, one JSON object per line or tab separated values'
+        )
+        return
+
     #-------------------------------------------------------------------
     #
     # Function read
@@ -175,6 +233,10 @@ class CommonParser(ArgumentParser):
         verbose_help = 'Increase output'
         loglevel_help = 'Specify output level'
         debug_help = 'Maximize output level'
+        trace_help = 'Log entry to and exit from every function'
+        profile_help = 'Print where the time went at exit'
+        profile_output_help = ('Also write a Chrome trace (.json) or '
+                               'cProfile statistics (other names)')
         loglevel_choices = [ 'debug',
                              'info',
                              'warning',
@@ -207,6 +269,14 @@ class CommonParser(ArgumentParser):
                                   default = 0,
                                   help = verbose_help)
 
+        # Profiling
+        self.logging.add_argument('--profile',
+                                  action = 'store_true',
+                                  help = profile_help)
+        self.logging.add_argument('--profile-output',
+                                  metavar = 'FILE',
+                                  help = profile_output_help)
+
         # If debugging is enabled
         if DEBUG:
             # Set Loglevel
@@ -218,6 +288,10 @@ class CommonParser(ArgumentParser):
             self.logging.add_argument('--debug',
                                       action = 'store_true',
                                       help = debug_help)
+            # Trace function calls
+            self.logging.add_argument('--trace',
+                                      action = 'store_true',
+                                      help = trace_help)
 
         return self.parent
         
@@ -38,15 +38,19 @@
 #-------------------------------------------------------------------------------
 
 # System Libraries
-from distro import *
+import importlib
+import os
 
 # 3rd Party Libraries
-
+#
+# The distro library is imported on first use, see __getattr__ and
+# get_distro_id.
 
 # Application Libraries
 # System Library Overrides
 
 # Other Application Libraries
+from pysorcery.lib.util import cache
 
 
 #-------------------------------------------------------------------------------
@@ -84,4 +88,137 @@ for k, v in distro_definitions.items():
     for key in k:
         distro_group[key] = v
 
-distro_id = linux_distribution()[0]
+# Same as pysorcery.lib.util.SORCERY_ROOT; util can not be imported
+# here
+SORCERY_ROOT = os.environ.get('PYSORCERY_ROOT', '/')
+
+# Package manager to use whatever the distribution, e.g. 'smgl'
+PKG_MGR = os.environ.get('PYSORCERY_PKG_MGR')
+
+# Files the distribution is detected from, beneath SORCERY_ROOT; the
+# result is cached until one of them changes.
+RELEASE_FILES = tuple(os.path.join(SORCERY_ROOT, path.lstrip('/'))
+                      for path in ('/etc/os-release',
+                                   '/usr/lib/os-release',
+                                   '/etc/lsb-release'))
+
+#-------------------------------------------------------------------------------
+#
+# Functions
+#
+# read_os_release
+# get_distro_id
+# get_pkg_mgr
+# __getattr__
+#
+#-------------------------------------------------------------------------------
+
+#-------------------------------------------------------------------------------
+#
+# Function read_os_release
+#
+# Get NAME from the first os-release file of RELEASE_FILES.
+#
+# Inputs
+# ------
+#    @param: None
+#
+# Returns
+# -------
+#    @return: name - '' when there is none
+#
+# Raises
+# ------
+#    ...
+#
+#-------------------------------------------------------------------------------
+def read_os_release():
+    for filename in RELEASE_FILES[:2]:
+        try:
+            with open(filename) as file_:
+                for line in file_:
+                    key, sep, value = line.strip().partition('=')
+                    if key == 'NAME':
+                        return value.strip('"\'')
+        except OSError:
+            continue
+    return ''
+
+#-------------------------------------------------------------------------------
+#
+# Function get_distro_id
+#
+# Get the name of the running distribution, as returned by
+# linux_distribution()[0].  Beneath a SORCERY_ROOT other than /, the
+# name is read from the os-release file of that root, if it has one.
+#
+# Inputs
+# ------
+#    @param: None
+#
+# Returns
+# -------
+#    @return: distro_id
+#
+# Raises
+# ------
+#    ...
+#
+#-------------------------------------------------------------------------------
+@cache.cached(maxsize=1, disk=True, depends=RELEASE_FILES)
+def get_distro_id():
+    if SORCERY_ROOT != '/':
+        name = read_os_release()
+        if name:
+            return name
+    return importlib.import_module('distro').name()
+
+#-------------------------------------------------------------------------------
+#
+# Function get_pkg_mgr
+#
+# Get the package manager of the running distribution, or the one
+# PYSORCERY_PKG_MGR names.
+#
+# Inputs
+# ------
+#    @param: None
+#
+# Returns
+# -------
+#    @return: pkg_mgr - 'apt', 'smgl', ...
+#
+# Raises
+# ------
+#    @raises: KeyError - the distribution is not supported
+#
+#-------------------------------------------------------------------------------
+def get_pkg_mgr():
+    if PKG_MGR:
+        return PKG_MGR
+    return distro_group[get_distro_id()]
+
+#-------------------------------------------------------------------------------
+#
+# Function __getattr__
+#
+# distro_id is detected on first access, and the rest of the distro
+# library is still available through this module.
+#
+# Inputs
+# ------
+#    @param: name
+#
+# Returns
+# -------
+#    @return: attribute
+#
+# Raises
+# ------
+#    @raises: AttributeError
+#
+#-------------------------------------------------------------------------------
+def __getattr__(name):
+    if name == 'distro_id':
+        return get_distro_id()
+    return getattr(importlib.import_module('distro'), name)
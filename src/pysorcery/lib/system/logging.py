@@ -41,6 +41,8 @@
 import logging
 from logging import *
 import copy
+import sys
+import threading
 
 # 3rd Party Libraries
 
@@ -116,6 +118,43 @@ logging.addLevelName(27, "INFO7")
 logging.addLevelName(28, "INFO8")
 logging.addLevelName(29, "INFO9")
 
+# Logger methods short-circuited by refresh() while their level is
+# disabled
+LevelMethods = {
+    'debug': DEBUG,
+    'debug2': DEBUG2,
+    'debug3': DEBUG3,
+    'debug4': DEBUG4,
+    'debug5': DEBUG5,
+    'debug6': DEBUG6,
+    'debug7': DEBUG7,
+    'debug8': DEBUG8,
+    'debug9': DEBUG9,
+    'debug10': DEBUG10,
+    'vinfo1': VINFO1,
+    'vinfo2': VINFO2,
+    'vinfo3': VINFO3,
+    'vinfo4': VINFO4,
+    'vinfo5': VINFO5,
+    'vinfo6': VINFO6,
+    'vinfo7': VINFO7,
+    'vinfo8': VINFO8,
+    'vinfo9': VINFO9,
+    'info': INFO,
+    'info1': INFO1,
+    'info2': INFO2,
+    'info3': INFO3,
+    'info4': INFO4,
+    'info5': INFO5,
+    'info6': INFO6,
+    'info7': INFO7,
+    'info8': INFO8,
+    'info9': INFO9,
+}
+
+# Code flag of function bodies, as inspect.CO_NEWLOCALS
+CO_NEWLOCALS = 0x2
+
 colortext = text.ConsoleText()
 #-----------------------------------------------------------------------
 #
@@ -147,6 +186,32 @@ colortext = text.ConsoleText()
 #
 #-----------------------------------------------------------------------
 class LocalLogger(Logger):
+    #-------------------------------------------------------------------
+    #
+    # Function setLevel
+    #
+    # Set the level, then re-check which level methods are disabled on
+    # this logger and the ones below it.
+    #
+    # Inputs
+    # ------
+    #    @param: self
+    #    @param: level
+    #
+    # Returns
+    # -------
+    #    @return: None
+    #
+    # Raises
+    # ------
+    #    ...
+    #
+    #-------------------------------------------------------------------
+    def setLevel(self, level):
+        super(LocalLogger, self).setLevel(level)
+        refresh()
+        return
+
     #-------------------------------------------------------------------
     #
     # Function debug2
@@ -1170,6 +1235,9 @@ local_manager.loggerClass = LocalLogger
 # Functions
 #
 # getLogger
+# discard
+# refresh
+# trace
 # verifydebuglevels
 #
 #-----------------------------------------------------------------------
@@ -1198,6 +1266,124 @@ local_manager.loggerClass = LocalLogger
 #-----------------------------------------------------------------------
 def getLogger(name=None):  # noqa
     if name:
-        return local_manager.getLogger(name)
+        logger = local_manager.getLogger(name)
+        refresh(logger)
+        return logger
     else:
         return Logger.root
+
+#-----------------------------------------------------------------------
+#
+# Function discard
+#
+# Stands in for a disabled level method, so the call returns before
+# the message or its arguments are looked at.
+#
+# Inputs
+# ------
+#    @param: *args
+#    @param: **kwargs
+#
+# Returns
+# -------
+#    @return: None
+#
+# Raises
+# ------
+#    ...
+#
+#-----------------------------------------------------------------------
+def discard(*args, **kwargs):
+    return
+
+#-----------------------------------------------------------------------
+#
+# Function refresh
+#
+# Replace each level method that is disabled on a logger with
+# discard(), and restore the ones that are enabled.  Called whenever a
+# LocalLogger level changes and for each new logger; call it directly
+# after changing the level of the root logger or logging.disable().
+#
+# Inputs
+# ------
+#    @param: logger - a single logger, default every LocalLogger
+#
+# Returns
+# -------
+#    @return: None
+#
+# Raises
+# ------
+#    ...
+#
+#-----------------------------------------------------------------------
+def refresh(logger=None):
+    if logger is None:
+        loggers = list(local_manager.loggerDict.values())
+    else:
+        loggers = [logger]
+
+    for logger in loggers:
+        if not isinstance(logger, LocalLogger):
+            continue
+        for method, level in LevelMethods.items():
+            if logger.isEnabledFor(level):
+                logger.__dict__.pop(method, None)
+            else:
+                logger.__dict__[method] = discard
+    return
+
+#-----------------------------------------------------------------------
+#
+# Function trace
+#
+# Log 'Begin Function' and 'End Function' at DEBUG for every call into
+# and return from a module under prefix, through the logger of that
+# module.  Installed with sys.setprofile() for this and new threads, so
+# nothing is paid unless tracing was asked for (--trace).
+#
+# Inputs
+# ------
+#    @param: enable - False removes the tracer
+#    @param: prefix - module name prefix to trace
+#
+# Returns
+# -------
+#    @return: None
+#
+# Raises
+# ------
+#    ...
+#
+#-----------------------------------------------------------------------
+def trace(enable=True, prefix='pysorcery'):
+    if not enable:
+        sys.setprofile(None)
+        threading.setprofile(None)
+        return
+
+    messages = {'call': 'Begin Function', 'return': 'End Function'}
+
+    def tracer(frame, event, arg):
+        message = messages.get(event)
+        if message is None:
+            return
+        name = frame.f_globals.get('__name__', '')
+        if not name.startswith(prefix) or name == __name__:
+            return
+        # Module and class bodies, comprehensions and lambdas
+        code = frame.f_code
+        if not code.co_flags & CO_NEWLOCALS or code.co_name.startswith('<'):
+            return
+        logger = getLogger(name)
+        if not logger.isEnabledFor(DEBUG):
+            return
+        record = logger.makeRecord(logger.name, DEBUG, code.co_filename,
+                                   frame.f_lineno, message, (), None,
+                                   func=code.co_name)
+        logger.handle(record)
+
+    sys.setprofile(tracer)
+    threading.setprofile(tracer)
+    return
@@ -28,6 +28,15 @@
 #    Provides additional functionality to the Mimetypes library from
 #    Python.
 #
+#    detect_type() identifies a file by its content: the first
+#    MAGIC_SIZE bytes are read once and matched against Signatures.
+#    The start of gzip, xz and lzma files is decompressed and matched
+#    again, so a renamed tarball is still a tarball.  Files without a
+#    known signature, and files that do not exist yet, are identified
+#    by their extension.  Results are cached by inode and mtime.
+#
+#        mime, encoding = mimetypes.detect_type('download')
+#
 #-----------------------------------------------------------------------
 
 #-----------------------------------------------------------------------
@@ -38,6 +47,11 @@
 
 # System Libraries
 from mimetypes import *
+import lzma
+import os
+import re
+import stat
+import zlib
 
 # 3rd Party Libraries
 
@@ -45,6 +59,7 @@ from mimetypes import *
 # System Library Overrides
 from pysorcery.lib.system import logging
 # Other Application Libraries
+from pysorcery.lib.util import cache
 
 # Other Optional Libraries
 
@@ -220,6 +235,79 @@ ArchiveCompressions = ('bzip2', 'compress', 'gzip', 'lzip', 'lzma', 'xz')
 # internal MIME database
 mimedb = None
 
+# Bytes read from the start of a file to match Signatures
+MAGIC_SIZE = 4096
+
+# Decompressed bytes matched inside gzip, xz and lzma files
+PEEK_SIZE = 1024
+
+# ISO 9660 volume descriptor, beyond MAGIC_SIZE
+ISO_OFFSET = 32769
+ISO_MAGIC = b'CD001'
+
+# Signatures: (offset, pattern, mimetype, encoding).  The first match
+# wins, so more specific signatures come first.  A compression has no
+# mimetype of its own; see detect_type().  Signatures short enough to
+# turn up in other files are in WeakSignatures, and lose to the
+# extension.
+Signatures = (
+    (257, rb'ustar(?:\x00|  \x00)', 'application/x-tar', None),
+    (0, rb'\x1f\x8b\x08', None, 'gzip'),
+    (0, rb'BZh[1-9](?:1AY&SY|\x17rE8P\x90)', None, 'bzip2'),
+    (0, rb'\xfd7zXZ\x00', None, 'xz'),
+    (0, rb'LZIP[\x00\x01]', None, 'lzip'),
+    (0, rb'\x1f\x9d[\x09-\x10\x89-\x90]', None, 'compress'),
+    (0, rb'\x89LZO\x00\r\n\x1a\n', 'application/x-lzop', None),
+    (0, rb'PK(?:\x03\x04|\x05\x06|\x07\x08)', 'application/zip', None),
+    (0, rb"7z\xbc\xaf'\x1c", 'application/x-7z-compressed', None),
+    (0, rb'Rar!\x1a\x07(?:\x00|\x01\x00)', 'application/x-rar', None),
+    (0, rb'MSCF\x00\x00\x00\x00', 'application/vnd.ms-cab-compressed', None),
+    (0, rb'ITSF\x03\x00\x00\x00', 'application/x-chm', None),
+    (7, rb'\*\*ACE\*\*', 'application/x-ace', None),
+    (2, rb'-l(?:h[0-7d]|z[s45])-', 'application/x-lha', None),
+    (20, rb'\xdc\xa7\xc4\xfd', 'application/x-zoo', None),
+    (0, rb'ALZ\x01', 'application/x-alzip', None),
+    (0, rb'RZIP[\x01\x02][\x00-\x09]', 'application/x-rzip', None),
+    (0, rb'LRZI\x00[\x00-\x0f]', 'application/x-lrzip', None),
+    (0, rb'conectix', 'application/x-vhd', None),
+    # header size up to 2600, then the main header: file type 2
+    (0, rb'\x60\xea[\x00-\xff][\x00-\x0a][\x00-\xff]{6}\x02',
+     'application/x-arj', None),
+    (0, rb'!<arch>\ndebian-binary', 'application/x-debian-package', None),
+    (0, rb'!<arch>\n', 'application/x-archive', None),
+    (0, rb'\xed\xab\xee\xdb', 'application/x-rpm', None),
+    (0, rb'fLaC', 'audio/flac', None),
+    # version 3800 to 4095
+    (0, rb'MAC [\x00-\xff][\x0e\x0f]', 'audio/x-ape', None),
+    (0, rb'ajkg[\x01-\x03]', 'audio/x-shn', None),
+    (0, rb'ID3[\x02-\x04]\x00', 'audio/mpeg', None),
+    (4, rb'ftypM4A ', 'audio/x-m4a', None),
+    (4, rb'ftypqt  ', 'video/quicktime', None),
+    (4, rb'ftyp', 'video/mp4', None),
+    (0, rb'\x1a\x45\xdf\xa3', 'video/x-matroska', None),
+)
+
+WeakSignatures = (
+    (0, rb'\x5d\x00\x00[\x00-\xff]\x00', None, 'lzma'),
+    (0, rb'(?:7kSt|zPQ)', 'application/zpaq', None),
+    (0, rb'DMS!', 'application/x-dms', None),
+    (0, rb'(?:07070[127]|\xc7\x71|\x71\xc7)', 'application/x-cpio', None),
+    (0, rb'\xff[\xf2\xf3\xfa\xfb]', 'audio/mpeg', None),
+)
+
+# Every signature in one pattern, a group each, matched at the start
+MagicPattern = re.compile(
+    b'|'.join(b'(.{%d}%s)' % (offset, pattern)
+              for offset, pattern, mimetype, encoding
+              in Signatures + WeakSignatures),
+    re.DOTALL)
+
+# Compressions whose start decompresses without reading far
+PeekEncodings = ('gzip', 'xz', 'lzma')
+
+# (device, inode) -> signature match, stamped with mtime and size
+MagicCache = cache.Cache('mimetypes.magic', maxsize=1024)
+
 #-----------------------------------------------------------------------
 #
 # Classes
@@ -234,6 +322,11 @@ mimedb = None
 # add_mimedb_data
 # add_mimetypes
 # check_types
+# match_magic
+# peek_compressed
+# read_magic
+# guess_type_by_name
+# detect_type
 #
 #-----------------------------------------------------------------------
 
@@ -260,9 +353,9 @@ def init_mimedb():
     """Initialize the internal MIME database."""
     global mimedb
     try:
-        mimedb = mimetypes.MimeTypes(strict=False)
+        mimedb = MimeTypes(strict=False)
     except Exception as msg:
-        log_error("could not initialize MIME database: %s" % msg)
+        logger.error("could not initialize MIME database: %s", msg)
         return
     add_mimedb_data(mimedb)
     return
@@ -391,3 +484,184 @@ def check_type(format_, encoding):
     if encoding is not None and encoding not in ArchiveCompressions:
         raise Exception("Unkonwn archive compression `%s'" % encoding)
     return
+
+#-----------------------------------------------------------------------
+#
+# Function match_magic
+#
+# Match data against Signatures and WeakSignatures.
+#
+# Inputs
+# ------
+#    @param: data - the start of a file
+#
+# Returns
+# -------
+#    @return: (mimetype, encoding, weak)
+#    @return: None - no signature matches
+#
+# Raises
+# ------
+#    ...
+#
+#-----------------------------------------------------------------------
+def match_magic(data):
+    match = MagicPattern.match(data)
+    if match is None:
+        return None
+    signatures = Signatures + WeakSignatures
+    offset, pattern, mimetype, encoding = signatures[match.lastindex - 1]
+    return mimetype, encoding, match.lastindex > len(Signatures)
+
+#-----------------------------------------------------------------------
+#
+# Function peek_compressed
+#
+# Decompress the start of a gzip, xz or lzma file.
+#
+# Inputs
+# ------
+#    @param: data     - the start of the file
+#    @param: encoding
+#
+# Returns
+# -------
+#    @return: data - up to PEEK_SIZE bytes, empty when data does not
+#                    decompress
+#
+# Raises
+# ------
+#    ...
+#
+#-----------------------------------------------------------------------
+def peek_compressed(data, encoding):
+    try:
+        if encoding == 'gzip':
+            # 16 + window bits: expect a gzip header
+            decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        else:
+            decompressor = lzma.LZMADecompressor()
+        return decompressor.decompress(data, PEEK_SIZE)
+    except (zlib.error, lzma.LZMAError, EOFError):
+        return b''
+
+#-----------------------------------------------------------------------
+#
+# Function read_magic
+#
+# Identify a file by its signature.  Compressed files are identified
+# by their compression, and by what they contain when that is found in
+# the first PEEK_SIZE decompressed bytes.
+#
+# Inputs
+# ------
+#    @param: filename
+#
+# Returns
+# -------
+#    @return: (mimetype, encoding, weak) - mimetype is None for
+#                                          compressed files of unknown
+#                                          content
+#    @return: None - no signature matches, or not a regular file
+#
+# Raises
+# ------
+#    ...
+#
+#-----------------------------------------------------------------------
+def read_magic(filename):
+    try:
+        st = os.stat(filename)
+    except OSError:
+        return None
+    if not stat.S_ISREG(st.st_mode):
+        return None
+
+    key = (st.st_dev, st.st_ino)
+    stamp = (st.st_mtime_ns, st.st_size)
+    found = MagicCache.get(key, stamp)
+    if found is not cache.MISSING:
+        return found
+
+    try:
+        with open(filename, 'rb') as fileobj:
+            data = fileobj.read(MAGIC_SIZE)
+            found = match_magic(data)
+            if found is None and st.st_size >= ISO_OFFSET + len(ISO_MAGIC):
+                fileobj.seek(ISO_OFFSET)
+                if fileobj.read(len(ISO_MAGIC)) == ISO_MAGIC:
+                    found = ('application/x-iso9660-image', None, False)
+    except OSError as msg:
+        logger.debug('Cannot read %s: %s', filename, msg)
+        return None
+
+    if found is not None and found[1] in PeekEncodings:
+        inner = match_magic(peek_compressed(data, found[1]))
+        if inner is not None and inner[1] is None and not inner[2]:
+            found = (inner[0],) + found[1:]
+
+    MagicCache.set(key, found, stamp)
+    return found
+
+#-----------------------------------------------------------------------
+#
+# Function guess_type_by_name
+#
+# Identify a file by its extension, using the internal MIME database.
+#
+# Inputs
+# ------
+#    @param: filename
+#
+# Returns
+# -------
+#    @return: (mimetype, encoding) - as mimetypes.guess_type()
+#
+# Raises
+# ------
+#    ...
+#
+#-----------------------------------------------------------------------
+def guess_type_by_name(filename):
+    if mimedb is None:
+        init_mimedb()
+    if mimedb is None:
+        return guess_type(filename)
+    return mimedb.guess_type(filename, strict=False)
+
+#-----------------------------------------------------------------------
+#
+# Function detect_type
+#
+# Identify a file by its content, else by its extension.  A compressed
+# file whose content is not recognized, for example a bzip2 file, takes
+# the mimetype of its extension when that names the same compression:
+# foo.tar.bz2 is a tar archive, a renamed one a compressed file.  A
+# weak signature only counts for files without a known extension.
+#
+# Inputs
+# ------
+#    @param: filename
+#
+# Returns
+# -------
+#    @return: (mimetype, encoding) - as mimetypes.guess_type()
+#
+# Raises
+# ------
+#    ...
+#
+#-----------------------------------------------------------------------
+def detect_type(filename):
+    found = read_magic(filename)
+    if found is not None:
+        mimetype, encoding, weak = found
+        if mimetype is not None and not weak:
+            return mimetype, encoding
+
+    guessed = guess_type_by_name(filename)
+    if found is None \
+       or (encoding is not None and guessed[1] == encoding) \
+       or (weak and guessed != (None, None)):
+        return guessed
+    return mimetype, encoding
@@ -131,10 +131,9 @@ _extensions = {
 #
 #-----------------------------------------------------------------------
 def init_formats(format_type):
-    logger.debug('Begin Function')
     available_formats = util.get_cmd_types(format_type)
 
-    logger.debug2('Available Formats: ' + str(available_formats))
+    logger.debug2('Available Formats: %s', available_formats)
     
     archive_cmd = ['extract','create']
     compress_cmd = ['decompress','compress']
@@ -148,20 +147,20 @@ def init_formats(format_type):
         for i in available_formats:
             if (i == 'tar' or
                 i == 'zip'):
-                logger.debug2('Skipping Module: ' + str(i))
+                logger.debug2('Skipping Module: %s', i)
             else:
-                logger.debug2('Adding Module: ' + str(i))
-                logger.debug2('Format: ' + str(format_type))
-                logger.debug2('Extension: ' + str(_extensions[i]))
+                logger.debug2('Adding Module: %s', i)
+                logger.debug2('Format: %s', format_type)
+                logger.debug2('Extension: %s', _extensions[i])
                 func = util.get_module_func(format_type,
                                             i,
                                             x)
 
                 if x == cmd[format_type][1]:
-                    logger.debug2('Adding Archive Format: ' + str(i))
-                    logger.debug2('Command: ' + str(x))
-                    logger.debug2('Format: ' + str(format_type))
-                    logger.debug2('Extension: ' + str(_extensions[i]))
+                    logger.debug2('Adding Archive Format: %s', i)
+                    logger.debug2('Command: %s', x)
+                    logger.debug2('Format: %s', format_type)
+                    logger.debug2('Extension: %s', _extensions[i])
                     description = i + ' File'
                     register_archive_format(i,func, None, description)
                 elif x == cmd[format_type][0]:
@@ -172,20 +171,19 @@ def init_formats(format_type):
                                                _extensions[i],
                                                func, None,
                                                description)
-                        logger.debug2('Adding Unpack Format: ' + str(i))
-                        logger.debug3('Command: ' + str(x))
-                        logger.debug3('Format: ' + str(format_type))
-                        logger.debug3('Extension: ' + str(_extensions[i]))
+                        logger.debug2('Adding Unpack Format: %s', i)
+                        logger.debug3('Command: %s', x)
+                        logger.debug3('Format: %s', format_type)
+                        logger.debug3('Extension: %s', _extensions[i])
                     except:
-                        logger.error('Error Adding Unpack Format: ' + str(i))
-                        logger.error('Command: ' + str(x))
-                        logger.error('Format: ' + str(format_type))
-                        logger.error('Extension: ' + str(_extensions[i]))
+                        logger.error('Error Adding Unpack Format: %s', i)
+                        logger.error('Command: %s', x)
+                        logger.error('Format: %s', format_type)
+                        logger.error('Extension: %s', _extensions[i])
 
                 else:
                     logger.error('Error itializing module functions')
 
     logger.debug2(get_unpack_formats())
     logger.debug2(get_archive_formats())
-    logger.debug('End Function')
     return
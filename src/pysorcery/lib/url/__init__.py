@@ -76,12 +76,9 @@ logger = logging.getLogger(__name__)
 #-------------------------------------------------------------------------------
 class BaseURI():
     def __init__(self,uri, download_dir=None):
-        logger.debug('Begin Function')
-
         self.uri = uri
         self.download_dir = download_dir
 
-        logger.debug('End Function')
         return
 
 #-------------------------------------------------------------------------------
@@ -99,8 +96,6 @@ class HTTPUri(BaseURI):
     #
     #-------------------------------------------------------------------------------
     def download(self):
-        logger.debug('Begin Function')
-
         u = urllib.request.urlopen(self.uri)
         scheme, netloc, path, query, fragment = urllib.parse.urlsplit(self.uri)
         filename = os.path.basename(path)
@@ -135,7 +130,6 @@ class HTTPUri(BaseURI):
                     print(status, end="")
                 print()
 
-        logger.debug('End Function')
         return
 
 #-------------------------------------------------------------------------------
@@ -153,9 +147,6 @@ class FTPUri(BaseURI):
     #
     #-------------------------------------------------------------------------------
     def download(self):
-        logger.debug('Begin Function')
-
-        logger.debug('End Function')
         return
 
 #-------------------------------------------------------------------------------
@@ -173,9 +164,6 @@ class RsyncUri(BaseURI):
     #
     #-------------------------------------------------------------------------------
     def download(self):
-        logger.debug('Begin Function')
-
-        logger.debug('End Function')
         return
 
 #-------------------------------------------------------------------------------
@@ -193,9 +181,6 @@ class GitUri(BaseURI):
     #
     #-------------------------------------------------------------------------------
     def download(self):
-        logger.debug('Begin Function')
-
-        logger.debug('End Function')
         return
 
 #-------------------------------------------------------------------------------
@@ -213,9 +198,6 @@ class CVSUri(BaseURI):
     #
     #-------------------------------------------------------------------------------
     def download(self):
-        logger.debug('Begin Function')
-
-        logger.debug('End Function')
         return
 
 #-------------------------------------------------------------------------------
@@ -233,9 +215,6 @@ class SVNUri(BaseURI):
     #
     #-------------------------------------------------------------------------------
     def download(self):
-        logger.debug('Begin Function')
-
-        logger.debug('End Function')
         return
 
 #-------------------------------------------------------------------------------
@@ -253,9 +232,6 @@ class TorrentUri(BaseURI):
     #
     #-------------------------------------------------------------------------------
     def download(self):
-        logger.debug('Begin Function')
-
-        logger.debug('End Function')
         return
 
 #-------------------------------------------------------------------------------
@@ -287,12 +263,9 @@ class URI(HTTPUri,
     #
     #-------------------------------------------------------------------------------
     def download(self):
-        logger.debug('Begin Function')
-
         if self.uri.startswith('http'):
             HTTPUri.download(self)
         else:
             logger.error('We Fucked Up')
             
-        logger.debug('End Function')
         return
@@ -44,7 +44,6 @@ Provides common utilities.
 import glob
 import importlib
 import os
-import pkg_resources
 from shutil import which
 import subprocess
 
@@ -56,7 +55,10 @@ import subprocess
 from pysorcery.lib.system import logging
 # Other Application Libraries
 from pysorcery import lib
+from pysorcery.lib.util import cache
+from pysorcery.lib.util import profiling
 from pysorcery.lib.util import text
+from pysorcery.lib.util import tools
 
 # Conditional Libraries
 
@@ -72,24 +74,30 @@ logger = logging.getLogger(__name__)
 # Allow Color text on console
 colortext = text.ConsoleText()
 
-# Set paths for sorcery resources:
+# Set paths for sorcery resources, relative to the installed package
+# rather than through pkg_resources, which is slow to import.
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))))
+
 # Utilities and Files
-UTIL_FILE_PATH = pkg_resources.resource_filename('pysorcery',
-                                                    'lib/files/')
-UTIL_ARCHIVE_PATH = pkg_resources.resource_filename('pysorcery',
-                                                    'lib/files/archive/')
-UTIL_COMPRESSED_PATH = pkg_resources.resource_filename('pysorcery',
-                                                       'lib/files/compressed/')
-UTIL_URL_PATH = pkg_resources.resource_filename('pysorcery',
-                                                'lib/url/')
+UTIL_FILE_PATH = os.path.join(PACKAGE_DIR, 'lib/files/')
+UTIL_ARCHIVE_PATH = os.path.join(PACKAGE_DIR, 'lib/files/archive/')
+UTIL_COMPRESSED_PATH = os.path.join(PACKAGE_DIR, 'lib/files/compressed/')
+UTIL_URL_PATH = os.path.join(PACKAGE_DIR, 'lib/url/')
 
 # Command Plugins
-ARCHIVE_PATH = pkg_resources.resource_filename('pysorcery', 'plugins/archive/')
-GAZE_PATH = pkg_resources.resource_filename('pysorcery', 'plugins/gaze/')
+ARCHIVE_PATH = os.path.join(PACKAGE_DIR, 'plugins/archive/')
+GAZE_PATH = os.path.join(PACKAGE_DIR, 'plugins/gaze/')
 
 # Sorcecy
-SORCERY_APT_PATH = pkg_resources.resource_filename('pysorcery','lib/sorcery/apt/')
-SORCERY_SMGL_PATH = pkg_resources.resource_filename('pysorcery','lib/sorcery/smgl/')
+SORCERY_APT_PATH = os.path.join(PACKAGE_DIR, 'lib/sorcery/apt/')
+SORCERY_SMGL_PATH = os.path.join(PACKAGE_DIR, 'lib/sorcery/smgl/')
+
+# Root of the system being managed.  Every absolute sorcery state path
+# (/etc/sorcery, /var/lib/sorcery, /var/state/sorcery, /var/log/sorcery)
+# is resolved beneath it, so a synthetic tree can stand in for the real
+# one.  It is read once at import; set PYSORCERY_ROOT before starting.
+SORCERY_ROOT = os.environ.get('PYSORCERY_ROOT', '/')
 
 cmd_dir = {
     'util_archive': UTIL_ARCHIVE_PATH,
@@ -128,102 +136,7 @@ ArchiveModules = {
 #
 # Classes
 #
-# memoized
-#
-#-----------------------------------------------------------------------
-
-#-----------------------------------------------------------------------
-#
-# Class memoized
-#
-# Decorator that caches a function's return value each time it is
-# called.  If called later with the same arguments, the cached value is
-# returned, and not re-evaluated.
-#
-# Inputs
-# ------
-#     @param: self
-#     @param: func
-#
-# Returns
-# -------
-#     @return: None
-#
-# Raises
-# ------
-#    ...
-#
 #-----------------------------------------------------------------------
-class memoized (object):
-    """Decorator that caches a function's return value each time it is called.
-    If called later with the same arguments, the cached value is returned, and
-    not re-evaluated."""
-
-    def __init__(self, func):
-        """Set func and init cache."""
-        self.func = func
-        self.cache = {}
-        return
-
-    #-------------------------------------------------------------------
-    #
-    # Function __call__
-    #
-    # Try to find result for function arguments in local cache or
-    # execute the function and fill the cache with the result.
-    #
-    # Inputs
-    # ------
-    #     @param: self -
-    #     @param: *args -
-    #
-    # Returns
-    # -------
-    #     @return: self.cache[args]
-    #     @return: value
-    #     @return: self.func(*args)
-    #
-    # Raises
-    # ------
-    #    ...
-    #
-    #-------------------------------------------------------------------
-    def __call__(self, *args):
-        """Try to find result for function arguments in local cache or
-        execute the function and fill the cache with the result."""
-        try:
-            return self.cache[args]
-        except KeyError:
-            self.cache[args] = value = self.func(*args)
-            return value
-        except TypeError:
-            # uncachable -- for instance, passing a list as an argument.
-            # Better to not cache than to blow up entirely.
-            return self.func(*args)
-
-    #-------------------------------------------------------------------
-    #
-    # Function __repr__
-    #
-    # Return the function's docstring.
-    #
-    # Inputs
-    # ------
-    #     @param: self
-    #
-    # Returns
-    # -------
-    #     @return: self.func.__doc__
-    #
-    # Raises
-    # ------
-    #    ...
-    #
-    #-------------------------------------------------------------------
-    def __repr__(self):
-        """Return the function's docstring."""
-        return self.func.__doc__
-
 
 #-----------------------------------------------------------------------
 #
@@ -232,6 +145,7 @@ class memoized (object):
 # strlist_with_or
 # shell_quote
 # shell_quote_nt
+# root_path
 # get_cmd_types
 # get_cmd_func
 #
@@ -344,10 +258,11 @@ def shell_quote_nt (value):
 def run (cmd, verbosity=0, **kwargs):
     """Run command without error checking.
     @return: command return code"""
+    program = os.path.basename(cmd[0])
     # Note that shell_quote_nt() result is not suitable for copy-paste
     # (especially on Unix systems), but it looks nicer than shell_quote().
     if verbosity >= 0:
-        logger.info("running %s" % " ".join(map(shell_quote_nt, cmd)))
+        logger.info("running %s", " ".join(map(shell_quote_nt, cmd)))
     if kwargs:
         if verbosity >= 0:
             logger.info("    with %s"
@@ -358,13 +273,14 @@ def run (cmd, verbosity=0, **kwargs):
         if kwargs.get("shell"):
             # for shell calls the command must be a string
             cmd = " ".join(cmd)
-    if verbosity < 1:
-        # hide command output on stdout
-        with open(os.devnull, 'wb') as devnull:
-            kwargs['stdout'] = devnull
+    with profiling.span('run', program):
+        if verbosity < 1:
+            # hide command output on stdout
+            with open(os.devnull, 'wb') as devnull:
+                kwargs['stdout'] = devnull
+                res = subprocess.call(cmd, **kwargs)
+        else:
             res = subprocess.call(cmd, **kwargs)
-    else:
-        res = subprocess.call(cmd, **kwargs)
     return res
 
 #-----------------------------------------------------------------------
@@ -417,8 +333,6 @@ def run_checked (cmd, ret_ok=(0,), **kwargs):
 #
 #-----------------------------------------------------------------------
 def get_cmd_types(cmd_class=None, path=None):
-    logger.debug('Begin Function')
-
     # Use [a-z] to allow finding directories, but ignoring
     # '__pycache__', etc
     if path is not None:
@@ -438,8 +352,7 @@ def get_cmd_types(cmd_class=None, path=None):
             supformats.append(os.path.basename(f)[:-3])
 
     supformats.sort()
-    logger.debug('Return: ' + str(supformats))
-    logger.debug('End Function')
+    logger.debug('Return: %s', supformats)
     return supformats
 
 #-----------------------------------------------------------------------
@@ -466,8 +379,6 @@ def get_cmd_types(cmd_class=None, path=None):
 #
 #-----------------------------------------------------------------------
 def get_module_func(*args, **kwargs):
-    logger.debug('Begun Function')
-
     scmd = kwargs['scmd']
     program = kwargs['program']
     command = kwargs['cmd']
@@ -495,7 +406,8 @@ def get_module_func(*args, **kwargs):
 
     # import the module
     try:
-        module = importlib.import_module(modulename, __name__)
+        with profiling.span('import', modulename):
+            module = importlib.import_module(modulename, __name__)
     except ImportError as msg:
         raise ImportError(msg)
     # get archive handler function (eg. patoolib.programs.star.extract_tar)
@@ -508,9 +420,33 @@ def get_module_func(*args, **kwargs):
         raise AttributeError(msg)
 
         logger.error(msg)
-        logger.debug('End Function')
         return
 
+#-----------------------------------------------------------------------
+#
+# Function root_path
+#
+# Resolve an absolute system path beneath SORCERY_ROOT.  With the
+# default root of '/' the path is returned unchanged.
+#
+# Inputs
+# ------
+#    @param: path - absolute path, as on a live system
+#
+# Returns
+# -------
+#    @return: path
+#
+# Raises
+# ------
+#    ...
+#
+#-----------------------------------------------------------------------
+def root_path(path):
+    if SORCERY_ROOT == '/':
+        return path
+    return os.path.join(SORCERY_ROOT, path.lstrip('/'))
+
 #-----------------------------------------------------------------------
 #
 # Function system_search_path
@@ -543,7 +479,8 @@ def system_search_path():
 #
 # Function find_program
 #
-# Look for program in environment PATH variable.
+# Look for program in environment PATH variable, through the tools
+# registry outside Windows.
 #
 # Inputs
 # ------
@@ -551,14 +488,14 @@ def system_search_path():
 #
 # Returns
 # -------
-#    @return: which(program, path=path)
+#    @return: filename - None when not found
 #
 # Raises
 # ------
 #    ...
 #
 #-----------------------------------------------------------------------
-@memoized
+@cache.cached(stamp=lambda program: system_search_path())
 def find_program (program):
     """Look for program in environment PATH variable."""
     if os.name == 'nt':
@@ -567,10 +504,8 @@ def find_program (program):
         path = append_to_path(path, get_nt_7z_dir())
         path = append_to_path(path, get_nt_mac_dir())
         path = append_to_path(path, get_nt_winrar_dir())
-    else:
-        # use default path
-        path = None
-    return which(program, path=path)
+        return which(program, path=path)
+    return tools.find(program, system_search_path())
 
 #-----------------------------------------------------------------------
 #
@@ -0,0 +1,790 @@
+#! /usr/bin/env python3
+#-----------------------------------------------------------------------
+#
+# Original BASH version
+# Original version Copyright 2001 by Kyle Sallee
+# Additions/corrections Copyright 2002 by the Source Mage Team
+#
+# Python rewrite
+# Copyright 2017 Geoff S Derber
+#
+# File: pysorcery/lib/util/cache.py
+#
+# This file is part of Sorcery.
+#
+#    Sorcery is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published
+#    by the Free Software Foundation, either version 3 of the License,
+#    or (at your option) any later version.
+#
+#    Sorcery is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with Sorcery.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Cache:
+#
+#    Provides bounded, thread safe result caches with LRU and TTL
+#    eviction, invalidation stamps (such as file mtimes) and an
+#    optional on-disk tier shared between processes.
+#
+#-----------------------------------------------------------------------
+"""
+Cache:
+
+Provides bounded, thread safe result caches with LRU and TTL eviction,
+invalidation stamps (such as file mtimes) and an optional on-disk tier
+shared between processes.
+"""
+#-----------------------------------------------------------------------
+#
+# Libraries
+#
+#-----------------------------------------------------------------------
+# System Libraries
+from collections import OrderedDict
+import functools
+import glob
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+import time
+
+# 3rd Party Libraries
+
+
+# Application Libraries
+# System Library Overrides
+from pysorcery.lib.system import logging
+# Other Application Libraries
+
+# Conditional Libraries
+
+
+#-----------------------------------------------------------------------
+#
+# Global Variables
+#
+#-----------------------------------------------------------------------
+# Enable Logging
+# create logger
+logger = logging.getLogger(__name__)
+
+# Returned by Cache.get() when there is no usable entry
+MISSING = object()
+
+# Every named cache, for statistics and invalidation
+Caches = {}
+
+# Where the shared on-disk tier lives
+CACHE_DIR = os.environ.get(
+    'PYSORCERY_CACHE_DIR',
+    os.path.join(os.environ.get('XDG_CACHE_HOME',
+                                os.path.expanduser('~/.cache')),
+                 'pysorcery'))
+
+# File stamps kept current by poll_stamps() rather than computed on
+# every call.  Only used by long running processes (pygazed) that call
+# watch_stamps(); None otherwise.
+WatchedStamps = None
+
+#-----------------------------------------------------------------------
+#
+# Classes
+#
+# DiskCache
+# Cache
+#
+#-----------------------------------------------------------------------
+
+#-----------------------------------------------------------------------
+#
+# Class DiskCache
+#
+# A directory of pickled entries shared by every process using the
+# same cache directory.  Entries are written to a temporary file and
+# renamed into place, so readers never see a partial entry.  Any entry
+# that can not be read is treated as missing.
+#
+# Inputs
+# ------
+#    @param: name      - The cache name, used as a sub directory
+#    @param: directory - The top level cache directory
+#
+# Returns
+# -------
+#    @return: None
+#
+# Raises
+# ------
+#    ...
+#
+#-----------------------------------------------------------------------
+class DiskCache():
+    def __init__(self, name, directory=None):
+        if directory is None:
+            directory = CACHE_DIR
+        self.directory = os.path.join(directory, name)
+        return
+
+    #-------------------------------------------------------------------
+    #
+    # Function path
+    #
+    # Get the file an entry is stored in.
+    #
+    # Inputs
+    # ------
+    #    @param: self
+    #    @param: key
+    #
+    # Returns
+    # -------
+    #    @return: filename
+    #
+    # Raises
+    # ------
+    #    ...
+    #
+    #-------------------------------------------------------------------
+    def path(self, key):
+        digest = hashlib.sha1(repr(key).encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, digest)
+
+    #-------------------------------------------------------------------
+    #
+    # Function get
+    #
+    # Inputs
+    # ------
+    #    @param: self
+    #    @param: key
+    #
+    # Returns
+    # -------
+    #    @return: (value, stamp, expires)
+    #    @return: None - no usable entry
+    #
+    # Raises
+    # ------
+    #    ...
+    #
+    #-------------------------------------------------------------------
+    def get(self, key):
+        try:
+            with open(self.path(key), 'rb') as file_:
+                stored_key, entry = pickle.load(file_)
+        except Exception:
+            return None
+
+        # Guard against hash collisions
+        if stored_key != key:
+            return None
+        return entry
+
+    #-------------------------------------------------------------------
+    #
+    # Function set
+    #
+    # Inputs
+    # ------
+    #    @param: self
+    #    @param: key
+    #    @param: entry - (value, stamp, expires)
+    #
+    # Returns
+    # -------
+    #    @return: None
+    #
+    # Raises
+    # ------
+    #    ...
+    #
+    #-------------------------------------------------------------------
+    def set(self, key, entry):
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, tmpname = tempfile.mkstemp(dir=self.directory)
+            with os.fdopen(fd, 'wb') as file_:
+                pickle.dump((key, entry), file_, pickle.HIGHEST_PROTOCOL)
+            os.replace(tmpname, self.path(key))
+        except Exception as msg:
+            logger.debug('Disk cache write failed: %s', msg)
+        return
+
+    #-------------------------------------------------------------------
+    #
+    # Function delete
+    #
+    # Remove one entry, or every entry when key is MISSING.
+    #
+    # Inputs
+    # ------
+    #    @param: self
+    #    @param: key
+    #
+    # Returns
+    # -------
+    #    @return: None
+    #
+    # Raises
+    # ------
+    #    ...
+    #
+    #-------------------------------------------------------------------
+    def delete(self, key=MISSING):
+        if key is MISSING:
+            filenames = [os.path.join(self.directory, f)
+                         for f in os.listdir(self.directory)] \
+                         if os.path.isdir(self.directory) else []
+        else:
+            filenames = [self.path(key)]
+
+        for filename in filenames:
+            try:
+                os.remove(filename)
+            except OSError:
+                pass
+        return
+
+#-----------------------------------------------------------------------
+#
+# Class Cache
+#
+# A bounded least recently used cache.
+#
+# Every entry carries a stamp, such as a tuple of file mtimes, that is
+# compared on lookup.  An entry whose stamp differs from the current
+# one is stale and is discarded.  Entries older than ttl seconds are
+# expired.  When maxsize is reached the least recently used entry is
+# evicted.
+#
+# Inputs
+# ------
+#    @param: name    - Unique name, used for statistics and the disk tier
+#    @param: maxsize - Maximum number of entries held in memory.
+#                      None for unbounded.
+#    @param: ttl     - Seconds an entry is valid for.  None for no limit.
+#    @param: disk    - Also keep entries in the shared on-disk tier
+#
+# Returns
+# -------
+#    @return: None
+#
+# Raises
+# ------
+#    ...
+#
+#-----------------------------------------------------------------------
+class Cache():
+    def __init__(self, name, maxsize=128, ttl=None, disk=False):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.disk = DiskCache(name) if disk else None
+
+        self.lock = threading.RLock()
+        self.entries = OrderedDict()
+        self.stats = {'hits': 0,
+                      'misses': 0,
+                      'disk_hits': 0,
+                      'evictions': 0,
+                      'expired': 0,
+                      'stale': 0,
+                      'uncacheable': 0
+        }
+
+        Caches[name] = self
+        return
+
+    #-------------------------------------------------------------------
+    #
+    # Function valid
+    #
+    # Check an entry against the current stamp and time.
+    #
+    # Inputs
+    # ------
+    #    @param: self
+    #    @param: entry - (value, stamp, expires)
+    #    @param: stamp
+    #
+    # Returns
+    # -------
+    #    @return: True or False
+    #
+    # Raises
+    # ------
+    #    ...
+    #
+    #-------------------------------------------------------------------
+    def valid(self, entry, stamp):
+        value, entry_stamp, expires = entry
+        if entry_stamp != stamp:
+            self.stats['stale'] += 1
+            return False
+        if expires is not None and expires < time.time():
+            self.stats['expired'] += 1
+            return False
+        return True
+
+    #-------------------------------------------------------------------
+    #
+    # Function get
+    #
+    # Look up key in memory, then in the disk tier.
+    #
+    # Inputs
+    # ------
+    #    @param: self
+    #    @param: key
+    #    @param: stamp
+    #
+    # Returns
+    # -------
+    #    @return: value
+    #    @return: MISSING - no valid entry
+    #
+    # Raises
+    # ------
+    #    ...
+    #
+    #-------------------------------------------------------------------
+    def get(self, key, stamp=None):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                if self.valid(entry, stamp):
+                    self.entries.move_to_end(key)
+                    self.stats['hits'] += 1
+                    return entry[0]
+                del self.entries[key]
+
+        if self.disk is not None:
+            entry = self.disk.get(key)
+            with self.lock:
+                if entry is not None and self.valid(entry, stamp):
+                    self.stats['disk_hits'] += 1
+                    self.store(key, entry)
+                    return entry[0]
+
+        with self.lock:
+            self.stats['misses'] += 1
+        return MISSING
+
+    #-------------------------------------------------------------------
+    #
+    # Function set
+    #
+    # Inputs
+    # ------
+    #    @param: self
+    #    @param: key
+    #    @param: value
+    #    @param: stamp
+    #
+    # Returns
+    # -------
+    #    @return: None
+    #
+    # Raises
+    # ------
+    #    ...
+    #
+    #-------------------------------------------------------------------
+    def set(self, key, value, stamp=None):
+        expires = None if self.ttl is None else time.time() + self.ttl
+        entry = (value, stamp, expires)
+        with self.lock:
+            self.store(key, entry)
+        if self.disk is not None:
+            self.disk.set(key, entry)
+        return
+
+    #-------------------------------------------------------------------
+    #
+    # Function store
+    #
+    # Put an entry in memory, evicting the least recently used entries
+    # beyond maxsize.  The caller must hold the lock.
+    #
+    # Inputs
+    # ------
+    #    @param: self
+    #    @param: key
+    #    @param: entry
+    #
+    # Returns
+    # -------
+    #    @return: None
+    #
+    # Raises
+    # ------
+    #    ...
+    #
+    #-------------------------------------------------------------------
+    def store(self, key, entry):
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        if self.maxsize is not None:
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+                self.stats['evictions'] += 1
+        return
+
+    #-------------------------------------------------------------------
+    #
+    # Function invalidate
+    #
+    # Drop one entry, or every entry if no key is given, from memory
+    # and the disk tier.
+    #
+    # Inputs
+    # ------
+    #    @param: self
+    #    @param: key
+    #
+    # Returns
+    # -------
+    #    @return: None
+    #
+    # Raises
+    # ------
+    #    ...
+    #
+    #-------------------------------------------------------------------
+    def invalidate(self, key=MISSING):
+        with self.lock:
+            if key is MISSING:
+                self.entries.clear()
+            else:
+                self.entries.pop(key, None)
+        if self.disk is not None:
+            self.disk.delete(key)
+        return
+
+    #-------------------------------------------------------------------
+    #
+    # Function info
+    #
+    # Inputs
+    # ------
+    #    @param: self
+    #
+    # Returns
+    # -------
+    #    @return: info - statistics, current size and limits
+    #
+    # Raises
+    # ------
+    #    ...
+    #
+    #-------------------------------------------------------------------
+    def info(self):
+        with self.lock:
+            info = dict(self.stats)
+            info['size'] = len(self.entries)
+        info['maxsize'] = self.maxsize
+        info['ttl'] = self.ttl
+        info['disk'] = self.disk is not None
+        return info
+
+#-----------------------------------------------------------------------
+#
+# Functions
+#
+# make_key
+# file_stamp
+# read_stamp
+# watch_stamps
+# poll_stamps
+# cached
+# cache_info
+# invalidate_all
+#
+#-----------------------------------------------------------------------
+
+#-----------------------------------------------------------------------
+#
+# Function make_key
+#
+# Build a hashable key from call arguments.  Lists, sets and dicts are
+# converted to tuples so they can be cached too.
+#
+# Inputs
+# ------
+#    @param: args
+#    @param: kwargs
+#
+# Returns
+# -------
+#    @return: key
+#
+# Raises
+# ------
+#    @raises: TypeError - an argument can not be hashed
+#
+#-----------------------------------------------------------------------
+def make_key(args, kwargs):
+    def freeze(value):
+        if isinstance(value, (list, tuple)):
+            return tuple(freeze(item) for item in value)
+        if isinstance(value, (set, frozenset)):
+            return frozenset(freeze(item) for item in value)
+        if isinstance(value, dict):
+            return tuple(sorted((k, freeze(v)) for k, v in value.items()))
+        return value
+
+    key = (freeze(args), freeze(kwargs))
+    hash(key)
+    return key
+
+#-----------------------------------------------------------------------
+#
+# Function file_stamp
+#
+# Build an invalidation stamp from the mtime and size of each file.
+# Files that do not exist stamp as None, so creating them also
+# invalidates.  Shell style patterns ('/var/state/sorcery/*') are
+# expanded, so adding or removing a matching file also invalidates.
+#
+# After watch_stamps() the stamp is the one poll_stamps() last read,
+# so a change is noticed on the next poll rather than the next call.
+#
+# Inputs
+# ------
+#    @param: filenames
+#
+# Returns
+# -------
+#    @return: stamp
+#
+# Raises
+# ------
+#    ...
+#
+#-----------------------------------------------------------------------
+def file_stamp(filenames):
+    if WatchedStamps is not None:
+        filenames = tuple(filenames)
+        stamp = WatchedStamps.get(filenames)
+        if stamp is None:
+            stamp = WatchedStamps[filenames] = read_stamp(filenames)
+        return stamp
+    return read_stamp(filenames)
+
+#-----------------------------------------------------------------------
+#
+# Function read_stamp
+#
+# Stat the files behind a stamp.  See file_stamp().
+#
+# Inputs
+# ------
+#    @param: filenames
+#
+# Returns
+# -------
+#    @return: stamp
+#
+# Raises
+# ------
+#    ...
+#
+#-----------------------------------------------------------------------
+def read_stamp(filenames):
+    stamp = []
+    for pattern in filenames:
+        if glob.has_magic(pattern):
+            matches = sorted(glob.glob(pattern))
+            if not matches:
+                stamp.append((pattern, None))
+        else:
+            matches = (pattern,)
+
+        for filename in matches:
+            try:
+                st = os.stat(filename)
+                stamp.append((filename, st.st_mtime_ns, st.st_size))
+            except OSError:
+                stamp.append((filename, None))
+    return tuple(stamp)
+
+#-----------------------------------------------------------------------
+#
+# Function watch_stamps
+#
+# Stop statting dependency files on every cached call.  Stamps are read
+# once and then refreshed by poll_stamps().
+#
+# Inputs
+# ------
+#    @param: None
+#
+# Returns
+# -------
+#    @return: None
+#
+# Raises
+# ------
+#    ...
+#
+#-----------------------------------------------------------------------
+def watch_stamps():
+    global WatchedStamps
+    if WatchedStamps is None:
+        WatchedStamps = {}
+    return
+
+#-----------------------------------------------------------------------
+#
+# Function poll_stamps
+#
+# Re-read every watched stamp.
+#
+# Inputs
+# ------
+#    @param: None
+#
+# Returns
+# -------
+#    @return: changed - list of filename tuples whose stamp changed
+#
+# Raises
+# ------
+#    ...
+#
+#-----------------------------------------------------------------------
+def poll_stamps():
+    changed = []
+    if WatchedStamps is None:
+        return changed
+
+    for filenames, stamp in list(WatchedStamps.items()):
+        current = read_stamp(filenames)
+        if current != stamp:
+            WatchedStamps[filenames] = current
+            changed.append(filenames)
+    return changed
+
+#-----------------------------------------------------------------------
+#
+# Function cached
+#
+# Decorator that caches a function's return value in a Cache.
+#
+#    @cached(maxsize=256, depends=lambda grimoire: [grimoire + '/codex.index'])
+#    def read_codex_index(grimoire):
+#        ...
+#
+# The decorated function gains 'cache' (the Cache) and 'func' (the
+# undecorated function) attributes.  Two threads missing on the same
+# key may both run the function; the last result is kept.
+#
+# Inputs
+# ------
+#    @param: maxsize - see Cache
+#    @param: ttl     - see Cache
+#    @param: disk    - see Cache.  Results must be picklable.
+#    @param: depends - Files whose mtimes validate the result.  Either a
+#                      list of filenames, or a function taking the
+#                      same arguments as the decorated function and
+#                      returning one.
+#    @param: stamp   - Function taking the same arguments as the
+#                      decorated function, returning any other
+#                      invalidation value (for example PATH).
+#    @param: name    - Cache name, defaults to module.function
+#
+# Returns
+# -------
+#    @return: decorator
+#
+# Raises
+# ------
+#    ...
+#
+#-----------------------------------------------------------------------
+def cached(maxsize=128, ttl=None, disk=False, depends=None, stamp=None,
+           name=None):
+    def decorator(func):
+        cache = Cache(name or func.__module__ + '.' + func.__qualname__,
+                      maxsize=maxsize,
+                      ttl=ttl,
+                      disk=disk)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            try:
+                key = make_key(args, kwargs)
+            except TypeError:
+                with cache.lock:
+                    cache.stats['uncacheable'] += 1
+                logger.debug('Uncacheable arguments for %s', cache.name)
+                return func(*args, **kwargs)
+
+            current = None
+            if depends is not None:
+                filenames = depends(*args, **kwargs) \
+                            if callable(depends) else depends
+                current = file_stamp(filenames)
+            if stamp is not None:
+                current = (current, stamp(*args, **kwargs))
+
+            value = cache.get(key, current)
+            if value is MISSING:
+                value = func(*args, **kwargs)
+                cache.set(key, value, current)
+            return value
+
+        wrapper.cache = cache
+        wrapper.func = func
+        return wrapper
+
+    return decorator
+
+#-----------------------------------------------------------------------
+#
+# Function cache_info
+#
+# Inputs
+# ------
+#    @param: None
+#
+# Returns
+# -------
+#    @return: info - dictionary of cache name -> Cache.info()
+#
+# Raises
+# ------
+#    ...
+#
+#-----------------------------------------------------------------------
+def cache_info():
+    return {name: cache.info() for name, cache in Caches.items()}
+
+#-----------------------------------------------------------------------
+#
+# Function invalidate_all
+#
+# Inputs
+# ------
+#    @param: None
+#
+# Returns
+# -------
+#    @return: None
+#
+# Raises
+# ------
+#    ...
+#
+#-----------------------------------------------------------------------
+def invalidate_all():
+    for cache in list(Caches.values()):
+        cache.invalidate()
+    return
@@ -0,0 +1,636 @@
+#! /usr/bin/env python3
+#-----------------------------------------------------------------------
+#
+# Original BASH version
+# Original version Copyright 2001 by Kyle Sallee
+# Additions/corrections Copyright 2002 by the Source Mage Team
+#
+# Python rewrite
+# Copyright 2017 Geoff S Derber
+#
+# File: pysorcery/lib/util/output.py
+#
+# This file is part of Sorcery.
+#
+#    Sorcery is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published
+#    by the Free Software Foundation, either version 3 of the License,
+#    or (at your option) any later version.
+#
+#    Sorcery is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with Sorcery.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Output:
+#
+#    Buffered writer for command results.  Whether stdout is a terminal,
+#    whether to colour and how wide the terminal is are decided once,
+#    when the writer is created; styles are escape sequences built
+#    once; lines are collected and written in large chunks.
+#
+#        writer = output.get_writer()
+#        writer.line(spell.name, 'name')
+#        writer.line(description, 'value')
+#        writer.lines(installed)
+#
+#    Commands describe each result as a record as well, which is all
+#    that is written with --format ndjson (one JSON object per line) or
+#    tsv (a header line, then tab separated values):
+#
+#        writer.record({'spell': spell.name, 'size': size},
+#                      (spell.name, 'name'), (str(size) + 'kb', 'value'))
+#        writer.records('file', alien)
+#
+#    Results go to stdout, log messages keep going to stderr through
+#    logging.  get_writer() returns a new writer when sys.stdout was
+#    replaced (pygazed does so for every request); flush() writes what
+#    is buffered and runs at exit.
+#
+#-----------------------------------------------------------------------
+"""
+Output:
+
+Buffered writer for command results.  Whether stdout is a terminal,
+whether to colour and how wide the terminal is are decided once, when
+the writer is created; lines are collected and written in large chunks.
+Results can also be written as NDJSON or TSV records.
+"""
+#-----------------------------------------------------------------------
+#
+# Libraries
+#
+#-----------------------------------------------------------------------
+# System Libraries
+import atexit
+import itertools
+import math
+import os
+import shutil
+import sys
+import time
+
+# 3rd Party Libraries
+
+
+# Application Libraries
+# System Library Overrides
+from pysorcery.lib.system import logging
+# Other Application Libraries
+from pysorcery.lib.util import text
+
+# Conditional Libraries
+
+
+#-----------------------------------------------------------------------
+#
+# Global Variables
+#
+#-----------------------------------------------------------------------
+# Enable Logging
+# create logger
+logger = logging.getLogger(__name__)
+
+# Characters collected before writing them out
+BUFSIZE = 64 * 1024
+
+# Seconds buffered output may wait, so slow queries still stream
+INTERVAL = 0.2
+
+# Lines joined at once by Writer.lines()
+BATCH = 4096
+
+# Output formats, see set_format()
+Formats = ('text', 'ndjson', 'tsv')
+Format = 'text'
+
+# Characters TSV values can not contain as they are
+TSV_ESCAPES = str.maketrans({
+    '\\': '\\\\',
+    '\t': '\\t',
+    '\n': '\\n',
+    '\r': '\\r',
+})
+
+# Style name -> ConsoleText.colorize() attribute, fg and bg colours
+Styles = {
+    'name': ('bold', 'white', 'black'),
+    'value': ('none', 'white', 'black'),
+}
+
+# The writer for the current sys.stdout, see get_writer()
+current = None
+
+#-----------------------------------------------------------------------
+#
+# Classes
+#
+# Writer
+#
+#-----------------------------------------------------------------------
+
+#-----------------------------------------------------------------------
+#
+# Class Writer
+#
+# Collects output and writes it to a stream in chunks of about BUFSIZE
+# characters, or after INTERVAL seconds.
+#
+# Inputs
+# ------
+#    @param: stream  - default sys.stdout
+#    @param: format_ - one of Formats, default Format
+#    @param: color   - None decides from the stream, NO_COLOR and TERM
+#    @param: width   - None asks the terminal, 80 when not a terminal
+#    @param: bufsize
+#
+# Returns
+# -------
+#    @return: None
+#
+# Raises
+# ------
+#    ...
+#
+#-----------------------------------------------------------------------
+class Writer():
+    def __init__(self, stream=None, color=None, width=None,
+                 bufsize=BUFSIZE, format_=None):
+        self.stream = stream or sys.stdout
+        self.format = format_ or Format
+        if self.format not in Formats:
+            raise ValueError('Unknown output format: %s' % self.format)
+        isatty = getattr(self.stream, 'isatty', None)
+        self.isatty = bool(isatty and isatty())
+
+        if self.format != 'text':
+            color = False
+        elif color is None:
+            color = (self.isatty
+                     and 'NO_COLOR' not in os.environ
+                     and os.environ.get('TERM') != 'dumb')
+        self.color = color
+
+        if width is None:
+            width = 80
+            if self.isatty:
+                width = shutil.get_terminal_size((80, 24)).columns
+        self.width = width
+
+        self.styles = {}
+        if color:
+            colortext = text.ConsoleText()
+            for style, spec in Styles.items():
+                begin, end = colortext.colorize('\0', *spec).split('\0')
+                self.styles[style] = (begin, end)
+
+        self.encode = None
+        if self.format == 'ndjson':
+            import json
+            self.encode = json.JSONEncoder(ensure_ascii=False,
+                                           separators=(',', ':'),
+                                           default=str).encode
+        self.header = None
+
+        self.bufsize = bufsize
+        self.chunks = []
+        self.size = 0
+        self.flushed = time.monotonic()
+        return
+
+    #-------------------------------------------------------------------
+    #
+    # Function write
+    #
+    # Inputs
+    # ------
+    #    @param: self
+    #    @param: string - text to write as is
+    #
+    # Returns
+    # -------
+    #    @return: None
+    #
+    # Raises
+    # ------
+    #    ...
+    #
+    #-------------------------------------------------------------------
+    def write(self, string):
+        self.chunks.append(string)
+        self.size += len(string)
+        if (self.size >= self.bufsize
+            or time.monotonic() - self.flushed >= INTERVAL):
+            self.flush()
+        return
+
+    #-------------------------------------------------------------------
+    #
+    # Function style
+    #
+    # Inputs
+    # ------
+    #    @param: self
+    #    @param: string
+    #    @param: style  - a key of Styles, or None
+    #
+    # Returns
+    # -------
+    #    @return: string - with the style's escapes when colouring
+    #
+    # Raises
+    # ------
+    #    ...
+    #
+    #-------------------------------------------------------------------
+    def style(self, string, style=None):
+        escapes = self.styles.get(style)
+        if escapes is None:
+            return string
+        return escapes[0] + string + escapes[1]
+
+    #-------------------------------------------------------------------
+    #
+    # Function line
+    #
+    # Inputs
+    # ------
+    #    @param: self
+    #    @param: line  - converted with str()
+    #    @param: style
+    #
+    # Returns
+    # -------
+    #    @return: None
+    #
+    # Raises
+    # ------
+    #    ...
+    #
+    #-------------------------------------------------------------------
+    def line(self, line='', style=None):
+        self.write(self.style(str(line), style) + '\n')
+        return
+
+    #-------------------------------------------------------------------
+    #
+    # Function lines
+    #
+    # Write one line per item, BATCH items at a time.
+    #
+    # Inputs
+    # ------
+    #    @param: self
+    #    @param: lines - iterable, items converted with str()
+    #    @param: style
+    #
+    # Returns
+    # -------
+    #    @return: None
+    #
+    # Raises
+    # ------
+    #    ...
+    #
+    #-------------------------------------------------------------------
+    def lines(self, lines, style=None):
+        escapes = self.styles.get(style)
+        lines = iter(lines)
+        while True:
+            batch = [str(line) for line in itertools.islice(lines, BATCH)]
+            if not batch:
+                break
+            if escapes is None:
+                self.write('\n'.join(batch) + '\n')
+            else:
+                self.write(''.join(escapes[0] + line + escapes[1] + '\n'
+                                   for line in batch))
+        return
+
+    #-------------------------------------------------------------------
+    #
+    # Function tsv_row
+    #
+    # Inputs
+    # ------
+    #    @param: self
+    #    @param: values - lists are joined with spaces
+    #
+    # Returns
+    # -------
+    #    @return: row - escaped, tab separated, with a newline
+    #
+    # Raises
+    # ------
+    #    ...
+    #
+    #-------------------------------------------------------------------
+    def tsv_row(self, values):
+        fields = []
+        for value in values:
+            if isinstance(value, (list, tuple, set)):
+                value = ' '.join(str(item) for item in value)
+            elif value is None:
+                value = ''
+            fields.append(str(value).translate(TSV_ESCAPES))
+        return '\t'.join(fields) + '\n'
+
+    #-------------------------------------------------------------------
+    #
+    # Function tsv_header
+    #
+    # Write the header line when the fields change.
+    #
+    # Inputs
+    # ------
+    #    @param: self
+    #    @param: keys
+    #
+    # Returns
+    # -------
+    #    @return: None
+    #
+    # Raises
+    # ------
+    #    ...
+    #
+    #-------------------------------------------------------------------
+    def tsv_header(self, keys):
+        if keys != self.header:
+            self.header = keys
+            self.write(self.tsv_row(keys))
+        return
+
+    #-------------------------------------------------------------------
+    #
+    # Function record
+    #
+    # Write one result: the record itself for ndjson and tsv, the text
+    # lines for text.
+    #
+    # Inputs
+    # ------
+    #    @param: self
+    #    @param: record - dictionary, field name -> value
+    #    @param: *text  - (line, style) tuples written in text format;
+    #                     default one line per value
+    #
+    # Returns
+    # -------
+    #    @return: None
+    #
+    # Raises
+    # ------
+    #    ...
+    #
+    #-------------------------------------------------------------------
+    def record(self, record, *text):
+        if self.format == 'ndjson':
+            self.write(self.encode(record) + '\n')
+        elif self.format == 'tsv':
+            self.tsv_header(tuple(record))
+            self.write(self.tsv_row(record.values()))
+        elif text:
+            for line, style in text:
+                self.line(line, style)
+        else:
+            self.lines(record.values())
+        return
+
+    #-------------------------------------------------------------------
+    #
+    # Function records
+    #
+    # Write one single field record per item, BATCH items at a time.
+    #
+    # Inputs
+    # ------
+    #    @param: self
+    #    @param: key   - field name
+    #    @param: items - iterable
+    #    @param: style - for text format
+    #
+    # Returns
+    # -------
+    #    @return: None
+    #
+    # Raises
+    # ------
+    #    ...
+    #
+    #-------------------------------------------------------------------
+    def records(self, key, items, style=None):
+        if self.format == 'text':
+            self.lines(items, style)
+            return
+
+        if self.format == 'tsv':
+            self.tsv_header((key,))
+            items = iter(items)
+            while True:
+                batch = [str(item) for item in itertools.islice(items, BATCH)]
+                if not batch:
+                    break
+                # Escaping is rarely needed, so check the batch at once
+                data = '\n'.join(batch)
+                if ('\t' in data or '\\' in data or '\r' in data
+                    or data.count('\n') != len(batch) - 1):
+                    data = '\n'.join(item.translate(TSV_ESCAPES)
+                                     for item in batch)
+                self.write(data + '\n')
+            return
+
+        # Strings are encoded by the C fast path; records of anything
+        # else go through the whole encoder
+        encode = self.encode
+        prefix = '{' + encode(key) + ':'
+        items = iter(items)
+        while True:
+            batch = list(itertools.islice(items, BATCH))
+            if not batch:
+                break
+            self.write(''.join(prefix + encode(item) + '}\n'
+                               for item in batch))
+        return
+
+    #-------------------------------------------------------------------
+    #
+    # Function columns
+    #
+    # Write items in evenly spaced columns fitting the terminal width,
+    # like text.column_print().
+    #
+    # Inputs
+    # ------
+    #    @param: self
+    #    @param: items
+    #    @param: cols       - the number of columns to use
+    #    @param: columnwise - fill down the columns rather than across
+    #    @param: gap        - spaces between columns
+    #
+    # Returns
+    # -------
+    #    @return: None
+    #
+    # Raises
+    # ------
+    #    ...
+    #
+    #-------------------------------------------------------------------
+    def columns(self, items, cols=4, columnwise=True, gap=4):
+        items = [str(item) for item in items]
+        if not items:
+            return
+        cols = min(cols, len(items))
+
+        item_width = min(max(len(item) for item in items),
+                         self.width // cols - gap)
+        cell_width = item_width + gap
+        rows = int(math.ceil(len(items) / cols))
+
+        if columnwise:
+            table = [items[row::rows] for row in range(rows)]
+        else:
+            table = [items[i:i + cols] for i in range(0, len(items), cols)]
+
+        self.lines(''.join(item[:item_width].ljust(cell_width)
+                           for item in row).rstrip()
+                   for row in table)
+        return
+
+    #-------------------------------------------------------------------
+    #
+    # Function flush
+    #
+    # Write out what is buffered.  When the reader has gone away
+    # (pygaze ... | head) there is no point in going on: the stream is
+    # pointed at /dev/null, so the interpreter does not complain again
+    # at exit, and the command stops.
+    #
+    # Inputs
+    # ------
+    #    @param: self
+    #
+    # Returns
+    # -------
+    #    @return: None
+    #
+    # Raises
+    # ------
+    #    @raises: SystemExit - on a closed pipe
+    #
+    #-------------------------------------------------------------------
+    def flush(self):
+        data = ''.join(self.chunks)
+        self.chunks = []
+        self.size = 0
+        self.flushed = time.monotonic()
+        try:
+            if data:
+                self.stream.write(data)
+            self.stream.flush()
+        except BrokenPipeError:
+            devnull = os.open(os.devnull, os.O_WRONLY)
+            os.dup2(devnull, self.stream.fileno())
+            raise SystemExit(1)
+        return
+
+#-----------------------------------------------------------------------
+#
+# Functions
+#
+# set_format
+# get_writer
+# flush
+#
+#-----------------------------------------------------------------------
+
+#-----------------------------------------------------------------------
+#
+# Function set_format
+#
+# Choose the format of every writer created from now on (--format).
+# Output buffered by the current writer is written first.
+#
+# Inputs
+# ------
+#    @param: format_ - one of Formats
+#
+# Returns
+# -------
+#    @return: None
+#
+# Raises
+# ------
+#    @raises: ValueError
+#
+#-----------------------------------------------------------------------
+def set_format(format_):
+    global Format
+
+    if format_ not in Formats:
+        raise ValueError('Unknown output format: %s' % format_)
+    if current is not None and current.format != format_:
+        flush()
+    Format = format_
+    return
+
+#-----------------------------------------------------------------------
+#
+# Function get_writer
+#
+# The writer for sys.stdout, created on first use and again whenever
+# sys.stdout has been replaced since.
+#
+# Inputs
+# ------
+#    @param: None
+#
+# Returns
+# -------
+#    @return: writer
+#
+# Raises
+# ------
+#    ...
+#
+#-----------------------------------------------------------------------
+def get_writer():
+    global current
+
+    if (current is None
+        or current.stream is not sys.stdout
+        or current.format != Format):
+        if current is not None:
+            flush()
+        else:
+            atexit.register(flush)
+        current = Writer(sys.stdout)
+    return current
+
+#-----------------------------------------------------------------------
+#
+# Function flush
+#
+# Write out whatever the current writer has buffered.
+#
+# Inputs
+# ------
+#    @param: None
+#
+# Returns
+# -------
+#    @return: None
+#
+# Raises
+# ------
+#    @raises: SystemExit - on a closed pipe
+#
+#-----------------------------------------------------------------------
+def flush():
+    if current is not None:
+        current.flush()
+    return
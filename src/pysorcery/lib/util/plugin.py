@@ -23,13 +23,22 @@
 #    You should have received a copy of the GNU General Public License
 #    along with Dionysius.  If not, see <http://www.gnu.org/licenses/>.
 #
+# File: pysorcery/lib/util/plugin.py
 #
+# Command plugins
 #
-#
+#    Building the command line parser only needs each plugin's command
+#    name, aliases and help.  These are kept in a manifest, cached until
+#    a plugin file changes, so only the selected command's plugin is
+#    imported.
 #
 #-----------------------------------------------------------------------
 """
+Command plugins
 
+Building the command line parser only needs each plugin's command name,
+aliases and help.  These are kept in a manifest, cached until a plugin
+file changes, so only the selected command's plugin is imported.
 """
 #-----------------------------------------------------------------------
 #
@@ -38,12 +47,19 @@
 #-----------------------------------------------------------------------
 
 # System Libraries
+import argparse
+import os
 import sys
 
 # 3rd Party Libraries
 
 # Application Libraries
-from pysorcery.lib import logging
+# System Library Overrides
+from pysorcery.lib.system import distro
+from pysorcery.lib.system import logging
+# Other Application Libraries
+from pysorcery.lib import util
+from pysorcery.lib.util import cache
 
 # Other Optional Libraries
 
@@ -67,6 +83,11 @@ logger = logging.getLogger(__name__)
 #
 # Functions
 #
+# defPluginList
+# get_manifest
+# find_command
+# add_subcommands
+#
 #-------------------------------------------------------------------------------
 
 #-------------------------------------------------------------------------------
@@ -101,3 +122,163 @@ def defPluginList():
         filelist[filelist.index(item)] = item.replace(".py","")
         
     return filelist
+
+#-------------------------------------------------------------------------------
+#
+# Function get_manifest
+#
+# Import every plugin of a command and record what its parser() adds.
+# Plugin help text can depend on the package manager, so the manifest is
+# also stamped with the distribution.
+#
+# Inputs
+# ------
+#    @param: scmd - 'gaze', 'archive', ...
+#    @param: path - The plugin directory
+#
+# Returns
+# -------
+#    @return: manifest - list of (program, name, aliases, help)
+#
+# Raises
+# ------
+#    ...
+#
+#-------------------------------------------------------------------------------
+@cache.cached(maxsize=8,
+              disk=True,
+              depends=lambda scmd, path: [os.path.join(path, '*.py')],
+              stamp=lambda scmd, path: distro.get_pkg_mgr())
+def get_manifest(scmd, path):
+    logger.debug('Building %s plugin manifest', scmd)
+
+    parent = argparse.ArgumentParser(add_help=False)
+    subparsers = argparse.ArgumentParser().add_subparsers()
+
+    manifest = []
+    for program in sorted(util.get_cmd_types(scmd, path)):
+        func = util.get_module_func(scmd=scmd,
+                                    program=program,
+                                    cmd='parser')
+        known = set(subparsers.choices)
+        actions = len(subparsers._choices_actions)
+        func(subparsers, parent, parent)
+
+        for action in subparsers._choices_actions[actions:]:
+            name = action.dest
+            aliases = [alias for alias, cmd in subparsers.choices.items()
+                       if alias not in known and
+                       alias != name and
+                       cmd is subparsers.choices[name]]
+            manifest.append((program, name, aliases, action.help))
+
+    return manifest
+
+#-------------------------------------------------------------------------------
+#
+# Function find_command
+#
+# Find the plugin for the command given on the command line.  The
+# values of options that may come before the command are skipped, as
+# argparse would consume them, so `-g what installed` selects
+# installed.
+#
+# Inputs
+# ------
+#    @param: manifest
+#    @param: argv    - Command line arguments, without the program name
+#    @param: parsers - The top-level parser and its parents, whose
+#                      options may come before the command
+#
+# Returns
+# -------
+#    @return: program - None if no command was given
+#
+# Raises
+# ------
+#    ...
+#
+#-------------------------------------------------------------------------------
+def find_command(manifest, argv, *parsers):
+    commands = {}
+    for program, name, aliases, help_ in manifest:
+        for cmd in [name] + aliases:
+            commands.setdefault(cmd, program)
+
+    # Option -> nargs of its action; 0 for flags
+    options = {}
+    for parser in parsers:
+        for option, action in parser._option_string_actions.items():
+            options.setdefault(option, action.nargs)
+
+    i = 0
+    while i < len(argv):
+        arg = argv[i]
+        i += 1
+        if arg == '--':
+            break
+        if arg in commands:
+            return commands[arg]
+
+        nargs = options.get(arg, 0)
+        if nargs is None:
+            i += 1
+        elif isinstance(nargs, int):
+            i += nargs
+        elif i < len(argv) and not argv[i].startswith('-'):
+            # '?', '*' and '+' take the next argument; '*' and '+' go on
+            # up to the next option or command
+            i += 1
+            if nargs != argparse.OPTIONAL:
+                while (i < len(argv) and not argv[i].startswith('-') and
+                       argv[i] not in commands):
+                    i += 1
+
+    return None
+
+#-------------------------------------------------------------------------------
+#
+# Function add_subcommands
+#
+# Add every plugin's command to the parser.  The selected command's
+# plugin builds its full parser; the others are added from the manifest
+# with only their aliases and help, which is all '--help' shows.
+#
+# Inputs
+# ------
+#    @param: subparsers
+#    @param: scmd
+#    @param: path
+#    @param: argv    - Command line arguments, without the program name
+#    @param: parents - Parent parsers passed on to the plugin
+#    @param: parser  - The top-level parser, for the options that may
+#                      come before the command
+#
+# Returns
+# -------
+#    @return: program - The selected plugin, None if no command was given
+#
+# Raises
+# ------
+#    ...
+#
+#-------------------------------------------------------------------------------
+def add_subcommands(subparsers, scmd, path, argv, *parents, parser=None):
+    manifest = get_manifest(scmd, path)
+    parsers = parents if parser is None else (parser,) + parents
+    selected = find_command(manifest, argv, *parsers)
+
+    for program, name, aliases, help_ in manifest:
+        if program != selected:
+            subparsers.add_parser(name,
+                                  aliases = aliases,
+                                  help = help_,
+                                  add_help = False
+            )
+        elif name not in subparsers.choices:
+            func = util.get_module_func(scmd=scmd,
+                                        program=program,
+                                        cmd='parser')
+            func(subparsers, *parents)
+
+    return selected
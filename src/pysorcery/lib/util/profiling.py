@@ -0,0 +1,502 @@
+#! /usr/bin/env python3
+#-----------------------------------------------------------------------
+#
+# Original BASH version
+# Original version Copyright 2001 by Kyle Sallee
+# Additions/corrections Copyright 2002 by the Source Mage Team
+#
+# Python rewrite
+# Copyright 2017 Geoff S Derber
+#
+# File: pysorcery/lib/util/profiling.py
+#
+# This file is part of Sorcery.
+#
+#    Sorcery is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published
+#    by the Free Software Foundation, either version 3 of the License,
+#    or (at your option) any later version.
+#
+#    Sorcery is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with Sorcery.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Profiling:
+#
+#    Named timing spans and counters, switched on by --profile.  Spans
+#    nest per thread and are added up by their path, so the report is a
+#    tree of where the time went: imports, index loads, backend calls,
+#    subprocesses and file reads.  Optionally the whole run is also
+#    written as cProfile statistics or a Chrome trace.
+#
+#        with profiling.span('index', 'codex.index'):
+#            ...
+#
+#        @profiling.spanned('index', 'provides.index')
+#        def read_provides_index(grimoire_dir):
+#            ...
+#
+#    While profiling is off, span() returns a shared no-op context and
+#    count() returns at once.
+#
+#-----------------------------------------------------------------------
+"""
+Profiling:
+
+Named timing spans and counters, switched on by --profile.  Spans nest
+per thread and are added up by their path, so the report is a tree of
+where the time went.  Optionally the whole run is also written as
+cProfile statistics or a Chrome trace.
+"""
+#-----------------------------------------------------------------------
+#
+# Libraries
+#
+#-----------------------------------------------------------------------
+# System Libraries
+import atexit
+import contextlib
+import functools
+import os
+import sys
+import threading
+import time
+
+# 3rd Party Libraries
+
+
+# Application Libraries
+# System Library Overrides
+from pysorcery.lib.system import logging
+# Other Application Libraries
+
+# Conditional Libraries
+
+
+#-----------------------------------------------------------------------
+#
+# Global Variables
+#
+#-----------------------------------------------------------------------
+# Enable Logging
+# create logger
+logger = logging.getLogger(__name__)
+
+# Set by enable(), cleared by finish()
+Enabled = False
+
+# Span path (tuple of names, outermost first) -> [calls, seconds]
+Spans = {}
+
+# Counter name -> value
+Counters = {}
+
+# Completed spans as (name, start, seconds, thread id), kept only when
+# a Chrome trace was asked for; None otherwise
+Events = None
+
+# File to write cProfile statistics or the Chrome trace to
+Output = None
+
+# cProfile.Profile of the main thread, when writing statistics
+Profiler = None
+
+# perf_counter() when profiling started
+Started = 0.0
+
+# Returned by span() while profiling is off
+NULL_SPAN = contextlib.nullcontext()
+
+# Output file extensions written as a Chrome trace
+TRACE_EXTENSIONS = ('.json', '.trace')
+
+lock = threading.Lock()
+local = threading.local()
+registered = False
+
+#-----------------------------------------------------------------------
+#
+# Classes
+#
+# Span
+#
+#-----------------------------------------------------------------------
+
+#-----------------------------------------------------------------------
+#
+# Class Span
+#
+# One timed region.  Entering pushes its name on the thread's span
+# stack, leaving adds the elapsed time to the path of the stack.
+#
+# Inputs
+# ------
+#    @param: name
+#
+# Returns
+# -------
+#    @return: None
+#
+# Raises
+# ------
+#    ...
+#
+#-----------------------------------------------------------------------
+class Span():
+    __slots__ = ('name', 'start')
+
+    def __init__(self, name):
+        self.name = name
+        self.start = 0.0
+        return
+
+    #-------------------------------------------------------------------
+    #
+    # Function __enter__
+    #
+    # Inputs
+    # ------
+    #    @param: self
+    #
+    # Returns
+    # -------
+    #    @return: self
+    #
+    # Raises
+    # ------
+    #    ...
+    #
+    #-------------------------------------------------------------------
+    def __enter__(self):
+        stack = getattr(local, 'stack', None)
+        if stack is None:
+            stack = local.stack = []
+        stack.append(self.name)
+        self.start = time.perf_counter()
+        return self
+
+    #-------------------------------------------------------------------
+    #
+    # Function __exit__
+    #
+    # Inputs
+    # ------
+    #    @param: self
+    #    @param: *exc_info
+    #
+    # Returns
+    # -------
+    #    @return: False - exceptions are not suppressed
+    #
+    # Raises
+    # ------
+    #    ...
+    #
+    #-------------------------------------------------------------------
+    def __exit__(self, *exc_info):
+        elapsed = time.perf_counter() - self.start
+        stack = local.stack
+        path = tuple(stack)
+        stack.pop()
+
+        with lock:
+            entry = Spans.get(path)
+            if entry is None:
+                entry = Spans[path] = [0, 0.0]
+            entry[0] += 1
+            entry[1] += elapsed
+            if Events is not None:
+                Events.append((self.name, self.start, elapsed,
+                               threading.get_ident()))
+        return False
+
+#-----------------------------------------------------------------------
+#
+# Functions
+#
+# enable
+# span
+# spanned
+# count
+# report
+# write_trace
+# finish
+#
+#-----------------------------------------------------------------------
+
+#-----------------------------------------------------------------------
+#
+# Function enable
+#
+# Start recording.  The report is printed to stderr by finish(), which
+# runs at exit.
+#
+# Inputs
+# ------
+#    @param: output - None, or a file for a Chrome trace (.json,
+#                     .trace) or cProfile statistics (anything else,
+#                     read with pstats or snakeviz)
+#
+# Returns
+# -------
+#    @return: None
+#
+# Raises
+# ------
+#    ...
+#
+#-----------------------------------------------------------------------
+def enable(output=None):
+    global Enabled, Events, Output, Profiler, Started, registered
+
+    if Enabled:
+        return
+
+    Spans.clear()
+    Counters.clear()
+    Output = output
+    Events = None
+    Profiler = None
+    if output is not None:
+        if output.endswith(TRACE_EXTENSIONS):
+            Events = []
+        else:
+            # Only the calling (main) thread is profiled
+            import cProfile
+            Profiler = cProfile.Profile()
+
+    if not registered:
+        atexit.register(finish)
+        registered = True
+
+    Enabled = True
+    Started = time.perf_counter()
+    if Profiler is not None:
+        Profiler.enable()
+    return
+
+#-----------------------------------------------------------------------
+#
+# Function span
+#
+# A context manager timing the enclosed block.  Several names are
+# joined with spaces, only while profiling is on.
+#
+# Inputs
+# ------
+#    @param: *names
+#
+# Returns
+# -------
+#    @return: span
+#
+# Raises
+# ------
+#    ...
+#
+#-----------------------------------------------------------------------
+def span(*names):
+    if not Enabled:
+        return NULL_SPAN
+    return Span(' '.join(names))
+
+#-----------------------------------------------------------------------
+#
+# Function spanned
+#
+# Decorator timing every call of a function as a span.
+#
+# Inputs
+# ------
+#    @param: *names
+#
+# Returns
+# -------
+#    @return: decorator
+#
+# Raises
+# ------
+#    ...
+#
+#-----------------------------------------------------------------------
+def spanned(*names):
+    name = ' '.join(names)
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not Enabled:
+                return func(*args, **kwargs)
+            with Span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+#-----------------------------------------------------------------------
+#
+# Function count
+#
+# Add to a named counter.
+#
+# Inputs
+# ------
+#    @param: name
+#    @param: value
+#
+# Returns
+# -------
+#    @return: None
+#
+# Raises
+# ------
+#    ...
+#
+#-----------------------------------------------------------------------
+def count(name, value=1):
+    if not Enabled:
+        return
+    with lock:
+        Counters[name] = Counters.get(name, 0) + value
+    return
+
+#-----------------------------------------------------------------------
+#
+# Function report
+#
+# Write the span tree, counters and cache statistics.  Siblings are
+# listed slowest first.
+#
+# Inputs
+# ------
+#    @param: stream
+#
+# Returns
+# -------
+#    @return: None
+#
+# Raises
+# ------
+#    ...
+#
+#-----------------------------------------------------------------------
+def report(stream=None):
+    stream = stream or sys.stderr
+    elapsed = time.perf_counter() - Started
+
+    with lock:
+        spans = {path: tuple(entry) for path, entry in Spans.items()}
+        counters = dict(Counters)
+
+    children = {}
+    for path in spans:
+        children.setdefault(path[:-1], []).append(path)
+
+    def walk(parent, depth):
+        for path in sorted(children.get(parent, ()),
+                           key=lambda path: -spans[path][1]):
+            calls, seconds = spans[path]
+            stream.write('%10.2f %7d  %s%s\n'
+                         % (seconds * 1000, calls, '  ' * depth, path[-1]))
+            walk(path, depth + 1)
+
+    stream.write('Profile: %.2f ms\n' % (elapsed * 1000))
+    stream.write('%10s %7s  %s\n' % ('ms', 'calls', 'span'))
+    walk((), 0)
+
+    # The cache module is only reported when something used it
+    cache = sys.modules.get('pysorcery.lib.util.cache')
+    if cache is not None:
+        for name, info in sorted(cache.cache_info().items()):
+            for stat in ('hits', 'disk_hits', 'misses'):
+                if info.get(stat):
+                    counters['cache %s %s' % (name, stat)] = info[stat]
+
+    if counters:
+        stream.write('Counters:\n')
+        width = max(len(name) for name in counters)
+        for name in sorted(counters):
+            stream.write('  %-*s %d\n' % (width, name, counters[name]))
+
+    stream.flush()
+    return
+
+#-----------------------------------------------------------------------
+#
+# Function write_trace
+#
+# Write the recorded spans in the Chrome trace event format, for
+# chrome://tracing or https://ui.perfetto.dev.
+#
+# Inputs
+# ------
+#    @param: filename
+#
+# Returns
+# -------
+#    @return: None
+#
+# Raises
+# ------
+#    @raises: OSError
+#
+#-----------------------------------------------------------------------
+def write_trace(filename):
+    import json
+
+    pid = os.getpid()
+    with lock:
+        events = [{'name': name,
+                   'ph': 'X',
+                   'ts': (start - Started) * 1e6,
+                   'dur': seconds * 1e6,
+                   'pid': pid,
+                   'tid': tid}
+                  for name, start, seconds, tid in Events]
+
+    with open(filename, 'w') as file_:
+        json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, file_)
+    return
+
+#-----------------------------------------------------------------------
+#
+# Function finish
+#
+# Stop recording, print the report and write the output file.  Does
+# nothing when profiling is off, so it is safe to call more than once.
+#
+# Inputs
+# ------
+#    @param: stream
+#
+# Returns
+# -------
+#    @return: None
+#
+# Raises
+# ------
+#    ...
+#
+#-----------------------------------------------------------------------
+def finish(stream=None):
+    global Enabled
+
+    if not Enabled:
+        return
+    if Profiler is not None:
+        Profiler.disable()
+    Enabled = False
+
+    report(stream)
+
+    try:
+        if Profiler is not None:
+            Profiler.dump_stats(Output)
+        elif Events is not None:
+            write_trace(Output)
+    except OSError as msg:
+        logger.error('Could not write profile %s: %s', Output, msg)
+    return
@@ -211,31 +211,10 @@ def column_print(obj, cols=4, columnwise=True, gap=4):
         between columns based on the maximum len() of the list items.
     """
 
-    term_height, term_width = os.popen('stty size', 'r').read().split()
+    # Imported here: output builds on this module
+    from pysorcery.lib.util import output
 
-    column_width = int(term_width)
-
-    sobj = [str(item) for item in obj]
-    if cols > len(sobj):
-        cols = len(sobj)
-
-    imax = max([len(item) for item in sobj])
-    cmax = column_width // cols
-
-    max_len = min(imax,cmax - gap)
-
-    if columnwise:
-        cols = int(math.ceil(float(len(sobj)) / float(cols)))
-
-    plist = [sobj[i: i+cols] for i in range(0, len(sobj), cols)]
-    if columnwise:
-        if not len(plist[-1]) == cols:
-            plist[-1].extend(['']*(len(sobj) - len(plist[-1])))
-        plist = zip(*plist)
-    printer = '\n'.join([
-        ''.join([c[0:max_len].ljust(max_len + gap) for c in p])
-        for p in plist])
-    logger.info1(printer)
+    output.get_writer().columns(obj, cols, columnwise, gap)
 
 #    term_height, term_width = os.popen('stty size', 'r').read().split()
 #    total_columns = int(term_width) // column_width
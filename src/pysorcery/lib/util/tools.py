@@ -0,0 +1,473 @@
+#! /usr/bin/env python3
+#-----------------------------------------------------------------------
+#
+# Original BASH version
+# Original version Copyright 2001 by Kyle Sallee
+# Additions/corrections Copyright 2002 by the Source Mage Team
+#
+# Python rewrite
+# Copyright 2017 Geoff S Derber
+#
+# File: pysorcery/lib/util/tools.py
+#
+# This file is part of Sorcery.
+#
+#    Sorcery is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published
+#    by the Free Software Foundation, either version 3 of the License,
+#    or (at your option) any later version.
+#
+#    Sorcery is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with Sorcery.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Tools:
+#
+#    A registry of the external programs on PATH, kept in the disk
+#    cache so that commands do not search PATH again:
+#
+#    - scan_path() lists every PATH directory once.  The result is
+#      stamped with the mtimes of the directories, so installing or
+#      removing a program rescans;
+#    - probe() runs a program once with --version and --help to learn
+#      its version, the compressions it handles and whether it can use
+#      several threads.  The result is stamped with the mtime of the
+#      program.
+#
+#        exe = tools.find('xz')
+#        cmd = [exe] + tools.thread_args('xz', 4)
+#
+#-----------------------------------------------------------------------
+"""
+Tools:
+
+A registry of the external programs on PATH: where they are, their
+version, the compressions they handle and their thread support.  Kept
+in the disk cache, stamped with the mtimes of the PATH directories.
+"""
+#-----------------------------------------------------------------------
+#
+# Libraries
+#
+#-----------------------------------------------------------------------
+# System Libraries
+import os
+import re
+import shutil
+import subprocess
+
+# 3rd Party Libraries
+
+
+# Application Libraries
+# System Library Overrides
+from pysorcery.lib.system import logging
+# Other Application Libraries
+from pysorcery.lib.util import cache
+
+# Conditional Libraries
+
+
+#-----------------------------------------------------------------------
+#
+# Global Variables
+#
+#-----------------------------------------------------------------------
+# Enable Logging
+# create logger
+logger = logging.getLogger(__name__)
+
+# Known programs: program -> (compressions, thread arguments, text of
+# --help showing thread support).  The thread arguments take the
+# number of threads.
+Tools = {
+    'gzip': (('gzip',), None, None),
+    'pigz': (('gzip',), ('-p', '%d'), '--processes'),
+    'bzip2': (('bzip2',), None, None),
+    'pbzip2': (('bzip2',), ('-p%d',), '-p#'),
+    'lbzip2': (('bzip2',), ('-n', '%d'), '-n'),
+    'xz': (('xz', 'lzma'), ('-T%d',), '--threads'),
+    'pixz': (('xz',), ('-p', '%d'), '-p'),
+    'lzma': (('lzma',), None, None),
+    'lzip': (('lzip',), None, None),
+    'clzip': (('lzip',), None, None),
+    'pdlzip': (('lzip',), None, None),
+    'plzip': (('lzip',), ('-n', '%d'), '--threads'),
+    'zstd': (('zstd',), ('-T%d',), '-T#'),
+    'lzop': (('lzop',), None, None),
+    'compress': (('compress',), None, None),
+    '7z': (('7z', 'zip', 'gzip', 'bzip2', 'xz'), None, None),
+    '7za': (('7z', 'zip', 'gzip', 'bzip2', 'xz'), None, None),
+    '7zr': (('7z',), None, None),
+    'tar': ((), None, None),
+    'bsdtar': ((), None, None),
+}
+
+# Compressions of GNU tar, by the option that shows them in --help.
+# tar runs the program of the same name.
+TarOptions = {
+    'gzip': '--gzip',
+    'compress': '--compress',
+    'bzip2': '--bzip2',
+    'lzma': '--lzma',
+    'xz': '--xz',
+    'lzip': '--lzip',
+}
+
+# Compressions of bsdtar, by the library --version shows
+BsdtarLibraries = {
+    'gzip': 'zlib/',
+    'bzip2': 'bz2lib/',
+    'lzma': 'liblzma/',
+    'xz': 'liblzma/',
+}
+
+# The RAR codec of p7zip
+RarCodecs = tuple(os.path.join(libdir, 'p7zip/Codecs', codec)
+                  for libdir in ('/usr/lib', '/usr/local/lib', '/usr/lib64',
+                                 '/usr/local/lib64', '/usr/lib/i386-linux-gnu',
+                                 '/usr/lib/x86_64-linux-gnu')
+                  for codec in ('Rar29.so', 'Rar.so'))
+
+# Seconds a probe may take
+PROBE_TIMEOUT = 5
+
+VersionPattern = re.compile(r'\d+(?:\.\d+)+')
+
+# PATH -> programs, as scan_path() returned them to this process
+Scanned = {}
+
+#-----------------------------------------------------------------------
+#
+# Classes
+#
+#-----------------------------------------------------------------------
+
+#-----------------------------------------------------------------------
+#
+# Functions
+#
+# split_path
+# scan_path
+# find
+# run_probe
+# probe_depends
+# probe
+# info
+# codecs
+# thread_args
+# registry
+#
+#-----------------------------------------------------------------------
+
+#-----------------------------------------------------------------------
+#
+# Function split_path
+#
+# Inputs
+# ------
+#    @param: path - as PATH
+#
+# Returns
+# -------
+#    @return: directories - without duplicates, in order
+#
+# Raises
+# ------
+#    ...
+#
+#-----------------------------------------------------------------------
+def split_path(path):
+    directories = []
+    for directory in path.split(os.pathsep):
+        if directory and directory not in directories:
+            directories.append(directory)
+    return directories
+
+#-----------------------------------------------------------------------
+#
+# Function scan_path
+#
+# List the programs in every directory of path; the first directory
+# holding a program wins, as for which.
+#
+# Inputs
+# ------
+#    @param: path - as PATH, of absolute directories
+#
+# Returns
+# -------
+#    @return: programs - dictionary of program -> filename
+#
+# Raises
+# ------
+#    ...
+#
+#-----------------------------------------------------------------------
+@cache.cached(maxsize=8, disk=True, depends=split_path)
+def scan_path(path):
+    programs = {}
+    for directory in split_path(path):
+        try:
+            entries = os.scandir(directory)
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                if entry.name in programs:
+                    continue
+                try:
+                    if entry.is_file() and os.access(entry.path, os.X_OK):
+                        programs[entry.name] = entry.path
+                except OSError:
+                    pass
+    logger.debug('Found %d programs on %s', len(programs), path)
+    return programs
+
+#-----------------------------------------------------------------------
+#
+# Function find
+#
+# Look for a program on path.  The PATH directories are stamped once
+# per process, or at each poll after cache.watch_stamps().  A PATH with
+# relative directories depends on the current directory, so it is
+# searched every time.
+#
+# Inputs
+# ------
+#    @param: program
+#    @param: path    - defaults to PATH
+#
+# Returns
+# -------
+#    @return: filename
+#    @return: None - not found
+#
+# Raises
+# ------
+#    ...
+#
+#-----------------------------------------------------------------------
+def find(program, path=None):
+    if path is None:
+        path = os.environ.get('PATH', os.defpath)
+    if os.sep in program \
+       or not all(os.path.isabs(d) for d in split_path(path)):
+        return shutil.which(program, path=path)
+    programs = Scanned.get(path)
+    if programs is None or cache.WatchedStamps is not None:
+        programs = Scanned[path] = scan_path(path)
+    return programs.get(program)
+
+#-----------------------------------------------------------------------
+#
+# Function run_probe
+#
+# Inputs
+# ------
+#    @param: cmd
+#
+# Returns
+# -------
+#    @return: text - standard output and error; empty when the program
+#                    fails to run
+#
+# Raises
+# ------
+#    ...
+#
+#-----------------------------------------------------------------------
+def run_probe(cmd):
+    try:
+        result = subprocess.run(cmd,
+                                stdin=subprocess.DEVNULL,
+                                stdout=subprocess.PIPE,
+                                stderr=subprocess.STDOUT,
+                                timeout=PROBE_TIMEOUT)
+    except (OSError, subprocess.SubprocessError) as msg:
+        logger.debug('Probing %s failed: %s', cmd[0], msg)
+        return ''
+    return result.stdout.decode('utf-8', 'replace')
+
+#-----------------------------------------------------------------------
+#
+# Function probe_depends
+#
+# The files a probe depends on: the program, and for 7z its RAR codec.
+#
+# Inputs
+# ------
+#    @param: exe
+#
+# Returns
+# -------
+#    @return: filenames
+#
+# Raises
+# ------
+#    ...
+#
+#-----------------------------------------------------------------------
+def probe_depends(exe):
+    if os.path.basename(exe) == '7z':
+        return (exe,) + RarCodecs
+    return (exe,)
+
+#-----------------------------------------------------------------------
+#
+# Function probe
+#
+# Learn what a program can do.  GNU tar and bsdtar are asked which
+# compressions they were built with; other programs handle those of
+# Tools.
+#
+# Inputs
+# ------
+#    @param: exe - filename of the program
+#
+# Returns
+# -------
+#    @return: info - dictionary of path, version (None when not shown),
+#                    codecs and threads (the thread arguments, None
+#                    without thread support)
+#
+# Raises
+# ------
+#    ...
+#
+#-----------------------------------------------------------------------
+@cache.cached(maxsize=64, disk=True, depends=probe_depends)
+def probe(exe):
+    program = os.path.basename(exe)
+    codecs, threads, token = Tools.get(program, ((), None, None))
+
+    version_text = run_probe([exe, '--version'])
+    help_text = run_probe([exe, '--help'])
+    match = VersionPattern.search(version_text) \
+        or VersionPattern.search(help_text)
+
+    if program == 'tar' and 'GNU tar' in version_text:
+        codecs = tuple(codec for codec, option in TarOptions.items()
+                       if option in help_text)
+    elif program == 'bsdtar':
+        codecs = ('compress',) + tuple(
+            codec for codec, library in BsdtarLibraries.items()
+            if library in version_text)
+    elif program == '7z' and any(os.path.exists(codec)
+                                 for codec in RarCodecs):
+        codecs += ('rar',)
+
+    if threads is not None and token not in help_text:
+        threads = None
+
+    logger.debug('Probed %s: version %s, codecs %s, threads %s', exe,
+                 match and match.group(), codecs, threads)
+    return {'path': exe,
+            'version': match.group() if match else None,
+            'codecs': codecs,
+            'threads': threads}
+
+#-----------------------------------------------------------------------
+#
+# Function info
+#
+# Inputs
+# ------
+#    @param: program
+#    @param: path    - defaults to PATH
+#
+# Returns
+# -------
+#    @return: info - see probe()
+#    @return: None - program not found
+#
+# Raises
+# ------
+#    ...
+#
+#-----------------------------------------------------------------------
+def info(program, path=None):
+    exe = find(os.path.basename(program), path)
+    if exe is None:
+        return None
+    found = probe(exe)
+    if os.path.basename(exe) == 'tar':
+        # GNU tar runs a program for each compression
+        found = dict(found, codecs=tuple(codec for codec in found['codecs']
+                                         if find(codec, path)))
+    return found
+
+#-----------------------------------------------------------------------
+#
+# Function codecs
+#
+# Inputs
+# ------
+#    @param: program
+#
+# Returns
+# -------
+#    @return: codecs - empty when the program is not found
+#
+# Raises
+# ------
+#    ...
+#
+#-----------------------------------------------------------------------
+def codecs(program):
+    found = info(program)
+    return found['codecs'] if found else ()
+
+#-----------------------------------------------------------------------
+#
+# Function thread_args
+#
+# Inputs
+# ------
+#    @param: program
+#    @param: jobs    - threads to use
+#
+# Returns
+# -------
+#    @return: args - empty when the program has no thread support
+#
+# Raises
+# ------
+#    ...
+#
+#-----------------------------------------------------------------------
+def thread_args(program, jobs):
+    found = info(program)
+    if not found or not found['threads']:
+        return []
+    return [arg % jobs if '%' in arg else arg for arg in found['threads']]
+
+#-----------------------------------------------------------------------
+#
+# Function registry
+#
+# Inputs
+# ------
+#    @param: path - defaults to PATH
+#
+# Returns
+# -------
+#    @return: registry - dictionary of program -> info for each program
+#                        of Tools that is installed
+#
+# Raises
+# ------
+#    ...
+#
+#-----------------------------------------------------------------------
+def registry(path=None):
+    found = {}
+    for program in Tools:
+        program_info = info(program, path)
+        if program_info is not None:
+            found[program] = program_info
+    return found
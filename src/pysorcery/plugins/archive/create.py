@@ -117,15 +117,12 @@ colortext = text.ConsoleText()
 #
 #-----------------------------------------------------------------------
 def archive_create(args):
-    logger.debug('Begin Function')
-
     cfile = lib.File(args.archive)
 
     cfile.create(args.pathname,
                  verbosity=args.verbosity,
                  interactive=args.interactive)
 
-    logger.debug('End Function')
     return
 
 #-----------------------------------------------------------------------
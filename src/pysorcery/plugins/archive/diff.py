@@ -117,17 +117,15 @@ colortext = text.ConsoleText()
 #
 #-----------------------------------------------------------------------
 def archive_diff(args):
-    logger.debug('Begin Function')
-
     """Show differences between two archives."""
     try:
         archives = lib.Files(filelist=args.archive)
         result = archives.diff(verbosity=args.verbosity,
-                               interactive=args.interactive)
+                               interactive=args.interactive,
+                               contents=not args.size)
     except Exception as msg:
-        logger.error("error showing differences between %s and %s: %s" % (args.archive[0], args.archive[1], msg))
+        logger.error("error showing differences between %s and %s: %s", args.archive[0], args.archive[1], msg)
 
-    logger.debug('End Function')
     return
 
 #-----------------------------------------------------------------------
@@ -166,11 +164,11 @@ def parser(*args, **kwargs):
     group.add_argument('-s',
                      '--size',
                      action='store_true',
-                     help='Compare file names and sizes')
+                     help='Compare file names, sizes and modes only')
     group.add_argument('-c',
                      '--contents',
                      action='store_true',
-                     help='Compare file contents')
+                     help='Compare file contents and show diffs (default)')
     cmd.add_argument('-n',
                      '--non-interactive',
                      dest = 'interactive',
@@ -60,8 +60,10 @@ from pysorcery import *
 from pysorcery import lib
 from pysorcery.lib import util
 from pysorcery.lib.util import config
+from pysorcery.lib.util import output
 from pysorcery.lib.util import text
 from pysorcery.lib.files import archive
+from pysorcery.lib.files import batch
 
 # Conditional Libraries
 
@@ -106,10 +108,16 @@ colortext = text.ConsoleText()
 #            args.recursive - Extract all files in all subfolders
 #            args.depth (Add me) - if recursive, limit to depth #
 #            args.output_dir - Directory to extract to
+#            args.jobs - Archives to extract at once
+#            args.io_jobs - Archives to read ahead at once
+#            args.keep_going - Go on after an archive fails
+#
+#    Several archives are extracted at once, each into a directory of
+#    its own in the output directory, and reported in order.
 #
 # Returns
 # -------
-#    @return: None
+#    @return: res - 0, or 1 when an archive failed
 #
 # Raises
 # ------
@@ -117,17 +125,36 @@ colortext = text.ConsoleText()
 #
 #-----------------------------------------------------------------------
 def archive_extract(args):
-    logger.debug('Begin Function')
-
-    for file_ in args.files:
-        cfile = lib.File(file_)
+    if len(args.files) == 1:
+        cfile = lib.File(args.files[0])
         cfile.extract(verbosity=args.verbosity,
                       interactive=args.interactive,
                       outdir=args.outdir)
-            
-
-    logger.debug('End Function')
-    return
+        return 0
+
+    res = 0
+    failed = 0
+    reported = 0
+    writer = output.get_writer()
+    for file_, target, error in batch.extract_all(args.files,
+                                                   outdir=args.outdir,
+                                                   jobs=args.jobs,
+                                                   io_jobs=args.io_jobs,
+                                                   keep_going=args.keep_going,
+                                                   verbosity=args.verbosity):
+        reported += 1
+        if error is not None:
+            writer.flush()
+            logger.error("error extracting %s: %s", file_, error)
+            failed += 1
+            res = 1
+        else:
+            writer.line('%s: %s' % (file_, target))
+    writer.flush()
+    if failed:
+        logger.error('%d of %d archives failed, %d not extracted',
+                     failed, len(args.files), len(args.files) - reported)
+    return res
 
 
 #-----------------------------------------------------------------------
@@ -177,6 +204,32 @@ def parser(*args, **kwargs):
                      action = 'store_false',
                      help="Don't query for user input (ie. passwords or when overwriting duplicate files); use with care since overwriting files or ignoring passwords could be unintended"
     )
+    cmd.add_argument('-j',
+                     '--jobs',
+                     type = int,
+                     metavar = 'N',
+                     help = 'Extract at most N archives at once (default: '
+                            'one per CPU)'
+    )
+    cmd.add_argument('--io-jobs',
+                     type = int,
+                     metavar = 'N',
+                     help = 'Read at most N archives ahead at once '
+                            '(default: %d; 0 to not read ahead)'
+                            % batch.IO_JOBS
+    )
+    policy = cmd.add_mutually_exclusive_group()
+    policy.add_argument('-k',
+                        '--keep-going',
+                        action = 'store_true',
+                        help = 'Go on extracting after an archive fails'
+    )
+    policy.add_argument('--fail-fast',
+                        dest = 'keep_going',
+                        action = 'store_false',
+                        help = 'Stop at the first archive that fails '
+                               '(default)'
+    )
     cmd.add_argument('-r',
                      '--recursive',
                      action = 'store_true',
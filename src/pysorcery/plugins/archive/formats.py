@@ -62,6 +62,7 @@ from pysorcery import lib
 from pysorcery.lib import util
 from pysorcery.lib.util import config
 from pysorcery.lib.util import text
+from pysorcery.lib.util import tools
 from pysorcery.lib.files import archive
 from pysorcery.lib.files import audio
 from pysorcery.lib.files import compressed
@@ -123,6 +124,17 @@ def archive_formats(args):
         print(util.system_search_path())
         print()
 
+        print("Compression programs found:")
+        for program, found in sorted(tools.registry().items()):
+            print("   %8s: %s %s" % (program, found['path'],
+                                    found['version'] or ''), end=' ')
+            if found['codecs']:
+                print("(%s)" % ", ".join(found['codecs']), end=' ')
+            if found['threads']:
+                print("(threads)", end=' ')
+            print()
+        print()
+
         if (args.archive is False
             and args.audio is False
             and args.compressed is False
@@ -114,13 +114,10 @@ colortext = text.ConsoleText()
 #
 #-----------------------------------------------------------------------
 def archive_list(args):
-    logger.debug('Begin Function')
-
     for i in args.files:
         cfile = lib.File(i)
         content = cfile.listfiles()
 
-    logger.debug('End Function')
     return
 
 #-----------------------------------------------------------------------
@@ -59,6 +59,7 @@ from pysorcery.lib.system import mimetypes
 
 # Other Application Libraries
 from pysorcery import lib
+from pysorcery.lib.files import archive
 from pysorcery.lib.util import config
 from pysorcery.lib.util import text
 # Conditional Libraries
@@ -102,10 +103,12 @@ colortext = text.ConsoleText()
 #    @param: args
 #            args.quiet - Decrease Output Verbosity
 #            args.files - List of files to extract
+#            args.members - Files within an archive to read
+#            args.index - Build the index of a tar archive
 #
 # Returns
 # -------
-#    @return: None
+#    @return: res - 0, or 1 when a file could not be read
 #
 # Raises
 # ------
@@ -113,17 +116,33 @@ colortext = text.ConsoleText()
 #
 #-----------------------------------------------------------------------
 def archive_read(args):
-    logger.debug('Begin Function')
-
+    res = 0
     for i in args.files:
         cfile = lib.File(i)
-        content = cfile.read()
-
-        for line in content:
-            print(line)
-
-    logger.debug('End Function')
-    return
+        if not isinstance(cfile, archive.Archive):
+            content = cfile.read()
+
+            for line in content:
+                print(line)
+            continue
+
+        if not args.members:
+            logger.error('%s is an archive; name the files to read with '
+                         '--member', i)
+            res = 1
+            continue
+        for member in args.members:
+            try:
+                content = cfile.read(member, index=args.index)
+            except Exception as msg:
+                logger.error('error reading %s in %s: %s', member, i, msg)
+                res = 1
+                continue
+            sys.stdout.flush()
+            sys.stdout.buffer.write(content)
+            sys.stdout.buffer.flush()
+
+    return res
 
 #-----------------------------------------------------------------------
 #
@@ -157,6 +176,17 @@ def parser(*args, **kwargs):
     cmd.add_argument('files',
                      nargs = '+',
                      help = 'List files')
+    cmd.add_argument('-m',
+                     '--member',
+                     dest = 'members',
+                     action = 'append',
+                     metavar = 'NAME',
+                     help = 'File within an archive to read; may be given '
+                            'more than once')
+    cmd.add_argument('--index',
+                     action = 'store_true',
+                     help = 'Build an index of a tar archive that has none, '
+                            'so later reads only decompress around the file')
     cmd.set_defaults(func = archive_read)
 
     return cmd
@@ -60,6 +60,7 @@ from pysorcery.lib import util
 from pysorcery.lib.util import config
 from pysorcery.lib.util import text
 from pysorcery.lib.files import archive
+from pysorcery.lib.files import recompress
 
 # Conditional Libraries
 
@@ -86,6 +87,7 @@ colortext = text.ConsoleText()
 # Functions
 #
 # archive_recompress
+# candidates
 # parser
 #
 #-----------------------------------------------------------------------
@@ -102,6 +104,10 @@ colortext = text.ConsoleText()
 #            args.quiet   - Decrease Output Verbosity
 #            args.archive - Original File
 #            args.compression_level - Compression level to recompress to.
+#            args.candidates - Compressions to try
+#            args.jobs       - Candidates to run at once
+#            args.max_time   - Seconds a candidate may take
+#            args.min_gain   - Percent a candidate must save
 #
 # Returns
 # -------
@@ -113,21 +119,50 @@ colortext = text.ConsoleText()
 #
 #-----------------------------------------------------------------------
 def archive_recompress(args):
-    logger.debug('Begin Function')
-
     """Recompress an archive to smaller size."""
     res = 0
     try:
+        candidates = args.candidates
+        if not candidates and args.compression_level is not None:
+            # The file's own compression at the given level
+            base, codec = recompress.split_name(args.archive)
+            candidates = [(codec, args.compression_level, False)]
         archive = lib.File(args.archive)
         archive.recompress_archive(verbosity=args.verbosity,
-                                   interactive=args.interactive)
+                                   interactive=args.interactive,
+                                   candidates=candidates,
+                                   jobs=args.jobs,
+                                   max_time=args.max_time,
+                                   min_gain=args.min_gain)
     except Exception as msg:
-        logger.error("error recompressing %s: %s" % (args.archive, msg))
+        logger.error("error recompressing %s: %s", args.archive, msg)
         res = 1
     return res
 
-    logger.debug('End Function')
-    return
+#-----------------------------------------------------------------------
+#
+# Function candidates
+#
+# Argument type of --try.
+#
+# Inputs
+# ------
+#    @param: text
+#
+# Returns
+# -------
+#    @return: candidates - list of (codec, level, extreme)
+#
+# Raises
+# ------
+#    @raises: argparse.ArgumentTypeError
+#
+#-----------------------------------------------------------------------
+def candidates(text):
+    try:
+        return recompress.parse_candidates(text)
+    except ValueError as msg:
+        raise argparse.ArgumentTypeError(str(msg))
 
 #-----------------------------------------------------------------------
 #
@@ -162,10 +197,32 @@ def parser(*args, **kwargs):
     cmd.add_argument('archive',
                      help = 'Source file')
     cmd.add_argument('compression_level',
+                     nargs = '?',
                      type = int,
-                     choices = range(0, 9),
-                     default = 9,
+                     choices = range(0, 10),
+                     default = None,
                      help = 'Set new compression level')
+    cmd.add_argument('--try',
+                     dest = 'candidates',
+                     metavar = 'CANDIDATES',
+                     type = candidates,
+                     help = 'Compressions to try at once and keep the '
+                            'smallest of, e.g. gzip:9,xz:6,xz:9e,zstd:19,lzip')
+    cmd.add_argument('-j',
+                     '--jobs',
+                     type = int,
+                     metavar = 'N',
+                     help = 'Run at most N candidates at once (default: '
+                            'one per CPU)')
+    cmd.add_argument('--max-time',
+                     type = float,
+                     metavar = 'SECONDS',
+                     help = 'Only keep candidates that took at most SECONDS')
+    cmd.add_argument('--min-gain',
+                     type = float,
+                     default = 0.0,
+                     metavar = 'PERCENT',
+                     help = 'Only keep a candidate at least PERCENT smaller')
     cmd.add_argument('-n',
                      '--non-interactive',
                      dest = 'interactive',
@@ -101,6 +101,7 @@ colortext = text.ConsoleText()
 #            args.quiet - Decrease Output Verbosity
 #            args.srcfile
 #            args.dstfile
+#            args.compression_level
 #
 # Returns
 # -------
@@ -112,18 +113,18 @@ colortext = text.ConsoleText()
 #
 #-----------------------------------------------------------------------
 def archive_repack(args):
-    logger.debug('Begin Function')
-
     """Repackage one archive in another format."""
     res = 0
     try:
         archive = lib.File(args.srcfile)
-        archive.repack_archive(args.dstfile, verbosity=args.verbosity, interactive=args.interactive)
+        archive.repack_archive(args.dstfile,
+                               verbosity=args.verbosity,
+                               interactive=args.interactive,
+                               level=args.compression_level)
     except Exception as msg:
         logging.error("error repacking %s: %s" % (args.srcfile, msg))
         res = 1
 
-    logger.debug('End Function')
     return
 
 #-----------------------------------------------------------------------
@@ -159,9 +160,10 @@ def parser(*args, **kwargs):
     cmd.add_argument('dstfile',
                                help = 'Destination File')
     cmd.add_argument('compression_level',
+                     nargs = '?',
                      type = int,
-                     choices = range(0, 9),
-                     default = 9,
+                     choices = range(0, 10),
+                     default = None,
                      help = 'Set new compression level')
     cmd.add_argument('-n',
                      '--non-interactive',
@@ -100,7 +100,10 @@ colortext = text.ConsoleText()
 #    @param: args
 #            args.quiet  - Decrease Output Verbosity
 #            args.archive - Archive to search
-#            args.search - What we are searching for
+#            args.pattern - What we are searching for
+#            args.max_count - Stop after this many matches
+#            args.ignore_case
+#            args.fixed_strings
 #
 # Returns
 # -------
@@ -113,15 +116,18 @@ colortext = text.ConsoleText()
 #-----------------------------------------------------------------------
 def archive_search(args):
     """Search for pattern in given archive."""
-    logger.debug('Begin Function')
 
     try:
         archive = lib.File(args.archive)
-        res = archive.search(args.pattern, verbosity=args.verbosity, interactive=args.interactive)
+        res = archive.search(args.pattern,
+                             verbosity=args.verbosity,
+                             interactive=args.interactive,
+                             max_count=args.max_count,
+                             ignore_case=args.ignore_case,
+                             fixed_strings=args.fixed_strings)
     except Exception as msg:
-        logger.error("error searching %s: %s" % (args.archive, msg))
+        logger.error("error searching %s: %s", args.archive, msg)
         res = 2
-    logger.debug('End Function')
     return
 
 #-----------------------------------------------------------------------
@@ -156,6 +162,19 @@ def parser(*args, **kwargs):
                      help = 'Archive to search')
     cmd.add_argument('pattern',
                      help = 'Term to search for')
+    cmd.add_argument('-m',
+                     '--max-count',
+                     metavar = 'NUM',
+                     type = int,
+                     help = 'Stop reading the archive after NUM matches')
+    cmd.add_argument('-i',
+                     '--ignore-case',
+                     action = 'store_true',
+                     help = 'Ignore case distinctions')
+    cmd.add_argument('-F',
+                     '--fixed-strings',
+                     action = 'store_true',
+                     help = 'Search for a string, not a regular expression')
     cmd.add_argument('-n',
                      '--non-interactive',
                      dest = 'interactive',
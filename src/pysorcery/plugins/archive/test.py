@@ -114,7 +114,6 @@ colortext = text.ConsoleText()
 #-----------------------------------------------------------------------
 def archive_test(args):
     """Test files in archive(s)."""
-    logger.debug('Begin Function')
     for i in args.archive:
         try:
             cfile = lib.File(i)
@@ -123,7 +122,6 @@ def archive_test(args):
         except Exception as msg:
             logging.error("error testing %s: %s" % (archive, msg))
 
-    logger.debug('End Function')
     return
 
 #-----------------------------------------------------------------------
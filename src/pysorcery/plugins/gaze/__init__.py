@@ -57,6 +57,7 @@ from pysorcery import *
 from pysorcery import lib
 from pysorcery.lib.sorcery.smgl import py_smgl
 from pysorcery.lib.util import config
+from pysorcery.lib.util import output
 from pysorcery.lib.util import text
 # Conditional Libraries
 
@@ -123,19 +124,15 @@ colortext = text.ConsoleText()
 #
 #-----------------------------------------------------------------------
 def gaze_checksum(args):
-    logger.debug('Begin Function')
-            
     spell = libspell.Spell(i)
 
-    logger.debug3('Spell: ' + str(spell))
+    logger.debug3('Spell: %s', spell)
         
-    message = colortext.colorize(spell.name, 'bold','white','black')
-    logger.info(message)
+    writer = output.get_writer()
+    writer.record({'spell': spell.name, 'description': spell.description},
+                  (spell.name, 'name'),
+                  (spell.description, 'value'))
 
-    message = colortext.colorize(spell.description, 'none','white','black')
-    logger.info1(message)
-
-    logger.debug('End Function')
     return
 
 #-------------------------------------------------------------------------------
@@ -161,16 +158,12 @@ def gaze_checksum(args):
 #
 #-------------------------------------------------------------------------------
 def gaze_queue(args):
-    logger.debug('Begin Function')
-
     # 
     queue = lib.Packages()
     spells = queue.get_queue(args.queue)
 
-    for spell in spells:
-        print(spell)
+    output.get_writer().records('spell', spells)
     
-    logger.debug('End Function')
     return
 
 #-------------------------------------------------------------------------------
@@ -201,8 +194,7 @@ def gaze_queue(args):
 #
 #-------------------------------------------------------------------------------
 def gaze_version(args):
-    logger.debug('Begin Function')
-
+    writer = output.get_writer()
     for i in args.spell:
         spell = lib.Package(i)
         version = spell.get_version()
@@ -215,15 +207,11 @@ def gaze_version(args):
             if args.verbosity > 0:
                 logger.critical('Fix Me')
             else:
-                message = colortext.colorize(spell.name, 'bold','white','black')
-                logger.info1(message)
-
-                message = colortext.colorize(version, 'none','white','black')
-                logger.info2(message)
-
-                print()
+                writer.record({'spell': spell.name, 'version': version},
+                              (spell.name, 'name'),
+                              (version, 'value'),
+                              ('', None))
     
-    logger.debug('End Function')
     return
 
 #-------------------------------------------------------------------------------
@@ -254,8 +242,7 @@ def gaze_version(args):
 #
 #-------------------------------------------------------------------------------
 def gaze_versions(args):
-    logger.debug('Begin Function')
-
+    writer = output.get_writer()
     for i in args.spell:
         spell = lib.Package(i)
         version = spell.get_version()
@@ -265,15 +252,11 @@ def gaze_versions(args):
         if args.verbosity > 0:
             logger.critical('Fix Me')
         else:
-            message = colortext.colorize(spell.name, 'bold','white','black')
-            logger.info1(message)
-            
-            message = colortext.colorize(version, 'none','white','black')
-            logger.info2(message)
-
-            print()
+            writer.record({'spell': spell.name, 'version': version},
+                          (spell.name, 'name'),
+                          (version, 'value'),
+                          ('', None))
     
-    logger.debug('End Function')
     return
 
 #-------------------------------------------------------------------------------
@@ -306,18 +289,14 @@ def gaze_versions(args):
 #
 #-------------------------------------------------------------------------------
 def gaze_spell_file(args):
-    logger.debug('Begin Function')
-
     if args.filename.upper() in py_smgl.spellfiles:
         spell = lib.Package(args.spell)
         content = spell.read_file(args.filename)
     else:
         raise NotImplementedError
 
-    for line in content:
-        print(line)
+    output.get_writer().records('line', content)
 
-    logger.debug('End Function')
     return
 
 #-------------------------------------------------------------------------------
@@ -345,8 +324,6 @@ def gaze_spell_file(args):
 #
 #-------------------------------------------------------------------------------
 def gaze_file(args):
-    logger.debug('Begin Function')
-
     conf = config.SorceryConfig()
     if (not args.spell and
         args.filename):
@@ -358,10 +335,8 @@ def gaze_file(args):
     else:
         raise NotImplementedError
 
-    for line in content:
-        print(line)
+    output.get_writer().records('line', content)
 
-    logger.debug('End Function')
     return
 
 #-------------------------------------------------------------------------------
@@ -393,14 +368,11 @@ def gaze_file(args):
 #
 #-------------------------------------------------------------------------------
 def gaze_grimoire(args):
-    logger.debug('Begin Function')
-
     if args.multi:
         codex = lib.Repositories()
         repositories = codex.repositories
 
-        for repo in repositories:
-            print(repo)
+        output.get_writer().records('grimoire', repositories)
 
     elif args.grimoire:
         logger.info('Fix Me')
@@ -408,7 +380,6 @@ def gaze_grimoire(args):
     else:
         libgaze.print_codex()          
     
-    logger.debug('End Function')
     return
 
 #-------------------------------------------------------------------------------
@@ -437,15 +408,11 @@ def gaze_grimoire(args):
 #
 #-------------------------------------------------------------------------------
 def gaze_grimoires(args):
-    logger.debug('Begin Function')
-
     codex = lib.Repositories()
     repositories = codex.repositories
     
-    for repo in repositories:
-        print(repo)
+    output.get_writer().records('grimoire', repositories)
     
-    logger.debug('End Function')
     return
 
 #-------------------------------------------------------------------------------
@@ -480,10 +447,7 @@ def gaze_grimoires(args):
 #
 #-------------------------------------------------------------------------------
 def gaze_time(args):
-    logger.debug('Begin Function')
-
     
-    logger.debug('End Function')
     return
 
 #-------------------------------------------------------------------------------
@@ -515,13 +479,25 @@ def gaze_time(args):
 #
 #-------------------------------------------------------------------------------
 def gaze_packages_status(args):
+    writer = output.get_writer()
     if args.spell:
         for i in args.spell:
             spell = lib.Package(i)
-            print(spell.get_version())
+            version = spell.get_version()
+            writer.record({'spell': spell.name, 'version': version},
+                          (version, None))
     else:
         spells = lib.Packages()
         spell_status = spells.get_installed(args.spellstatus)
 
-        for spell in spell_status:
-            print(spell)
+        if writer.format == 'text':
+            writer.records('spell', spell_status)
+        else:
+            # The backend returns name, date, version, name, ...
+            fields = [str(field).strip() for field in spell_status]
+            for name, date, version in zip(fields[0::3],
+                                           fields[1::3],
+                                           fields[2::3]):
+                writer.record({'spell': name,
+                               'date': date,
+                               'version': version})
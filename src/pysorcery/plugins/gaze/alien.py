@@ -52,6 +52,7 @@ from pysorcery.lib.system import distro
 from pysorcery.lib.system import logging
 # Other Application Libraries
 from pysorcery import lib
+from pysorcery.lib.util import output
 from pysorcery.lib.util import text
 
 # Conditional Libraries
@@ -67,7 +68,7 @@ from pysorcery.lib.util import text
 logger = logging.getLogger(__name__)
 # Allow Color text on console
 colortext = text.ConsoleText()
-pkg_mgr = distro.distro_group[distro.distro_id]
+pkg_mgr = distro.get_pkg_mgr()
 
 #-----------------------------------------------------------------------
 #
@@ -102,15 +103,11 @@ pkg_mgr = distro.distro_group[distro.distro_id]
 #
 #-------------------------------------------------------------------------------
 def gaze_alien(args):
-    logger.debug('Begin Function')
-
     # create 'alien' object
     files = lib.Files()
     alien = files.get_alien()
-    for f in alien:
-        print(f)
+    output.get_writer().records('file', alien)
 
-    logger.debug('End Function')
     return
 
 #-----------------------------------------------------------------------
@@ -52,6 +52,8 @@ import sys
 from pysorcery.lib.system import logging
 # Other Application Libraries
 from pysorcery import lib
+from pysorcery.lib import sorcery
+from pysorcery.lib.util import output
 from pysorcery.lib.util import text
 
 # Conditional Libraries
@@ -100,14 +102,14 @@ colortext = text.ConsoleText()
 #
 #-------------------------------------------------------------------------------
 def gaze_dependencies(args):
-    logger.debug('Begin Function')
-
     spell = lib.Package(args.spell[0])
-    dependencies = spell.get_dependencies()
+    try:
+        dependencies = sorcery.get_package_info(spell, 'get_dependencies')
+    except sorcery.PackageError as error:
+        logger.error(error)
+        return
 
-    for dep in dependencies:
-        print(dep)
-    logger.debug('End Function')
+    output.get_writer().records('spell', dependencies)
     return
 
 
@@ -52,6 +52,8 @@ pyGaze: depends
 from pysorcery.lib.system import logging
 # Other Application Libraries
 from pysorcery import lib
+from pysorcery.lib import sorcery
+from pysorcery.lib.util import output
 from pysorcery.lib.util import text
 
 # Conditional Libraries
@@ -107,15 +109,15 @@ colortext = text.ConsoleText()
 #
 #-------------------------------------------------------------------------------
 def gaze_depends(args):
-    logger.debug('Begin Function')
-
     spell = lib.Package(args.spell[0])
-    depends = spell.get_depends()
+    try:
+        depends = sorcery.get_package_info(spell, 'get_depends')
+    except sorcery.PackageError as error:
+        logger.error(error)
+        return
 
-    for dep in depends:
-        print(dep)
+    output.get_writer().records('spell', depends)
 
-    logger.debug('End Function')
     return
 
 
@@ -51,6 +51,7 @@ pyGaze: from
 from pysorcery.lib.system import logging
 # Other Application Libraries
 from pysorcery import lib
+from pysorcery.lib.util import output
 from pysorcery.lib.util import text
 
 # Conditional Libraries
@@ -106,15 +107,11 @@ colortext = text.ConsoleText()
 #
 #-----------------------------------------------------------------------
 def gaze_from(args):
-    logger.debug('Begin Function')
-
     file_ = lib.File(args.filename[0])
     spells = file_.get_from()
 
-    for spell in spells:
-        print(spell)
+    output.get_writer().records('spell', spells)
 
-    logger.debug('End Function')
     return
 
 #-----------------------------------------------------------------------
@@ -56,6 +56,7 @@ from pysorcery.lib.system import logging
 
 # Other Application Libraries
 from pysorcery import lib
+from pysorcery.lib.util import output
 from pysorcery.lib.util import text
 
 # Conditional Libraries
@@ -143,12 +144,12 @@ Raises
     if args.ssl[0] in licenses:
         license_ = lib.File(license_dir + '/' + args.ssl[0])
         content = license_.read()
-        for line in content:
-            print(line)
+        output.get_writer().records('line', content)
     else:
         package = lib.Package(args.ssl[0])
         if package.is_package():
-            print(package.get_license())
+            output.get_writer().record({'spell': package.name,
+                                        'license': package.get_license()})
         else:
             raise NotImplementedError
 
@@ -52,6 +52,7 @@ specified spell.
 from pysorcery.lib.system import logging
 # Other Application Libraries
 from pysorcery import lib
+from pysorcery.lib.util import output
 from pysorcery.lib.util import text
 
 # Conditional Libraries
@@ -108,10 +109,9 @@ colortext = text.ConsoleText()
 #
 #-------------------------------------------------------------------------------
 def gaze_maintainer(args):
-    logger.debug('Begin Function')
-
+    writer = output.get_writer()
     for i in args.spell:
-        logger.debug2('Loop iteration: ' + i)
+        logger.debug2('Loop iteration: %s', i)
         
         spell = lib.Package(i)
         tf = spell.is_package()
@@ -121,14 +121,12 @@ def gaze_maintainer(args):
             section = lib.Section(i)
             maintainer = section.get_maintainer()
             
-        logger.debug3('Spell: ' + str(spell))
+        logger.debug3('Spell: %s', spell)
         
-        message = colortext.colorize(spell.name, 'bold','white','black')
-        logger.info(message)
-        message = colortext.colorize(maintainer, 'none','white','black')
-        logger.info1(message)
+        writer.record({'spell': spell.name, 'maintainer': maintainer},
+                      (spell.name, 'name'),
+                      (maintainer, 'value'))
     
-    logger.debug('End Function')
     return
 
 
@@ -51,6 +51,7 @@ pyGaze: orphans
 from pysorcery.lib.system import logging
 # Other Application Libraries
 from pysorcery import lib
+from pysorcery.lib.util import output
 from pysorcery.lib.util import text
 
 # Conditional Libraries
@@ -98,14 +99,10 @@ colortext = text.ConsoleText()
 #
 #-----------------------------------------------------------------------
 def gaze_orphans(args):
-    logger.debug('Begin Function')
-
     spells = lib.Packages()
     orphans = spells.get_orphans()
-    for orphan in orphans:
-        logger.info1(orphan)
+    output.get_writer().records('spell', orphans)
 
-    logger.debug('End Function')
     return
 
 #-----------------------------------------------------------------------
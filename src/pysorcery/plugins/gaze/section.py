@@ -51,6 +51,7 @@ View ...
 from pysorcery.lib.system import logging
 # Other Application Libraries
 from pysorcery import lib
+from pysorcery.lib.util import output
 from pysorcery.lib.util import text
 
 # Conditional Libraries
@@ -109,8 +110,8 @@ def gaze_section(args):
     section = lib.Section(args.section)
     packages = section.get_packages()
 
-    for package in packages:
-        print(package.name)
+    output.get_writer().records('spell',
+                                (package.name for package in packages))
 
     return
 
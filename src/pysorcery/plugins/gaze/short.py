@@ -51,6 +51,7 @@ Provide a package short description
 from pysorcery.lib.system import logging
 # Other Application Libraries
 from pysorcery import lib
+from pysorcery.lib.util import output
 from pysorcery.lib.util import text
 
 # Conditional Libraries
@@ -101,22 +102,19 @@ colortext = text.ConsoleText()
 #
 #-----------------------------------------------------------------------
 def gaze_short(args):
-    logger.debug('Begin Function')
-
+    writer = output.get_writer()
     for i in args.spell:
-        logger.debug2('Loop iteration: ' + i)
+        logger.debug2('Loop iteration: %s', i)
         
         spell = lib.Package(i)
         short = spell.get_short()
 
-        logger.debug3('Spell: ' + str(spell))
+        logger.debug3('Spell: %s', spell)
         
-        message = colortext.colorize(spell.name, 'bold','white','black')
-        logger.info(message)
-        message = colortext.colorize(short, 'none','white','black')
-        logger.info1(message)
+        writer.record({'spell': spell.name, 'short': short},
+                      (spell.name, 'name'),
+                      (short, 'value'))
 
-    logger.debug('End Function')
     return
 
 
@@ -52,12 +52,14 @@ from pysorcery.lib.system import distro
 from pysorcery.lib.system import logging
 # Other Application Libraries
 from pysorcery import lib
+from pysorcery.lib import sorcery
 from pysorcery.lib import util
 from pysorcery.lib.util import config
+from pysorcery.lib.util import output
 from pysorcery.lib.util import text
 # Conditional Libraries
 
-pkg_mgr = distro.distro_group[distro.distro_id]
+pkg_mgr = distro.get_pkg_mgr()
 #-----------------------------------------------------------------------
 #
 # Global Variables
@@ -110,20 +112,21 @@ colortext = text.ConsoleText()
 #
 #-----------------------------------------------------------------------
 def gaze_size(args):
-    logger.debug('Begin Function')
-
-    for i in args.spell:
-        spell = lib.Package(i)
-        size = spell.get_size()
-
-        logger.debug3('Spell: ' + str(spell))
+    writer = output.get_writer()
+    spells = [lib.Package(i) for i in args.spell]
+    for spell, size, error in sorcery.map_packages(spells,
+                                                   'get_size',
+                                                   args.jobs):
+        if error is not None:
+            logger.error(error)
+            continue
+
+        logger.debug3('Spell: %s', spell)
         
-        message = colortext.colorize(spell.name, 'bold','white','black')
-        logger.info(message)
-        message = colortext.colorize(str(spell.size) + 'kb', 'none','white','black')
-        logger.info1(message)
+        writer.record({'spell': spell.name, 'size': spell.size},
+                      (spell.name, 'name'),
+                      (str(spell.size) + 'kb', 'value'))
 
-    logger.debug('End Function')
     return
 
 
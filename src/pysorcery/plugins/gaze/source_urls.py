@@ -51,6 +51,8 @@ Lists the urls to all files contained in a spell.
 from pysorcery.lib.system import logging
 # Other Application Libraries
 from pysorcery import lib
+from pysorcery.lib import sorcery
+from pysorcery.lib.util import output
 from pysorcery.lib.util import text
 # Conditional Libraries
 
@@ -103,21 +105,23 @@ colortext = text.ConsoleText()
 #
 #-----------------------------------------------------------------------
 def gaze_source_urls(args):
-    logger.debug('Begin Function')
-    for i in args.spell:
-        logger.debug2('Loop iteration: ' + i)
-        
-        spell = lib.Package(i)
-        uris = spell.get_source_uris()
-        logger.debug3('Spell: ' + str(spell))
-        
-        message = colortext.colorize(spell.name, 'bold','white','black')
-        logger.info(message)
+    writer = output.get_writer()
+    spells = [lib.Package(i) for i in args.spell]
+    for spell, uris, error in sorcery.map_packages(spells,
+                                                   'get_source_uris',
+                                                   args.jobs):
+        if error is not None:
+            logger.error(error)
+            continue
 
-        for uri in uris:
-            print(uri)
+        logger.debug3('Spell: %s', spell)
+        
+        if writer.format == 'text':
+            writer.line(spell.name, 'name')
+            writer.lines(uris)
+        else:
+            writer.record({'spell': spell.name, 'urls': list(uris)})
     
-    logger.debug('End Function')
     return
 
 #-----------------------------------------------------------------------
@@ -51,6 +51,8 @@ List all source files contained in a spell.
 from pysorcery.lib.system import logging
 # Other Application Libraries
 from pysorcery import lib
+from pysorcery.lib import sorcery
+from pysorcery.lib.util import output
 from pysorcery.lib.util import text
 
 # Conditional Libraries
@@ -105,22 +107,23 @@ colortext = text.ConsoleText()
 #
 #-----------------------------------------------------------------------
 def gaze_sources(args):
-    logger.debug('Begin Function')
-
-    for i in args.spell:
-        logger.debug2('Loop iteration: ' + i)
-        
-        spell = lib.Package(i)
-        sources = spell.get_sources()
-        
-        logger.debug3('Spell: ' + str(spell))
+    writer = output.get_writer()
+    spells = [lib.Package(i) for i in args.spell]
+    for spell, sources, error in sorcery.map_packages(spells,
+                                                      'get_sources',
+                                                      args.jobs):
+        if error is not None:
+            logger.error(error)
+            continue
+
+        logger.debug3('Spell: %s', spell)
         
-        message = colortext.colorize(spell.name, 'bold','white','black')
-        logger.info(message)
-        for source in sources:
-            logger.info1(source)
+        if writer.format == 'text':
+            writer.line(spell.name, 'name')
+            writer.lines(sources)
+        else:
+            writer.record({'spell': spell.name, 'sources': list(sources)})
 
-    logger.debug('End Function')
     return
 
 
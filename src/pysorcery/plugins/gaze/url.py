@@ -52,6 +52,7 @@ from pysorcery.lib.system import logging
 # Other Application Libraries
 from pysorcery import lib
 from pysorcery.lib.util import config
+from pysorcery.lib.util import output
 from pysorcery.lib.util import text
 
 # Conditional Libraries
@@ -107,19 +108,17 @@ colortext = text.ConsoleText()
 #
 #-------------------------------------------------------------------------------
 def gaze_url(args):
-    logger.debug('Begin Function')
-
+    writer = output.get_writer()
     for i in args.spell:
         spell = lib.Package(i)
 
         logger.debug(spell)
         
-        name = colortext.colorize(spell.name, 'bold','white','black')
-        url = colortext.colorize(spell.get_url(), 'none','white','black')
-        logger.info(name + ': ')
-        logger.info1(url)
+        url = spell.get_url()
+        writer.record({'spell': spell.name, 'url': url},
+                      (writer.style(spell.name, 'name') + ': ', None),
+                      (url, 'value'))
 
-    logger.debug('End Function')
     return
 
 
@@ -52,6 +52,8 @@ import sys
 from pysorcery.lib.system import logging
 # Other Application Libraries
 from pysorcery import lib
+from pysorcery.lib import sorcery
+from pysorcery.lib.util import output
 from pysorcery.lib.util import text
 
 # Conditional Libraries
@@ -107,8 +109,6 @@ colortext = text.ConsoleText()
 #
 #-----------------------------------------------------------------------
 def gaze_what(args):
-    logger.debug('Begin Function')
-
     # Misc fun ...
     terms = {
         'the_force': 'The Force is an energy field created by all living things. It surrounds us, penetrates us, and binds the galaxy together.',
@@ -120,30 +120,27 @@ def gaze_what(args):
     # Provide hidden easter egg:
     if (args.spell[0] == 'is' and
         args.spell[1] in terms):
-        logger.info(terms[args.spell[1]])
+        output.get_writer().record({'term': args.spell[1],
+                                    'description': terms[args.spell[1]]},
+                                   (terms[args.spell[1]], None))
         
     else:
+        writer = output.get_writer()
         # For each spell in the spell list...
-        for i in args.spell:
-            logger.debug2('Loop iteration: ' + i)
-            
-            spell = lib.Package(i)
-            description = spell.get_description()
-#            try:
-#                description = spell.get_description()
-#            except:
-#                description = 'Fall back description, something went wrong'
-
-            logger.debug3('Spell: ' + str(spell))
+        spells = [lib.Package(i) for i in args.spell]
+        for spell, description, error in sorcery.map_packages(
+                spells, 'get_description', args.jobs):
+            if error is not None:
+                logger.error(error)
+                continue
+
+            logger.debug3('Spell: %s', spell)
             
-            message = colortext.colorize(spell.name, 'bold','white','black')
-            logger.info(message)
-
-            message = colortext.colorize(description, 'none','white','black')
-            logger.info1(message)
+            writer.record({'spell': spell.name, 'description': description},
+                          (spell.name, 'name'),
+                          (description, 'value'))
 
     
-    logger.debug('End Function')
     return
 
 
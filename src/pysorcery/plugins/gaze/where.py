@@ -51,6 +51,7 @@ Display the section a spell belongs to.
 from pysorcery.lib.system import logging
 # Other Application Libraries
 from pysorcery import lib
+from pysorcery.lib.util import output
 from pysorcery.lib.util import text
 
 # Conditional Libraries
@@ -109,19 +110,17 @@ colortext = text.ConsoleText()
 #
 #-------------------------------------------------------------------------------
 def gaze_where(args):
-    logger.debug('Begin Function')
-
+    writer = output.get_writer()
     for i in args.spell:
         spell = lib.Package(i)
 
         logger.debug2(spell)
         
-        name = colortext.colorize(spell.name, 'bold','white','black')
-        section = colortext.colorize(spell.get_section(), 'none','white','black')
-        logger.info(name + ': ')
-        logger.info1(section)
+        section = spell.get_section()
+        writer.record({'spell': spell.name, 'section': section},
+                      (writer.style(spell.name, 'name') + ': ', None),
+                      (section, 'value'))
     
-    logger.debug('End Function')
     return
 
 